@@ -0,0 +1,281 @@
+"""Background alert dispatch with concurrent per-channel delivery."""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, wait
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# A delivery sends one alert to one channel; raising or returning False marks it failed
+Delivery = Callable[[], Any]
+
+
+class _Job:
+    """One queued alert and its per-channel deliveries."""
+
+    def __init__(self, key: Hashable, deliveries: Dict[str, Delivery]):
+        self.key = key
+        self.deliveries = deliveries
+        self.count = 1
+        self.future: Future = Future()
+
+
+def _register_exit(callback: Callable[[], None]) -> None:
+    """
+    Run callback when the interpreter starts shutting down.
+
+    threading's exit hooks run before non-daemon threads are joined and
+    before plain atexit handlers, while every delivery thread is still
+    alive; atexit is only the fallback for interpreters without them.
+    """
+    try:
+        threading._register_atexit(callback)
+    except (AttributeError, RuntimeError):
+        atexit.register(callback)
+
+
+class _DeliveryPool:
+    """
+    Daemon threads running deliveries, with a ThreadPoolExecutor-like submit.
+
+    Unlike ThreadPoolExecutor workers they are not joined at exit, so a
+    delivery stuck in a retry loop cannot hold the process open past the
+    dispatcher's flush timeout.
+    """
+
+    def __init__(self, max_workers: int, name: str):
+        self.max_workers = max_workers
+        self.name = name
+        self._tasks: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def submit(self, send: Delivery) -> Future:
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new deliveries after shutdown")
+            future: Future = Future()
+            self._tasks.put((future, send))
+            if len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._work, daemon=True,
+                                          name=f"{self.name}_{len(self._threads)}")
+                thread.start()
+                self._threads.append(thread)
+        return future
+
+    def shutdown(self) -> None:
+        """Cancel deliveries that have not started and stop idle threads."""
+        with self._lock:
+            self._shutdown = True
+            while True:
+                try:
+                    task = self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if task is not None:
+                    task[0].cancel()
+            for _ in self._threads:
+                self._tasks.put(None)
+
+    def _work(self) -> None:
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            future, send = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = send()
+            except BaseException as error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+class AlertDispatcher:
+    """
+    Fire-and-forget alert fan-out.
+
+    Alerts are queued and handed to a worker thread, which delivers every
+    channel concurrently on a thread pool, so callers never wait on a slow
+    webhook. Identical alerts (same key) are coalesced while one is still
+    queued and rate-limited to one per ``min_interval`` seconds afterwards.
+    Webhook senders should post through ``session`` to reuse pooled
+    connections. Alerts still queued or in flight when the process exits
+    are waited for, up to ``flush_timeout`` seconds.
+
+    Args:
+        max_workers: Concurrent deliveries (and pooled connections per host)
+        min_interval: Seconds before an identical alert may be sent again
+        flush_timeout: Upper bound on the wait for queued alerts at exit
+    """
+
+    def __init__(self, max_workers: int = 4, min_interval: float = 60.0, flush_timeout: float = 10.0):
+        self.min_interval = min_interval
+        self.flush_timeout = flush_timeout
+        self.suppressed: Counter = Counter()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._pool = _DeliveryPool(max_workers, "alert-delivery")
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._pending: Dict[Hashable, _Job] = {}
+        self._last_sent: Dict[Hashable, float] = {}
+        self._outstanding = set()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+        _register_exit(self.close)
+
+    def submit(self, key: Hashable, deliveries: Dict[str, Delivery]) -> Optional[Future]:
+        """
+        Queue an alert for background delivery.
+
+        Args:
+            key: Identity used for coalescing and rate limiting (e.g. type + message)
+            deliveries: Channel name -> zero-argument sender
+
+        Returns:
+            Future resolving to {channel: delivered}, shared by coalesced
+            duplicates; None when the alert was rate-limited or there is
+            nothing to deliver
+        """
+        if not deliveries or self._closed:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            job = self._pending.get(key)
+            if job is not None:
+                job.count += 1
+                return job.future
+
+            last = self._last_sent.get(key)
+            if last is not None and now - last < self.min_interval:
+                self.suppressed[key] += 1
+                logger.debug(f"Rate-limited duplicate alert: {key}")
+                return None
+
+            job = _Job(key, dict(deliveries))
+            self._pending[key] = job
+            self._last_sent[key] = now
+            self._outstanding.add(job.future)
+            job.future.add_done_callback(self._forget)
+            self._ensure_worker()
+
+        self._queue.put(job)
+        return job.future
+
+    def deliver(self, deliveries: Dict[str, Delivery], timeout: Optional[float] = None) -> Dict[str, bool]:
+        """Send to every channel concurrently and wait for the results (no queueing)."""
+        futures = {name: self._pool.submit(send) for name, send in deliveries.items()}
+        wait(futures.values(), timeout=timeout)
+        return {name: self._succeeded(name, future) for name, future in futures.items()}
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait up to timeout seconds for queued alerts; True if all were delivered."""
+        with self._lock:
+            outstanding = list(self._outstanding)
+        _, not_done = wait(outstanding, timeout=timeout)
+        if not_done:
+            logger.warning(f"{len(not_done)} alerts still undelivered after {timeout}s")
+        return not not_done
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Flush (bounded by flush_timeout) and stop the worker."""
+        if self._closed:
+            return
+        self.flush(self.flush_timeout if timeout is None else timeout)
+        self._closed = True
+        self._queue.put(None)
+        self._pool.shutdown()
+        self.session.close()
+
+    def _forget(self, future: Future) -> None:
+        with self._lock:
+            self._outstanding.discard(future)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                self._pending.pop(job.key, None)
+            if job.count > 1:
+                logger.info(f"Coalesced {job.count} duplicate alerts: {job.key}")
+            self._fan_out(job)
+
+    def _fan_out(self, job: _Job) -> None:
+        try:
+            futures = {name: self._pool.submit(send) for name, send in job.deliveries.items()}
+        except RuntimeError:
+            # Dispatcher already closed; report the alert as undelivered
+            job.future.set_result({name: False for name in job.deliveries})
+            return
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def on_done(_):
+            with lock:
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished:
+                job.future.set_result({name: self._succeeded(name, f) for name, f in futures.items()})
+
+        for future in futures.values():
+            future.add_done_callback(on_done)
+
+    @staticmethod
+    def _succeeded(name: str, future: Future) -> bool:
+        if not future.done() or future.cancelled():
+            return False
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Failed to send {name} alert: {error}")
+            return False
+        return future.result() is not False
+
+
+_dispatcher: Optional[AlertDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> AlertDispatcher:
+    """Process-wide dispatcher configured from the environment."""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = AlertDispatcher(
+                    max_workers=int(os.getenv('ALERT_MAX_WORKERS', '4')),
+                    min_interval=float(os.getenv('ALERT_RATE_LIMIT_SECONDS', '60')),
+                    flush_timeout=float(os.getenv('ALERT_FLUSH_TIMEOUT', '10')),
+                )
+    return _dispatcher
+
+
+def _reset_dispatcher():
+    """Close and drop the shared dispatcher (for testing)."""
+    global _dispatcher
+    if _dispatcher is not None:
+        _dispatcher.close(timeout=0)
+    _dispatcher = None
@@ -2,10 +2,14 @@
 import os
 import sys
 import logging
+from concurrent.futures import Future
+from functools import partial
 from typing import Optional, Dict, Any
 import requests
 from twilio.rest import Client
 
+from alerts.dispatcher import get_dispatcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -145,19 +149,32 @@ class AlertNotifier:
             logger.error(f"Failed to send SMS: {e}")
             return False
 
-    def send_all_alerts(self, message: str, include_sms: bool = True) -> Dict[str, bool]:
-        """Send alert through all configured channels."""
-        results = {
-            "discord": self.send_discord_alert(message),
-            "slack": self.send_slack_alert(message)
+    def _deliveries(self, message: str, include_sms: bool) -> Dict[str, Any]:
+        deliveries = {
+            "discord": partial(self.send_discord_alert, message),
+            "slack": partial(self.send_slack_alert, message)
         }
-
         if include_sms:
-            results["sms"] = self.send_sms_alert(message)
+            deliveries["sms"] = partial(self.send_sms_alert, message)
+        return deliveries
+
+    def send_all_alerts(self, message: str, include_sms: bool = True) -> Dict[str, bool]:
+        """Send alert through all configured channels concurrently and wait for the results."""
+        results = get_dispatcher().deliver(self._deliveries(message, include_sms))
 
         logger.info(f"Alert results: {results}")
         return results
 
+    def dispatch_all_alerts(self, message: str, include_sms: bool = True) -> Optional[Future]:
+        """
+        Queue an alert for all channels and return immediately.
+
+        Duplicate messages are coalesced/rate-limited by the shared dispatcher;
+        returns a Future of the per-channel results, or None if suppressed.
+        """
+        return get_dispatcher().submit(("notifier", message, include_sms),
+                                       self._deliveries(message, include_sms))
+
     def send_error_alert(self, error_message: str) -> Dict[str, bool]:
         """Send high-priority error alert."""
         formatted_message = f"?? ERROR: {error_message}"
@@ -12,8 +12,6 @@ import json
 import logging
 import time
 import argparse
-import csv
-import sqlite3
 from typing import List, Dict, Optional, Tuple
 from functools import wraps
 from datetime import datetime as dt, timedelta, timezone
@@ -25,9 +23,14 @@ from googleapiclient.errors import HttpError
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import numpy as np
+import pandas as pd
+
 from odds_provider.prizepicks import PrizePicksClient
 from slips_generator import generate_slips
 from alert_system import AlertManager
+from core.gamelog_store import normalize_player_key
+from core.paper_slip_store import get_slip_store, write_slips
 
 # Configure logging
 logging.basicConfig(
@@ -77,6 +80,19 @@ def exponential_backoff_retry(max_retries: int = 3, base_delay: float = 1.0, max
     return decorator
 
 
+def _stat_key(stat_types) -> pd.Series:
+    """Normalized stat name for joins ('Pts+Rebs ' -> 'pts+rebs')."""
+    return pd.Series(stat_types, dtype=object).fillna('').astype(str).str.strip().str.lower() \
+        .str.replace(r"\s+", " ", regex=True)
+
+
+def _float_column(frame: pd.DataFrame, column: str, default: float) -> np.ndarray:
+    """Column as floats with missing values (or a missing column) as default."""
+    if column not in frame.columns:
+        return np.full(len(frame), default, dtype=float)
+    return pd.to_numeric(frame[column], errors='coerce').fillna(default).to_numpy(dtype=float)
+
+
 class StateManager:
     """Manages state persistence for multi-day runs"""
     
@@ -123,6 +139,10 @@ class EnhancedAutoPaper:
         self.alert_manager = AlertManager()
         self.state_manager = StateManager()
         
+        # Live boards fetched this run, keyed by league (one network fetch per league)
+        self._live_lines: Dict[str, List[Dict]] = {}
+        self.last_merge_stats = {'hits': 0, 'misses': 0}
+        
         # Timezone handling
         self.timezone = timezone.utc
         if timezone_override:
@@ -134,25 +154,8 @@ class EnhancedAutoPaper:
         self._init_database()
 
     def _init_database(self):
-        """Initialize database with new schema"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Check if columns exist before adding
-        cursor.execute("PRAGMA table_info(paper_slips)")
-        existing_columns = [col[1] for col in cursor.fetchall()]
-        
-        # Add new columns if they don't exist
-        if 'confidence_score' not in existing_columns:
-            cursor.execute("ALTER TABLE paper_slips ADD COLUMN confidence_score REAL")
-            logger.info("Added confidence_score column to paper_slips table")
-        
-        if 'closing_line' not in existing_columns:
-            cursor.execute("ALTER TABLE paper_slips ADD COLUMN closing_line TEXT")
-            logger.info("Added closing_line column to paper_slips table")
-            
-        conn.commit()
-        conn.close()
+        """Attach the shared slip store (its schema is migrated on the first save)"""
+        self.slip_store = get_slip_store(self.db_path)
 
     def initialize_sheets(self):
         """Initialize Google Sheets service with retry logic"""
@@ -183,59 +186,15 @@ class EnhancedAutoPaper:
 
     def calculate_confidence_score(self, slip_data: Dict) -> float:
         """Calculate confidence score based on model variance and other factors"""
-        base_confidence = slip_data.get('confidence', 0.5)
-        
-        # Factors that affect confidence
-        factors = []
-        
-        # Edge factor
-        if 'edge' in slip_data:
-            edge = abs(slip_data['edge'])
-            edge_factor = min(edge * 2, 1.0)  # Cap at 1.0
-            factors.append(edge_factor)
-        
-        # Model agreement factor (if multiple models)
-        if 'model_variance' in slip_data:
-            variance_factor = 1.0 - min(slip_data['model_variance'], 0.5)
-            factors.append(variance_factor)
-        
-        # Historical accuracy factor (if available)
-        if 'historical_accuracy' in slip_data:
-            factors.append(slip_data['historical_accuracy'])
-        
-        # Combine factors
-        if factors:
-            confidence_score = base_confidence * (sum(factors) / len(factors))
-        else:
-            confidence_score = base_confidence
-            
-        return round(confidence_score, 4)
+        return float(self.calculate_confidence_scores(pd.DataFrame([slip_data]))[0])
 
     def get_closing_line(self, slip_data: Dict) -> str:
         """Get the final closing line for the prop"""
-        # In a real implementation, this would fetch the actual closing line
-        # For now, we'll use the line at generation time
-        line = slip_data.get('line', 'N/A')
-        prop_type = slip_data.get('prop_type', '')
-        
-        return f"{prop_type} {line}"
+        return self.get_closing_lines([slip_data])[0]
 
     def generate_slip_id(self, slip_data: Dict) -> str:
         """Generate unique slip ID"""
-        # Create deterministic ID based on slip content
-        components = [
-            slip_data.get('player', ''),
-            slip_data.get('prop_type', ''),
-            str(slip_data.get('line', '')),
-            slip_data.get('game_id', ''),
-            datetime.datetime.now().strftime('%Y%m%d')
-        ]
-
-        # Use first 8 chars of UUID5 for shorter IDs
-        namespace = uuid.uuid5(uuid.NAMESPACE_DNS, 'phasegrid.com')
-        slip_uuid = uuid.uuid5(namespace, '|'.join(components))
-
-        return f"PG_{slip_uuid.hex[:8].upper()}"
+        return self.generate_slip_ids([slip_data])[0]
 
     @exponential_backoff_retry(max_retries=3)
     def check_existing_slip(self, slip_id: str) -> Optional[int]:
@@ -258,8 +217,10 @@ class EnhancedAutoPaper:
             logger.error(f"Error checking existing slip: {e}")
             raise
 
-    def fetch_live_lines(self, league: str = "WNBA") -> List[Dict]:
-        """Fetch live lines from PrizePicks"""
+    def fetch_live_lines(self, league: str = "WNBA", refresh: bool = False) -> List[Dict]:
+        """Fetch live lines from PrizePicks (once per league per run unless refresh)"""
+        if not refresh and league in self._live_lines:
+            return self._live_lines[league]
         try:
             logger.info(f"?? Fetching live {league} lines from PrizePicks...")
             projections = self.prizepicks_client.fetch_projections(league=league)
@@ -283,6 +244,7 @@ class EnhancedAutoPaper:
                 slips.append(slip)
                 
             logger.info(f"✅ Fetched {len(slips)} live lines")
+            self._live_lines[league] = slips
             return slips
         except Exception as e:
             logger.error(f"Failed to fetch live lines: {e}")
@@ -291,23 +253,30 @@ class EnhancedAutoPaper:
     def merge_with_projections(self, live_lines: List[Dict], date: str) -> List[Dict]:
         """Merge live lines with model projections"""
         try:
-            # Generate projections from model
-            model_slips = generate_slips(start_date=date, end_date=date)
-
-            # Create lookup map for live lines
-            lines_map = {}
-            for line in live_lines:
-                key = f"{line['player']}|{line['prop_type']}"
-                lines_map[key] = line
-
-            # Merge data
+            # Generate projections from model off the already-fetched board
+            model_slips = generate_slips(start_date=date, end_date=date,
+                                         projections=self._lines_to_projections(live_lines))
+            if not model_slips:
+                self.last_merge_stats = {'hits': 0, 'misses': 0}
+                return []
+
+            # Join model slips to live lines on normalized (player, stat) keys
+            live_index, live_positions = self._line_index(live_lines)
+            slip_keys = pd.MultiIndex.from_arrays([
+                normalize_player_key([s.get('player', '') for s in model_slips]).fillna(''),
+                _stat_key([s.get('prop_type', '') for s in model_slips]),
+            ])
+            live_rows = live_index.get_indexer(slip_keys) if len(live_index) else np.full(len(model_slips), -1)
+            hits = int((live_rows >= 0).sum())
+            self.last_merge_stats = {'hits': hits, 'misses': len(model_slips) - hits}
+            logger.info(f"🔗 Live line join: {hits} hits, {len(model_slips) - hits} misses")
+
+            created_at = datetime.datetime.now().isoformat()
             merged_slips = []
-            for slip in model_slips:
-                key = f"{slip.get('player', '')}|{slip.get('prop_type', '')}"
-
+            for slip, row in zip(model_slips, live_rows):
                 # If we have live line data, use it
-                if key in lines_map:
-                    live_data = lines_map[key]
+                if row >= 0:
+                    live_data = live_lines[live_positions[row]]
                     slip.update({
                         'line': live_data['line'],
                         'over_odds': live_data['over_odds'],
@@ -318,22 +287,28 @@ class EnhancedAutoPaper:
                     })
 
                 # Add metadata
-                slip['slip_id'] = self.generate_slip_id(slip)
                 slip['batch_id'] = self.batch_id
                 slip['dry_run'] = self.dry_run
-                slip['created_at'] = datetime.datetime.now().isoformat()
+                slip['created_at'] = created_at
                 slip['date'] = date
-                
-                # Add new fields
-                slip['confidence_score'] = self.calculate_confidence_score(slip)
-                slip['closing_line'] = self.get_closing_line(slip)
+                merged_slips.append(slip)
+
+            # Derived fields for the whole batch at once
+            frame = pd.DataFrame(merged_slips)
+            slip_ids = self.generate_slip_ids(merged_slips)
+            confidence_scores = self.calculate_confidence_scores(frame)
+            closing_lines = self.get_closing_lines(merged_slips)
+            edges, picks = self._edges_and_picks(frame)
+
+            for i, slip in enumerate(merged_slips):
+                slip['slip_id'] = slip_ids[i]
+                slip['confidence_score'] = float(confidence_scores[i])
+                slip['closing_line'] = closing_lines[i]
 
                 # Calculate edge and make pick
-                if 'projection' in slip and 'line' in slip:
-                    slip['edge'] = (slip['projection'] - slip['line']) / slip['line']
-                    slip['pick'] = 'over' if slip['edge'] > 0 else 'under'
-                    
-                merged_slips.append(slip)
+                if np.isfinite(edges[i]):
+                    slip['edge'] = float(edges[i])
+                    slip['pick'] = picks[i]
 
             return merged_slips
 
@@ -341,12 +316,94 @@ class EnhancedAutoPaper:
             logger.error(f"Error merging projections: {e}")
             return []
 
-    def save_slips_to_csv(self, slips: List[Dict], date: str):
-        """Save slips to CSV with new fields"""
+    @staticmethod
+    def _lines_to_projections(live_lines: List[Dict]) -> List[Dict]:
+        """Live lines in the projection layout generate_slips expects."""
+        return [
+            {
+                'id': line.get('projection_id', ''),
+                'player_name': line.get('player', ''),
+                'stat_type': line.get('prop_type', ''),
+                'line_score': line.get('line', 0),
+                'odds': line.get('over_odds', -110),
+                'game_time': line.get('start_time', ''),
+            }
+            for line in live_lines
+        ]
+
+    @staticmethod
+    def _line_index(live_lines: List[Dict]) -> Tuple[pd.MultiIndex, np.ndarray]:
+        """Unique (player_key, stat_key) index over live lines, with each key's position (later lines win)."""
+        keys = pd.DataFrame({
+            'player_key': normalize_player_key([line.get('player', '') for line in live_lines]).fillna(''),
+            'stat_key': _stat_key([line.get('prop_type', '') for line in live_lines]),
+            'position': np.arange(len(live_lines)),
+        }).drop_duplicates(['player_key', 'stat_key'], keep='last')
+        index = pd.MultiIndex.from_frame(keys[['player_key', 'stat_key']])
+        return index, keys['position'].to_numpy()
+
+    def generate_slip_ids(self, slips: List[Dict]) -> List[str]:
+        """Deterministic slip IDs from each slip's content and today's date"""
+        today = datetime.datetime.now().strftime('%Y%m%d')
+        # Use first 8 chars of UUID5 for shorter IDs
+        namespace = uuid.uuid5(uuid.NAMESPACE_DNS, 'phasegrid.com')
+        slip_ids = []
+        for slip in slips:
+            components = [
+                slip.get('player', ''),
+                slip.get('prop_type', ''),
+                str(slip.get('line', '')),
+                slip.get('game_id', ''),
+                today
+            ]
+            slip_ids.append(f"PG_{uuid.uuid5(namespace, '|'.join(components)).hex[:8].upper()}")
+        return slip_ids
+
+    def calculate_confidence_scores(self, slips: pd.DataFrame) -> np.ndarray:
+        """
+        Confidence score for every row of a slip frame: the base confidence
+        scaled by the mean of the edge, model agreement and historical
+        accuracy factors a slip has (missing or NaN factors are left out)
+        """
+        base_confidence = _float_column(slips, 'confidence', 0.5)
+        factor_sum = np.zeros(len(slips))
+        factor_count = np.zeros(len(slips))
+
+        def add(factor):
+            present = ~np.isnan(factor)
+            factor_sum[present] += factor[present]
+            factor_count[present] += 1
+
+        # Edge factor
+        add(np.minimum(np.abs(_float_column(slips, 'edge', np.nan)) * 2, 1.0))
+        # Model agreement factor
+        add(1.0 - np.minimum(_float_column(slips, 'model_variance', np.nan), 0.5))
+        # Historical accuracy factor
+        add(_float_column(slips, 'historical_accuracy', np.nan))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores = np.where(factor_count > 0, base_confidence * (factor_sum / factor_count), base_confidence)
+        return np.round(scores, 4)
+
+    def get_closing_lines(self, slips: List[Dict]) -> List[str]:
+        """Closing line of each slip's prop"""
+        # In a real implementation, this would fetch the actual closing lines
+        # For now, we'll use the line at generation time
+        return [f"{slip.get('prop_type', '')} {slip.get('line', 'N/A')}" for slip in slips]
+
+    @staticmethod
+    def _edges_and_picks(slips: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Edge vs line and over/under pick; edge is NaN where there is no model projection"""
+        projection = _float_column(slips, 'projection', np.nan)
+        line = _float_column(slips, 'line', np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            edges = (projection - line) / line
+        return edges, np.where(edges > 0, 'over', 'under')
+
+    def save_slips_to_csv(self, slips: List[Dict], date: str, fmt: str = "csv"):
+        """Save slips to CSV (or Parquet with fmt="parquet") with new fields"""
         output_dir = "output"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        filename = os.path.join(output_dir, f"paper_slips_{date.replace('-', '')}.csv")
+        filename = os.path.join(output_dir, f"paper_slips_{date.replace('-', '')}.{fmt}")
         
         # Define all columns including new ones
         fieldnames = [
@@ -357,46 +414,14 @@ class EnhancedAutoPaper:
             'confidence_score', 'closing_line'  # New fields
         ]
         
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for slip in slips:
-                # Ensure all fields exist
-                row = {field: slip.get(field, '') for field in fieldnames}
-                writer.writerow(row)
-                
+        write_slips(slips, filename, fieldnames)
         logger.info(f"💾 Saved {len(slips)} slips to {filename}")
         return filename
 
     def save_to_database(self, slips: List[Dict]):
-        """Save slips to database with new fields"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for slip in slips:
-            # Insert with new fields
-            cursor.execute("""
-                INSERT OR REPLACE INTO paper_slips 
-                (slip_id, date, player, prop_type, line, pick, confidence, 
-                 confidence_score, closing_line, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                slip.get('slip_id'),
-                slip.get('date'),
-                slip.get('player'),
-                slip.get('prop_type'),
-                slip.get('line'),
-                slip.get('pick'),
-                slip.get('confidence'),
-                slip.get('confidence_score'),
-                slip.get('closing_line'),
-                slip.get('created_at')
-            ))
-        
-        conn.commit()
-        conn.close()
-        logger.info(f"💾 Saved {len(slips)} slips to database")
+        """Save slips to database with new fields (one batched transaction)"""
+        saved = self.slip_store.save_slips(slips)
+        logger.info(f"💾 Saved {saved} slips to database")
 
     def emit_daily_metrics(self, date: str, slips: List[Dict]):
         """Emit daily metrics for monitoring"""
@@ -510,6 +535,9 @@ class EnhancedAutoPaper:
         if state['completed_dates']:
             logger.info(f"✅ Already completed: {len(state['completed_dates'])} days")
         
+        # One board fetch for the whole run, shared by every date
+        self._live_lines.clear()
+        
         # Process each date
         for date in dates_to_process:
             success, slip_count = self.run_single_day(date)
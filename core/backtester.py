@@ -17,6 +17,14 @@ from scipy import optimize
 import json
 import os
 from pathlib import Path
+import sys
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.gamelog_store import load_gamelogs
 
 # Import the existing prediction engine
 try:
@@ -95,20 +103,17 @@ class IntegratedWNBABacktester:
     def load_historical_data(self, filepath: str = "data/wnba_combined_gamelogs.csv") -> pd.DataFrame:
         """Load historical game log data with proper column mapping."""
         try:
-            df = pd.read_csv(filepath)
-            
-            # Map column names to standardized format
-            column_mapping = {
-                'Date': 'GAME_DATE',
-                'Player': 'PLAYER_NAME',
-                'GAME_DATE': 'GAME_DATE',  # In case it's already correct
-                'PLAYER_NAME': 'PLAYER_NAME'
-            }
-            
-            # Apply column mapping if needed
-            for old_col, new_col in column_mapping.items():
-                if old_col in df.columns and new_col not in df.columns:
-                    df[new_col] = df[old_col]
+            # Only the identity columns and the configured prop stats are read,
+            # and rows outside the backtest window are dropped at load time
+            columns = ['GAME_DATE', 'PLAYER_NAME'] + [
+                stat for stat in self.config.prop_types if stat not in ('GAME_DATE', 'PLAYER_NAME')
+            ]
+            df = load_gamelogs(
+                filepath,
+                columns=columns,
+                start_date=self.config.start_date,
+                end_date=self.config.end_date,
+            )
             
             # Ensure required columns exist
             required_cols = ['GAME_DATE', 'PLAYER_NAME', 'PTS', 'REB', 'AST']
@@ -116,15 +121,8 @@ class IntegratedWNBABacktester:
             if missing_cols:
                 raise ValueError(f"Missing required columns: {missing_cols}")
             
-            # Standardize date format
-            df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
             df = df.sort_values(['PLAYER_NAME', 'GAME_DATE']).reset_index(drop=True)
             
-            # Filter by date range
-            start_date = pd.to_datetime(self.config.start_date)
-            end_date = pd.to_datetime(self.config.end_date)
-            df = df[(df['GAME_DATE'] >= start_date) & (df['GAME_DATE'] <= end_date)]
-            
             print(f"✅ Loaded {len(df)} game logs from {df['GAME_DATE'].min()} to {df['GAME_DATE'].max()}")
             print(f"   Unique players: {df['PLAYER_NAME'].nunique()}")
             print(f"   Available stats: {[col for col in df.columns if col in self.config.prop_types]}")
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+bets_log_store.py - Typed, date-partitioned store of the bets log
+Parses bets_log.csv once into Parquet partitioned by month, keeps a daily
+aggregate table next to it, and only re-reads the rows appended since the
+last sync. Date-range reads prune partitions and filter rows in pyarrow
+instead of parsing the whole log.
+"""
+
+import json
+import os
+import shutil
+import warnings
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Parquet storage is optional; without pyarrow callers read the CSV directly
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = ds = pq = None
+
+DEFAULT_STORE_DIR = "data/bets_log_store"
+
+PARTITION_COLUMN = 'MONTH'
+UNDATED_PARTITION = 'undated'
+MANIFEST_FILE = 'manifest.json'
+DAILY_FILE = 'daily.parquet'
+
+# Column spellings accepted by the stats CLI, first match wins
+STAKE_COLUMNS = ['stake', 'bet_amount']
+PAYOUT_COLUMNS = ['payout', 'win_amount']
+RESULT_COLUMNS = ['result', 'status']
+WIN_VALUES = ['win', 'Won', 'W', True, 1]
+
+DAILY_COLUMNS = ['date', 'bet_count', 'total_stake', 'total_payout', 'wins']
+
+# Bytes before the recorded end of file that must be unchanged for an append
+TAIL_CHECK_BYTES = 64
+
+
+def _first_present(df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
+    return next((column for column in candidates if column in df.columns), None)
+
+
+def parse_bet_dates(values) -> pd.Series:
+    """
+    Timezone-naive datetimes for a date column.
+
+    Aware timestamps are converted to UTC before the zone is dropped; this
+    holds per value, so logs mixing offsets (or aware and naive rows) parse
+    consistently. Unparseable values become NaT.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        dates = values
+    else:
+        with warnings.catch_warnings():
+            # Mixed offsets come back as objects and are re-parsed in UTC below
+            warnings.simplefilter('ignore', FutureWarning)
+            dates = pd.to_datetime(values, errors='coerce', format='ISO8601')
+        if dates.dtype == object:
+            dates = pd.to_datetime(values, errors='coerce', format='ISO8601', utc=True)
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        dates = dates.dt.tz_convert('UTC').dt.tz_localize(None)
+    return dates
+
+
+def normalize_bets_log(df: pd.DataFrame) -> pd.DataFrame:
+    """Parse dates and coerce stake/payout to float; text columns stay strings."""
+    df = df.copy()
+    if 'date' in df.columns:
+        df['date'] = parse_bet_dates(df['date'])
+    for column in STAKE_COLUMNS + PAYOUT_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype(float)
+    for column in df.columns:
+        if df[column].dtype == object:
+            df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+    return df
+
+
+def daily_aggregates(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Additive per-day totals of a bets frame.
+
+    bet_count counts rows with a stake and wins follows the stats CLI rule:
+    a winning result when there is a result column, a positive payout
+    otherwise. Rows without a date are left out.
+    """
+    if df.empty or 'date' not in df.columns:
+        empty = {column: pd.Series(dtype=float) for column in DAILY_COLUMNS}
+        empty['date'] = pd.Series(dtype='datetime64[ns]')
+        return pd.DataFrame(empty)
+
+    stake_col = _first_present(df, STAKE_COLUMNS)
+    payout_col = _first_present(df, PAYOUT_COLUMNS)
+    result_col = _first_present(df, RESULT_COLUMNS)
+
+    stake = df[stake_col] if stake_col else pd.Series(np.nan, index=df.index)
+    payout = df[payout_col] if payout_col else pd.Series(np.nan, index=df.index)
+    if result_col:
+        wins = df[result_col].isin(WIN_VALUES)
+    else:
+        wins = payout > 0
+
+    dates = parse_bet_dates(df['date']).dt.normalize()
+    daily = pd.DataFrame({
+        'date': dates,
+        'bet_count': stake.notna().astype(int),
+        'total_stake': stake.astype(float),
+        'total_payout': payout.astype(float),
+        'wins': wins.astype(int)
+    }).dropna(subset=['date'])
+    return daily.groupby('date', sort=True)[DAILY_COLUMNS[1:]].sum().reset_index()
+
+
+def _combine_daily(*frames: pd.DataFrame) -> pd.DataFrame:
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return daily_aggregates(pd.DataFrame())
+    combined = pd.concat(frames, ignore_index=True)
+    return combined.groupby('date', sort=True)[DAILY_COLUMNS[1:]].sum().reset_index()
+
+
+def _month_key(dates: pd.Series) -> pd.Series:
+    return dates.dt.strftime('%Y-%m').fillna(UNDATED_PARTITION)
+
+
+class BetsLogStore:
+    """
+    Month-partitioned Parquet copy of a bets log CSV.
+
+    sync() keeps the copy current: nothing is read while the CSV's mtime
+    and size are unchanged, rows appended to the CSV are parsed on their
+    own, and any other edit rebuilds the store. read() pushes the date
+    range down to partition pruning and a row filter.
+    """
+
+    def __init__(self, root: Union[str, Path] = DEFAULT_STORE_DIR):
+        self.root = Path(root)
+        self._daily: Optional[Tuple[Tuple[int, int], pd.DataFrame]] = None
+
+    @staticmethod
+    def available() -> bool:
+        """Whether the Parquet backend (pyarrow) is installed."""
+        return pq is not None
+
+    def manifest(self) -> Dict:
+        try:
+            return json.loads((self.root / MANIFEST_FILE).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, manifest: Dict) -> None:
+        tmp = self.root / f"{MANIFEST_FILE}.tmp"
+        tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp, self.root / MANIFEST_FILE)
+
+    def sync(self, source: Union[str, Path]) -> str:
+        """
+        Bring the store up to date with the source CSV.
+
+        Returns:
+            'current', 'appended' or 'rebuilt'
+
+        Raises:
+            FileNotFoundError: If the source does not exist
+        """
+        if not self.available():
+            raise ImportError("pyarrow is required for the bets log store")
+
+        source = Path(source)
+        stat = os.stat(source)
+        manifest = self.manifest()
+        if (manifest.get('source') == str(source.resolve()) and
+                manifest.get('mtime_ns') == stat.st_mtime_ns and manifest.get('size') == stat.st_size):
+            return 'current'
+
+        if self._can_append(source, stat.st_size, manifest) and self._append(source, stat, manifest):
+            return 'appended'
+        self._rebuild(source, stat)
+        return 'rebuilt'
+
+    def _fingerprint(self, source: Path, end: int) -> Tuple[str, str]:
+        """Header line and the hex of the bytes just before end."""
+        with open(source, 'rb') as f:
+            header = f.readline().decode('utf-8-sig').strip()
+            start = max(end - TAIL_CHECK_BYTES, 0)
+            f.seek(start)
+            tail = f.read(end - start)
+        return header, tail.hex()
+
+    def _can_append(self, source: Path, size: int, manifest: Dict) -> bool:
+        if manifest.get('source') != str(source.resolve()) or size <= manifest.get('size', size):
+            return False
+        if not manifest.get('tail', '').endswith('0a'):
+            return False
+        return self._fingerprint(source, manifest['size']) == (manifest.get('header'), manifest.get('tail'))
+
+    def _read_source(self, source: Path, offset: int = 0, names: Optional[List[str]] = None) -> pd.DataFrame:
+        if offset == 0:
+            return pd.read_csv(source, encoding='utf-8-sig')
+        with open(source, 'rb') as f:
+            f.seek(offset)
+            return pd.read_csv(f, header=None, names=names, encoding='utf-8')
+
+    def _schema_matches(self, df: pd.DataFrame) -> bool:
+        """Whether new rows have the column types already stored."""
+        files = sorted(self.root.glob(f"{PARTITION_COLUMN}=*/*.parquet"))
+        if not files:
+            return False
+        stored = pq.read_schema(files[0])
+        new = pa.Schema.from_pandas(df, preserve_index=False)
+        for field in new:
+            index = stored.get_field_index(field.name)
+            if index < 0 or pa.types.is_null(field.type):
+                continue
+            if stored.field(index).type != field.type:
+                return False
+        return True
+
+    def _append(self, source: Path, stat, manifest: Dict) -> bool:
+        rows = self._read_source(source, manifest['size'], manifest['columns'])
+        rows = normalize_bets_log(rows)
+        for column, dtype in manifest.get('float_columns', {}).items():
+            if column in rows.columns and pd.api.types.is_integer_dtype(rows[column]):
+                rows[column] = rows[column].astype(dtype)
+        if not self._schema_matches(rows):
+            return False
+
+        self._write_partitions(rows, manifest['rows'])
+        daily = _combine_daily(self.daily(), daily_aggregates(rows))
+        self._write_daily(daily)
+        self._write_manifest(self._manifest_for(source, stat, manifest['columns'], manifest['rows'] + len(rows),
+                                                manifest['date_column'], manifest['float_columns']))
+        return True
+
+    def _rebuild(self, source: Path, stat) -> None:
+        df = normalize_bets_log(self._read_source(source))
+        if self.root.exists():
+            shutil.rmtree(self.root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        has_dates = 'date' in df.columns
+        self._write_partitions(df, 0)
+        self._write_daily(daily_aggregates(df))
+        float_columns = {column: str(df[column].dtype) for column in df.columns
+                         if pd.api.types.is_float_dtype(df[column])}
+        self._write_manifest(self._manifest_for(source, stat, list(df.columns), len(df), has_dates, float_columns))
+
+    def _manifest_for(self, source: Path, stat, columns: List[str], rows: int, date_column: bool,
+                      float_columns: Dict[str, str]) -> Dict:
+        header, tail = self._fingerprint(source, stat.st_size)
+        return {
+            'source': str(source.resolve()),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'header': header,
+            'tail': tail,
+            'columns': columns,
+            'rows': rows,
+            'date_column': date_column,
+            'float_columns': float_columns
+        }
+
+    def _write_partitions(self, df: pd.DataFrame, first_row: int) -> None:
+        # Parts are named by the log row they start at, so name order is log order
+        if df.empty:
+            return
+        if 'date' in df.columns:
+            months = _month_key(df['date'])
+        else:
+            months = pd.Series(UNDATED_PARTITION, index=df.index)
+        for month, month_df in df.groupby(months, sort=True):
+            part_dir = self.root / f"{PARTITION_COLUMN}={month}"
+            part_dir.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pandas(month_df, preserve_index=False)
+            pq.write_table(table, part_dir / f"part-{first_row:012d}.parquet")
+
+    def _write_daily(self, daily: pd.DataFrame) -> None:
+        pq.write_table(pa.Table.from_pandas(daily, preserve_index=False), self.root / DAILY_FILE)
+        self._daily = None
+
+    def daily(self) -> pd.DataFrame:
+        """Cached daily aggregates (DAILY_COLUMNS), re-read only after a sync changed them."""
+        path = self.root / DAILY_FILE
+        try:
+            signature = (os.stat(path).st_mtime_ns, os.stat(path).st_size)
+        except OSError:
+            return daily_aggregates(pd.DataFrame())
+        if self._daily is None or self._daily[0] != signature:
+            self._daily = (signature, pq.read_table(path).to_pandas())
+        return self._daily[1]
+
+    def read(self, start=None, end=None, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Stored bets with start <= date <= end, in log order within each month.
+
+        Only the month partitions overlapping the range are opened. Without
+        bounds every row (including undated ones) is returned.
+        """
+        files = sorted(self.root.glob(f"{PARTITION_COLUMN}=*/*.parquet"))
+        columns = list(columns) if columns is not None else self.manifest().get('columns')
+        if not files:
+            return pd.DataFrame(columns=columns)
+
+        schema = pa.unify_schemas([pq.read_schema(path) for path in files])
+        dataset = ds.dataset(files, schema=schema.append(pa.field(PARTITION_COLUMN, pa.string())),
+                             format='parquet', partition_base_dir=str(self.root),
+                             partitioning=ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.string())]),
+                                                          flavor='hive'))
+
+        predicates = []
+        if 'date' in schema.names:
+            date_type = schema.field('date').type
+            if start is not None:
+                start = pd.Timestamp(start)
+                predicates += [ds.field(PARTITION_COLUMN) >= start.strftime('%Y-%m'),
+                               ds.field('date') >= pa.scalar(start, type=date_type)]
+            if end is not None:
+                end = pd.Timestamp(end)
+                predicates += [ds.field(PARTITION_COLUMN) <= end.strftime('%Y-%m'),
+                               ds.field('date') <= pa.scalar(end, type=date_type)]
+        expression = None
+        for predicate in predicates:
+            expression = predicate if expression is None else expression & predicate
+
+        read_columns = [column for column in columns if column in schema.names] if columns else None
+        return dataset.to_table(columns=read_columns, filter=expression).to_pandas()
+
+    def daily_range(self, start=None, end=None) -> pd.DataFrame:
+        """Daily aggregates for days in [start, end] (dates compared at day resolution)."""
+        daily = self.daily()
+        mask = pd.Series(True, index=daily.index)
+        if start is not None:
+            mask &= daily['date'] >= pd.Timestamp(start).normalize()
+        if end is not None:
+            mask &= daily['date'] <= pd.Timestamp(end).normalize()
+        return daily[mask].reset_index(drop=True)
+
+
+def main():
+    """Build or update the store from a bets log CSV."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Sync the Parquet bets log store')
+    parser.add_argument('source', nargs='?', default='bets_log.csv', help='Bets log CSV')
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR, help='Store directory')
+    args = parser.parse_args()
+
+    store = BetsLogStore(args.store)
+    status = store.sync(args.source)
+    print(f"✅ Bets log store {status}: {store.manifest().get('rows', 0)} rows in {store.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,21 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime, timedelta
+import sys
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.gamelog_store import normalize_player_key
+
+# Reason text per dip type (other types add nothing)
+DIP_REASONS = {
+    'cycle': 'cyclical performance pattern detected',
+    'fatigue': 'potential fatigue-related decline',
+    'unknown': 'unclear dip cause',
+}
 
 class BettingIntelligenceSystem:
     """
@@ -76,147 +91,164 @@ class BettingIntelligenceSystem:
             self.dips_data['trend_phase'].isin(concerning_phases)
         ].copy()
         
-        # Get most recent record for each concerning player
-        latest_concerns = recent_concerns.groupby('player').apply(
-            lambda x: x.loc[x['date'].idxmax()]
-        ).reset_index(drop=True)
+        # Most recent record for each concerning player (earliest row wins date ties)
+        latest_concerns = (
+            recent_concerns.dropna(subset=['player'])
+            .sort_values('date', ascending=False, kind='mergesort')
+            .drop_duplicates('player')
+            .sort_values('player', kind='mergesort')
+        )
         
         # Match with current props
-        opportunities = []
-        
-        for _, concern in latest_concerns.iterrows():
-            player_name = concern['player']
-            
-            # Find matching props (try exact match first, then fuzzy)
-            player_props = self.props_data[
-                self.props_data['player_name'] == player_name
-            ].copy()
-            
-            if len(player_props) == 0:
-                # Try fuzzy matching for slight name differences
-                player_props = self.props_data[
-                    self.props_data['player_name'].str.contains(
-                        player_name.split()[0], case=False, na=False
-                    )
-                ].copy()
-            
-            # Create opportunity records for each prop
-            for _, prop in player_props.iterrows():
-                opportunity = {
-                    'player': player_name,
-                    'stat_type': prop['stat_type'],
-                    'line_score': prop['line_score'],
-                    'trend_phase': concern['trend_phase'],
-                    'games_in_trend': concern['games_in_trend'],
-                    'dip_type': concern['dip_type'],
-                    'confidence_score': self._calculate_confidence_score(concern, prop),
-                    'recommendation': 'UNDER',
-                    'reasoning': self._generate_reasoning(concern, prop)
-                }
-                
-                # Add recent performance data if available
-                if 'fantasy_points_roll_3' in concern.index:
-                    opportunity['recent_avg'] = concern['fantasy_points_roll_3']
-                if 'percent_drop_from_avg' in concern.index:
-                    opportunity['drop_percentage'] = concern['percent_drop_from_avg']
-                    
-                opportunities.append(opportunity)
-        
-        self.opportunities = pd.DataFrame(opportunities)
+        matched, prop_rows = self._match_props(latest_concerns)
+        self.opportunities = self._build_opportunities(matched, prop_rows)
         
         if len(self.opportunities) > 0:
             # Sort by confidence score
             self.opportunities = self.opportunities.sort_values(
-                'confidence_score', ascending=False
-            )
+                'confidence_score', ascending=False, kind='mergesort'
+            ).reset_index(drop=True)
             print(f"✅ Found {len(self.opportunities)} UNDER opportunities")
         else:
             print("ℹ️ No UNDER opportunities found")
             
         return self.opportunities
     
-    def _calculate_confidence_score(self, concern, prop):
+    def _match_props(self, concerns):
         """
-        Calculate confidence score for the betting opportunity.
+        Join concerning players to the props board.
+        
+        Players are hash-joined on a normalized name key. Players with no
+        exact match get one blocked fuzzy pass: props whose name contains
+        the player's first name as a word.
         
         Args:
-            concern (pd.Series): Performance concern data
-            prop (pd.Series): Props data
+            concerns (pd.DataFrame): One row per concerning player
             
         Returns:
-            float: Confidence score (0-100)
+            tuple: (concern row per match, matching props_data row positions)
         """
-        score = 50  # Base score
+        concerns = concerns.reset_index(drop=True)
+        concern_keys = pd.DataFrame({
+            '_concern': np.arange(len(concerns)),
+            '_key': normalize_player_key(concerns['player']).to_numpy(),
+        })
+        prop_keys = pd.DataFrame({
+            '_prop': np.arange(len(self.props_data)),
+            '_key': normalize_player_key(self.props_data['player_name']).to_numpy(),
+        }).dropna(subset=['_key'])
         
-        # Trend phase scoring
-        if concern['trend_phase'] == 'Trough':
-            score += 30
-        elif concern['trend_phase'] == 'Descending':
-            score += 20
+        exact = concern_keys.merge(prop_keys, on='_key')
+        
+        unresolved = concern_keys[~concern_keys['_key'].isin(prop_keys['_key'])]
+        if len(unresolved) > 0:
+            # Block on name tokens so only props sharing the first name are compared
+            prop_tokens = prop_keys.assign(_token=prop_keys['_key'].str.split(' ')).explode('_token')
+            first_names = unresolved.assign(_token=unresolved['_key'].str.split(' ').str[0])
+            fuzzy = first_names.merge(prop_tokens[['_token', '_prop']], on='_token')
+            exact = pd.concat([exact, fuzzy[['_concern', '_prop']]], ignore_index=True)
+        
+        pairs = (exact[['_concern', '_prop']]
+                 .drop_duplicates()
+                 .sort_values(['_concern', '_prop'], kind='mergesort'))
+        matched = concerns.iloc[pairs['_concern'].to_numpy()].reset_index(drop=True)
+        return matched, pairs['_prop'].to_numpy()
+    
+    def _build_opportunities(self, matched, prop_rows):
+        """
+        Create opportunity records for each matched (concern, prop) pair.
+        
+        Args:
+            matched (pd.DataFrame): Concern row per match
+            prop_rows (np.ndarray): props_data row position per match
             
-        # Trend duration scoring
-        games_in_trend = concern['games_in_trend']
-        if games_in_trend >= 4:
-            score += 20
-        elif games_in_trend >= 2:
-            score += 10
+        Returns:
+            pd.DataFrame: One UNDER opportunity per match
+        """
+        line_column = 'line_score' if 'line_score' in self.props_data.columns else 'line'
+        stat_types = self.props_data['stat_type'].to_numpy()[prop_rows]
+        
+        opportunities = pd.DataFrame({
+            'player': matched['player'].to_numpy(),
+            'stat_type': stat_types,
+            'line_score': self.props_data[line_column].to_numpy()[prop_rows],
+            'trend_phase': matched['trend_phase'].to_numpy(),
+            'games_in_trend': matched['games_in_trend'].to_numpy(),
+            'dip_type': matched['dip_type'].to_numpy(),
+            'confidence_score': self._calculate_confidence_scores(matched, stat_types),
+            'recommendation': 'UNDER',
+            'reasoning': self._generate_reasoning(matched).to_numpy(),
+        })
+        
+        # Add recent performance data if available
+        if 'fantasy_points_roll_3' in matched.columns:
+            opportunities['recent_avg'] = matched['fantasy_points_roll_3'].to_numpy()
+        if 'percent_drop_from_avg' in matched.columns:
+            opportunities['drop_percentage'] = matched['percent_drop_from_avg'].to_numpy()
             
-        # Dip type scoring
-        if concern['dip_type'] == 'cycle':
-            score += 15
-        elif concern['dip_type'] == 'fatigue':
-            score += 10
+        return opportunities
+    
+    def _calculate_confidence_scores(self, concerns, stat_types):
+        """
+        Calculate confidence scores for betting opportunities.
+        
+        Args:
+            concerns (pd.DataFrame): Performance concern data, one row per opportunity
+            stat_types (array-like): Prop stat type per opportunity
             
+        Returns:
+            np.ndarray: Confidence scores (0-100)
+        """
+        trend = concerns['trend_phase'].to_numpy()
+        games_in_trend = concerns['games_in_trend'].to_numpy(dtype=float)
+        dip_type = concerns['dip_type'].to_numpy()
+        
+        score = np.full(len(concerns), 50)  # Base score
+        
+        # Trend phase scoring
+        score += np.select([trend == 'Trough', trend == 'Descending'], [30, 20], 0)
+        
+        # Trend duration scoring
+        score += np.select([games_in_trend >= 4, games_in_trend >= 2], [20, 10], 0)
+        
+        # Dip type scoring
+        score += np.select([dip_type == 'cycle', dip_type == 'fatigue'], [15, 10], 0)
+        
         # Performance drop scoring
-        if 'percent_drop_from_avg' in concern.index:
-            drop_pct = abs(concern['percent_drop_from_avg'])
-            if drop_pct > 25:
-                score += 20
-            elif drop_pct > 15:
-                score += 10
-                
+        if 'percent_drop_from_avg' in concerns.columns:
+            drop_pct = np.abs(concerns['percent_drop_from_avg'].to_numpy(dtype=float))
+            score += np.select([drop_pct > 25, drop_pct > 15], [20, 10], 0)
+        
         # Stat type considerations
-        stat_type = prop['stat_type'].lower()
-        if stat_type in ['points', 'fantasy_points']:
-            score += 5  # High-impact stats
-        elif stat_type in ['assists', 'rebounds']:
-            score += 3  # Medium-impact stats
+        stat_type = pd.Series(stat_types, dtype=object).str.lower()
+        score += np.select(
+            [stat_type.isin(['points', 'fantasy_points']), stat_type.isin(['assists', 'rebounds'])],
+            [5, 3], 0)  # High-impact, then medium-impact stats
             
-        return min(score, 95)  # Cap at 95
+        return np.minimum(score, 95)  # Cap at 95
     
-    def _generate_reasoning(self, concern, prop):
+    def _generate_reasoning(self, concerns):
         """
-        Generate human-readable reasoning for the recommendation.
+        Generate human-readable reasoning for each recommendation.
         
         Args:
-            concern (pd.Series): Performance concern data  
-            prop (pd.Series): Props data
+            concerns (pd.DataFrame): Performance concern data, one row per opportunity
             
         Returns:
-            str: Reasoning text
+            pd.Series: Reasoning text
         """
-        reasons = []
-        
         # Trend information
-        trend = concern['trend_phase']
-        games = concern['games_in_trend']
-        reasons.append(f"{trend} trend for {games} games")
+        reasons = (concerns['trend_phase'].astype(str) + ' trend for '
+                   + concerns['games_in_trend'].astype(str) + ' games')
         
         # Dip type information
-        dip_type = concern['dip_type']
-        if dip_type == 'cycle':
-            reasons.append("cyclical performance pattern detected")
-        elif dip_type == 'fatigue':
-            reasons.append("potential fatigue-related decline")
-        elif dip_type == 'unknown':
-            reasons.append("unclear dip cause")
-            
+        reasons += concerns['dip_type'].map(DIP_REASONS).radd('; ').fillna('')
+        
         # Performance drop information
-        if 'percent_drop_from_avg' in concern.index:
-            drop = abs(concern['percent_drop_from_avg'])
-            reasons.append(f"{drop:.1f}% below season average")
+        if 'percent_drop_from_avg' in concerns.columns:
+            reasons += concerns['percent_drop_from_avg'].abs().map('; {:.1f}% below season average'.format)
             
-        return "; ".join(reasons)
+        return reasons
     
     def generate_daily_report(self, min_confidence=60):
         """
@@ -8,9 +8,17 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.gamelog_store import load_gamelogs
+
 class CycleDipDetector:
     """
     Advanced system for detecting cyclical performance dips in WNBA players.
@@ -44,10 +52,8 @@ class CycleDipDetector:
         print(f"Loading data from {filepath}...")
         
         try:
-            df = pd.read_csv(filepath)
-            print(f"Loaded {len(df)} game logs")
-            
-            # Map column names to expected format
+            # Only the columns this detector uses are parsed; the store maps
+            # the source layout onto canonical names first
             column_mapping = {
                 'PLAYER_NAME': 'player',
                 'GAME_DATE': 'date', 
@@ -58,9 +64,12 @@ class CycleDipDetector:
                 'AST': 'assists', 
                 'REB': 'rebounds'
             }
-            
-            # Rename columns to standard format
-            df = df.rename(columns=column_mapping)
+            df = load_gamelogs(
+                filepath,
+                columns=list(column_mapping) + ['WNBA_FANTASY_PTS'],
+                rename=column_mapping
+            )
+            print(f"Loaded {len(df)} game logs")
             print("✅ Mapped column names to standard format")
             
             # Validate required columns now exist
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+dashboard_data.py - Cached, lazily loaded data layer for the dashboards
+Reads each source file only when a panel asks for it and again only when
+the file's mtime or size changes, computes panel aggregates once per data
+version, and records how long every load and computation took.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# Source key -> CSV path (relative to base_dir)
+DASHBOARD_SOURCES = {
+    'phase_results': 'phase_results_tracker.csv',
+    'confidence': 'output/phase_confidence_levels.csv',
+    'kelly_divisors': 'output/dynamic_kelly_divisors.csv',
+    'risk_adjustments': 'output/phase_risk_adjustments.csv',
+    'betting_card': 'input/daily_betting_card.csv'
+}
+
+Signature = Optional[Tuple[int, int]]
+
+
+def file_signature(path: str) -> Signature:
+    """(mtime_ns, size) of a file, or None when it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DashboardData:
+    """
+    Source frames and derived aggregates, cached per file version.
+
+    Frames are read on first access (data['confidence'] or
+    data.frame('confidence')); a later access re-reads the file only when
+    its signature changed. Missing or unreadable files give an empty frame.
+    The instance is safe to share between sessions.
+    """
+
+    def __init__(self, sources: Optional[Dict[str, str]] = None, base_dir: Optional[str] = None):
+        self.sources = dict(DASHBOARD_SOURCES if sources is None else sources)
+        self.base_dir = base_dir
+        self.timings: Dict[str, Dict] = {}
+        self._frames: Dict[str, Tuple[Signature, pd.DataFrame]] = {}
+        self._derived: Dict[str, Tuple[tuple, object]] = {}
+        self._lock = threading.RLock()
+
+    def path(self, key: str) -> str:
+        path = self.sources[key]
+        return os.path.join(self.base_dir, path) if self.base_dir else path
+
+    def signature(self, key: str) -> Signature:
+        return file_signature(self.path(key))
+
+    def frame(self, key: str) -> pd.DataFrame:
+        """Source frame for key, read again only if the file changed."""
+        signature = self.signature(key)
+        with self._lock:
+            cached = self._frames.get(key)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+
+            start = time.perf_counter()
+            frame = pd.DataFrame()
+            if signature is not None:
+                try:
+                    frame = pd.read_csv(self.path(key))
+                except Exception:
+                    frame = pd.DataFrame()
+            self._frames[key] = (signature, frame)
+            self._record(f"load {key}", start, len(frame))
+            return frame
+
+    def __getitem__(self, key: str) -> pd.DataFrame:
+        return self.frame(key)
+
+    def derived(self, name: str, keys: Sequence[str], compute: Callable[..., object]):
+        """
+        compute(*frames) for the given sources, cached until one of them changes.
+
+        Args:
+            name: Cache and timing label of the aggregate
+            keys: Source keys whose frames are passed to compute, in order
+            compute: Aggregation run once per version of its sources
+        """
+        frames = [self.frame(key) for key in keys]
+        version = tuple(self._frames[key][0] for key in keys)
+        with self._lock:
+            cached = self._derived.get(name)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+            start = time.perf_counter()
+            value = compute(*frames)
+            self._derived[name] = (version, value)
+            self._record(f"compute {name}", start, len(value) if isinstance(value, pd.DataFrame) else None)
+            return value
+
+    def _record(self, label: str, start: float, rows: Optional[int]) -> None:
+        self.timings[label] = {
+            'seconds': time.perf_counter() - start,
+            'rows': rows,
+            'at': pd.Timestamp.now()
+        }
+
+    def timing_table(self) -> pd.DataFrame:
+        """Most recent load/compute timings, slowest first."""
+        if not self.timings:
+            return pd.DataFrame(columns=['step', 'ms', 'rows', 'at'])
+        table = pd.DataFrame([
+            {'step': label, 'ms': round(timing['seconds'] * 1000, 1), 'rows': timing['rows'],
+             'at': timing['at'].strftime('%H:%M:%S')}
+            for label, timing in self.timings.items()
+        ])
+        return table.sort_values('ms', ascending=False, kind='stable').reset_index(drop=True)
+
+    # Panel aggregates
+
+    def phase_summary(self) -> pd.DataFrame:
+        """Bets, wins and win rate per phase of the results tracker."""
+        return self.derived('phase summary', ['phase_results'], phase_summary)
+
+    def bet_timeline(self) -> pd.DataFrame:
+        """Bet count per date and phase."""
+        return self.derived('bet timeline', ['phase_results'], bet_timeline)
+
+    def risk_matrix(self) -> Dict[str, pd.DataFrame]:
+        """Risk level counts and per-phase Kelly multipliers."""
+        return self.derived('risk matrix', ['risk_adjustments'], risk_matrix)
+
+    def result_totals(self) -> Dict[str, int]:
+        """Total bets and wins across the whole tracker."""
+        return self.derived('result totals', ['phase_results'], result_totals)
+
+
+def phase_summary(results: pd.DataFrame) -> pd.DataFrame:
+    """One row per phase with bets, wins, losses and win_rate."""
+    if results.empty or 'phase' not in results.columns:
+        return pd.DataFrame(columns=['phase', 'bets', 'wins', 'losses', 'win_rate'])
+    wins = (results['actual_result'] == 'win') if 'actual_result' in results.columns \
+        else pd.Series(False, index=results.index)
+    summary = pd.DataFrame({'phase': results['phase'], 'win': wins}).groupby('phase', sort=False).agg(
+        bets=('win', 'size'), wins=('win', 'sum')).reset_index()
+    summary['wins'] = summary['wins'].astype(int)
+    summary['losses'] = summary['bets'] - summary['wins']
+    summary['win_rate'] = summary['wins'] / summary['bets']
+    return summary
+
+
+def result_totals(results: pd.DataFrame) -> Dict[str, int]:
+    """Total bets and wins, including rows without a phase."""
+    wins = int((results['actual_result'] == 'win').sum()) if 'actual_result' in results.columns else 0
+    return {'total_bets': len(results), 'total_wins': wins}
+
+
+def bet_timeline(results: pd.DataFrame) -> pd.DataFrame:
+    """Bet count per (date, phase), sorted by date."""
+    if results.empty or not {'date', 'phase'} <= set(results.columns):
+        return pd.DataFrame(columns=['date', 'phase', 'bet_count'])
+    dates = pd.to_datetime(results['date'])
+    return results.assign(date=dates).groupby(['date', 'phase']).size().reset_index(name='bet_count')
+
+
+def risk_matrix(adjustments: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Risk level distribution and the phase/multiplier table behind the Kelly chart."""
+    if adjustments.empty or 'risk_level' not in adjustments.columns:
+        return {'levels': pd.DataFrame(columns=['risk_level', 'count']),
+                'multipliers': pd.DataFrame(columns=['phase', 'kelly_multiplier', 'risk_level'])}
+    levels = adjustments['risk_level'].value_counts(sort=False).rename_axis('risk_level').reset_index(name='count')
+    columns = [column for column in ['phase', 'kelly_multiplier', 'risk_level'] if column in adjustments.columns]
+    return {'levels': levels, 'multipliers': adjustments[columns]}
@@ -3,6 +3,232 @@ import numpy as np
 from datetime import datetime, timedelta
 import json
 import os
+import sqlite3
+
+# Confidence level of each bet for performance breakdowns
+CONFIDENCE_BUCKETS_SQL = """
+    CASE WHEN confidence >= 70 THEN 'high'
+         WHEN confidence >= 50 THEN 'medium'
+         ELSE 'low' END
+"""
+
+BET_COLUMNS = [
+    'id', 'date', 'player', 'stat', 'line', 'recommendation', 'predicted_ev',
+    'hit_probability', 'confidence', 'stake', 'odds', 'result', 'actual_value', 'payout'
+]
+
+SESSION_COLUMNS = [
+    'date', 'total_bets', 'completed_bets', 'wins', 'win_rate',
+    'total_stake', 'total_payout', 'profit', 'roi'
+]
+
+
+def _decimal_odds(odds):
+    """Convert American odds to decimal."""
+    if odds < 0:
+        return 1 + (100 / abs(odds))
+    return 1 + (odds / 100)
+
+
+def _settle(bet, actual_value, hit=None):
+    """Result and payout for a bet given the actual stat value."""
+    if hit is None:
+        if bet['recommendation'] == 'OVER' or bet['recommendation'] == 'STRONG OVER':
+            hit = actual_value > bet['line']
+        else:  # UNDER
+            hit = actual_value < bet['line']
+    
+    payout = bet['stake'] * _decimal_odds(bet['odds']) if hit else 0
+    return ('win' if hit else 'loss'), payout
+
+
+class BetLedger:
+    """
+    SQLite-backed bet ledger.
+    
+    Bets are rows keyed by id, so adding or settling a bet touches one row
+    instead of rewriting the whole history, and performance breakdowns are
+    grouped queries.
+    """
+    
+    def __init__(self, db_path='data/betting_history.db'):
+        self.db_path = db_path
+        self._ensure_database()
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    def _ensure_database(self):
+        """Create database and tables if they don't exist."""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bets (
+                    id INTEGER PRIMARY KEY,
+                    date TEXT NOT NULL,
+                    player TEXT,
+                    stat TEXT,
+                    line REAL,
+                    recommendation TEXT,
+                    predicted_ev REAL,
+                    hit_probability REAL,
+                    confidence REAL,
+                    stake REAL,
+                    odds REAL,
+                    result TEXT DEFAULT 'pending',
+                    actual_value REAL,
+                    payout REAL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    date TEXT PRIMARY KEY,
+                    total_bets INTEGER,
+                    completed_bets INTEGER,
+                    wins INTEGER,
+                    win_rate REAL,
+                    total_stake REAL,
+                    total_payout REAL,
+                    profit REAL,
+                    roi REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_bets_date ON bets(date)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_bets_result ON bets(result)")
+    
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM bets").fetchone()[0]
+    
+    def add(self, bet):
+        """Insert a bet and return its id."""
+        columns = [c for c in BET_COLUMNS if c in bet]
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO bets ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [bet[c] for c in columns]
+            )
+            return cursor.lastrowid
+    
+    def add_many(self, bets):
+        """Insert several bets in one transaction."""
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT INTO bets ({', '.join(BET_COLUMNS)}) VALUES ({', '.join('?' * len(BET_COLUMNS))})",
+                [[bet.get(c) for c in BET_COLUMNS] for bet in bets]
+            )
+    
+    def get(self, bet_id):
+        """Bet by id, or None."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM bets WHERE id = ?", (bet_id,)).fetchone()
+        return dict(row) if row else None
+    
+    def settle(self, results):
+        """
+        Record results for many bets in one transaction.
+        
+        Args:
+            results: Iterable of (bet_id, actual_value) or (bet_id, actual_value, hit)
+            
+        Returns:
+            int: Number of bets updated
+        """
+        results = [tuple(r) + (None,) * (3 - len(r)) for r in results]
+        if not results:
+            return 0
+        
+        with self._connect() as conn:
+            bets = {}
+            ids = [r[0] for r in results]
+            # Chunk the IN list to stay under SQLite's parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT id, line, recommendation, stake, odds FROM bets "
+                    f"WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                bets.update((row['id'], dict(row)) for row in rows)
+            
+            updates = []
+            for bet_id, actual_value, hit in results:
+                if bet_id in bets:
+                    result, payout = _settle(bets[bet_id], actual_value, hit)
+                    updates.append((actual_value, result, payout, bet_id))
+            
+            conn.executemany(
+                "UPDATE bets SET actual_value = ?, result = ?, payout = ? WHERE id = ?", updates
+            )
+        return len(updates)
+    
+    def bets(self):
+        """All bets as a DataFrame."""
+        with self._connect() as conn:
+            return pd.read_sql_query("SELECT * FROM bets ORDER BY id", conn)
+    
+    def summary(self, after=None, on_date=None, by=None, completed_only=False):
+        """
+        Aggregate bets in one grouped query.
+        
+        Args:
+            after: Optional ISO timestamp; only bets placed after it
+            on_date: Optional 'YYYY-MM-DD'; only bets placed that day
+            by: Optional list of grouping columns ('stat', 'bucket')
+            completed_only: Skip pending bets
+            
+        Returns:
+            pd.DataFrame: count, completed, wins, stake, payout, ev_sum per group
+        """
+        where, params = [], []
+        if after is not None:
+            where.append("date > ?")
+            params.append(after)
+        if on_date is not None:
+            # Prefix match as a range so the date index is used
+            where.append("date >= ? AND date < ?")
+            params.extend([on_date, on_date + '\uffff'])
+        if completed_only:
+            where.append("result != 'pending'")
+        
+        groups = [CONFIDENCE_BUCKETS_SQL + " AS bucket" if g == 'bucket' else g for g in (by or [])]
+        group_names = list(by or [])
+        select = ", ".join(groups + [
+            "COUNT(*) AS count",
+            "SUM(result != 'pending') AS completed",
+            "SUM(result = 'win') AS wins",
+            "COALESCE(SUM(stake), 0) AS stake",
+            "COALESCE(SUM(payout), 0) AS payout",
+            "COALESCE(SUM(predicted_ev), 0) AS ev_sum",
+        ])
+        query = f"SELECT {select} FROM bets"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        if group_names:
+            query += " GROUP BY " + ", ".join(group_names)
+        
+        with self._connect() as conn:
+            return pd.read_sql_query(query, conn, params=params)
+    
+    def upsert_session(self, session):
+        """Insert or replace a session summary by date."""
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO sessions ({', '.join(SESSION_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(SESSION_COLUMNS))})",
+                [session[c] for c in SESSION_COLUMNS]
+            )
+    
+    def sessions(self):
+        """Session summaries in date order."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM sessions ORDER BY date").fetchall()
+        return [dict(row) for row in rows]
+
 
 class EdgeTracker:
     """
@@ -10,30 +236,44 @@ class EdgeTracker:
     Provides insights on actual ROI vs predicted EV.
     """
     
-    def __init__(self, tracking_file='data/betting_history.json'):
+    def __init__(self, tracking_file='data/betting_history.json', ledger_path=None):
         self.tracking_file = tracking_file
-        self.history = self.load_history()
+        self.ledger = BetLedger(ledger_path or os.path.splitext(tracking_file)[0] + '.db')
+        
+        # One-time import of a legacy JSON history into an empty ledger
+        if len(self.ledger) == 0 and os.path.exists(self.tracking_file):
+            self._import_json_history()
+    
+    def _import_json_history(self):
+        """Copy bets and sessions from the legacy JSON document."""
+        try:
+            with open(self.tracking_file, 'r') as f:
+                history = json.load(f)
+        except:
+            return
         
+        self.ledger.add_many(history.get('bets', []))
+        for session in history.get('sessions', []):
+            self.ledger.upsert_session(session)
+    
     def load_history(self):
-        """Load betting history from file."""
-        if os.path.exists(self.tracking_file):
-            try:
-                with open(self.tracking_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {'bets': [], 'sessions': []}
-        return {'bets': [], 'sessions': []}
+        """Betting history as {'bets': [...], 'sessions': [...]}."""
+        bets = self.ledger.bets().replace({np.nan: None})
+        return {'bets': bets.to_dict('records'), 'sessions': self.ledger.sessions()}
+    
+    @property
+    def history(self):
+        return self.load_history()
     
     def save_history(self):
-        """Save betting history to file."""
+        """Write a JSON snapshot of the ledger to tracking_file."""
         with open(self.tracking_file, 'w') as f:
-            json.dump(self.history, f, indent=2)
+            json.dump(self.load_history(), f, indent=2)
     
     def add_bet(self, player, stat, line, recommendation, predicted_ev, 
                 hit_probability, confidence, stake=1.0, odds=-110):
         """Add a new bet to tracking."""
         bet = {
-            'id': len(self.history['bets']) + 1,
             'date': datetime.now().isoformat(),
             'player': player,
             'stat': stat,
@@ -49,39 +289,23 @@ class EdgeTracker:
             'payout': None
         }
         
-        self.history['bets'].append(bet)
-        self.save_history()
-        return bet['id']
+        return self.ledger.add(bet)
     
     def update_bet_result(self, source_id, actual_value, hit=None):
         """Update a bet with its result."""
-        for bet in self.history['bets']:
-            if bet['id'] == source_id:
-                bet['actual_value'] = actual_value
-                
-                # Determine if bet hit
-                if hit is None:
-                    if bet['recommendation'] == 'OVER' or bet['recommendation'] == 'STRONG OVER':
-                        hit = actual_value > bet['line']
-                    else:  # UNDER
-                        hit = actual_value < bet['line']
-                
-                bet['result'] = 'win' if hit else 'loss'
-                
-                # Calculate payout
-                if hit:
-                    # Convert American odds to decimal
-                    if bet['odds'] < 0:
-                        decimal_odds = 1 + (100 / abs(bet['odds']))
-                    else:
-                        decimal_odds = 1 + (bet['odds'] / 100)
-                    bet['payout'] = bet['stake'] * decimal_odds
-                else:
-                    bet['payout'] = 0
-                
-                self.save_history()
-                return True
-        return False
+        return self.ledger.settle([(source_id, actual_value, hit)]) == 1
+    
+    def update_bet_results(self, results):
+        """
+        Settle many bets at once.
+        
+        Args:
+            results: Iterable of (bet_id, actual_value) or (bet_id, actual_value, hit)
+            
+        Returns:
+            int: Number of bets updated
+        """
+        return self.ledger.settle(results)
     
     def add_session_summary(self, date=None):
         """Add a betting session summary."""
@@ -89,32 +313,30 @@ class EdgeTracker:
             date = datetime.now().date()
         
         # Get bets from this date
-        session_bets = [
-            bet for bet in self.history['bets'] 
-            if bet['date'].startswith(str(date))
-        ]
+        day = str(date)
+        totals = self.ledger.summary(on_date=day).iloc[0]
         
-        if not session_bets:
+        if not totals['count']:
             return None
         
         # Calculate session metrics
-        total_stake = sum(bet['stake'] for bet in session_bets)
-        total_payout = sum(bet.get('payout', 0) for bet in session_bets)
-        completed_bets = [bet for bet in session_bets if bet['result'] != 'pending']
+        total_stake = float(totals['stake'])
+        total_payout = float(totals['payout'])
+        completed = int(totals['completed'])
+        wins = int(totals['wins']) if completed else 0
         
-        if completed_bets:
-            wins = len([bet for bet in completed_bets if bet['result'] == 'win'])
-            win_rate = wins / len(completed_bets)
+        if completed:
+            win_rate = wins / completed
             roi = ((total_payout - total_stake) / total_stake) * 100 if total_stake > 0 else 0
         else:
             win_rate = 0
             roi = 0
         
         session = {
-            'date': str(date),
-            'total_bets': len(session_bets),
-            'completed_bets': len(completed_bets),
-            'wins': wins if completed_bets else 0,
+            'date': day,
+            'total_bets': int(totals['count']),
+            'completed_bets': completed,
+            'wins': wins,
             'win_rate': win_rate,
             'total_stake': total_stake,
             'total_payout': total_payout,
@@ -122,75 +344,45 @@ class EdgeTracker:
             'roi': roi
         }
         
-        # Update or add session
-        existing = False
-        for i, s in enumerate(self.history['sessions']):
-            if s['date'] == session['date']:
-                self.history['sessions'][i] = session
-                existing = True
-                break
-        
-        if not existing:
-            self.history['sessions'].append(session)
-        
-        self.save_history()
+        self.ledger.upsert_session(session)
         return session
     
     def analyze_performance(self, days=30):
         """Analyze betting performance over specified period."""
         cutoff_date = datetime.now() - timedelta(days=days)
         
-        recent_bets = [
-            bet for bet in self.history['bets']
-            if datetime.fromisoformat(bet['date']) > cutoff_date
-            and bet['result'] != 'pending'
-        ]
+        # Completed bets in the window, grouped by confidence bucket and stat
+        groups = self.ledger.summary(after=cutoff_date.isoformat(), by=['bucket', 'stat'],
+                                     completed_only=True)
         
-        if not recent_bets:
+        if groups.empty:
             return None
         
         # Overall metrics
-        total_bets = len(recent_bets)
-        wins = len([bet for bet in recent_bets if bet['result'] == 'win'])
+        total_bets = int(groups['count'].sum())
+        wins = int(groups['wins'].sum())
         win_rate = wins / total_bets
         
-        total_stake = sum(bet['stake'] for bet in recent_bets)
-        total_payout = sum(bet['payout'] for bet in recent_bets)
+        total_stake = groups['stake'].sum()
+        total_payout = groups['payout'].sum()
         profit = total_payout - total_stake
         roi = (profit / total_stake) * 100 if total_stake > 0 else 0
         
         # Expected vs Actual
-        avg_predicted_ev = np.mean([bet['predicted_ev'] for bet in recent_bets])
+        avg_predicted_ev = groups['ev_sum'].sum() / total_bets
         
         # Performance by confidence level
-        confidence_buckets = {
-            'high': [bet for bet in recent_bets if bet['confidence'] >= 70],
-            'medium': [bet for bet in recent_bets if 50 <= bet['confidence'] < 70],
-            'low': [bet for bet in recent_bets if bet['confidence'] < 50]
+        by_bucket = groups.groupby('bucket')[['count', 'wins', 'stake', 'payout']].sum()
+        confidence_performance = {
+            level: self._group_performance(by_bucket.loc[level])
+            for level in ['high', 'medium', 'low'] if level in by_bucket.index
         }
         
-        confidence_performance = {}
-        for level, bets in confidence_buckets.items():
-            if bets:
-                level_wins = len([bet for bet in bets if bet['result'] == 'win'])
-                level_win_rate = level_wins / len(bets)
-                level_roi = self._calculate_roi(bets)
-                confidence_performance[level] = {
-                    'count': len(bets),
-                    'win_rate': level_win_rate,
-                    'roi': level_roi
-                }
-        
         # Performance by stat type
-        stat_performance = {}
-        for stat in set(bet['stat'] for bet in recent_bets):
-            stat_bets = [bet for bet in recent_bets if bet['stat'] == stat]
-            stat_wins = len([bet for bet in stat_bets if bet['result'] == 'win'])
-            stat_performance[stat] = {
-                'count': len(stat_bets),
-                'win_rate': stat_wins / len(stat_bets),
-                'roi': self._calculate_roi(stat_bets)
-            }
+        by_stat = groups.groupby('stat', dropna=False)[['count', 'wins', 'stake', 'payout']].sum()
+        stat_performance = {
+            stat: self._group_performance(row) for stat, row in by_stat.iterrows()
+        }
         
         return {
             'period_days': days,
@@ -207,13 +399,15 @@ class EdgeTracker:
             'stat_performance': stat_performance
         }
     
-    def _calculate_roi(self, bets):
-        """Calculate ROI for a list of bets."""
-        if not bets:
-            return 0
-        total_stake = sum(bet['stake'] for bet in bets)
-        total_payout = sum(bet['payout'] for bet in bets)
-        return ((total_payout - total_stake) / total_stake) * 100 if total_stake > 0 else 0
+    @staticmethod
+    def _group_performance(row):
+        """Count, win rate and ROI for one aggregated group."""
+        stake = row['stake']
+        return {
+            'count': int(row['count']),
+            'win_rate': row['wins'] / row['count'],
+            'roi': ((row['payout'] - stake) / stake) * 100 if stake > 0 else 0
+        }
     
     def generate_performance_report(self):
         """Generate a comprehensive performance report."""
@@ -251,15 +445,14 @@ class EdgeTracker:
                 print(f"  {stat}: {perf['win_rate']:.1%} win rate, {perf['roi']:.1f}% ROI ({perf['count']} bets)")
         
         # All-time stats
-        all_completed = [bet for bet in self.history['bets'] if bet['result'] != 'pending']
-        if all_completed:
-            all_wins = len([bet for bet in all_completed if bet['result'] == 'win'])
-            all_roi = self._calculate_roi(all_completed)
+        all_completed = self.ledger.summary(completed_only=True).iloc[0]
+        if all_completed['count']:
+            all_time = self._group_performance(all_completed)
             
             print(f"\n📈 All-Time Record:")
-            print(f"  Total Bets: {len(all_completed)}")
-            print(f"  Win Rate: {all_wins/len(all_completed):.1%}")
-            print(f"  ROI: {all_roi:.1f}%")
+            print(f"  Total Bets: {all_time['count']}")
+            print(f"  Win Rate: {all_time['win_rate']:.1%}")
+            print(f"  ROI: {all_time['roi']:.1f}%")
 
 def main():
     """Demo/utility functions for edge tracker."""
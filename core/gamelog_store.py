@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+gamelog_store.py - Shared columnar WNBA gamelog store
+Normalizes column names and dtypes once, persists gamelogs as Parquet
+partitioned by season, and serves projected/filtered reads to the analyzers.
+"""
+
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Parquet storage is optional; without pyarrow the store falls back to CSV sources
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = ds = pafs = pq = None
+
+DEFAULT_STORE_DIR = "data/gamelog_store"
+
+# Source gamelogs searched (in order) when no store has been built yet
+DEFAULT_SOURCES = [
+    "data/wnba_combined_gamelogs.csv",
+    "data/wnba_2024_gamelogs.csv",
+    "data/wnba_2025_gamelogs.csv",
+    "data/archive/2024/cleaned_gamelogs_2024.csv",
+    "data/archive/2024/engineered_gamelogs_2024.csv",
+]
+
+# Canonical column -> spellings seen across the scraped/derived gamelog files
+COLUMN_ALIASES: Dict[str, List[str]] = {
+    'PLAYER_NAME': ['Player', 'player', 'player_name', 'PlayerName', 'PlayerFileName', 'name'],
+    'PLAYER_ID': ['PlayerID', 'player_id'],
+    'GAME_DATE': ['Date', 'date', 'game_date', 'GameDate'],
+    'GAME_ID': ['GameID', 'game_id'],
+    'SEASON_YEAR': ['season', 'Season'],
+    'TEAM_ABBREVIATION': ['TEAM', 'Tm', 'team'],
+    'MATCHUP': ['Matchup', 'matchup', 'Opponent', 'opponent', 'Opp'],
+    'MIN': ['minutes', 'Minutes', 'MP'],
+    'PTS': ['points', 'Points'],
+    'REB': ['rebounds', 'Rebounds', 'TRB'],
+    'AST': ['assists', 'Assists'],
+    'STL': ['steals', 'Steals'],
+    'BLK': ['blocks', 'Blocks'],
+    'TOV': ['turnovers', 'Turnovers', 'TO'],
+    'FGM': ['FG'],
+    'FG3M': ['3PM', '3P', 'ThreesMade', 'threes_made'],
+    'FG3A': ['3PA'],
+    'FTM': ['FT'],
+    'WNBA_FANTASY_PTS': ['fantasy_points'],
+}
+
+# Typed schema for the canonical columns; anything else is passed through
+SCHEMA: Dict[str, str] = {
+    'PLAYER_NAME': 'string',
+    'TEAM_ABBREVIATION': 'string',
+    'MATCHUP': 'string',
+    'GAME_DATE': 'datetime',
+    'SEASON_YEAR': 'int',
+    'MIN': 'float',
+    'PTS': 'number',
+    'REB': 'number',
+    'AST': 'number',
+    'STL': 'number',
+    'BLK': 'number',
+    'TOV': 'number',
+    'FGM': 'number',
+    'FG3M': 'number',
+    'FG3A': 'number',
+    'FTM': 'number',
+    'WNBA_FANTASY_PTS': 'number',
+}
+
+SEASON_COLUMN = 'SEASON'
+
+_ALIAS_LOOKUP = {alias: canonical for canonical, aliases in COLUMN_ALIASES.items() for alias in aliases}
+
+
+def canonical_name(column: str) -> str:
+    """Return the canonical name for a source column."""
+    column = column.lstrip('\ufeff').strip()
+    return _ALIAS_LOOKUP.get(column, column)
+
+
+def normalize_player_key(names) -> pd.Series:
+    """Case/whitespace-insensitive player key for joins (missing names stay NaN)."""
+    keys = pd.Series(names, dtype=object)
+    normalized = keys.astype(str).str.strip().str.lower().str.replace(r"\s+", " ", regex=True)
+    return normalized.where(keys.notna())
+
+
+def _minutes_to_decimal(values: pd.Series) -> pd.Series:
+    """Convert 'MM:SS' minute strings to decimal minutes in one pass."""
+    text = values.astype(str).str.strip()
+    parts = text.str.split(':', n=1, expand=True)
+    whole = pd.to_numeric(parts[0], errors='coerce')
+    if parts.shape[1] > 1:
+        seconds = pd.to_numeric(parts[1], errors='coerce').fillna(0)
+        whole = whole + seconds / 60.0
+    return whole
+
+
+def normalize_gamelogs(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rename aliased columns to canonical names and coerce the schema dtypes.
+
+    A column already carrying the canonical name wins over its aliases, and
+    otherwise the first alias wins; the losing duplicates are dropped.
+    """
+    renames = {}
+    dropped = []
+    taken = set()
+    for column in df.columns:
+        target = canonical_name(column)
+        if target in taken or (target != column and target in df.columns):
+            dropped.append(column)
+            continue
+        taken.add(target)
+        if target != column:
+            renames[column] = target
+    df = df.drop(columns=dropped).rename(columns=renames)
+
+    for column, kind in SCHEMA.items():
+        if column not in df.columns:
+            continue
+        if kind == 'datetime':
+            if not pd.api.types.is_datetime64_any_dtype(df[column]):
+                df[column] = pd.to_datetime(df[column], errors='coerce')
+        elif kind == 'string':
+            df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+        elif kind == 'float':
+            if df[column].dtype == object:
+                df[column] = _minutes_to_decimal(df[column])
+            else:
+                df[column] = df[column].astype(float)
+        elif kind == 'int':
+            if not pd.api.types.is_integer_dtype(df[column]):
+                df[column] = pd.to_numeric(df[column], errors='coerce')
+        elif not pd.api.types.is_numeric_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+
+    return df
+
+
+def _season_of(df: pd.DataFrame) -> pd.Series:
+    """Season per row: SEASON_YEAR when present, otherwise the game year."""
+    season = pd.Series(np.nan, index=df.index)
+    if 'SEASON_YEAR' in df.columns:
+        season = pd.to_numeric(df['SEASON_YEAR'], errors='coerce')
+    if 'GAME_DATE' in df.columns:
+        season = season.fillna(df['GAME_DATE'].dt.year)
+    return season.fillna(0).astype(int)
+
+
+def _filter_frame(df: pd.DataFrame, players=None, start_date=None, end_date=None) -> pd.DataFrame:
+    """Apply player/date predicates to an in-memory frame."""
+    mask = pd.Series(True, index=df.index)
+    if players is not None and 'PLAYER_NAME' in df.columns:
+        mask &= df['PLAYER_NAME'].isin(list(players))
+    if start_date is not None and 'GAME_DATE' in df.columns:
+        mask &= df['GAME_DATE'] >= pd.Timestamp(start_date)
+    if end_date is not None and 'GAME_DATE' in df.columns:
+        mask &= df['GAME_DATE'] <= pd.Timestamp(end_date)
+    return df[mask] if not mask.all() else df
+
+
+def read_gamelog_csv(path: Union[str, Path], columns: Optional[Iterable[str]] = None,
+                     players=None, start_date=None, end_date=None) -> pd.DataFrame:
+    """
+    Read a gamelog CSV with canonical names, parsing only the requested columns.
+
+    Args:
+        path: CSV file in any of the known gamelog layouts
+        columns: Canonical columns to keep (None keeps everything)
+        players: Optional iterable of player names to keep
+        start_date/end_date: Optional inclusive GAME_DATE bounds
+    """
+    header = pd.read_csv(path, nrows=0, encoding='utf-8-sig').columns
+    usecols = None
+    if columns is not None:
+        wanted = set(columns)
+        if players is not None:
+            wanted.add('PLAYER_NAME')
+        if start_date is not None or end_date is not None:
+            wanted.add('GAME_DATE')
+        usecols = [col for col in header if canonical_name(col) in wanted]
+
+    df = pd.read_csv(path, usecols=usecols, encoding='utf-8-sig')
+    df = normalize_gamelogs(df)
+    df = _filter_frame(df, players, start_date, end_date)
+
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return df
+
+
+class GamelogStore:
+    """
+    Season-partitioned Parquet store of normalized gamelogs.
+
+    Reads support column projection and player/date predicate pushdown, and
+    are memory-mapped by default so repeated analyzer runs share the OS page
+    cache instead of re-parsing CSV text.
+    """
+
+    def __init__(self, root: Union[str, Path] = DEFAULT_STORE_DIR):
+        self.root = Path(root)
+
+    @staticmethod
+    def available() -> bool:
+        """Whether the Parquet backend (pyarrow) is installed."""
+        return pq is not None
+
+    def exists(self) -> bool:
+        """Whether any season partition has been written."""
+        return self.root.exists() and any(self.root.glob(f"{SEASON_COLUMN}=*"))
+
+    def seasons(self) -> List[int]:
+        """Seasons present in the store."""
+        if not self.exists():
+            return []
+        return sorted(int(p.name.split('=', 1)[1]) for p in self.root.glob(f"{SEASON_COLUMN}=*"))
+
+    def write(self, df: pd.DataFrame, mode: str = 'overwrite') -> int:
+        """
+        Write gamelogs into season partitions.
+
+        Args:
+            df: Gamelogs in any known layout (normalized before writing)
+            mode: 'overwrite' replaces the seasons present in df,
+                  'append' adds new files next to the existing ones
+
+        Returns:
+            Number of rows written
+        """
+        if not self.available():
+            raise ImportError("pyarrow is required to write the gamelog store")
+
+        df = normalize_gamelogs(df)
+        # Pass-through columns mixing text and numbers (merged sources) are
+        # written as text, so every season partition stores the same type
+        for column in df.columns.difference(list(SCHEMA)):
+            if df[column].dtype == object:
+                df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+        df[SEASON_COLUMN] = _season_of(df)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        for season, season_df in df.groupby(SEASON_COLUMN, sort=True):
+            part_dir = self.root / f"{SEASON_COLUMN}={season}"
+            if mode == 'overwrite' and part_dir.exists():
+                shutil.rmtree(part_dir)
+            part_dir.mkdir(parents=True, exist_ok=True)
+
+            table = pa.Table.from_pandas(season_df.drop(columns=[SEASON_COLUMN]), preserve_index=False)
+            pq.write_table(table, part_dir / f"part-{uuid.uuid4().hex}.parquet")
+
+        return len(df)
+
+    def append(self, df: pd.DataFrame) -> int:
+        """Append new gamelog rows without rewriting existing partitions."""
+        return self.write(df, mode='append')
+
+    def ingest_csv(self, paths: Iterable[Union[str, Path]]) -> int:
+        """
+        Build (or rebuild) the seasons found in the given CSV sources.
+
+        When the same player-game appears in several sources the rows are
+        merged column by column: the later source wins where it has a value,
+        and columns it lacks (or leaves empty) keep the earlier source's.
+        """
+        frames = [normalize_gamelogs(pd.read_csv(path, encoding='utf-8-sig')) for path in paths]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return 0
+
+        df = pd.concat(frames, ignore_index=True)
+        keys = [col for col in ('PLAYER_NAME', 'GAME_DATE') if col in df.columns]
+        if len(keys) == 2:
+            # last() takes the last non-null value of each column per key
+            df = df.groupby(keys, sort=False, dropna=False).last().reset_index()[list(df.columns)]
+        return self.write(df)
+
+    def _dataset(self, memory_map: bool = True):
+        """Open the store as one dataset over the union of all file schemas."""
+        filesystem = pafs.LocalFileSystem(use_mmap=memory_map)
+        files = sorted(str(path) for path in self.root.glob(f"{SEASON_COLUMN}=*/*.parquet"))
+        partitioning = ds.partitioning(pa.schema([(SEASON_COLUMN, pa.int64())]), flavor='hive')
+
+        # Seasons (and appended batches) may carry different column sets
+        schema = pa.unify_schemas([pq.read_schema(path) for path in files])
+        schema = schema.append(pa.field(SEASON_COLUMN, pa.int64()))
+
+        return ds.dataset(files, schema=schema, format='parquet', filesystem=filesystem,
+                          partitioning=partitioning, partition_base_dir=str(self.root))
+
+    def read(self, columns: Optional[Iterable[str]] = None, players=None,
+             start_date=None, end_date=None, seasons: Optional[Iterable[int]] = None,
+             memory_map: bool = True) -> pd.DataFrame:
+        """
+        Read gamelogs with projection and predicate pushdown.
+
+        Args:
+            columns: Canonical columns to load (None loads everything)
+            players: Optional iterable of PLAYER_NAME values
+            start_date/end_date: Optional inclusive GAME_DATE bounds
+            seasons: Optional seasons to read; other partitions are never opened
+            memory_map: Memory-map the Parquet files instead of buffered reads
+        """
+        if not self.exists():
+            raise FileNotFoundError(f"No gamelog store at {self.root}")
+
+        dataset = self._dataset(memory_map)
+        names = set(dataset.schema.names)
+
+        expression = None
+        predicates = []
+        if seasons is not None:
+            predicates.append(ds.field(SEASON_COLUMN).isin([int(s) for s in seasons]))
+        if players is not None and 'PLAYER_NAME' in names:
+            predicates.append(ds.field('PLAYER_NAME').isin(list(players)))
+        if start_date is not None and 'GAME_DATE' in names:
+            predicates.append(ds.field('GAME_DATE') >= pa.scalar(pd.Timestamp(start_date), type=dataset.schema.field('GAME_DATE').type))
+        if end_date is not None and 'GAME_DATE' in names:
+            predicates.append(ds.field('GAME_DATE') <= pa.scalar(pd.Timestamp(end_date), type=dataset.schema.field('GAME_DATE').type))
+        for predicate in predicates:
+            expression = predicate if expression is None else expression & predicate
+
+        read_columns = None
+        if columns is not None:
+            read_columns = [col for col in columns if col in names]
+
+        table = dataset.to_table(columns=read_columns, filter=expression)
+        df = table.to_pandas()
+        if columns is None and SEASON_COLUMN in df.columns:
+            df = df.drop(columns=[SEASON_COLUMN])
+        return df
+
+
+def load_gamelogs(source: Optional[Union[str, Path]] = None,
+                  columns: Optional[Iterable[str]] = None,
+                  players=None, start_date=None, end_date=None,
+                  rename: Optional[Dict[str, str]] = None,
+                  store_dir: Union[str, Path] = DEFAULT_STORE_DIR) -> pd.DataFrame:
+    """
+    Load normalized gamelogs for an analyzer.
+
+    An explicit CSV source is read directly (projected and filtered); with no
+    source the Parquet store is used when built, falling back to the first
+    default CSV that exists.
+
+    Args:
+        source: Optional gamelog CSV path
+        columns: Canonical columns the caller needs
+        players/start_date/end_date: Row predicates
+        rename: Canonical -> caller-specific column names applied last
+
+    Raises:
+        FileNotFoundError: If no gamelog source can be found
+    """
+    if source is not None:
+        df = read_gamelog_csv(source, columns, players, start_date, end_date)
+    else:
+        store = GamelogStore(store_dir)
+        if store.available() and store.exists():
+            df = store.read(columns, players, start_date, end_date)
+        else:
+            for path in DEFAULT_SOURCES:
+                if Path(path).exists():
+                    df = read_gamelog_csv(path, columns, players, start_date, end_date)
+                    break
+            else:
+                raise FileNotFoundError("No gamelog store or gamelog CSV found")
+
+    if rename:
+        df = df.rename(columns=rename)
+    return df
+
+
+def main():
+    """Build the season-partitioned store from the known gamelog CSVs."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build the Parquet gamelog store')
+    parser.add_argument('sources', nargs='*', help='Gamelog CSVs (defaults to the known season files)')
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR, help='Store directory')
+    args = parser.parse_args()
+
+    sources = args.sources or [path for path in DEFAULT_SOURCES if Path(path).exists()]
+    store = GamelogStore(args.store)
+    rows = store.ingest_csv(sources)
+    print(f"✅ Wrote {rows} gamelog rows to {store.root} (seasons: {store.seasons()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+grading.py - Columnar grading engine for bets and slips
+Joins legs to actual results on (player, prop_type[, date]), grades every
+leg with vectorized win/loss/push masks, converts American odds in bulk and
+settles slips with one groupby against the Power/Flex payout tables.
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+PAYOUT_TABLES_PATH = Path(__file__).parent.parent / "config" / "payout_tables.json"
+
+# Used when config/payout_tables.json is unavailable
+DEFAULT_FLEX_PAYOUTS = {
+    2: {2: 2.3},
+    3: {2: 1.2, 3: 5.0},
+    4: {2: 0.4, 3: 2.0, 4: 10.0},
+    5: {3: 1.5, 4: 5.0, 5: 20.0},
+    6: {4: 4.0, 5: 12.0, 6: 35.0}
+}
+
+OVER, UNDER, NO_PICK = 1, -1, 0
+
+
+def american_to_decimal(odds) -> np.ndarray:
+    """Convert American odds to decimal odds element-wise."""
+    odds = np.asarray(odds, dtype=float)
+    with np.errstate(divide='ignore'):
+        return np.where(odds < 0, (-100 / odds) + 1, (odds / 100) + 1)
+
+
+@lru_cache(maxsize=8)
+def _read_flex_payouts(path: str) -> Tuple[Tuple[Tuple[int, int], float], ...]:
+    try:
+        with open(path, 'r') as f:
+            flex = json.load(f)['flex']
+    except Exception:
+        flex = DEFAULT_FLEX_PAYOUTS
+    return tuple(((int(legs), int(wins)), float(multiplier))
+                 for legs, table in flex.items() for wins, multiplier in table.items())
+
+
+def load_flex_payouts(path: Optional[str] = None) -> pd.Series:
+    """Flex multipliers indexed by (total_legs, wins)."""
+    entries = _read_flex_payouts(str(path or PAYOUT_TABLES_PATH))
+    index = pd.MultiIndex.from_tuples([key for key, _ in entries], names=['total_legs', 'wins'])
+    return pd.Series([multiplier for _, multiplier in entries], index=index, dtype=float)
+
+
+def actuals_frame(actuals: Dict[tuple, float], keys: Sequence[str]) -> pd.DataFrame:
+    """Turn a {(player, prop_type[, date]): value} lookup into a joinable frame."""
+    if not actuals:
+        return pd.DataFrame(columns=list(keys) + ['actual'])
+    frame = pd.DataFrame(list(actuals.keys()), columns=list(keys))
+    frame['actual'] = list(actuals.values())
+    return frame
+
+
+def pick_sides(picks: Iterable, over: str = 'over', under: Optional[str] = 'under') -> np.ndarray:
+    """
+    Map pick labels to OVER/UNDER/NO_PICK.
+
+    With under=None every non-over pick counts as an under.
+    """
+    picks = pd.Series(list(picks), dtype=object).to_numpy()
+    is_over = picks == over
+    if under is None:
+        return np.where(is_over, OVER, UNDER)
+    return np.select([is_over, picks == under], [OVER, UNDER], NO_PICK)
+
+
+def grade_legs(legs: pd.DataFrame, actuals: pd.DataFrame, keys: Sequence[str],
+               sides: np.ndarray, line_col: str = 'line', stake_col: Optional[str] = None,
+               odds_col: Optional[str] = None) -> pd.DataFrame:
+    """
+    Grade every leg against the actual results in one pass.
+
+    Args:
+        legs: One row per leg with the key columns and a numeric line
+        actuals: Frame with the key columns and 'actual' (first row per key wins)
+        keys: Join columns, e.g. ['player', 'prop_type'] or with 'date'
+        sides: OVER/UNDER/NO_PICK per leg (see pick_sides)
+        stake_col/odds_col: When given, decimal odds and payouts are added
+
+    Returns:
+        Frame aligned to legs.index with 'actual' (NaN when missing),
+        'result' ('won'/'lost'/'push', None when ungradable) and, with
+        stake/odds, 'decimal_odds' and 'payout'
+    """
+    lookup = actuals.drop_duplicates(list(keys)).set_index(list(keys))['actual']
+    if len(keys) == 1:
+        position = lookup.index.get_indexer(legs[keys[0]])
+    else:
+        position = lookup.index.get_indexer(pd.MultiIndex.from_frame(legs[list(keys)]))
+
+    found = position >= 0
+    actual = np.full(len(legs), np.nan)
+    actual[found] = pd.to_numeric(lookup.to_numpy()[position[found]], errors='coerce')
+
+    line = pd.to_numeric(legs[line_col], errors='coerce').to_numpy(dtype=float)
+    sides = np.asarray(sides)
+    gradable = found & (sides != NO_PICK) & ~np.isnan(actual)
+
+    push = gradable & (actual == line)
+    won = gradable & ~push & np.where(sides == OVER, actual > line, actual < line)
+    lost = gradable & ~push & ~won
+
+    graded = pd.DataFrame({'actual': actual}, index=legs.index)
+    graded['result'] = np.select([won, lost, push], ['won', 'lost', 'push'], None)
+
+    if stake_col is not None and odds_col is not None:
+        stake = pd.to_numeric(legs[stake_col], errors='coerce').to_numpy(dtype=float)
+        decimal_odds = american_to_decimal(pd.to_numeric(legs[odds_col], errors='coerce'))
+        graded['decimal_odds'] = decimal_odds
+        graded['payout'] = np.select([won, push], [np.round(stake * decimal_odds, 2), stake], 0.0)
+        graded.loc[~gradable, 'payout'] = np.nan
+    return graded
+
+
+def settle_slips(legs: pd.DataFrame, slips: pd.DataFrame, flex_payouts: Optional[pd.Series] = None,
+                 slip_col: str = 'slip_id', result_col: str = 'result', odds_col: str = 'odds',
+                 type_col: str = 'type', stake_col: str = 'total_stake') -> pd.DataFrame:
+    """
+    Settle slips from their graded legs with one groupby.
+
+    Power slips pay stake times the product of the winning legs' decimal
+    odds when no leg lost or is ungraded (all pushes refund the stake).
+    Flex slips pay from the (total_legs, wins) payout table.
+
+    Returns:
+        Frame aligned to the slips that have legs, with wins, losses,
+        pushes, total_legs, actual_payout and result
+    """
+    if flex_payouts is None:
+        flex_payouts = load_flex_payouts()
+
+    slip_legs = legs[legs[slip_col].isin(slips[slip_col])]
+    outcome = slip_legs[result_col]
+    decimal_odds = american_to_decimal(pd.to_numeric(slip_legs[odds_col], errors='coerce'))
+    counts = pd.DataFrame({
+        slip_col: slip_legs[slip_col].to_numpy(),
+        'wins': (outcome == 'won').to_numpy(),
+        'losses': (outcome == 'lost').to_numpy(),
+        'pushes': (outcome == 'push').to_numpy(),
+        'won_odds': np.where(outcome == 'won', decimal_odds, 1.0),
+    }).groupby(slip_col, sort=False).agg(
+        wins=('wins', 'sum'), losses=('losses', 'sum'), pushes=('pushes', 'sum'),
+        total_legs=('wins', 'size'), combined_odds=('won_odds', 'prod'))
+
+    has_legs = slips[slip_col].isin(counts.index).to_numpy()
+    settled = slips.loc[has_legs, [slip_col, type_col, stake_col]].copy()
+    stats = counts.reindex(settled[slip_col])
+    for column in ['wins', 'losses', 'pushes', 'total_legs']:
+        settled[column] = stats[column].to_numpy().astype(int)
+
+    stake = pd.to_numeric(settled[stake_col], errors='coerce').to_numpy(dtype=float)
+    wins, total_legs = settled['wins'].to_numpy(), settled['total_legs'].to_numpy()
+    is_power = (settled[type_col] == 'Power').to_numpy()
+
+    # Power: every leg must win or push
+    all_in = (settled['losses'].to_numpy() == 0) & (wins + settled['pushes'].to_numpy() == total_legs)
+    combined = np.round(stake * stats['combined_odds'].to_numpy(), 2)
+    power_payout = np.where(all_in, np.where(wins == 0, stake, combined), 0)
+    power_result = np.where(all_in, np.where(wins == 0, 'push', 'won'), 'lost')
+
+    # Flex: look up the multiplier for (legs, wins)
+    multiplier = flex_payouts.reindex(pd.MultiIndex.from_arrays([total_legs, wins])).to_numpy()
+    has_tier = ~np.isnan(multiplier)
+    flex_payout = np.where(has_tier, np.round(stake * np.nan_to_num(multiplier), 2), 0)
+    flex_result = np.select(
+        [~has_tier, flex_payout > stake, flex_payout == stake], ['lost', 'won', 'push'], 'partial')
+
+    settled['actual_payout'] = np.where(is_power, power_payout, flex_payout)
+    settled['result'] = np.where(is_power, power_result, flex_result)
+    return settled.drop(columns=[type_col, stake_col])
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+metrics_cube.py - Grouped metrics cube for cycle risk tag backtests
+Counts over/under/push outcomes and sums prediction margins for every
+(risk_tag, prop_type, volatility_bucket, cycle_phase) cell in one groupby.
+Tag effectiveness, phase correlations and volatility checks are then
+re-aggregated from the cube's additive columns without touching the
+merged props again.
+"""
+
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ['risk_tag', 'prop_type', 'volatility_bucket', 'cycle_phase']
+
+# Additive columns per cell; every metric below is derived from these
+MEASURES = [
+    'rows', 'n', 'overs', 'unders', 'pushes',
+    'pct_count', 'pct_sum', 'pct_sq_sum', 'abs_pct_sum', 'diff_sum', 'diff_sq_sum'
+]
+
+VOLATILITY_BINS = [0, 0.8, 0.9, 1.0, 1.1, 1.2, np.inf]
+VOLATILITY_LABELS = ['very_low', 'low', 'normal', 'high', 'very_high', 'extreme']
+
+PHASE_ORDER = {
+    'menstrual': 1,
+    'follicular': 2,
+    'ovulation': 3,
+    'luteal': 4
+}
+
+
+def volatility_buckets(scores, bins: Sequence[float] = VOLATILITY_BINS,
+                       labels: Optional[Sequence[str]] = VOLATILITY_LABELS) -> np.ndarray:
+    """Bucket label per volatility score (NaN outside the bins); interval strings without labels."""
+    if labels is not None and len(labels) != len(bins) - 1:
+        labels = None
+    buckets = pd.cut(pd.to_numeric(pd.Series(scores), errors='coerce'), bins=bins, labels=labels)
+    return buckets.astype(object).map(lambda bucket: bucket if pd.isna(bucket) else str(bucket)).to_numpy(dtype=object)
+
+
+def _column(df: pd.DataFrame, name: str) -> np.ndarray:
+    return df[name].to_numpy(dtype=object) if name in df.columns else np.full(len(df), np.nan, dtype=object)
+
+
+def build_metrics_cube(merged: pd.DataFrame, prop_columns: Dict[str, Tuple[str, str]],
+                       volatility_bins: Sequence[float] = VOLATILITY_BINS,
+                       volatility_labels: Optional[Sequence[str]] = VOLATILITY_LABELS,
+                       tag_col: str = 'cycle_risk_tag', phase_col: str = 'cycle_phase',
+                       volatility_col: str = 'volatility_score') -> pd.DataFrame:
+    """
+    Aggregate props merged with their actual outcomes into the metrics cube.
+
+    Args:
+        merged: One row per prop with predictions, actuals, tag, phase and volatility
+        prop_columns: {prop_type: (predicted column, actual column)}; prop
+            types missing either column are left out
+        volatility_bins/volatility_labels: Edges and names of the volatility buckets
+
+    Returns:
+        One row per cell in first-appearance order, with DIMENSIONS (missing
+        labels kept as NaN) and MEASURES. 'rows' counts every prop in the
+        cell; the other measures only those with a prediction and an actual.
+    """
+    cells = pd.DataFrame({
+        'risk_tag': _column(merged, tag_col),
+        'volatility_bucket': volatility_buckets(_column(merged, volatility_col), volatility_bins,
+                                                volatility_labels),
+        'cycle_phase': _column(merged, phase_col)
+    })
+
+    parts = []
+    for prop_type, (pred_col, actual_col) in prop_columns.items():
+        if pred_col not in merged.columns or actual_col not in merged.columns:
+            continue
+        predicted = pd.to_numeric(merged[pred_col], errors='coerce').to_numpy(dtype=float)
+        actual = pd.to_numeric(merged[actual_col], errors='coerce').to_numpy(dtype=float)
+        clean = ~np.isnan(predicted) & ~np.isnan(actual)
+        diff = np.where(clean, actual - predicted, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = diff / predicted
+        finite = clean & np.isfinite(pct)
+        pct = np.where(finite, pct, 0.0)
+
+        parts.append(cells.assign(
+            prop_type=prop_type,
+            rows=1,
+            n=clean.astype(int),
+            overs=(clean & (actual > predicted)).astype(int),
+            unders=(clean & (actual < predicted)).astype(int),
+            pushes=(clean & (actual == predicted)).astype(int),
+            pct_count=finite.astype(int),
+            pct_sum=pct,
+            pct_sq_sum=pct ** 2,
+            abs_pct_sum=np.abs(pct),
+            diff_sum=diff,
+            diff_sq_sum=diff ** 2
+        ))
+
+    if not parts:
+        # Keep the cell counts so tag and bucket sample sizes survive
+        parts.append(cells.assign(prop_type=np.nan, rows=1,
+                                  **{measure: 0 for measure in MEASURES if measure != 'rows'}))
+
+    stacked = pd.concat(parts, ignore_index=True)
+    return stacked.groupby(DIMENSIONS, sort=False, dropna=False)[MEASURES].sum().reset_index()
+
+
+def save_metrics_cube(cube: pd.DataFrame, path: str) -> str:
+    """Write the cube as CSV (directories created as needed)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    cube.to_csv(path, index=False)
+    return path
+
+
+def load_metrics_cube(path: str) -> pd.DataFrame:
+    """Read a cube written by save_metrics_cube."""
+    return pd.read_csv(path, dtype={dimension: object for dimension in DIMENSIONS}, float_precision='round_trip')
+
+
+def _cell_rows(cube: pd.DataFrame, by: str) -> pd.Series:
+    """Props per label of one dimension ('rows' repeats across prop types)."""
+    cells = cube.drop_duplicates(['risk_tag', 'volatility_bucket', 'cycle_phase'])
+    return cells.groupby(by, sort=False)['rows'].sum()
+
+
+def prop_metrics(totals: pd.Series) -> Dict:
+    """Hit rates and margin statistics from one aggregate of the measures."""
+    n = int(totals['n'])
+    if n == 0:
+        return {}
+    pct_count = totals['pct_count']
+    avg_pct_diff = totals['pct_sum'] / pct_count if pct_count > 0 else np.nan
+    if pct_count > 1:
+        variance = (totals['pct_sq_sum'] - totals['pct_sum'] ** 2 / pct_count) / (pct_count - 1)
+        std_pct_diff = float(np.sqrt(max(variance, 0.0)))
+    else:
+        std_pct_diff = np.nan
+    return {
+        'over_rate': float(totals['overs'] / n),
+        'under_rate': float(totals['unders'] / n),
+        'push_rate': float(totals['pushes'] / n),
+        'avg_pct_diff': float(avg_pct_diff),
+        'std_pct_diff': std_pct_diff,
+        'sample_size': n
+    }
+
+
+def tag_performance(cube: pd.DataFrame, fade_marker: str = 'FADE',
+                    target_marker: str = 'TARGET',
+                    prop_types: Optional[Sequence[str]] = None) -> Dict[str, Dict]:
+    """
+    Per-tag prop metrics and fade/target effectiveness.
+
+    Fade effectiveness is the mean under rate across prop types for tags
+    containing fade_marker; target effectiveness the mean over rate for
+    tags containing target_marker (0.0 otherwise). Every tag reports the
+    given prop_types (default: those in the cube), as {} when none of its
+    props of that type could be measured.
+    """
+    tagged = cube[cube['risk_tag'].notna()]
+    sample_sizes = _cell_rows(tagged, 'risk_tag')
+    measured = tagged[tagged['prop_type'].notna()]
+    by_prop = measured.groupby(['risk_tag', 'prop_type'], sort=False)[MEASURES].sum()
+    if prop_types is None:
+        prop_types = list(pd.unique(measured['prop_type']))
+
+    performance = {}
+    for tag, sample_size in sample_sizes.items():
+        tag_props = by_prop.loc[tag] if tag in by_prop.index.get_level_values(0) else by_prop.iloc[:0]
+        metrics_by_prop = {prop_type: prop_metrics(tag_props.loc[prop_type]) if prop_type in tag_props.index else {}
+                           for prop_type in prop_types}
+
+        under_rates = [metrics['under_rate'] for metrics in metrics_by_prop.values() if metrics]
+        over_rates = [metrics['over_rate'] for metrics in metrics_by_prop.values() if metrics]
+        performance[tag] = {
+            'tag': tag,
+            'sample_size': int(sample_size),
+            'prop_types': metrics_by_prop,
+            'fade_effectiveness': float(np.mean(under_rates)) if fade_marker in tag and under_rates else 0.0,
+            'target_effectiveness': float(np.mean(over_rates)) if target_marker in tag and over_rates else 0.0
+        }
+    return performance
+
+
+def best_tags(performance: Dict[str, Dict], marker: str, metric: str, top: int = 5) -> List[Tuple[str, float]]:
+    """Highest-scoring tags containing marker, best first."""
+    scored = [(tag, result[metric]) for tag, result in performance.items() if marker in tag and metric in result]
+    return sorted(scored, key=lambda x: x[1], reverse=True)[:top]
+
+
+def phase_correlations(cube: pd.DataFrame, prop_columns: Dict[str, Tuple[str, str]],
+                       phase_order: Dict[str, int] = PHASE_ORDER) -> Dict[str, float]:
+    """
+    Pearson correlation between phase order and actual minus predicted, per stat.
+
+    Phase is constant within a cell, so the co-moments follow from each
+    cell's count and margin sums. Keys are the actual-value column names.
+    """
+    phase_value = cube['cycle_phase'].map(phase_order)
+    cells = cube.assign(x=phase_value)[phase_value.notna() & (cube['n'] > 0)]
+
+    correlations = {}
+    for prop_type, (_, actual_col) in prop_columns.items():
+        if not (cube['prop_type'] == prop_type).any():
+            continue
+        stat = cells[cells['prop_type'] == prop_type]
+        n = stat['n'].sum()
+        if n < 2:
+            correlations[actual_col] = np.nan
+            continue
+        x, count = stat['x'].to_numpy(dtype=float), stat['n'].to_numpy(dtype=float)
+        sum_x, sum_y = (count * x).sum(), stat['diff_sum'].sum()
+        cov = (x * stat['diff_sum']).sum() - sum_x * sum_y / n
+        var_x = (count * x ** 2).sum() - sum_x ** 2 / n
+        var_y = stat['diff_sq_sum'].sum() - sum_y ** 2 / n
+        correlations[actual_col] = float(cov / np.sqrt(var_x * var_y)) if var_x > 0 and var_y > 0 else np.nan
+    return correlations
+
+
+def volatility_accuracy(cube: pd.DataFrame, prop_types: Sequence[str]) -> Dict[str, Dict]:
+    """
+    Mean absolute percentage miss per volatility bucket.
+
+    Each prop type's mean |actual - predicted| / predicted is averaged
+    across prop_types (0 when none has a finite miss).
+    """
+    bucketed = cube[cube['volatility_bucket'].notna()]
+    sample_sizes = _cell_rows(bucketed, 'volatility_bucket')
+    by_prop = bucketed[bucketed['prop_type'].isin(list(prop_types))].groupby(
+        ['volatility_bucket', 'prop_type'], sort=False)[['pct_count', 'abs_pct_sum']].sum()
+    by_prop = by_prop[by_prop['pct_count'] > 0]
+    mean_miss = (by_prop['abs_pct_sum'] / by_prop['pct_count']).groupby(level=0, sort=False).mean()
+
+    return {
+        str(bucket): {
+            'avg_variance': float(mean_miss[bucket]) if bucket in mean_miss.index else 0,
+            'sample_size': int(sample_size)
+        }
+        for bucket, sample_size in sample_sizes.items()
+    }
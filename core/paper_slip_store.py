@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+paper_slip_store.py - Batched persistence for paper slips
+Keeps one SQLite connection per database file, runs schema migrations once
+(tracked in a schema_version table), writes slips with executemany inside a
+single transaction, and exports slip files as CSV or Parquet.
+"""
+
+import csv
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "data/paper_metrics.db"
+
+# Columns written by save_slips, in statement order
+SLIP_COLUMNS = [
+    'slip_id', 'date', 'player', 'prop_type', 'line', 'pick', 'confidence',
+    'confidence_score', 'closing_line', 'created_at'
+]
+
+# Columns added to paper_slips after the original schema shipped
+ADDED_COLUMNS = [
+    ('confidence_score', 'REAL'),
+    ('closing_line', 'TEXT'),
+]
+
+
+def _create_paper_slips(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS paper_slips (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            slip_id TEXT UNIQUE NOT NULL,
+            date TEXT NOT NULL,
+            player TEXT,
+            prop_type TEXT,
+            line REAL,
+            pick TEXT,
+            confidence REAL,
+            confidence_score REAL,
+            closing_line TEXT,
+            result TEXT,
+            payout REAL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_slip_date ON paper_slips(date)")
+
+
+def _add_missing_columns(conn: sqlite3.Connection) -> None:
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(paper_slips)")}
+    for name, column_type in ADDED_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE paper_slips ADD COLUMN {name} {column_type}")
+            logger.info(f"Added {name} column to paper_slips table")
+
+
+# Ordered (version, migration) pairs; each runs once per database file
+MIGRATIONS: List[Tuple[int, Callable[[sqlite3.Connection], None]]] = [
+    (1, _create_paper_slips),
+    (2, _add_missing_columns),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+class PaperSlipStore:
+    """
+    Reusable connection to the paper_slips database.
+
+    Opening a store does not write to the database; pending migrations run
+    on the first save_slips (or an explicit migrate()).
+
+    Args:
+        db_path: SQLite file; parent directories are created as needed
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._migrated = False
+
+    def schema_version(self) -> int:
+        """Version recorded for paper_slips (0 for an unmigrated database)."""
+        has_table = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+        ).fetchone()
+        if not has_table:
+            return 0
+        row = self.conn.execute(
+            "SELECT version FROM schema_version WHERE name = 'paper_slips'"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def migrate(self) -> int:
+        """Apply pending migrations in one transaction and return the schema version."""
+        with self._lock:
+            if self.schema_version() == SCHEMA_VERSION:
+                self._migrated = True
+                return SCHEMA_VERSION
+
+            with self.conn:
+                # IMMEDIATE takes the write lock before re-reading, so concurrent runs migrate once
+                self.conn.execute("BEGIN IMMEDIATE")
+                self.conn.execute("""
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        name TEXT PRIMARY KEY,
+                        version INTEGER NOT NULL
+                    )
+                """)
+                current = self.schema_version()
+                for version, step in MIGRATIONS:
+                    if version > current:
+                        step(self.conn)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO schema_version (name, version) VALUES ('paper_slips', ?)",
+                    (SCHEMA_VERSION,)
+                )
+            self._migrated = True
+        logger.info(f"Migrated paper_slips schema from v{current} to v{SCHEMA_VERSION}")
+        return SCHEMA_VERSION
+
+    def save_slips(self, slips: Sequence[Dict]) -> int:
+        """Insert or replace slips in a single transaction; returns the row count."""
+        rows = [tuple(slip.get(column) for column in SLIP_COLUMNS) for slip in slips]
+        if not rows:
+            return 0
+        if not self._migrated:
+            self.migrate()
+
+        placeholders = ', '.join('?' * len(SLIP_COLUMNS))
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO paper_slips ({', '.join(SLIP_COLUMNS)}) VALUES ({placeholders})",
+                rows
+            )
+        return len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+
+_STORES: Dict[str, PaperSlipStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_slip_store(db_path: str = DEFAULT_DB_PATH) -> PaperSlipStore:
+    """Process-wide PaperSlipStore for a database file (opened once, migrated on first save)."""
+    key = os.path.abspath(db_path)
+    store = _STORES.get(key)
+    if store is None:
+        with _STORES_LOCK:
+            store = _STORES.get(key)
+            if store is None:
+                store = _STORES[key] = PaperSlipStore(db_path)
+    return store
+
+
+def _value_kind(value) -> str:
+    return 'number' if isinstance(value, (int, float)) else type(value).__name__
+
+
+def _parquet_safe(frame: pd.DataFrame) -> pd.DataFrame:
+    """Encode nested (legs, flex_payouts) and mixed-type object columns as text."""
+    for column in frame.columns[frame.dtypes == object]:
+        values = frame[column]
+        present = values.notna()
+        kinds = values[present].map(_value_kind)
+        if kinds.nunique() > 1 or kinds.isin(['dict', 'list', 'tuple']).any():
+            encoded = values[present].map(
+                lambda value: json.dumps(value) if isinstance(value, (dict, list, tuple)) else str(value))
+            frame[column] = values.where(~present, encoded)
+    return frame
+
+
+def write_slips(slips: Iterable[Dict], path: str, fieldnames: Sequence[str]) -> str:
+    """
+    Write slips to one CSV or Parquet file (chosen by the path's extension).
+
+    Missing fields are blank in CSV and null in Parquet; fields outside
+    fieldnames are dropped.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if path.endswith('.parquet'):
+        frame = pd.DataFrame.from_records(list(slips), columns=list(fieldnames))
+        _parquet_safe(frame).to_parquet(path, index=False)
+        return path
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval='', extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(slips)
+    return path
@@ -1,9 +1,18 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from pathlib import Path
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.gamelog_store import load_gamelogs
+
 class PerformanceCycleDetector:
     """
     Detects hot/cold streaks and cyclical patterns in player performance.
@@ -210,32 +219,20 @@ def main():
     print("🔄 WNBA Performance Cycle Detector")
     print("=" * 50)
     
-    # Load gamelogs
-    try:
-        gamelogs_df = pd.read_csv('data/wnba_combined_gamelogs.csv')
-        print(f"✅ Loaded gamelogs: {len(gamelogs_df)} records")
-    except FileNotFoundError:
-        print("❌ Could not find data/wnba_combined_gamelogs.csv")
-        return
-    
-    # Rename columns for consistency
+    # Load gamelogs - only the identity columns and the stats scanned for cycles
     column_mapping = {
         'PLAYER_NAME': 'Player',
         'GAME_DATE': 'Date'
     }
-    gamelogs_df = gamelogs_df.rename(columns=column_mapping)
-    
-    # Check date format
-    print(f"📅 Sample dates: {gamelogs_df['Date'].iloc[0:3].tolist()}")
-    
-    # Convert date to datetime - handle various formats
     try:
-        gamelogs_df['Date'] = pd.to_datetime(gamelogs_df['Date'], format='%Y-%m-%d')
-    except:
-        try:
-            gamelogs_df['Date'] = pd.to_datetime(gamelogs_df['Date'], format='mixed')
-        except:
-            gamelogs_df['Date'] = pd.to_datetime(gamelogs_df['Date'], errors='coerce')
+        gamelogs_df = load_gamelogs(
+            columns=['PLAYER_NAME', 'GAME_DATE', 'PTS', 'REB', 'AST'],
+            rename=column_mapping
+        )
+        print(f"✅ Loaded gamelogs: {len(gamelogs_df)} records")
+    except FileNotFoundError:
+        print("❌ Could not find a gamelog store or data/wnba_combined_gamelogs.csv")
+        return
     
     # Remove rows with invalid dates
     valid_dates = gamelogs_df['Date'].notna()
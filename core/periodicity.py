@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+periodicity.py - Spectral cycle-length search and parallel player scans
+Scores every candidate cycle length at once with a periodogram of the dip
+dates (phase coherence over the irregular game-date series), and fans
+per-player analysis out over a process pool that shares one read-only
+buffer of game logs.
+"""
+
+import copy
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# With the default process count, each worker gets at least this many players
+# (smaller scans are faster in-process than paying for pool start-up)
+MIN_PLAYERS_PER_PROCESS = 200
+
+
+def candidate_periods(cycle_range: Tuple[int, int]) -> np.ndarray:
+    """Whole-day cycle lengths in cycle_range (inclusive)."""
+    return np.arange(cycle_range[0], cycle_range[1] + 1)
+
+
+def dip_periodogram(dip_days, periods) -> np.ndarray:
+    """
+    Phase coherence of dip dates at each candidate period.
+
+    Each dip is placed on the unit circle at its phase within the period;
+    the length of the mean vector is 1 when every dip falls on the same
+    cycle day and near 0 when dips are spread evenly.
+
+    Args:
+        dip_days: Days (from any origin) on which dips occurred
+        periods: Candidate cycle lengths in days
+
+    Returns:
+        Power in [0, 1] per period
+    """
+    days = np.asarray(dip_days, dtype=float)
+    periods = np.asarray(periods, dtype=float)
+    if len(days) == 0:
+        return np.zeros(len(periods))
+    phase = 2 * np.pi * days[None, :] / periods[:, None]
+    return np.hypot(np.cos(phase).mean(axis=1), np.sin(phase).mean(axis=1))
+
+
+def best_period(dip_days, periods, min_dips: int = 3) -> Optional[Tuple[int, float]]:
+    """Candidate period with the highest dip coherence (shortest on ties), or None with too few dips."""
+    if len(dip_days) < min_dips:
+        return None
+    power = dip_periodogram(dip_days, periods)
+    best = int(np.argmax(power))
+    return int(periods[best]), float(power[best])
+
+
+def days_since_first(dates) -> np.ndarray:
+    """Whole days from the first date in the series."""
+    days = pd.to_datetime(pd.Series(dates)).to_numpy().astype('datetime64[D]').astype(np.int64)
+    return days - days[0] if len(days) else days
+
+
+@dataclass
+class GamelogBuffer:
+    """
+    Read-only columnar game logs grouped by player.
+
+    Rows of player i are offsets[i]:offsets[i + 1], in the order they
+    appear in the source frame; players are in order of first appearance.
+    """
+    players: np.ndarray
+    offsets: np.ndarray
+    columns: List[str]
+    data: dict
+    player_col: str = 'PLAYER_NAME'
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Sequence[str],
+                   player_col: str = 'PLAYER_NAME') -> 'GamelogBuffer':
+        codes, players = pd.factorize(df[player_col], sort=False)
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes[codes >= 0], minlength=len(players))
+        order = order[codes[order] >= 0]
+        columns = [column for column in columns if column in df.columns]
+        data = {column: df[column].to_numpy()[order] for column in columns}
+        return cls(players=np.asarray(players, dtype=object),
+                   offsets=np.concatenate([[0], np.cumsum(counts)]),
+                   columns=columns, data=data, player_col=player_col)
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def frame(self, i: int) -> pd.DataFrame:
+        """Game logs of the i-th player."""
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        frame = pd.DataFrame({column: self.data[column][start:stop] for column in self.columns})
+        frame.insert(0, self.player_col, self.players[i])
+        return frame
+
+
+# Set in each worker by _init_worker
+_WORKER = {}
+
+
+def _init_worker(buffer: GamelogBuffer, analyzer) -> None:
+    _WORKER['buffer'] = buffer
+    _WORKER['analyzer'] = analyzer
+
+
+def _analyze_span(span: Tuple[int, int]) -> list:
+    buffer, analyzer = _WORKER['buffer'], _WORKER['analyzer']
+    return [analyzer.analyze_player_data(buffer.players[i], buffer.frame(i)) for i in range(*span)]
+
+
+def scan_players(detector, buffer: GamelogBuffer, processes: Optional[int] = None,
+                 progress: Optional[Callable[[int, int], None]] = None) -> list:
+    """
+    Run detector.analyze_player_data for every player in the buffer.
+
+    With more than one process, players are split into contiguous spans
+    and analysed on a process pool. Workers receive the buffer once (shared
+    copy-on-write where the platform forks) and a copy of the detector's
+    settings without its game logs.
+
+    Args:
+        detector: Object with analyze_player_data(player_name, player_data)
+        buffer: Game logs grouped by player
+        processes: Worker processes (default: CPU count, capped so each gets
+            MIN_PLAYERS_PER_PROCESS players; 1 runs in-process)
+        progress: Called with (players done, total) as spans complete
+
+    Returns:
+        Results in buffer player order
+    """
+    total = len(buffer)
+    if processes is None:
+        processes = max(1, min(os.cpu_count() or 1, total // MIN_PLAYERS_PER_PROCESS))
+    span_size = max(1, math.ceil(total / (processes * 4)))
+    spans = [(start, min(start + span_size, total)) for start in range(0, total, span_size)]
+
+    results = []
+    if processes <= 1 or len(spans) <= 1:
+        _init_worker(buffer, detector)
+        try:
+            for span in spans:
+                results.extend(_analyze_span(span))
+                if progress:
+                    progress(span[1], total)
+        finally:
+            _WORKER.clear()
+        return results
+
+    settings = copy.copy(detector)
+    settings.__dict__.pop('df', None)
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(buffer, settings)) as pool:
+        for span, span_results in zip(spans, pool.map(_analyze_span, spans)):
+            results.extend(span_results)
+            if progress:
+                progress(span[1], total)
+    return results
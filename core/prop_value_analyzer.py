@@ -1,9 +1,59 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from pathlib import Path
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.gamelog_store import load_gamelogs
+
+# Stats with a season-average projection
+PROJECTION_STATS = ['PTS', 'REB', 'AST', 'STL', 'BLK', 'FG3M']
+
+
+def _first_column(df, names, default):
+    """First of names present in df (the scalar path's nested prop.get)."""
+    for name in names:
+        if name in df.columns:
+            return df[name]
+    return pd.Series(default, index=df.index)
+
+
+def _analysis_column(table, rows, column, default):
+    """Per-prop value of an analysis column, default where missing."""
+    if column not in table.columns or len(table) == 0:
+        return np.broadcast_to(np.asarray(default, dtype=object), rows.shape).copy()
+    values = table[column].to_numpy(dtype=object)[np.maximum(rows, 0)]
+    values[rows < 0] = default
+    return values
+
+
+def _stat_column(table, rows, stat_types, suffix, default):
+    """Per-prop value of the '<stat><suffix>' analysis column for each prop's stat."""
+    result = np.array(np.broadcast_to(np.asarray(default, dtype=object), rows.shape), dtype=object)
+    stat_types = np.asarray(stat_types, dtype=object)
+    for stat in pd.unique(stat_types):
+        column = f'{stat}{suffix}'
+        if column in table.columns:
+            mask = stat_types == stat
+            result[mask] = _analysis_column(table, rows[mask], column, np.nan)
+    return result
+
+
+def _round_like_scalar(values, decimals, python_float):
+    """np.round, except rows flagged python_float use the builtin round."""
+    rounded = np.round(values, decimals)
+    for i in np.flatnonzero(python_float):
+        rounded[i] = round(float(values[i]), decimals)
+    return rounded
+
+
 class PropValueAnalyzer:
     """
     Analyzes prop betting value by combining volatility, cycles, and actual lines.
@@ -177,6 +227,129 @@ class PropValueAnalyzer:
     
     def analyze_props(self, props_df, gamelogs_df, volatility_df, cycles_df, stat_mapping):
         """Main analysis method."""
+        player_stats = self.build_player_stat_table(gamelogs_df)
+        analysis_table = self.build_analysis_table(volatility_df, cycles_df)
+        return self.score_props(props_df, player_stats, analysis_table, stat_mapping)
+
+    def build_player_stat_table(self, gamelogs_df):
+        """Season average per player (rows) and stat (columns)."""
+        stats = [stat for stat in PROJECTION_STATS if stat in gamelogs_df.columns]
+        return gamelogs_df.groupby('Player')[stats].mean()
+
+    def build_analysis_table(self, volatility_df, cycles_df):
+        """Volatility and cycle analysis merged to one row per player."""
+        analysis_df = volatility_df.merge(cycles_df, on='Player', how='outer')
+        return analysis_df.drop_duplicates('Player', keep='first').set_index('Player')
+
+    def score_props(self, props_df, player_stats, analysis_table, stat_mapping):
+        """
+        Score a whole prop board against precomputed player tables.
+
+        Same rules and output as analyze_props_rowwise, evaluated as array
+        expressions over every prop at once.
+        """
+        player = _first_column(props_df, ['player_name', 'name', 'Player'], '')
+        stat_display = _first_column(props_df, ['stat_type', 'stat'], '')
+        stat_type = stat_display.map(stat_mapping).fillna(stat_display)
+        line = _first_column(props_df, ['line_score', 'line'], 0)
+
+        # Join props to the per-player tables by position
+        analysis_row = analysis_table.index.get_indexer(player)
+        stat_row = player_stats.index.get_indexer(player)
+        stat_col = player_stats.columns.get_indexer(stat_type)
+        has_base = (stat_row >= 0) & (stat_col >= 0)
+        base = np.zeros(len(props_df))
+        base[has_base] = player_stats.to_numpy(dtype=float)[stat_row[has_base], stat_col[has_base]]
+
+        candidate = (
+            player.notna().to_numpy() & player.ne('').to_numpy()
+            & stat_type.notna().to_numpy() & stat_type.ne('').to_numpy()
+            & ~stat_type.isin(['PRA', 'PR', 'PA']).to_numpy()
+            & line.ne(0).to_numpy()
+            & (analysis_row >= 0) & has_base & (base != 0)
+        )
+
+        overall_volatility = _analysis_column(analysis_table, analysis_row, 'Overall_Volatility', 0.5)
+        stat_volatility = _stat_column(analysis_table, analysis_row, stat_type, '_CV', overall_volatility)
+        current_streak = _stat_column(analysis_table, analysis_row, stat_type, '_Current_Streak', 'neutral')
+        streak_length = _stat_column(analysis_table, analysis_row, stat_type, '_Streak_Length', 0).astype(float)
+        recent_avg = _stat_column(analysis_table, analysis_row, stat_type, '_Recent_Avg', base).astype(float)
+        bounce_rate = _stat_column(analysis_table, analysis_row, stat_type, '_Bounce_Rate', 0.5).astype(float)
+        stat_volatility = stat_volatility.astype(float)
+
+        with np.errstate(all='ignore'):
+            volatility_factor = np.select(
+                [stat_volatility > 0.8, stat_volatility > 0.5, stat_volatility > 0.3],
+                [0.92, 0.96, 0.98], 1.0)
+
+            is_hot = current_streak == 'hot'
+            is_cold = current_streak == 'cold'
+            hot_factor = 0.7 + (0.3 * (recent_avg / base))
+            hot_factor = np.where((streak_length >= 5) & (1.1 < hot_factor), 1.1, hot_factor)
+            cold_factor = np.where(bounce_rate > 0.6, 0.85, 0.75)
+            cycle_factor = np.select([is_hot, is_cold], [hot_factor, cold_factor], 1.0)
+
+            adjusted = base * volatility_factor * cycle_factor
+
+            confidence = 0.75 - np.select(
+                [stat_volatility > 0.8, stat_volatility > 0.5, stat_volatility > 0.3],
+                [0.15, 0.08, 0.03], 0.0)
+            confidence = confidence + np.select(
+                [current_streak == 'neutral', streak_length >= 5], [0.1, -0.1], 0.0)
+            confidence = np.clip(confidence, 0.3, 1.0)
+
+            # Hit probability from a normal approximation, shrunk by confidence
+            line_values = line.to_numpy(dtype=float)
+            std_dev = adjusted * 0.25
+            z_score = np.where(std_dev > 0, (line_values - adjusted) / std_dev, 0.0)
+            tail = (z_score > 3) | (z_score < -3)
+            hit_probability = np.select(
+                [z_score > 3, z_score < -3], [0.05, 0.95], 1 / (1 + np.exp(1.7 * z_score)))
+            hit_probability = (hit_probability * confidence) + (0.5 * (1 - confidence))
+            clamped = ~(hit_probability < 0.9)
+            hit_probability = np.where(clamped, 0.9, hit_probability)
+            clamped |= ~(hit_probability > 0.1)
+            hit_probability = np.where(hit_probability > 0.1, hit_probability, 0.1)
+
+            ev_over = (hit_probability * 0.909) - ((1 - hit_probability) * 1)
+            ev_under = ((1 - hit_probability) * 0.909) - (hit_probability * 1)
+
+        recommendation = np.select(
+            [ev_over >= self.value_thresholds['strong_over'],
+             ev_over >= self.value_thresholds['over'],
+             ev_under >= abs(self.value_thresholds['under']),
+             ev_under >= abs(self.value_thresholds['strong_under'])],
+            ['STRONG OVER', 'OVER', 'UNDER', 'STRONG UNDER'], 'PASS')
+
+        # Skip props with no projection or where the player doesn't take that stat
+        keep = candidate & ~(adjusted < 0.1) & (recommendation != 'PASS')
+        if not keep.any():
+            return pd.DataFrame()
+
+        # Tail/clamped probabilities are plain floats in the scalar path, which round differently
+        python_float = (tail | clamped)[keep]
+        output_volatility = _stat_column(
+            analysis_table, analysis_row, stat_type, '_CV',
+            _analysis_column(analysis_table, analysis_row, 'Overall_Volatility', 0))[keep]
+
+        return pd.DataFrame({
+            'Player': player.to_numpy()[keep],
+            'Stat': stat_display.to_numpy()[keep],
+            'Line': line.to_numpy()[keep],
+            'Projection': np.round(adjusted[keep], 1),
+            'Base_Avg': np.round(base[keep], 1),
+            'Hit_Probability': _round_like_scalar(hit_probability[keep] * 100, 1, python_float),
+            'EV': _round_like_scalar(np.where(ev_under > ev_over, ev_under, ev_over)[keep] * 100, 1, python_float),
+            'Recommendation': recommendation[keep],
+            'Confidence': np.rint(confidence[keep] * 100).astype(int),
+            'Volatility': [round(value, 3) for value in output_volatility.tolist()],
+            'Current_Streak': _stat_column(analysis_table, analysis_row, stat_type,
+                                           '_Current_Streak', 'unknown')[keep],
+            'Risk_Level': _analysis_column(analysis_table, analysis_row, 'Risk_Level', 'unknown')[keep],
+        })
+
+    def analyze_props_rowwise(self, props_df, gamelogs_df, volatility_df, cycles_df, stat_mapping):
+        """Row-by-row reference path; analyze_props is the columnar equivalent."""
         results = []
         
         # Merge analysis data
@@ -277,11 +450,13 @@ def main():
         print("❌ Missing required analysis files. Run volatility and cycle detectors first.")
         return
     
-    # Load gamelogs
+    # Load gamelogs - only the stats that feed player projections
     try:
-        gamelogs_df = pd.read_csv('data/wnba_combined_gamelogs.csv')
         column_mapping = {'PLAYER_NAME': 'Player', 'GAME_DATE': 'Date'}
-        gamelogs_df = gamelogs_df.rename(columns=column_mapping)
+        gamelogs_df = load_gamelogs(
+            columns=['PLAYER_NAME', 'GAME_DATE', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'FG3M'],
+            rename=column_mapping
+        )
         print(f"✅ Loaded gamelogs: {len(gamelogs_df)} records")
     except:
         print("❌ Could not load gamelogs")
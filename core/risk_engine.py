@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+risk_engine.py - Monte-Carlo risk engine for a whole betting card
+Samples correlated leg outcomes (shared player and game factors through a
+Gaussian copula) across many paths in bounded NumPy chunks, and reports
+ruin probability, drawdown quantiles and the final bankroll distribution.
+"""
+
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from core.simulation import STANDARD_PAYOUT
+
+FINAL_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+DRAWDOWN_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+@dataclass
+class RiskReport:
+    """Summary of a card's simulated paths"""
+    n_paths: int
+    starting_bankroll: float
+    ruin_probability: float
+    loss_probability: float
+    expected_final: float
+    final_quantiles: Dict[float, float]
+    drawdown_quantiles: Dict[float, float]
+    final_bankroll: np.ndarray = field(repr=False)
+    max_drawdown: np.ndarray = field(repr=False)
+
+    def to_dict(self) -> Dict:
+        """Scalar summary (per-path arrays left out)"""
+        return {
+            'n_paths': self.n_paths,
+            'starting_bankroll': self.starting_bankroll,
+            'ruin_probability': self.ruin_probability,
+            'loss_probability': self.loss_probability,
+            'expected_final': self.expected_final,
+            'final_quantiles': dict(self.final_quantiles),
+            'drawdown_quantiles': dict(self.drawdown_quantiles),
+        }
+
+
+def _normal_quantiles(probabilities: np.ndarray) -> np.ndarray:
+    """Standard normal quantile per leg (-inf/inf at probabilities 0 and 1)"""
+    probabilities = np.clip(np.asarray(probabilities, dtype=float), 0, 1)
+    quantiles = np.where(probabilities >= 1, np.inf, -np.inf)
+    quantiles[np.isnan(probabilities)] = np.nan
+    inside = (probabilities > 0) & (probabilities < 1)
+    # A card has few legs, so the stdlib inverse CDF per leg is enough
+    quantiles[inside] = [NormalDist().inv_cdf(p) for p in probabilities[inside]]
+    return quantiles
+
+
+def _group_codes(labels, n_bets: int) -> np.ndarray:
+    """Dense integer code per bet (-1 when the bet shares no group)"""
+    if labels is None:
+        return np.full(n_bets, -1)
+    codes, _ = pd.factorize(pd.Series(list(labels), dtype=object), use_na_sentinel=True)
+    return codes
+
+
+def _shared_factor(rng: np.random.Generator, codes: np.ndarray, size: int) -> np.ndarray:
+    """One standard normal draw per group and path, broadcast onto its bets"""
+    n_groups = codes.max() + 1
+    if n_groups <= 0:
+        return np.zeros((size, len(codes)))
+    draws = rng.standard_normal((size, n_groups))
+    return np.where(codes >= 0, draws[:, np.maximum(codes, 0)], 0.0)
+
+
+def simulate_card(fractions, hit_probability, players: Optional[Sequence] = None,
+                  games: Optional[Sequence] = None, sides: Optional[Sequence] = None,
+                  player_correlation: float = 0.3, game_correlation: float = 0.1,
+                  n_paths: int = 100_000, n_slates: int = 1,
+                  payout_ratio: float = STANDARD_PAYOUT, starting_bankroll: float = 1000.0,
+                  ruin_fraction: float = 0.5, seed: Optional[int] = None,
+                  chunk_size: int = 10_000) -> RiskReport:
+    """
+    Stress-test a card by sampling correlated outcomes for every leg.
+
+    Each leg wins when a latent normal falls below its hit-probability
+    quantile. The latent variable mixes a per-player factor, a per-game
+    factor and independent noise, so legs on the same player or game move
+    together (an opposite side flips the shared part). Stakes are fractions
+    of the bankroll at the start of each slate; legs settle in card order.
+
+    Args:
+        fractions: Stake of each leg as a fraction of the bankroll
+        hit_probability: Win probability per leg (scalar or sequence)
+        players/games: Group labels per leg (None disables that factor)
+        sides: +1/-1 per leg (e.g. OVER/UNDER) applied to the shared factors
+        player_correlation/game_correlation: Latent correlation from each factor
+        n_paths: Simulated paths
+        n_slates: Times the card is replayed back to back on each path
+        ruin_fraction: Paths that touch starting_bankroll * ruin_fraction are ruined
+            and stop betting
+        seed: RNG seed; the same seed and chunk_size reproduce the report
+        chunk_size: Paths simulated together (bounds memory)
+    """
+    if player_correlation < 0 or game_correlation < 0 or player_correlation + game_correlation >= 1:
+        raise ValueError("Correlations must be non-negative and sum to less than 1")
+
+    fractions = np.asarray(fractions, dtype=float)
+    n_bets = len(fractions)
+    threshold = _normal_quantiles(np.broadcast_to(np.asarray(hit_probability, dtype=float), fractions.shape))
+    player_codes = _group_codes(players, n_bets)
+    game_codes = _group_codes(games, n_bets)
+    side = np.ones(n_bets) if sides is None else np.asarray(sides, dtype=float)
+    player_weight = np.sqrt(player_correlation) * np.where(player_codes >= 0, 1.0, 0.0)
+    game_weight = np.sqrt(game_correlation) * np.where(game_codes >= 0, 1.0, 0.0)
+    noise_weight = np.sqrt(1.0 - player_weight ** 2 - game_weight ** 2)
+    ruin_level = starting_bankroll * ruin_fraction
+
+    rng = np.random.default_rng(seed)
+    final = np.empty(n_paths)
+    drawdown = np.empty(n_paths)
+    ruined = np.empty(n_paths, dtype=bool)
+
+    for start in range(0, n_paths, chunk_size):
+        size = min(chunk_size, n_paths - start)
+        bankroll = np.full(size, float(starting_bankroll))
+        peak = bankroll.copy()
+        worst = np.zeros(size)
+        alive = np.ones(size, dtype=bool)
+
+        for _ in range(n_slates if n_bets else 0):
+            shared = (player_weight * _shared_factor(rng, player_codes, size)
+                      + game_weight * _shared_factor(rng, game_codes, size)) * side
+            latent = shared + noise_weight * rng.standard_normal((size, n_bets))
+            returns = np.where(latent < threshold, payout_ratio, -1.0)
+
+            stakes = np.where(alive, bankroll, 0.0)[:, None] * fractions
+            path = bankroll[:, None] + np.cumsum(stakes * returns, axis=1)
+            running_peak = np.maximum(peak[:, None], np.maximum.accumulate(path, axis=1))
+            worst = np.maximum(worst, ((running_peak - path) / running_peak).max(axis=1))
+            alive &= path.min(axis=1) > ruin_level
+            peak = running_peak[:, -1]
+            bankroll = path[:, -1]
+
+        final[start:start + size] = bankroll
+        drawdown[start:start + size] = worst
+        ruined[start:start + size] = ~alive | (bankroll <= ruin_level)
+
+    return RiskReport(
+        n_paths=n_paths,
+        starting_bankroll=float(starting_bankroll),
+        ruin_probability=float(ruined.mean()) if n_paths else 0.0,
+        loss_probability=float((final < starting_bankroll).mean()) if n_paths else 0.0,
+        expected_final=float(final.mean()) if n_paths else float(starting_bankroll),
+        final_quantiles=dict(zip(FINAL_QUANTILES, np.quantile(final, FINAL_QUANTILES).tolist()))
+        if n_paths else {},
+        drawdown_quantiles=dict(zip(DRAWDOWN_QUANTILES, np.quantile(drawdown, DRAWDOWN_QUANTILES).tolist()))
+        if n_paths else {},
+        final_bankroll=final,
+        max_drawdown=drawdown,
+    )
+
+
+def card_risk(card: pd.DataFrame, fraction_col: str = 'bet_percentage',
+              probability_col: str = 'win_rate', player_col: Optional[str] = 'player_name',
+              game_col: Optional[str] = None, side_col: Optional[str] = None,
+              **kwargs) -> RiskReport:
+    """
+    simulate_card for a betting card DataFrame.
+
+    Missing group or side columns disable that factor; legs with no or a
+    non-positive stake are left out.
+    """
+    fractions = pd.to_numeric(card[fraction_col], errors='coerce')
+    legs = card[fractions.notna() & (fractions > 0)]
+
+    def column(name):
+        return legs[name].tolist() if name and name in legs.columns else None
+
+    sides = column(side_col)
+    if sides is not None:
+        sides = [-1 if str(value).lower() in ('under', 'less', '-1') else 1 for value in sides]
+
+    return simulate_card(pd.to_numeric(legs[fraction_col]).to_numpy(dtype=float),
+                         pd.to_numeric(legs[probability_col]).to_numpy(dtype=float),
+                         players=column(player_col), games=column(game_col), sides=sides, **kwargs)
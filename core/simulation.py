@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+simulation.py - Shared bankroll simulation core
+Runs a columnar table of bets (stake fractions plus outcomes) through a
+bankroll with cumulative NumPy ops, produces grouped metrics per category
+in one pass, and replays seasons for Monte-Carlo risk estimates.
+"""
+
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# Net return on a winning -110 bet
+STANDARD_PAYOUT = 100 / 110
+
+TRADING_DAYS = 252
+
+
+def outcome_returns(wins, payout_ratio: Union[float, np.ndarray] = STANDARD_PAYOUT) -> np.ndarray:
+    """Per-unit-staked return of each bet: +payout_ratio on a win, -1 on a loss."""
+    return np.where(np.asarray(wins, dtype=bool), payout_ratio, -1.0)
+
+
+def simulate_bankroll(fractions, returns, starting_bankroll: float = 1000.0,
+                      max_stake: Optional[float] = None, min_bankroll: float = 0.0) -> dict:
+    """
+    Stake a fraction of the running bankroll on each bet in order.
+
+    Works on one season (1-D inputs) or many replays at once (2-D inputs of
+    shape (replays, bets)). Uncapped fractional staking is a cumulative
+    product; with a stake cap the sizing depends on the running bankroll,
+    so bets are walked in order with each step vectorized across replays.
+
+    Args:
+        fractions: Share of the current bankroll staked on each bet
+        returns: Per-unit return of each bet (see outcome_returns)
+        starting_bankroll: Bankroll before the first bet
+        max_stake: Optional cap on any single stake
+        min_bankroll: Bankroll floor below which no further bets are placed
+
+    Returns:
+        Dict of arrays shaped like returns: 'bet_size', 'profit',
+        'bankroll' (after each bet) and 'bet_return' (profit / prior bankroll)
+    """
+    returns = np.asarray(returns, dtype=float)
+    fractions = np.broadcast_to(np.asarray(fractions, dtype=float), returns.shape)
+
+    if max_stake is None and min_bankroll <= 0:
+        growth = np.cumprod(1.0 + fractions * returns, axis=-1)
+        bankroll = starting_bankroll * growth
+        prior = np.concatenate([np.full(returns.shape[:-1] + (1,), float(starting_bankroll)),
+                                bankroll[..., :-1]], axis=-1)
+        bet_size = prior * fractions
+    else:
+        bet_size = np.empty_like(returns)
+        bankroll = np.empty_like(returns)
+        prior = np.empty_like(returns)
+        current = np.full(returns.shape[:-1], float(starting_bankroll))
+        cap = np.inf if max_stake is None else max_stake
+        for i in range(returns.shape[-1]):
+            stake = np.where(current > min_bankroll, np.minimum(current * fractions[..., i], cap), 0.0)
+            prior[..., i] = current
+            bet_size[..., i] = stake
+            current = current + stake * returns[..., i]
+            bankroll[..., i] = current
+
+    profit = bet_size * returns
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bet_return = profit / prior
+    return {'bet_size': bet_size, 'profit': profit, 'bankroll': bankroll, 'bet_return': bet_return}
+
+
+def max_drawdown(bankroll, starting_bankroll: float) -> np.ndarray:
+    """Largest peak-to-trough fall (as a fraction of the peak) along the last axis."""
+    bankroll = np.asarray(bankroll, dtype=float)
+    path = np.concatenate([np.full(bankroll.shape[:-1] + (1,), float(starting_bankroll)), bankroll], axis=-1)
+    peak = np.maximum.accumulate(path, axis=-1)
+    return np.abs(((path - peak) / peak).min(axis=-1))
+
+
+def annualized_sharpe(returns, ddof: int = 0) -> float:
+    """Mean over standard deviation of per-bet returns, scaled to a season of trading days."""
+    returns = np.asarray(returns, dtype=float)
+    if len(returns) <= 1:
+        return np.nan
+    std = np.std(returns, ddof=ddof)
+    return np.mean(returns) / std * np.sqrt(TRADING_DAYS) if std > 0 else np.nan
+
+
+def grouped_metrics(results: pd.DataFrame, by: str, exclude: Sequence = ('unknown',),
+                    sharpe: bool = True) -> pd.DataFrame:
+    """
+    Bet count, win rate, profit, average stake fraction and Sharpe per category.
+
+    Categories keep their order of first appearance; missing, empty and
+    excluded labels are dropped.
+
+    Args:
+        results: One row per bet with is_win, profit, bet_size, bet_percentage
+        by: Category column (e.g. 'phase' or 'risk_tag')
+        exclude: Labels left out of the breakdown
+        sharpe: Include a per-category Sharpe ratio of profit / bet_size
+    """
+    keep = results[by].notna() & results[by].astype(bool) & ~results[by].isin(list(exclude))
+    frame = results.loc[keep, [by, 'is_win', 'profit', 'bet_percentage']].copy()
+    frame['bet_return'] = results.loc[keep, 'profit'] / results.loc[keep, 'bet_size']
+
+    grouped = frame.groupby(by, sort=False).agg(
+        total_bets=('is_win', 'size'), wins=('is_win', 'sum'), profit=('profit', 'sum'),
+        avg_bet=('bet_percentage', 'mean'), return_mean=('bet_return', 'mean'),
+        return_std=('bet_return', 'std'), return_count=('bet_return', 'count'))
+
+    metrics = pd.DataFrame({
+        by: grouped.index,
+        'total_bets': grouped['total_bets'].to_numpy(),
+        'win_rate': np.round(grouped['wins'].to_numpy() / grouped['total_bets'].to_numpy(), 3),
+        'profit': np.round(grouped['profit'].to_numpy(), 2),
+        'avg_bet': np.round(grouped['avg_bet'].to_numpy(), 3),
+    })
+    if sharpe:
+        ratio = grouped['return_mean'] / grouped['return_std'] * np.sqrt(TRADING_DAYS)
+        ratio = ratio.where(grouped['return_count'] > 1)
+        metrics['sharpe_ratio'] = [round(value, 2) if not np.isnan(value) else 'NaN' for value in ratio]
+    return metrics
+
+
+def replay_seasons(fractions, hit_probability, n_replays: int = 1000,
+                   payout_ratio: float = STANDARD_PAYOUT, starting_bankroll: float = 1000.0,
+                   max_stake: Optional[float] = None, seed: Optional[int] = None,
+                   chunk_size: int = 512) -> pd.DataFrame:
+    """
+    Monte-Carlo replays of a season with random outcomes.
+
+    Args:
+        fractions: Stake fraction of each bet, in season order
+        hit_probability: Win probability (scalar or one per bet)
+        n_replays: Number of simulated seasons
+        max_stake: Optional stake cap (switches to sequential sizing)
+        seed: RNG seed for reproducible replays
+        chunk_size: Replays simulated together (bounds memory)
+
+    Returns:
+        One row per replay with final_bankroll, total_profit, max_drawdown and wins
+    """
+    rng = np.random.default_rng(seed)
+    fractions = np.asarray(fractions, dtype=float)
+    hit_probability = np.broadcast_to(np.asarray(hit_probability, dtype=float), fractions.shape)
+
+    chunks = []
+    for start in range(0, n_replays, chunk_size):
+        size = min(chunk_size, n_replays - start)
+        wins = rng.random((size, len(fractions))) < hit_probability
+        path = simulate_bankroll(fractions, outcome_returns(wins, payout_ratio),
+                                 starting_bankroll, max_stake=max_stake)
+        final = path['bankroll'][:, -1] if len(fractions) else np.full(size, float(starting_bankroll))
+        chunks.append(pd.DataFrame({
+            'final_bankroll': final,
+            'total_profit': final - starting_bankroll,
+            'max_drawdown': max_drawdown(path['bankroll'], starting_bankroll),
+            'wins': wins.sum(axis=1),
+        }))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(
+        columns=['final_bankroll', 'total_profit', 'max_drawdown', 'wins'])
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+stage_dag.py - Stage DAG runner with a content-addressed artifact cache
+Pipelines declare their stages with the in-memory artifacts and files each
+one reads and produces. Independent stages run concurrently, shared data is
+handed between stages in memory, and a stage whose inputs hash the same as
+on a previous run is served from the cache instead of being re-run.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+DEFAULT_CACHE_DIR = "data/stage_cache"
+
+# Bump to invalidate every cached stage (e.g. when the key layout changes)
+CACHE_FORMAT = 1
+
+# Cached results kept per stage; older ones (and objects only they use) are pruned
+DEFAULT_CACHE_KEEP = 5
+
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def file_hash(path: Union[str, Path]) -> Optional[str]:
+    """sha256 of a file's bytes, or None if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def content_hash(value: Any) -> str:
+    """
+    sha256 of an artifact's content.
+
+    DataFrames and Series are hashed from their values, index, labels and
+    dtypes, so equal frames hash equal however they were built; anything
+    else (or frames holding unhashable cells) is hashed from its pickle.
+    """
+    digest = hashlib.sha256()
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        labels = list(value.columns) if isinstance(value, pd.DataFrame) else [value.name]
+        dtypes = value.dtypes.astype(str).tolist() if isinstance(value, pd.DataFrame) else [str(value.dtype)]
+        digest.update(pickle.dumps((type(value).__name__, labels, dtypes, value.shape)))
+        try:
+            digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        except TypeError:
+            digest.update(pickle.dumps(value))
+    else:
+        digest.update(pickle.dumps(value))
+    return digest.hexdigest()
+
+
+def _code_version(func: Callable) -> str:
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = getattr(func, '__qualname__', repr(func))
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def _print_log(message: str, level: str = "INFO") -> None:
+    print(message)
+
+
+@dataclass
+class Stage:
+    """
+    One step of a pipeline.
+
+    func is called with each input artifact as a keyword argument and returns
+    the value of its single output, a tuple in `outputs` order for several,
+    or nothing. Stages must not modify their inputs: artifacts are shared
+    between stages that run at the same time.
+
+    `files` are read from disk and `writes` are written to disk; a stage
+    reading a file another stage writes runs after it. The cache key covers
+    the input artifacts, the current content of `files` and `version`
+    (defaulting to the source of func), so list the modules a stage
+    delegates to in `files` to re-run it when they change.
+    """
+    name: str
+    func: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    files: Tuple[str, ...] = ()
+    writes: Tuple[str, ...] = ()
+    version: Optional[str] = None
+    cacheable: bool = True
+
+    def __post_init__(self):
+        self.inputs, self.outputs = tuple(self.inputs), tuple(self.outputs)
+        self.files, self.writes = tuple(self.files), tuple(self.writes)
+        if self.version is None:
+            self.version = _code_version(self.func)
+
+
+@dataclass
+class StageResult:
+    """Outcome of one stage: 'ran', 'cached', 'failed' or 'skipped'."""
+    name: str
+    status: str
+    seconds: float = 0.0
+    key: Optional[str] = None
+    hashes: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+    traceback: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ('ran', 'cached')
+
+
+@dataclass(frozen=True)
+class _CachedObject:
+    """Placeholder for a cached artifact that has not been unpickled yet."""
+    digest: str
+
+
+class ArtifactCache:
+    """
+    Content-addressed store of stage results.
+
+    objects/<sha256> holds pickled artifacts and the bytes of written files,
+    stages/<key>.json maps a stage's cache key to the hashes it produced.
+    prune keeps the `keep` most recently stored or used entries per stage
+    (all of them when keep is None).
+    """
+
+    def __init__(self, root: Union[str, Path] = DEFAULT_CACHE_DIR,
+                 keep: Optional[int] = DEFAULT_CACHE_KEEP):
+        self.root = Path(root)
+        self.keep = keep
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / 'objects' / digest[:2] / digest
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / 'stages' / f"{key}.json"
+
+    def _put(self, digest: str, data: bytes) -> None:
+        path = self._object_path(digest)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{digest}.{uuid.uuid4().hex}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def load_object(self, digest: str) -> Any:
+        return pickle.loads(self._object_path(digest).read_bytes())
+
+    def lookup(self, key: str) -> Optional[dict]:
+        """The entry stored under key, if it and all its objects exist."""
+        path = self._entry_path(key)
+        try:
+            entry = json.loads(path.read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            return None
+        digests = list(entry['outputs'].values()) + list(entry['writes'].values())
+        if not all(self._object_path(digest).exists() for digest in digests):
+            return None
+        try:
+            # Mark the entry as used so prune keeps it
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def store(self, key: str, stage: str, values: Dict[str, Any], hashes: Dict[str, str],
+              writes: List[str]) -> None:
+        """Record a stage's outputs and the files it wrote under key."""
+        for name, value in values.items():
+            self._put(hashes[name], pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        written = {}
+        for path in writes:
+            if os.path.exists(path):
+                data = Path(path).read_bytes()
+                written[path] = hashlib.sha256(data).hexdigest()
+                self._put(written[path], data)
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry_path.with_name(f"{key}.{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps({'stage': stage, 'outputs': hashes, 'writes': written}), encoding='utf-8')
+        os.replace(tmp, entry_path)
+
+    def prune(self) -> Tuple[int, int]:
+        """
+        Drop all but the `keep` newest entries of each stage, then every
+        object no remaining entry refers to.
+
+        Returns:
+            (entries removed, objects removed)
+        """
+        if self.keep is None:
+            return 0, 0
+        entries: Dict[str, List[Tuple[float, Path, dict]]] = {}
+        for path in (self.root / 'stages').glob('*.json'):
+            try:
+                entry = json.loads(path.read_text(encoding='utf-8'))
+                entries.setdefault(entry['stage'], []).append((path.stat().st_mtime, path, entry))
+            except (OSError, ValueError, KeyError):
+                continue
+
+        removed_entries, referenced = 0, set()
+        for stage_entries in entries.values():
+            stage_entries.sort(key=lambda item: item[0], reverse=True)
+            for index, (_, path, entry) in enumerate(stage_entries):
+                if index < self.keep:
+                    referenced.update(entry['outputs'].values(), entry['writes'].values())
+                    continue
+                path.unlink(missing_ok=True)
+                removed_entries += 1
+
+        removed_objects = 0
+        for path in (self.root / 'objects').glob('*/*'):
+            if path.suffix != '.tmp' and path.name not in referenced:
+                path.unlink(missing_ok=True)
+                removed_objects += 1
+        return removed_entries, removed_objects
+
+    def restore_writes(self, entry: dict) -> None:
+        """Put back any recorded output file that is missing or was changed."""
+        for path, digest in entry['writes'].items():
+            if file_hash(path) != digest:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                Path(path).write_bytes(self._object_path(digest).read_bytes())
+
+
+class StageRunner:
+    """
+    Run a set of stages in dependency order.
+
+    Each stage is submitted as soon as everything it depends on has finished,
+    so the run takes as long as its critical path rather than the sum of its
+    stages. Artifacts of cached stages are only unpickled when a stage that
+    actually runs (or the caller, through get) needs them.
+    """
+
+    def __init__(self, stages: List[Stage], cache: Optional[ArtifactCache] = None,
+                 max_workers: Optional[int] = None,
+                 log: Callable[..., None] = _print_log):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache = cache
+        self.max_workers = max_workers
+        self.log = log
+        self.results: Dict[str, StageResult] = {}
+        self.wall_seconds = 0.0
+        self._values: Dict[str, Any] = {}
+        self._hashes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        self.dependencies = self._resolve_dependencies()
+        self.order = self._topological_order()
+
+    def _resolve_dependencies(self) -> Dict[str, List[str]]:
+        producers = {}
+        for stage in self.stages.values():
+            for name in stage.outputs + tuple(f"file:{path}" for path in stage.writes):
+                if name in producers:
+                    raise ValueError(f"{name} is produced by both {producers[name]} and {stage.name}")
+                producers[name] = stage.name
+
+        dependencies = {}
+        for stage in self.stages.values():
+            missing = [name for name in stage.inputs if name not in producers]
+            if missing:
+                raise ValueError(f"No stage produces {missing} (needed by {stage.name})")
+            needed = [producers[name] for name in stage.inputs]
+            needed += [producers[f"file:{path}"] for path in stage.files if f"file:{path}" in producers]
+            dependencies[stage.name] = list(dict.fromkeys(dep for dep in needed if dep != stage.name))
+        return dependencies
+
+    def _topological_order(self) -> List[str]:
+        order, state = [], {}
+
+        def visit(name, chain):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Stage cycle: {' -> '.join(chain + [name])}")
+            state[name] = 'visiting'
+            for dep in self.dependencies[name]:
+                visit(dep, chain + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    def get(self, name: str) -> Any:
+        """Value of an artifact produced (or served from the cache) in the last run."""
+        with self._lock:
+            value = self._values[name]
+            if isinstance(value, _CachedObject):
+                value = self._values[name] = self.cache.load_object(value.digest)
+            return value
+
+    def _stage_key(self, stage: Stage) -> str:
+        payload = {
+            'format': CACHE_FORMAT,
+            'stage': stage.name,
+            'version': stage.version,
+            'inputs': {name: self._hashes[name] for name in stage.inputs},
+            'files': {path: file_hash(path) for path in stage.files},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def _execute(self, stage: Stage, force: bool) -> StageResult:
+        start = time.perf_counter()
+        key = None
+        use_cache = self.cache is not None and stage.cacheable
+        if use_cache:
+            key = self._stage_key(stage)
+            entry = None if force else self.cache.lookup(key)
+            if entry is not None:
+                self.cache.restore_writes(entry)
+                with self._lock:
+                    for name, digest in entry['outputs'].items():
+                        self._values[name] = _CachedObject(digest)
+                return StageResult(stage.name, 'cached', time.perf_counter() - start, key, entry['outputs'])
+
+        returned = stage.func(**{name: self.get(name) for name in stage.inputs})
+        if len(stage.outputs) == 1:
+            returned = (returned,)
+        values = dict(zip(stage.outputs, returned)) if stage.outputs else {}
+        if len(values) != len(stage.outputs):
+            raise ValueError(f"{stage.name} returned {len(values)} outputs, expected {len(stage.outputs)}")
+
+        hashes = {name: content_hash(value) for name, value in values.items()}
+        if use_cache:
+            self.cache.store(key, stage.name, values, hashes, list(stage.writes))
+        with self._lock:
+            self._values.update(values)
+        return StageResult(stage.name, 'ran', time.perf_counter() - start, key, hashes)
+
+    def _run_stage(self, stage: Stage, force: bool) -> StageResult:
+        start = time.perf_counter()
+        try:
+            return self._execute(stage, force)
+        except Exception as e:
+            return StageResult(stage.name, 'failed', time.perf_counter() - start, error=str(e),
+                               traceback=traceback.format_exc())
+
+    def run(self, force: bool = False) -> Dict[str, StageResult]:
+        """
+        Run every stage, re-running cached ones too when force is set.
+
+        A failing stage is logged with its traceback and every stage
+        depending on it is skipped; independent branches still run. The cache
+        is pruned afterwards. Returns the per-stage results.
+        """
+        self.results, self._values, self._hashes = {}, {}, {}
+        waiting = list(self.order)
+        running = {}
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while waiting or running:
+                for name in list(waiting):
+                    deps = [self.results.get(dep) for dep in self.dependencies[name]]
+                    if any(dep is None for dep in deps):
+                        continue
+                    waiting.remove(name)
+                    failed = [dep.name for dep in deps if not dep.ok]
+                    if failed:
+                        self.results[name] = StageResult(name, 'skipped', error=f"needs {', '.join(failed)}")
+                        self.log(f"⚠️  Skipping {name}: {', '.join(failed)} did not complete", "WARN")
+                    else:
+                        running[pool.submit(self._run_stage, self.stages[name], force)] = name
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    del running[future]
+                    self.results[result.name] = result
+                    self._hashes.update(result.hashes)
+                    if result.status == 'failed':
+                        self.log(f"❌ {result.name} failed after {result.seconds:.3f}s: {result.error}\n"
+                                 f"{result.traceback}", "ERROR")
+                    elif result.status == 'cached':
+                        self.log(f"✅ {result.name} unchanged - reused cached results")
+
+        self.wall_seconds = time.perf_counter() - start
+        if self.cache is not None:
+            removed_entries, removed_objects = self.cache.prune()
+            if removed_entries:
+                self.log(f"Pruned {removed_entries} old cached stage results ({removed_objects} objects)")
+        return self.results
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """Longest chain of dependent stages by measured time, and its length."""
+        finish, previous = {}, {}
+        for name in self.order:
+            deps = [dep for dep in self.dependencies[name] if dep in finish]
+            before = max(deps, key=finish.get, default=None)
+            previous[name] = before
+            seconds = self.results[name].seconds if name in self.results else 0.0
+            finish[name] = seconds + (finish[before] if before else 0.0)
+        if not finish:
+            return [], 0.0
+
+        name = max(finish, key=finish.get)
+        total, path = finish[name], []
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+        return path[::-1], total
+
+    def timing_report(self) -> List[str]:
+        """One line per stage plus the critical path, sum and wall time."""
+        lines = []
+        for name in self.order:
+            result = self.results.get(name)
+            if result is None:
+                continue
+            lines.append(f"{name:<20} {result.status:<8} {result.seconds:8.3f}s")
+        path, seconds = self.critical_path()
+        total = sum(result.seconds for result in self.results.values())
+        lines.append(f"Critical path: {' -> '.join(path)} ({seconds:.3f}s)")
+        lines.append(f"Sum of stages: {total:.3f}s, wall time: {self.wall_seconds:.3f}s")
+        return lines
@@ -1,9 +1,18 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from pathlib import Path
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.gamelog_store import load_gamelogs
+
 class VolatilityAnalyzer:
     """
     Analyzes player performance volatility to identify high-risk betting targets.
@@ -148,35 +157,8 @@ def main():
     print("🎲 WNBA Player Volatility Analyzer")
     print("=" * 50)
     
-    # Use the correct file with actual game statistics
-    gamelogs_path = 'data/wnba_combined_gamelogs.csv'
-    
-    try:
-        gamelogs_df = pd.read_csv(gamelogs_path)
-        print(f"✅ Loaded gamelogs from {gamelogs_path}: {len(gamelogs_df)} records")
-    except FileNotFoundError:
-        print(f"❌ Could not find {gamelogs_path}")
-        print("\nTrying alternative files...")
-        
-        # Fallback options
-        alternative_paths = [
-            'data/wnba_2024_gamelogs.csv',
-            'data/archive/2024/engineered_gamelogs_2024.csv',
-            'data/wnba_full_gamelogs.csv'
-        ]
-        
-        gamelogs_df = None
-        for path in alternative_paths:
-            try:
-                gamelogs_df = pd.read_csv(path)
-                print(f"✅ Loaded gamelogs from {path}: {len(gamelogs_df)} records")
-                break
-            except FileNotFoundError:
-                continue
-        
-        if gamelogs_df is None:
-            print("❌ Could not find any gamelog files.")
-            return
+    # Only identity columns and the stats scored for volatility are loaded
+    columns = ['PLAYER_NAME', 'GAME_DATE', 'PLAYER_ID', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'FG3M', 'FGM', 'FTM']
     
     # Rename columns to standard names
     column_mapping = {
@@ -185,7 +167,12 @@ def main():
         'PLAYER_ID': 'PlayerID'
     }
     
-    gamelogs_df = gamelogs_df.rename(columns=column_mapping)
+    try:
+        gamelogs_df = load_gamelogs(columns=columns, rename=column_mapping)
+        print(f"✅ Loaded gamelogs: {len(gamelogs_df)} records")
+    except FileNotFoundError:
+        print("❌ Could not find any gamelog files.")
+        return
     
     # Verify we have the required columns
     print(f"\n📋 Columns found: {list(gamelogs_df.columns)[:15]}")  # Show first 15
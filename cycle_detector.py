@@ -4,6 +4,8 @@ Cycle-Aware Pattern Detector for WNBA Performance Analysis
 Analyzes player performance data for cyclical patterns and variations
 """
 
+import sys
+from pathlib import Path
 import pandas as pd
 import numpy as np
 from scipy import stats, signal
@@ -11,6 +13,13 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+# Add project root to path for imports
+project_root = Path(__file__).parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.periodicity import GamelogBuffer, best_period, candidate_periods, days_since_first, scan_players
+
 class CycleAwarePatternDetector:
     """Detects cyclical performance patterns in WNBA player statistics"""
     
@@ -45,20 +54,14 @@ class CycleAwarePatternDetector:
         relative_perf = player_data[metric] / baseline
         
         # Identify dips (performance < 80% of baseline)
-        dips = []
-        for idx, (date, perf) in enumerate(zip(player_data['GAME_DATE'], relative_perf)):
-            if perf < threshold and not pd.isna(perf):
-                # Calculate dip magnitude
-                magnitude = 1 - perf
-                dips.append({
-                    'date': date,
-                    'index': idx,
-                    'magnitude': magnitude,
-                    'actual': player_data[metric].iloc[idx],
-                    'expected': baseline.iloc[idx]
-                })
-        
-        return dips
+        positions = np.flatnonzero((relative_perf < threshold).to_numpy())
+        return [{
+            'date': player_data['GAME_DATE'].iloc[idx],
+            'index': int(idx),
+            'magnitude': 1 - relative_perf.iloc[idx],
+            'actual': player_data[metric].iloc[idx],
+            'expected': baseline.iloc[idx]
+        } for idx in positions]
     
     def analyze_dip_periodicity(self, dips, player_data):
         """Analyze if dips follow a cyclical pattern"""
@@ -113,32 +116,31 @@ class CycleAwarePatternDetector:
         else:
             return "Unknown", 0.5
         
-    def find_optimal_cycle_length(self, player_data, metric):
-        """Find the cycle length that best fits the data"""
-        best_score = 0
-        best_length = self.cycle_length
+    def find_optimal_cycle_length(self, player_data, metric, dips=None):
+        """
+        Find the cycle length that best fits the data
         
-        for test_length in range(self.cycle_range[0], self.cycle_range[1] + 1):
-            # Temporary update cycle length
-            original_length = self.cycle_length
-            self.cycle_length = test_length
-            
-            # Detect dips and analyze periodicity
+        Dips are detected once (or passed in) and every length in
+        cycle_range is scored together by how tightly the dip dates line up
+        on the same cycle day.
+        
+        Returns:
+            (best_length, coherence score 0-1); (cycle_length, 0) with fewer than 3 dips
+        """
+        if dips is None:
             dips = self.detect_performance_dips(player_data, metric)
-            if len(dips) >= 3:
-                periodicity = self.analyze_dip_periodicity(dips, player_data)
-                if periodicity and periodicity['periodicity_score'] > best_score:
-                    best_score = periodicity['periodicity_score']
-                    best_length = test_length
-            
-            self.cycle_length = original_length
         
-        return best_length, best_score
+        dip_days = days_since_first(player_data['GAME_DATE'])[[d['index'] for d in dips]]
+        best = best_period(dip_days, candidate_periods(self.cycle_range))
+        return best if best else (self.cycle_length, 0)
     
     def analyze_player(self, player_name):
         """Comprehensive analysis for a single player"""
         player_data = self.df[self.df['PLAYER_NAME'] == player_name].copy()
-        
+        return self.analyze_player_data(player_name, player_data)
+    
+    def analyze_player_data(self, player_name, player_data):
+        """Analyze one player's game logs (rows in date order)"""
         if len(player_data) < self.min_games:
             return None
         
@@ -154,11 +156,9 @@ class CycleAwarePatternDetector:
             if metric not in player_data.columns:
                 continue
                 
-            # Find optimal cycle length for this metric
-            optimal_length, opt_score = self.find_optimal_cycle_length(player_data, metric)
-            
-            # Detect dips
+            # Detect dips once, then score every cycle length against them
             dips = self.detect_performance_dips(player_data, metric)
+            optimal_length, opt_score = self.find_optimal_cycle_length(player_data, metric, dips)
             
             if len(dips) >= 3:
                 # Analyze periodicity
@@ -222,20 +222,22 @@ class CycleAwarePatternDetector:
         
         return predictions
     
-    def analyze_all_players(self):
-        """Analyze all players in the dataset"""
-        players = self.df['PLAYER_NAME'].unique()
-        all_results = []
+    def analyze_all_players(self, processes=None):
+        """
+        Analyze all players in the dataset
         
-        print(f"Analyzing {len(players)} players...")
+        Args:
+            processes: Worker processes for the scan (default: CPU count, 1 = in-process)
+        """
+        buffer = GamelogBuffer.from_frame(self.df, ['GAME_DATE'] + self.target_metrics)
         
-        for i, player in enumerate(players):
-            if i % 10 == 0:
-                print(f"Progress: {i}/{len(players)} players analyzed")
-            
-            result = self.analyze_player(player)
-            if result and result['cycle_consistency_score'] > 0:
-                all_results.append(result)
+        print(f"Analyzing {len(buffer)} players...")
+        
+        def progress(done, total):
+            print(f"Progress: {done}/{total} players analyzed")
+        
+        all_results = [result for result in scan_players(self, buffer, processes, progress)
+                       if result and result['cycle_consistency_score'] > 0]
         
         # Sort by consistency score
         all_results.sort(key=lambda x: x['cycle_consistency_score'], reverse=True)
@@ -3,6 +3,13 @@
 Enhanced Cycle-Aware Pattern Detector with detailed diagnostics
 """
 
+import sys
+import math
+import pickle
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
 import pandas as pd
 import numpy as np
 from scipy import stats, signal
@@ -10,14 +17,108 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+# Add project root to path for imports
+project_root = Path(__file__).parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.periodicity import GamelogBuffer, best_period, candidate_periods, scan_players
+
+# Rolling baseline window (games), games needed for a baseline, and games in the early-season fill
+BASELINE_WINDOW = 7
+BASELINE_MIN_GAMES = 3
+EARLY_GAMES = 5
+
+# z-scores this close to +/-1 count as exactly +/-1, so rounding in the
+# rolling sums never decides whether a game is a dip. Incremental updates only
+# match a full analysis exactly with this tolerance (opt in with z_tolerance)
+Z_TOLERANCE = 1e-9
+
+
+class RollingWelford:
+    """
+    Mean and sample std of the last `window` values, updated in O(1) per value.
+
+    Values entering and leaving the window are folded in and out with
+    Welford updates; NaNs take a slot but are skipped, as in pandas
+    rolling. A window whose values are all identical reports that value
+    and a std of exactly 0.
+    """
+
+    def __init__(self, window=BASELINE_WINDOW):
+        self.values = deque(maxlen=window)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.last = math.nan
+        self.same_run = 0
+
+    def push(self, value):
+        """Add a value, dropping the oldest once the window is full."""
+        value = float(value)
+        if len(self.values) == self.values.maxlen:
+            self._remove(self.values[0])
+        self.values.append(value)
+        if math.isnan(value):
+            return
+        self.same_run = self.same_run + 1 if value == self.last else 1
+        self.last = value
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def _remove(self, value):
+        if math.isnan(value):
+            return
+        self.count -= 1
+        if self.count == 0:
+            self.mean = self.m2 = 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self.m2 -= delta * (value - self.mean)
+
+    def stats(self, min_count=BASELINE_MIN_GAMES):
+        """(mean, std) of the window, NaN for both with fewer than min_count values."""
+        if self.count < min_count:
+            return math.nan, math.nan
+        if self.same_run >= self.count:
+            return self.last, 0.0
+        return self.mean, math.sqrt(max(self.m2, 0.0) / (self.count - 1))
+
+
+@dataclass
+class MetricState:
+    """Rolling baseline and the dips/peaks found so far for one (player, metric)"""
+    window: RollingWelford = field(default_factory=RollingWelford)
+    early_avg: float = math.nan
+    dips: List[dict] = field(default_factory=list)
+    peaks: List[dict] = field(default_factory=list)
+
+
+@dataclass
+class PlayerCycleState:
+    """Per-player state of the incremental detector"""
+    first_date: pd.Timestamp
+    last_date: pd.Timestamp
+    games: int = 0
+    metrics: Dict[str, MetricState] = field(default_factory=dict)
+    # Games kept until the early-season average is final
+    head: List[tuple] = field(default_factory=list)
+    result: Optional[dict] = None
+
+
 class EnhancedCycleDetector:
     """Enhanced detector with more flexible pattern recognition"""
     
-    def __init__(self, cycle_length=28, cycle_range=(21, 35), min_games=20):
+    def __init__(self, cycle_length=28, cycle_range=(21, 35), min_games=20, z_tolerance=0.0):
         self.cycle_length = cycle_length
         self.cycle_range = cycle_range
         self.min_games = min_games
+        self.z_tolerance = z_tolerance
         self.target_metrics = ['PTS', 'REB', 'AST']
+        self.players: Dict[str, PlayerCycleState] = {}
         
     def load_data(self, filepath):
         """Load and prepare game log data"""
@@ -26,20 +127,18 @@ class EnhancedCycleDetector:
         self.df = self.df.sort_values(['PLAYER_NAME', 'GAME_DATE'])
         
         # Add days since first game for each player
-        for player in self.df['PLAYER_NAME'].unique():
-            player_mask = self.df['PLAYER_NAME'] == player
-            first_game = self.df.loc[player_mask, 'GAME_DATE'].min()
-            self.df.loc[player_mask, 'DAYS_SINCE_START'] = (self.df.loc[player_mask, 'GAME_DATE'] - first_game).dt.days
+        first_game = self.df.groupby('PLAYER_NAME')['GAME_DATE'].transform('min')
+        self.df['DAYS_SINCE_START'] = (self.df['GAME_DATE'] - first_game).dt.days.astype(float)
         
         return self.df
     
     def calculate_performance_baseline(self, player_data, metric):
         """Calculate adaptive rolling baseline"""
         # Use shorter window for better sensitivity
-        baseline = player_data[metric].rolling(window=7, min_periods=3).mean()
+        baseline = player_data[metric].rolling(window=BASELINE_WINDOW, min_periods=BASELINE_MIN_GAMES).mean()
         
         # Fill initial values with early season average
-        early_avg = player_data[metric].iloc[:5].mean()
+        early_avg = player_data[metric].iloc[:EARLY_GAMES].mean()
         baseline = baseline.fillna(early_avg)
         
         return baseline
@@ -49,33 +148,30 @@ class EnhancedCycleDetector:
         baseline = self.calculate_performance_baseline(player_data, metric)
         
         # Calculate z-scores for better sensitivity
-        std_dev = player_data[metric].rolling(window=7, min_periods=3).std().fillna(1)
-        z_scores = (player_data[metric] - baseline) / std_dev
+        std_dev = player_data[metric].rolling(window=BASELINE_WINDOW, min_periods=BASELINE_MIN_GAMES).std().fillna(1)
+        z_scores = ((player_data[metric] - baseline) / std_dev).to_numpy(dtype=float)
         
-        # Identify significant dips (z-score < -1)
-        dips = []
-        peaks = []
+        dates = player_data['GAME_DATE'].to_numpy()
+        days = player_data['DAYS_SINCE_START'].to_numpy()
+        actual = player_data[metric].to_numpy()
+        expected = baseline.to_numpy()
         
-        for idx, (date, z_score, actual, expected) in enumerate(zip(
-            player_data['GAME_DATE'], z_scores, player_data[metric], baseline)):
-            
-            if z_score < -1 and not pd.isna(z_score):
-                dips.append({
-                    'date': date,
-                    'days_since_start': player_data['DAYS_SINCE_START'].iloc[idx],
-                    'z_score': z_score,
-                    'actual': actual,
-                    'expected': expected,
-                    'drop_pct': (expected - actual) / expected if expected > 0 else 0
-                })
-            elif z_score > 1 and not pd.isna(z_score):
-                peaks.append({
-                    'date': date,
-                    'days_since_start': player_data['DAYS_SINCE_START'].iloc[idx],
-                    'z_score': z_score,
-                    'actual': actual,
-                    'expected': expected
-                })
+        # Identify significant dips (z-score < -1) and peaks (z-score > 1)
+        dips = [{
+            'date': pd.Timestamp(dates[i]),
+            'days_since_start': days[i],
+            'z_score': z_scores[i],
+            'actual': actual[i],
+            'expected': expected[i],
+            'drop_pct': (expected[i] - actual[i]) / expected[i] if expected[i] > 0 else 0
+        } for i in np.flatnonzero(z_scores < -1 - self.z_tolerance)]
+        peaks = [{
+            'date': pd.Timestamp(dates[i]),
+            'days_since_start': days[i],
+            'z_score': z_scores[i],
+            'actual': actual[i],
+            'expected': expected[i]
+        } for i in np.flatnonzero(z_scores > 1 + self.z_tolerance)]
         
         return dips, peaks
     
@@ -88,8 +184,8 @@ class EnhancedCycleDetector:
         dip_days = [d['days_since_start'] for d in dips]
         intervals = [dip_days[i+1] - dip_days[i] for i in range(len(dip_days)-1)]
         
-        # Method 2: Fourier analysis for periodicity
-        if len(player_data) > 20:
+        # Method 2: Fourier analysis for periodicity (needs the full game series)
+        if player_data is not None and len(player_data) > 20:
             try:
                 from scipy.fft import fft, fftfreq
                 values = player_data[self.target_metrics[0]].fillna(0).values
@@ -105,6 +201,9 @@ class EnhancedCycleDetector:
         else:
             dominant_period = 0
         
+        # Method 3: Dip-date periodogram over the candidate cycle lengths
+        spectral = best_period(dip_days, candidate_periods(self.cycle_range))
+        
         # Calculate pattern scores
         results = {
             'intervals': intervals,
@@ -112,6 +211,8 @@ class EnhancedCycleDetector:
             'std_interval': np.std(intervals) if intervals else 0,
             'median_interval': np.median(intervals) if intervals else 0,
             'fourier_period': abs(dominant_period),
+            'spectral_period': spectral[0] if spectral else self.cycle_length,
+            'spectral_score': spectral[1] if spectral else 0,
             'cycle_matches': 0,
             'consistency_score': 0
         }
@@ -163,27 +264,39 @@ class EnhancedCycleDetector:
     def analyze_player(self, player_name):
         """Comprehensive player analysis with diagnostics"""
         player_data = self.df[self.df['PLAYER_NAME'] == player_name].copy()
-        
+        return self.analyze_player_data(player_name, player_data)
+    
+    def analyze_player_data(self, player_name, player_data):
+        """Analyze one player's game logs (rows in date order)"""
         if len(player_data) < self.min_games:
             return None
         
+        variations = {
+            metric: self.detect_performance_variations(player_data, metric)
+            for metric in self.target_metrics if metric in player_data.columns
+        }
+        return self.summarize_player(player_name, len(player_data), player_data['GAME_DATE'].min(),
+                                     player_data['GAME_DATE'].max(), variations, player_data)
+    
+    def summarize_player(self, player_name, total_games, first_date, last_date, variations, player_data=None):
+        """
+        Pattern results for one player from their dips and peaks per metric
+        
+        Args:
+            variations: {metric: (dips, peaks)} in date order
+            player_data: Full game rows, only needed for the Fourier period
+        """
         results = {
             'player_name': player_name,
-            'total_games': len(player_data),
-            'date_range': f"{player_data['GAME_DATE'].min().date()} to {player_data['GAME_DATE'].max().date()}",
-            'season_length_days': (player_data['GAME_DATE'].max() - player_data['GAME_DATE'].min()).days,
+            'total_games': total_games,
+            'date_range': f"{first_date.date()} to {last_date.date()}",
+            'season_length_days': (last_date - first_date).days,
             'metrics': {}
         }
         
         # Analyze each metric
         all_scores = []
-        for metric in self.target_metrics:
-            if metric not in player_data.columns:
-                continue
-            
-            # Detect variations
-            dips, peaks = self.detect_performance_variations(player_data, metric)
-            
+        for metric, (dips, peaks) in variations.items():
             # Analyze patterns
             pattern_results = self.analyze_cycle_patterns(dips, player_data)
             
@@ -200,6 +313,8 @@ class EnhancedCycleDetector:
                     'mean_interval': pattern_results['mean_interval'],
                     'interval_std': pattern_results['std_interval'],
                     'pattern_score': pattern_results['consistency_score'],
+                    'spectral_period': pattern_results['spectral_period'],
+                    'spectral_score': pattern_results['spectral_score'],
                     'recent_dips': [d['date'].strftime('%Y-%m-%d') for d in dips[-5:]],
                     'intervals': pattern_results['intervals'][-5:] if pattern_results else []
                 }
@@ -217,32 +332,36 @@ class EnhancedCycleDetector:
         
         return results
     
-    def analyze_all_players(self, verbose=True):
-        """Analyze all players with progress tracking"""
-        players = self.df['PLAYER_NAME'].unique()
-        all_results = []
+    def analyze_all_players(self, verbose=True, processes=None):
+        """
+        Analyze all players with progress tracking
+        
+        Args:
+            verbose: Print progress as players are analyzed
+            processes: Worker processes for the scan (default: CPU count, 1 = in-process)
+        """
+        buffer = GamelogBuffer.from_frame(self.df, ['GAME_DATE', 'DAYS_SINCE_START'] + self.target_metrics)
         pattern_counts = {'Strong': 0, 'Moderate': 0, 'Weak': 0, 'None': 0}
         
-        print(f"\nAnalyzing {len(players)} players for cyclical patterns...")
+        print(f"\nAnalyzing {len(buffer)} players for cyclical patterns...")
         print(f"Cycle range: {self.cycle_range[0]}-{self.cycle_range[1]} days")
         print(f"Minimum games: {self.min_games}\n")
         
-        for i, player in enumerate(players):
-            if verbose and i % 20 == 0:
-                print(f"Progress: {i}/{len(players)} players analyzed")
-            
-            result = self.analyze_player(player)
-            if result:
-                all_results.append(result)
-                
-                # Track pattern types
-                for metric_data in result['metrics'].values():
-                    if 'Strong' in metric_data.get('classification', ''):
-                        pattern_counts['Strong'] += 1
-                    elif 'Moderate' in metric_data.get('classification', ''):
-                        pattern_counts['Moderate'] += 1
-                    elif 'Weak' in metric_data.get('classification', ''):
-                        pattern_counts['Weak'] += 1
+        def progress(done, total):
+            if verbose:
+                print(f"Progress: {done}/{total} players analyzed")
+        
+        all_results = [result for result in scan_players(self, buffer, processes, progress) if result]
+        
+        # Track pattern types
+        for result in all_results:
+            for metric_data in result['metrics'].values():
+                if 'Strong' in metric_data.get('classification', ''):
+                    pattern_counts['Strong'] += 1
+                elif 'Moderate' in metric_data.get('classification', ''):
+                    pattern_counts['Moderate'] += 1
+                elif 'Weak' in metric_data.get('classification', ''):
+                    pattern_counts['Weak'] += 1
         
         # Sort by overall pattern score
         all_results.sort(key=lambda x: x['overall_pattern_score'], reverse=True)
@@ -254,6 +373,136 @@ class EnhancedCycleDetector:
         
         return all_results
     
+    def update(self, new_games):
+        """
+        Fold new game logs into the per-player state and refresh their results
+        
+        Only games after a player's last processed game are used, so the whole
+        game log can be passed again on every run. Each new game moves its
+        player's rolling baselines and extends the dip/peak lists in O(1);
+        pattern scores are recomputed only for players with new games.
+        
+        Args:
+            new_games: Rows with PLAYER_NAME, GAME_DATE and the target metrics
+            
+        Returns:
+            Names of the players that received new games
+        """
+        games = new_games.copy()
+        games['GAME_DATE'] = pd.to_datetime(games['GAME_DATE'], format='mixed')
+        games = games.sort_values(['PLAYER_NAME', 'GAME_DATE'], kind='stable')
+        if self.players:
+            last_date = games['PLAYER_NAME'].map({name: state.last_date for name, state in self.players.items()})
+            games = games[last_date.isna() | (games['GAME_DATE'] > last_date)]
+        
+        metrics = [metric for metric in self.target_metrics if metric in games.columns]
+        dates = games['GAME_DATE'].tolist()
+        values = games.reindex(columns=self.target_metrics).to_numpy(dtype=float)
+        
+        updated = []
+        for name, positions in games.groupby('PLAYER_NAME', sort=False).indices.items():
+            state = self.players.get(name)
+            if state is None:
+                state = PlayerCycleState(first_date=dates[positions[0]], last_date=dates[positions[0]],
+                                         metrics={metric: MetricState() for metric in metrics})
+                self.players[name] = state
+            
+            rows = [(dates[i], dict(zip(self.target_metrics, values[i]))) for i in positions]
+            if state.games < EARLY_GAMES:
+                # Replay the first games so their baseline fill uses the final early-season average
+                rows = state.head + rows
+                state.metrics = {metric: MetricState() for metric in state.metrics}
+                state.games = 0
+            self._advance(state, rows)
+            
+            variations = {metric: (metric_state.dips, metric_state.peaks)
+                          for metric, metric_state in state.metrics.items()}
+            state.result = self.summarize_player(name, state.games, state.first_date, state.last_date,
+                                                 variations) if state.games >= self.min_games else None
+            updated.append(name)
+        
+        return updated
+    
+    def _advance(self, state, rows):
+        """Apply (date, {metric: value}) rows in date order to a player's state"""
+        if state.games == 0:
+            for metric, metric_state in state.metrics.items():
+                early = [row[1][metric] for row in rows[:EARLY_GAMES] if not math.isnan(row[1][metric])]
+                metric_state.early_avg = sum(early) / len(early) if early else math.nan
+        
+        for date, values in rows:
+            days_since_start = float((date - state.first_date).days)
+            for metric, metric_state in state.metrics.items():
+                actual = values[metric]
+                metric_state.window.push(actual)
+                expected, std_dev = metric_state.window.stats()
+                if math.isnan(expected):
+                    expected = metric_state.early_avg
+                if math.isnan(std_dev):
+                    std_dev = 1.0
+                
+                diff = actual - expected
+                if math.isnan(diff) or (std_dev == 0 and diff == 0):
+                    continue
+                z_score = diff / std_dev if std_dev != 0 else math.copysign(math.inf, diff)
+                
+                if z_score < -1 - self.z_tolerance:
+                    metric_state.dips.append({
+                        'date': date,
+                        'days_since_start': days_since_start,
+                        'z_score': z_score,
+                        'actual': actual,
+                        'expected': expected,
+                        'drop_pct': (expected - actual) / expected if expected > 0 else 0
+                    })
+                elif z_score > 1 + self.z_tolerance:
+                    metric_state.peaks.append({
+                        'date': date,
+                        'days_since_start': days_since_start,
+                        'z_score': z_score,
+                        'actual': actual,
+                        'expected': expected
+                    })
+            state.games += 1
+            state.last_date = date
+        
+        state.head = rows if state.games < EARLY_GAMES else []
+    
+    def current_results(self):
+        """Results of every player with enough games, best overall pattern score first"""
+        results = [self.players[name].result for name in sorted(self.players)
+                   if self.players[name].result is not None]
+        results.sort(key=lambda x: x['overall_pattern_score'], reverse=True)
+        return results
+    
+    def save_state(self, path):
+        """Pickle the per-player state for the next incremental run"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump({'target_metrics': self.target_metrics, 'players': self.players}, f)
+    
+    def load_state(self, path):
+        """
+        Restore state saved by save_state
+        
+        Results are re-scored with this detector's cycle settings, which
+        only needs the stored dips.
+        
+        Raises:
+            ValueError: If the state was built for other target metrics
+        """
+        with open(path, 'rb') as f:
+            saved = pickle.load(f)
+        if saved['target_metrics'] != self.target_metrics:
+            raise ValueError(f"State tracks {saved['target_metrics']}, detector uses {self.target_metrics}")
+        
+        self.players = saved['players']
+        for name, state in self.players.items():
+            variations = {metric: (metric_state.dips, metric_state.peaks)
+                          for metric, metric_state in state.metrics.items()}
+            state.result = self.summarize_player(name, state.games, state.first_date, state.last_date,
+                                                 variations) if state.games >= self.min_games else None
+    
     def export_detailed_results(self, results, output_file='enhanced_cycle_results.csv'):
         """Export detailed results with all metrics"""
         rows = []
@@ -299,6 +548,9 @@ def main():
     parser.add_argument('--cycle-length', type=int, default=28, help='Expected cycle length')
     parser.add_argument('--cycle-range', type=str, default='21,35', help='Cycle range (min,max)')
     parser.add_argument('--min-games', type=int, default=20, help='Minimum games for analysis')
+    parser.add_argument('--state', help='Incremental state file: only games newer than the saved state are processed')
+    parser.add_argument('--z-tolerance', type=float, default=0.0,
+                        help=f'Treat z-scores within this of +/-1 as +/-1 (e.g. {Z_TOLERANCE})')
     
     args = parser.parse_args()
     
@@ -309,12 +561,21 @@ def main():
     detector = EnhancedCycleDetector(
         cycle_length=args.cycle_length,
         cycle_range=cycle_range,
-        min_games=args.min_games
+        min_games=args.min_games,
+        z_tolerance=args.z_tolerance
     )
     
     # Load and analyze
-    detector.load_data(args.input_file)
-    results = detector.analyze_all_players()
+    if args.state:
+        if Path(args.state).exists():
+            detector.load_state(args.state)
+        updated = detector.update(pd.read_csv(args.input_file))
+        detector.save_state(args.state)
+        results = detector.current_results()
+        print(f"\nUpdated {len(updated)} players; {len(results)} with at least {args.min_games} games")
+    else:
+        detector.load_data(args.input_file)
+        results = detector.analyze_all_players()
     
     # Export results
     df = detector.export_detailed_results(results, args.output)
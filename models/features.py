@@ -1,51 +1,192 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.gamelog_store import load_gamelogs
+
 INPUT_FILE = "data/cleaned_gamelogs_2024.csv"
 OUTPUT_FILE = "data/engineered_gamelogs_2024.csv"
 
 ROLLING_WINDOWS = [3, 5, 10]
 TARGET_STATS = ["PTS", "REB", "AST", "STL", "BLK", "TOV", "MIN"]
 
+def _group_starts(keys):
+    """Index of the first row of each row's group in a key-sorted array."""
+    n = len(keys)
+    is_start = np.ones(n, dtype=bool)
+    if n > 1:
+        is_start[1:] = keys[1:] != keys[:-1]
+    return np.maximum.accumulate(np.where(is_start, np.arange(n), 0))
+
+
+def _rolling_window_stats(values, starts, window):
+    """
+    Shifted rolling mean/std of every column of `values` over `window` prior games.
+
+    Rows are windows over the previous `window` rows of the same group, built
+    as a strided view so all stats are reduced in one NumPy pass. Matches
+    shift(1).rolling(window, min_periods=1) with ddof=1.
+    """
+    n, k = values.shape
+    idx = np.arange(n)
+
+    # Previous game's values; NaN at the first game of every player
+    shifted = np.full((n, k), np.nan)
+    shifted[1:] = values[:-1]
+    shifted[starts == idx] = np.nan
+
+    padded = np.concatenate([np.full((window - 1, k), np.nan), shifted])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=0)  # (n, k, window)
+
+    # Positions reaching back past the player's first game belong to another player
+    positions = idx[:, None] - (window - 1) + np.arange(window)[None, :]
+    in_group = positions >= starts[:, None]
+    valid = in_group[:, None, :] & ~np.isnan(windows)
+
+    count = valid.sum(axis=2)
+    filled = np.where(valid, windows, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = filled.sum(axis=2) / count
+        centered = np.where(valid, windows - mean[:, :, None], 0.0)
+        var = (centered ** 2).sum(axis=2) / (count - 1)
+
+        # Constant windows get their exact value and zero variance, as in pandas' rolling ops
+        lo = np.where(valid, windows, np.inf).min(axis=2)
+        hi = np.where(valid, windows, -np.inf).max(axis=2)
+    constant = lo == hi
+    mean[constant] = lo[constant]
+    var[constant] = 0.0
+
+    mean[count < 1] = np.nan
+    std = np.sqrt(var)
+    std[count < 2] = np.nan
+    return mean, std
+
+
 def add_rolling_features(df, windows=ROLLING_WINDOWS, stats=TARGET_STATS):
+    """
+    Add leakage-safe rolling averages, stds and z-scores for every stat/window.
+
+    Each feature only sees a player's games before the current one. All stats
+    and windows are computed from one sort of the frame, without per-group
+    Python callbacks.
+    """
     df = df.copy()
     df.sort_values(["PLAYER_NAME", "GAME_DATE"], inplace=True)
 
-    for stat in stats:
+    starts = _group_starts(df["PLAYER_NAME"].to_numpy())
+    values = df[list(stats)].to_numpy(dtype=float)
+
+    features = {}
+    per_window = {window: _rolling_window_stats(values, starts, window) for window in windows}
+
+    for j, stat in enumerate(stats):
         for window in windows:
-            colname = f"{stat}_{window}G_AVG"
-            df[colname] = (
-                df.groupby("PLAYER_NAME")[stat]
-                .transform(lambda x: x.shift(1).rolling(window, min_periods=1).mean())
-            )
-            
-            # Optional: Add rolling std/z-score for volatility modeling
-            std_col = f"{stat}_{window}G_STD"
-            z_col = f"{stat}_{window}G_Z"
-            df[std_col] = (
-                df.groupby("PLAYER_NAME")[stat]
-                .transform(lambda x: x.shift(1).rolling(window, min_periods=1).std())
-            )
-            df[z_col] = (df[stat] - df[colname]) / df[std_col]
-    
-    return df
+            mean, std = per_window[window]
+            avg = mean[:, j]
+            sd = std[:, j]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                z = (values[:, j] - avg) / sd
+            features[f"{stat}_{window}G_AVG"] = avg
+            features[f"{stat}_{window}G_STD"] = sd
+            features[f"{stat}_{window}G_Z"] = z
+
+    feature_df = pd.DataFrame(features, index=df.index)
+    df = df.drop(columns=[col for col in feature_df.columns if col in df.columns])
+    return pd.concat([df, feature_df], axis=1)
 
-def main():
-    df = pd.read_csv(INPUT_FILE)
-    df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"])
-    
-    # Add rolling averages and z-scores
-    df = add_rolling_features(df)
 
+def rolling_features_for_new_games(new_games_df, history_df, windows=ROLLING_WINDOWS, stats=TARGET_STATS):
+    """
+    Compute features for newly played games only.
+
+    Only the last max(windows) prior games of each affected player are taken
+    from `history_df` as context, so the cost scales with the new games.
+
+    Args:
+        new_games_df: Raw gamelog rows to featurize
+        history_df: Earlier gamelog rows (raw or engineered) for the same players
+
+    Returns:
+        new_games_df rows with the rolling feature columns added
+    """
+    new_games_df = new_games_df.copy()
+    new_games_df["GAME_DATE"] = pd.to_datetime(new_games_df["GAME_DATE"])
+
+    depth = max(windows)
+    players = new_games_df["PLAYER_NAME"].unique()
+    history = history_df[history_df["PLAYER_NAME"].isin(players)]
+    history = history.sort_values(["PLAYER_NAME", "GAME_DATE"]).groupby("PLAYER_NAME").tail(depth)
+
+    context = pd.concat(
+        [history[new_games_df.columns.intersection(history.columns)], new_games_df],
+        keys=["history", "new"],
+    )
+    updated = add_rolling_features(context, windows, stats)
+    return updated.xs("new", level=0)
+
+
+def update_rolling_features(features_df, new_games_df, windows=ROLLING_WINDOWS, stats=TARGET_STATS):
+    """
+    Append features for newly played games without recomputing history.
+
+    Args:
+        features_df: Previously engineered frame (output of add_rolling_features)
+        new_games_df: Raw gamelog rows not yet present in features_df
+
+    Returns:
+        features_df with feature rows for the new games appended
+    """
+    if new_games_df.empty:
+        return features_df
+
+    new_rows = rolling_features_for_new_games(new_games_df, features_df, windows, stats)
+    return pd.concat([features_df, new_rows], ignore_index=True)
+
+
+def finalize_training_rows(df):
+    """Drop rows without history and add the modeling target."""
     # Drop games without any history (first game or missing data)
     df = df.dropna(subset=[col for col in df.columns if "_AVG" in col])
 
     # Optional: Add target column for modeling (e.g., OVER 14.5 PTS)
     df["TARGET_OVER_14.5_PTS"] = (df["PTS"] > 14.5).astype(int)
+    return df
+
+
+def main(incremental=False):
+    # The engineered dataset keeps every source column, so nothing is projected away
+    df = load_gamelogs(INPUT_FILE)
+
+    if incremental and Path(OUTPUT_FILE).exists():
+        existing = pd.read_csv(OUTPUT_FILE, usecols=["PLAYER_NAME", "GAME_DATE"], parse_dates=["GAME_DATE"])
+        seen = pd.MultiIndex.from_frame(existing)
+        is_new = ~pd.MultiIndex.from_frame(df[["PLAYER_NAME", "GAME_DATE"]]).isin(seen)
+
+        if not is_new.any():
+            print(f"✅ {OUTPUT_FILE} already up to date")
+            return
+
+        # Context comes from the raw gamelogs so players' first games still count
+        new_rows = finalize_training_rows(rolling_features_for_new_games(df[is_new], df[~is_new]))
+        columns = pd.read_csv(OUTPUT_FILE, nrows=0).columns
+        new_rows.reindex(columns=columns).to_csv(OUTPUT_FILE, mode="a", header=False, index=False)
+        print(f"✅ Appended features for {len(new_rows)} new games to {OUTPUT_FILE}")
+        return
+
+    # Add rolling averages and z-scores
+    df = finalize_training_rows(add_rolling_features(df))
 
     # Save output
     df.to_csv(OUTPUT_FILE, index=False)
     print(f"✅ Engineered features saved to {OUTPUT_FILE} ({len(df)} rows)")
 
 if __name__ == "__main__":
-    main()
+    main(incremental="--incremental" in sys.argv)
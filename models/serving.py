@@ -0,0 +1,198 @@
+"""
+Batch scoring for the prop_hit_predictor model.
+
+The joblib model and the per-player feature table are loaded lazily and at
+most once per process, so importing this module (and starting a CLI) stays
+cheap. A whole board is scored with one vectorized predict_proba call, and
+results are memoized by (player, game_date, model_version).
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.gamelog_store import normalize_player_key
+
+MODEL_PATH = "models/prop_hit_predictor.joblib"
+
+FEATURES = [
+    "MIN", "FGA", "FG_PCT", "FG3A", "FG3_PCT", "FTA", "FT_PCT",
+    "OREB", "DREB", "REB", "AST", "TOV", "STL", "BLK", "PFD"
+]
+
+# Keep probabilities strictly inside (0, 1) so downstream Kelly/EV math stays finite
+PROBABILITY_FLOOR = 1e-4
+
+
+class PropHitModel:
+    """
+    Lazily loaded prop_hit_predictor with columnar, memoized scoring.
+
+    Args:
+        model_path: joblib file produced by scripts/analysis/train_model.py
+        model_version: Cache namespace; defaults to a hash of the model file's
+            size and mtime so retraining invalidates memoized scores
+        gamelog_source: Optional gamelog CSV used to build player features;
+            the shared gamelog store is used when omitted
+    """
+
+    def __init__(self, model_path: str = MODEL_PATH, model_version: Optional[str] = None,
+                 gamelog_source: Optional[str] = None):
+        self.model_path = model_path
+        self.gamelog_source = gamelog_source
+        self._model_version = model_version
+        self._model = None
+        self._player_features = None
+        self._cache: Dict[Tuple[str, str, str], float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def model_version(self) -> str:
+        """Version tag used in memoization keys."""
+        if self._model_version is None:
+            stat = os.stat(self.model_path)
+            digest = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()
+            self._model_version = digest[:12]
+        return self._model_version
+
+    @property
+    def model(self):
+        """The fitted estimator, loaded on first use."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    # joblib/sklearn are imported here so CLIs that never score start fast
+                    import joblib
+                    self._model = joblib.load(self.model_path)
+        return self._model
+
+    @property
+    def player_features(self) -> pd.DataFrame:
+        """Average feature row per player (indexed by normalized player key)."""
+        if self._player_features is None:
+            from core.gamelog_store import load_gamelogs
+
+            gamelogs = load_gamelogs(self.gamelog_source, columns=["PLAYER_NAME"] + FEATURES)
+            self._player_features = build_player_feature_table(gamelogs)
+        return self._player_features
+
+    def set_player_features(self, table: pd.DataFrame) -> None:
+        """Use a precomputed player feature table (e.g. from today's gamelogs)."""
+        self._player_features = table
+        self._cache.clear()
+
+    def predict_proba(self, features) -> np.ndarray:
+        """
+        Hit probabilities for a feature matrix in one vectorized call.
+
+        Args:
+            features: DataFrame with the FEATURES columns, or an (n, 15) array
+
+        Returns:
+            Array of P(hit) per row; rows with missing features are NaN
+        """
+        if isinstance(features, pd.DataFrame):
+            matrix = features.reindex(columns=FEATURES).to_numpy(dtype=float)
+        else:
+            matrix = np.asarray(features, dtype=float).reshape(-1, len(FEATURES))
+
+        probs = np.full(len(matrix), np.nan)
+        complete = ~np.isnan(matrix).any(axis=1)
+        if complete.any():
+            frame = pd.DataFrame(matrix[complete], columns=FEATURES)
+            probs[complete] = self.model.predict_proba(frame)[:, 1]
+        return np.clip(probs, PROBABILITY_FLOOR, 1 - PROBABILITY_FLOOR)
+
+    def score_board(self, board: pd.DataFrame, player_col: str = "player",
+                    date_col: str = "game_date", side_col: Optional[str] = None) -> pd.Series:
+        """
+        Hit probabilities for every prop on a board.
+
+        Props are joined to the player feature table by normalized name, and
+        only (player, game_date) pairs not already memoized reach the model,
+        all in a single predict_proba call.
+
+        Args:
+            board: One row per prop
+            player_col/date_col: Board columns holding the player and game date
+            side_col: Optional 'over'/'under' column; unders get 1 - P(hit)
+
+        Returns:
+            Series aligned to board.index (NaN for players without features)
+        """
+        if board.empty:
+            return pd.Series(dtype=float, index=board.index)
+
+        version = self.model_version
+        keys = normalize_player_key(board[player_col].to_numpy()).fillna("")
+        dates = board[date_col].astype(str).to_numpy() if date_col in board.columns else np.full(len(board), "")
+        cache_keys = list(zip(keys, dates, [version] * len(board)))
+
+        missing = sorted({key for key in cache_keys if key not in self._cache})
+        if missing:
+            players = pd.Index([key[0] for key in missing])
+            table = self.player_features.reindex(players)
+            probs = self.predict_proba(table)
+            self._cache.update(zip(missing, probs))
+
+        result = pd.Series([self._cache[key] for key in cache_keys], index=board.index, dtype=float)
+
+        if side_col is not None and side_col in board.columns:
+            is_under = board[side_col].astype(str).str.lower().eq("under").to_numpy()
+            result[is_under] = 1 - result[is_under]
+        return result
+
+    def score_records(self, records: List[Dict], player_key: str = "player",
+                      date_key: str = "game_date") -> List[float]:
+        """score_board for a list of dicts (projection/slip style callers)."""
+        board = pd.DataFrame({
+            "player": [r.get(player_key, "") for r in records],
+            "game_date": [r.get(date_key, "") for r in records],
+        })
+        return self.score_board(board).tolist()
+
+    def clear_cache(self) -> None:
+        """Drop memoized scores (e.g. after new gamelogs arrive)."""
+        self._cache.clear()
+
+
+def build_player_feature_table(gamelogs: pd.DataFrame, how: str = "mean") -> pd.DataFrame:
+    """
+    One model-input row per player from their gamelogs.
+
+    Args:
+        gamelogs: Rows with PLAYER_NAME and the FEATURES columns
+        how: 'mean' averages complete games; 'latest' takes the most recent game
+
+    Returns:
+        DataFrame of FEATURES indexed by normalized player key
+    """
+    df = gamelogs.dropna(subset=["PLAYER_NAME"] + FEATURES).copy()
+    df["player_key"] = normalize_player_key(df["PLAYER_NAME"].to_numpy()).to_numpy()
+
+    if how == "latest":
+        df = df.sort_values("GAME_DATE").drop_duplicates("player_key", keep="last")
+        return df.set_index("player_key")[FEATURES]
+    return df.groupby("player_key")[FEATURES].mean()
+
+
+_MODELS: Dict[str, PropHitModel] = {}
+
+
+def get_model(model_path: str = MODEL_PATH) -> PropHitModel:
+    """Process-wide PropHitModel for a model file (created lazily, never reloaded)."""
+    model = _MODELS.get(model_path)
+    if model is None:
+        model = _MODELS.setdefault(model_path, PropHitModel(model_path))
+    return model
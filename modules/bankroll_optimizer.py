@@ -4,8 +4,16 @@ Calculates optimal bet sizing based on expected value and menstrual phase.
 """
 
 import json
+import sys
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.risk_engine import RiskReport, simulate_card
+from core.simulation import STANDARD_PAYOUT
 
 
 class BankrollOptimizer:
@@ -132,6 +140,40 @@ class BankrollOptimizer:
         """
         divisor = self.phase_divisors.get(phase.lower(), self.phase_divisors.get("unknown", 5.0))
         return ev / divisor if ev > 0 else 0.0
+    
+    def stress_test(self, bankroll: float, bets: List[Dict], n_paths: int = 100_000,
+                    seed: Optional[int] = None, **kwargs) -> RiskReport:
+        """
+        Monte-Carlo risk of a whole card sized with size_bet.
+        
+        Args:
+            bankroll: Current bankroll amount
+            bets: Dicts with 'ev' and 'phase' (or an explicit 'stake'), and
+                optionally 'hit_probability', 'player' and 'game'. Without a
+                hit probability it is implied from EV at -110.
+            n_paths: Simulated paths
+            seed: RNG seed for a reproducible report
+            **kwargs: Passed to core.risk_engine.simulate_card
+        
+        Returns:
+            RiskReport with ruin probability, drawdown and final bankroll quantiles
+        """
+        if bankroll <= 0:
+            raise ValueError("Bankroll must be positive")
+        
+        stakes, probabilities = [], []
+        for bet in bets:
+            stake = bet['stake'] if 'stake' in bet else self.size_bet(bankroll, bet['ev'], bet['phase'])
+            stakes.append(stake / bankroll)
+            # ev = p * payout - (1 - p)  =>  p = (ev + 1) / (payout + 1)
+            probabilities.append(bet.get('hit_probability', (bet.get('ev', 0.0) + 1) / (STANDARD_PAYOUT + 1)))
+        
+        players = [bet.get('player') for bet in bets]
+        games = [bet.get('game') for bet in bets]
+        return simulate_card(stakes, probabilities,
+                             players=players if any(players) else None,
+                             games=games if any(games) else None,
+                             n_paths=n_paths, starting_bankroll=bankroll, seed=seed, **kwargs)
 
 
 # Example usage and testing
@@ -9,6 +9,28 @@ import numpy as np
 from datetime import datetime, date
 from pathlib import Path
 
+LOG_COLUMNS = ['date', 'phase', 'total_bets', 'total_wins', 'win_rate', 'confidence_status']
+STATUS_ORDER = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2}
+STATUS_EMOJI = {'LOW': '🔴', 'MEDIUM': '🟨', 'HIGH': '✅'}
+
+
+def decimal_win_rates(win_rate):
+    """Win rates as decimals (percentages above 1 are divided by 100)."""
+    win_rate = np.asarray(win_rate, dtype=float)
+    return np.where(win_rate > 1, win_rate / 100, win_rate)
+
+
+def confidence_statuses(total_bets, win_rate) -> np.ndarray:
+    """
+    Confidence status for every phase at once: HIGH from a 70% win rate and
+    MEDIUM from 60%, once a phase has 20 bets; LOW otherwise.
+    """
+    total_bets = np.asarray(total_bets, dtype=float)
+    win_rate = decimal_win_rates(win_rate)
+    enough_bets = total_bets >= 20
+    return np.select([enough_bets & (win_rate >= 0.7), enough_bets & (win_rate >= 0.6)],
+                     ['HIGH', 'MEDIUM'], default='LOW')
+
 
 class PhaseConfidenceTracker:
     """Tracks confidence level evolution for each menstrual phase."""
@@ -19,6 +41,7 @@ class PhaseConfidenceTracker:
         self.today = date.today().strftime('%Y-%m-%d')
         self.confidence_changes = []
         self.log_file_path = 'output/phase_confidence_log.csv'
+        self.new_entries = pd.DataFrame(columns=LOG_COLUMNS)
         
     def load_phase_data(self):
         """Load current phase performance data."""
@@ -40,106 +63,85 @@ class PhaseConfidenceTracker:
             print(f"✓ Loaded confidence log: {len(self.confidence_log)} historical entries")
         except FileNotFoundError:
             # Create new log file
-            self.confidence_log = pd.DataFrame(columns=[
-                'date', 'phase', 'total_bets', 'total_wins', 'win_rate', 'confidence_status'
-            ])
+            self.confidence_log = pd.DataFrame(columns=LOG_COLUMNS)
             print("📝 Creating new confidence log file")
             
     def determine_confidence_status(self, total_bets, win_rate):
         """Determine confidence status based on bets and win rate."""
-        # Ensure win_rate is in decimal format
-        if win_rate > 1:
-            win_rate = win_rate / 100
-            
-        if total_bets < 20 or win_rate < 0.6:
-            return 'LOW'
-        elif total_bets >= 20 and 0.6 <= win_rate < 0.7:
-            return 'MEDIUM'
-        elif total_bets >= 20 and win_rate >= 0.7:
-            return 'HIGH'
-        else:
-            return 'LOW'
+        return str(confidence_statuses([total_bets], [win_rate])[0])
             
+    def current_status(self):
+        """Today's entry for every phase: decimal win rate and confidence status."""
+        status = pd.DataFrame({
+            'date': self.today,
+            'phase': self.phase_data['phase'].to_numpy(),
+            'total_bets': self.phase_data['total_bets'].astype(int).to_numpy(),
+            'total_wins': self.phase_data['total_wins'].astype(int).to_numpy(),
+            'win_rate': decimal_win_rates(self.phase_data['win_rate'])
+        })
+        status['confidence_status'] = confidence_statuses(status['total_bets'], status['win_rate'])
+        return status
+
     def update_confidence_log(self):
         """Add today's confidence status for each phase."""
-        new_entries = []
-        
-        for _, row in self.phase_data.iterrows():
-            phase = row['phase']
-            total_bets = int(row['total_bets'])
-            total_wins = int(row['total_wins'])
-            win_rate = row['win_rate']
-            
-            # Ensure win_rate is in decimal format
-            if win_rate > 1:
-                win_rate = win_rate / 100
-                
-            # Determine confidence status
-            confidence_status = self.determine_confidence_status(total_bets, win_rate)
-            
-            # Check if entry already exists for today
-            existing_entry = self.confidence_log[
-                (self.confidence_log['date'] == self.today) & 
-                (self.confidence_log['phase'] == phase)
-            ]
-            
-            if existing_entry.empty:
-                # Add new entry
-                new_entry = {
-                    'date': self.today,
-                    'phase': phase,
-                    'total_bets': total_bets,
-                    'total_wins': total_wins,
-                    'win_rate': win_rate,
-                    'confidence_status': confidence_status
-                }
-                new_entries.append(new_entry)
-                
-                # Check for confidence level changes
-                self.check_confidence_change(phase, confidence_status)
-            else:
-                print(f"  ℹ️  Entry already exists for {phase} on {self.today}")
-                
+        current = self.current_status()
+
+        # Phases already logged today are left alone
+        logged_today = self.confidence_log.loc[self.confidence_log['date'] == self.today, 'phase']
+        exists = current['phase'].isin(logged_today)
+        for phase in current.loc[exists, 'phase']:
+            print(f"  ℹ️  Entry already exists for {phase} on {self.today}")
+        new_entries = current[~exists].reset_index(drop=True)
+
+        self.detect_confidence_changes(new_entries)
+
         # Append new entries
-        if new_entries:
-            new_df = pd.DataFrame(new_entries)
-            self.confidence_log = pd.concat([self.confidence_log, new_df], ignore_index=True)
+        if not new_entries.empty:
+            self.new_entries = pd.concat([frame for frame in (self.new_entries, new_entries) if not frame.empty],
+                                         ignore_index=True)
+            self.confidence_log = pd.concat([frame for frame in (self.confidence_log, new_entries)
+                                             if not frame.empty], ignore_index=True)
             print(f"✓ Added {len(new_entries)} new confidence entries for {self.today}")
+
+    def detect_confidence_changes(self, entries):
+        """Compare entries with each phase's latest log entry and record status changes."""
+        latest = self.confidence_log.groupby('phase', sort=False).tail(1)[['phase', 'confidence_status']]
+        compared = entries.merge(latest.rename(columns={'confidence_status': 'last_status'}),
+                                 on='phase', how='left', sort=False)
+        changed = compared[compared['last_status'].notna() &
+                           (compared['last_status'] != compared['confidence_status'])]
+
+        upgrade = (changed['confidence_status'].map(STATUS_ORDER) >
+                   changed['last_status'].map(STATUS_ORDER)).to_numpy()
+        self.confidence_changes.extend(
+            {
+                'phase': phase,
+                'change': f"{last_status} → {new_status}",
+                'type': '⬆️ UPGRADE' if up else '⬇️ DOWNGRADE',
+                'emoji': '🎉' if up else '⚠️',
+                'date': self.today
+            }
+            for phase, last_status, new_status, up in zip(
+                changed['phase'], changed['last_status'], changed['confidence_status'], upgrade)
+        )
             
     def check_confidence_change(self, phase, new_status):
         """Check if confidence level changed from previous entry."""
-        # Get previous entries for this phase
-        phase_history = self.confidence_log[self.confidence_log['phase'] == phase]
-        
-        if not phase_history.empty:
-            # Get most recent entry
-            last_entry = phase_history.iloc[-1]
-            last_status = last_entry['confidence_status']
-            
-            if last_status != new_status:
-                # Determine if upgrade or downgrade
-                status_order = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2}
-                
-                if status_order[new_status] > status_order[last_status]:
-                    change_type = '⬆️ UPGRADE'
-                    emoji = '🎉'
-                else:
-                    change_type = '⬇️ DOWNGRADE'
-                    emoji = '⚠️'
-                    
-                self.confidence_changes.append({
-                    'phase': phase,
-                    'change': f"{last_status} → {new_status}",
-                    'type': change_type,
-                    'emoji': emoji,
-                    'date': self.today
-                })
+        self.detect_confidence_changes(pd.DataFrame({'phase': [phase], 'confidence_status': [new_status]}))
                 
     def save_confidence_log(self):
-        """Save updated confidence log to CSV."""
-        # Sort by date and phase for better readability
-        self.confidence_log = self.confidence_log.sort_values(['date', 'phase'])
-        self.confidence_log.to_csv(self.log_file_path, index=False)
+        """Append today's new entries to the confidence log CSV."""
+        log_path = Path(self.log_file_path)
+        if self.new_entries.empty and log_path.exists():
+            print(f"✓ Confidence log already up to date: {self.log_file_path}")
+            return
+
+        # History is never rewritten; new rows go to the end of the file
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        new_entries = self.new_entries.sort_values('phase', kind='stable')[LOG_COLUMNS]
+        write_header = not log_path.exists() or log_path.stat().st_size == 0
+        new_entries.to_csv(log_path, mode='a', header=write_header, index=False)
+        self.new_entries = pd.DataFrame(columns=LOG_COLUMNS)
         print(f"✓ Saved confidence log to: {self.log_file_path}")
         
     def print_summary_report(self):
@@ -164,47 +166,35 @@ class PhaseConfidenceTracker:
         print(f"{'Phase':<15} {'Status':<12} {'Total Bets':<12} {'Win Rate':<12} {'Progress to Next':<20}")
         print("-"*80)
         
-        for _, row in self.phase_data.iterrows():
-            phase = row['phase']
-            total_bets = int(row['total_bets'])
-            total_wins = int(row['total_wins'])
-            win_rate = row['win_rate']
-            
-            # Ensure win_rate is in decimal format for display
-            if win_rate > 1:
-                win_rate = win_rate / 100
-                
-            status = self.determine_confidence_status(total_bets, win_rate)
-            
+        current = self.current_status()
+        for phase, total_bets, win_rate, status in zip(current['phase'], current['total_bets'],
+                                                       current['win_rate'], current['confidence_status']):
             # Calculate progress to next level
             progress = self.calculate_progress_to_next(total_bets, win_rate, status)
             
-            # Status emoji
-            status_emoji = {'LOW': '🔴', 'MEDIUM': '🟨', 'HIGH': '✅'}
-            
-            print(f"{phase:<15} {status_emoji[status]} {status:<10} {total_bets:<12} "
+            print(f"{phase:<15} {STATUS_EMOJI[status]} {status:<10} {total_bets:<12} "
                   f"{win_rate*100:<12.1f} {progress:<20}")
             
         # Recent history for each phase
         print("\n\n📈 RECENT CONFIDENCE HISTORY (Last 5 Entries Per Phase):")
         print("-"*80)
         
-        phases = self.phase_data['phase'].unique()
-        for phase in sorted(phases):
-            phase_history = self.confidence_log[self.confidence_log['phase'] == phase].tail(5)
+        # One pass over the log for every phase's last five entries
+        phases = set(self.phase_data['phase'].unique())
+        recent = self.confidence_log[self.confidence_log['phase'].isin(phases)].groupby('phase', sort=True).tail(5)
+        win_rates = recent['win_rate'].astype(float)
+        recent = recent.assign(win_pct=win_rates.where(win_rates > 1, win_rates * 100))
+        for phase, phase_history in recent.groupby('phase', sort=True):
+            print(f"\n{phase.upper()}:")
+            print(f"{'Date':<12} {'Bets':<8} {'Wins':<8} {'Win%':<10} {'Status':<12}")
+            print("-"*50)
             
-            if not phase_history.empty:
-                print(f"\n{phase.upper()}:")
-                print(f"{'Date':<12} {'Bets':<8} {'Wins':<8} {'Win%':<10} {'Status':<12}")
-                print("-"*50)
-                
-                for _, entry in phase_history.iterrows():
-                    win_pct = entry['win_rate'] * 100 if entry['win_rate'] <= 1 else entry['win_rate']
-                    status_emoji = {'LOW': '🔴', 'MEDIUM': '🟨', 'HIGH': '✅'}
-                    
-                    print(f"{entry['date']:<12} {int(entry['total_bets']):<8} "
-                          f"{int(entry['total_wins']):<8} {win_pct:<10.1f} "
-                          f"{status_emoji[entry['confidence_status']]} {entry['confidence_status']:<10}")
+            for entry_date, bets, wins, win_pct, status in zip(
+                    phase_history['date'], phase_history['total_bets'], phase_history['total_wins'],
+                    phase_history['win_pct'], phase_history['confidence_status']):
+                print(f"{entry_date:<12} {int(bets):<8} "
+                      f"{int(wins):<8} {win_pct:<10.1f} "
+                      f"{STATUS_EMOJI[status]} {status:<10}")
                           
         # Statistical summary
         print("\n\n📊 STATISTICAL SUMMARY:")
@@ -220,15 +210,12 @@ class PhaseConfidenceTracker:
         print(f"Overall System Win Rate: {overall_win_rate:.1f}%")
         
         # Confidence distribution
-        current_statuses = []
-        for _, row in self.phase_data.iterrows():
-            status = self.determine_confidence_status(row['total_bets'], row['win_rate'])
-            current_statuses.append(status)
+        status_counts = current['confidence_status'].value_counts()
             
         print(f"\nConfidence Distribution:")
         for status in ['HIGH', 'MEDIUM', 'LOW']:
-            count = current_statuses.count(status)
-            pct = (count / len(current_statuses) * 100) if len(current_statuses) > 0 else 0
+            count = int(status_counts.get(status, 0))
+            pct = (count / len(current) * 100) if len(current) > 0 else 0
             print(f"  {status}: {count} phases ({pct:.0f}%)")
             
         print("\n" + "="*80)
@@ -95,11 +95,50 @@ def main():
 Orchestration script to automate WNBA betting prediction pipeline.
 Must be run from project root directory.
 """
+import argparse
 import subprocess
 import sys
 import os
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.stage_dag import DEFAULT_CACHE_DIR, DEFAULT_CACHE_KEEP, ArtifactCache, Stage, StageRunner
+
+# Each script with the files it reads and writes. The runner orders scripts by
+# these files, runs the ones that don't depend on each other in parallel and
+# skips a script whose inputs (and source) are unchanged since its last run.
+SCRIPT_STAGES = [
+    ("fetch_props", "scripts/scraping/fetch_and_parse_prizepicks.py",
+     [],
+     ["data/wnba_prizepicks_props.csv", "data/wnba_prizepicks_props.json"]),
+    ("map_names", "scripts/mapping/map_prizepicks_names.py",
+     ["data/wnba_prizepicks_props.csv", "data/player_directory.csv"],
+     ["data/wnba_props_mapped.csv", "output/unmatched_players.csv"]),
+    ("predictions", "scripts/prediction/run_prop_predictions.py",
+     ["data/wnba_props_mapped.csv", "data/wnba_combined_gamelogs.csv"],
+     ["data/wnba_prop_predictions.csv", "output/skipped_props.csv"]),
+    ("verify_traps", "scripts/prediction/verify_trap_props.py",
+     ["data/wnba_prop_predictions.csv", "data/wnba_combined_gamelogs.csv"],
+     ["data/wnba_trap_verification.csv", "output/trap_lines.csv",
+      "output/goblin_candidates.csv", "output/trap_debug.csv"]),
+    ("aggressive_traps", "scripts/prediction/aggressive_trap_detector.py",
+     ["data/wnba_prop_predictions.csv"],
+     ["data/wnba_aggressive_trap_detection.csv", "output/trap_detection_summary.csv"]),
+    ("clean_props", "scripts/prediction/prepare_clean_props.py",
+     ["data/wnba_aggressive_trap_detection.csv"],
+     ["data/wnba_clean_props_for_betting.csv", "output/betting_recommendation_summary.txt"]),
+    ("betting_strategy", "scripts/prediction/updated_betting_strategy.py",
+     ["data/wnba_prop_predictions.csv", "data/wnba_aggressive_trap_detection.csv"],
+     ["data/updated_betting_strategy.csv", "output/optimal_goblin_slate.csv"]),
+    ("menstrual_intelligence", "scripts/intelligence/menstrual_phase_estimator.py",  # Menstrual Intelligence Layer
+     ["data/wnba_clean_props_for_betting.csv", "data/wnba_gamelogs_with_cycle_phases.csv"],
+     ["output/cycle_risk_backtest_report.json", "output/cycle_risk_metrics_cube.csv"]),
+]
+
+# Scripts that must run every time (today's board comes from the network)
+UNCACHED_STAGES = {"fetch_props"}
+
 def run_script(script_path):
     """Execute a Python script and handle errors."""
     print(f"\n>>> Running: {script_path}")
@@ -156,31 +195,45 @@ def verify_output_files():
             
     return all_exist
 
+def script_stage(name, script_path, reads, writes):
+    """A stage that runs one pipeline script and fails if the script does."""
+    def run():
+        if not run_script(script_path):
+            raise RuntimeError(f"{script_path} exited with an error")
+        
+    return Stage(name, run, files=(script_path, *reads), writes=tuple(writes),
+                 version=script_path, cacheable=name not in UNCACHED_STAGES)
+
 def main():
     """Run the complete WNBA prediction pipeline."""
-    # Define scripts in execution order
-    scripts = [
-        "scripts/scraping/fetch_and_parse_prizepicks.py",
-        "scripts/mapping/map_prizepicks_names.py", 
-        "scripts/prediction/run_prop_predictions.py",
-        "scripts/intelligence/menstrual_phase_estimator.py",  # ADDED: Menstrual Intelligence Layer
-        "scripts/prediction/verify_trap_props.py",
-        "scripts/prediction/aggressive_trap_detector.py",
-        "scripts/prediction/prepare_clean_props.py",
-        "scripts/prediction/updated_betting_strategy.py"
-    ]
+    parser = argparse.ArgumentParser(description="Run the WNBA daily prediction pipeline")
+    parser.add_argument('--force', action='store_true', help="Re-run every script, ignoring cached outputs")
+    parser.add_argument('--no-cache', action='store_true', help="Do not read or write the stage cache")
+    parser.add_argument('--workers', type=int, default=None, help="Maximum scripts run at once")
+    parser.add_argument('--cache-keep', type=int, default=DEFAULT_CACHE_KEEP,
+                        help="Cached results kept per script; older ones are pruned after the run")
+    args = parser.parse_args()
     
     print("🏀 WNBA Daily Prediction Pipeline")
     print("=" * 60)
     print("🧠 NOW WITH MENSTRUAL INTELLIGENCE LAYER")
     print("=" * 60)
     
-    # Run each script in order
-    for script in scripts:
-        if not run_script(script):
-            print(f"\n❌ Pipeline failed at: {script}")
-            print("Exiting...")
-            sys.exit(1)
+    # Run the scripts as a stage DAG
+    stages = [script_stage(*spec) for spec in SCRIPT_STAGES]
+    cache = None if args.no_cache else ArtifactCache(DEFAULT_CACHE_DIR, keep=args.cache_keep)
+    runner = StageRunner(stages, cache=cache, max_workers=args.workers)
+    results = runner.run(force=args.force)
+    
+    print("\nStage timings:")
+    for line in runner.timing_report():
+        print(f"  {line}")
+    
+    failed = [result.name for result in results.values() if not result.ok]
+    if failed:
+        print(f"\n❌ Pipeline failed at: {', '.join(failed)}")
+        print("Exiting...")
+        sys.exit(1)
     
     # Verify output files
     print("\n" + "=" * 60)
@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -9,15 +10,41 @@ warnings.filterwarnings('ignore')
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from core.stage_dag import DEFAULT_CACHE_DIR, DEFAULT_CACHE_KEEP, ArtifactCache, Stage, StageRunner
+
+GAMELOGS_PATH = 'data/wnba_combined_gamelogs.csv'
+PROPS_PATH = 'data/wnba_prizepicks_props.csv'
+
+# PrizePicks stat names -> gamelog columns
+STAT_MAPPING = {
+    'Points': 'PTS',
+    'Rebounds': 'REB', 
+    'Assists': 'AST',
+    'Steals': 'STL',
+    'Blocks': 'BLK',
+    '3-PT Made': 'FG3M',
+    'Pts+Rebs+Asts': 'PRA',
+    'Pts+Rebs': 'PR',
+    'Pts+Asts': 'PA'
+}
+
 class DailyAnalysisPipeline:
     """
     Orchestrates the full WNBA betting analysis pipeline.
     Runs all analyzers and generates a comprehensive daily report.
+    
+    The analyzers are stages of a StageRunner: the gamelogs and props are
+    loaded once and passed in memory, volatility and cycle detection run in
+    parallel, and stages whose inputs are unchanged since the last run are
+    served from the artifact cache.
     """
     
-    def __init__(self):
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_workers=None, cache_keep=DEFAULT_CACHE_KEEP):
         self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         self.report_lines = []
+        self.cache = ArtifactCache(cache_dir, keep=cache_keep) if cache_dir else None
+        self.max_workers = max_workers
+        self.runner = None
         
     def log(self, message, level="INFO"):
         """Log message to console and report."""
@@ -32,116 +59,107 @@ class DailyAnalysisPipeline:
         formatted_report = f"[{timestamp}] {level}: {message}"
         self.report_lines.append(formatted_report)
         
-    def run_volatility_analysis(self):
+    def load_gamelogs(self):
+        """Load the combined gamelogs once for every analyzer."""
+        gamelogs_df = pd.read_csv(GAMELOGS_PATH)
+        return gamelogs_df.rename(columns={'PLAYER_NAME': 'Player', 'GAME_DATE': 'Date'})
+        
+    def load_props(self):
+        """Load today's PrizePicks board."""
+        return pd.read_csv(PROPS_PATH)
+        
+    def run_volatility_analysis(self, gamelogs):
         """Run volatility analysis inline."""
         self.log("Running Volatility Analyzer...")
         
-        try:
-            from core.volatility_analyzer import VolatilityAnalyzer
-            
-            # Load gamelogs
-            gamelogs_df = pd.read_csv('data/wnba_combined_gamelogs.csv')
-            gamelogs_df = gamelogs_df.rename(columns={'PLAYER_NAME': 'Player', 'GAME_DATE': 'Date'})
-            
-            # Run analysis
-            analyzer = VolatilityAnalyzer(lookback_games=10)
-            volatility_results = analyzer.analyze_player_volatility(gamelogs_df)
-            
-            # Save results
-            volatility_results = volatility_results.sort_values('Overall_Volatility', ascending=False)
-            volatility_results.to_csv('output/player_volatility_analysis.csv', index=False)
-            
-            # Get patterns
-            patterns_df = analyzer.identify_volatility_patterns(volatility_results)
-            if not patterns_df.empty:
-                patterns_df.to_csv('output/volatility_patterns.csv', index=False)
-            
-            self.log(f"✅ Volatility analysis complete - {len(volatility_results)} players analyzed")
-            return True
-            
-        except Exception as e:
-            self.log(f"❌ Volatility analysis failed: {str(e)}", "ERROR")
-            return False
+        from core.volatility_analyzer import VolatilityAnalyzer
+        
+        # Run analysis
+        analyzer = VolatilityAnalyzer(lookback_games=10)
+        volatility_results = analyzer.analyze_player_volatility(gamelogs)
+        
+        # Save results
+        volatility_results = volatility_results.sort_values('Overall_Volatility', ascending=False)
+        volatility_results.to_csv('output/player_volatility_analysis.csv', index=False)
+        
+        # Get patterns
+        patterns_df = analyzer.identify_volatility_patterns(volatility_results)
+        if not patterns_df.empty:
+            patterns_df.to_csv('output/volatility_patterns.csv', index=False)
+        
+        self.log(f"✅ Volatility analysis complete - {len(volatility_results)} players analyzed")
+        return volatility_results.reset_index(drop=True)
             
-    def run_cycle_detection(self):
+    def run_cycle_detection(self, gamelogs):
         """Run performance cycle detection inline."""
         self.log("Running Performance Cycle Detector...")
         
-        try:
-            from core.performance_cycle_detector import PerformanceCycleDetector
-            
-            # Load gamelogs
-            gamelogs_df = pd.read_csv('data/wnba_combined_gamelogs.csv')
-            gamelogs_df = gamelogs_df.rename(columns={'PLAYER_NAME': 'Player', 'GAME_DATE': 'Date'})
-            gamelogs_df['Date'] = pd.to_datetime(gamelogs_df['Date'], format='mixed', errors='coerce')
-            
-            # Run detection
-            detector = PerformanceCycleDetector(min_games=20)
-            cycles_results = detector.detect_cycles(gamelogs_df)
-            
-            # Save results
-            cycles_results.to_csv('output/player_performance_cycles.csv', index=False)
-            
-            # Find opportunities
-            opportunities = detector.identify_betting_opportunities(cycles_results)
-            if not opportunities.empty:
-                opportunities = opportunities.sort_values('Opportunity_Count', ascending=False)
-                opportunities.to_csv('output/cycle_betting_opportunities.csv', index=False)
-                
-            self.log(f"✅ Cycle detection complete - {len(cycles_results)} players analyzed")
-            return True
+        from core.performance_cycle_detector import PerformanceCycleDetector
+        
+        # Parse dates on a copy; the loaded gamelogs are shared with other stages
+        gamelogs_df = gamelogs.assign(Date=pd.to_datetime(gamelogs['Date'], format='mixed', errors='coerce'))
+        
+        # Run detection
+        detector = PerformanceCycleDetector(min_games=20)
+        cycles_results = detector.detect_cycles(gamelogs_df)
+        
+        # Save results
+        cycles_results.to_csv('output/player_performance_cycles.csv', index=False)
+        
+        # Find opportunities
+        opportunities = detector.identify_betting_opportunities(cycles_results)
+        if not opportunities.empty:
+            opportunities = opportunities.sort_values('Opportunity_Count', ascending=False)
+            opportunities.to_csv('output/cycle_betting_opportunities.csv', index=False)
             
-        except Exception as e:
-            self.log(f"❌ Cycle detection failed: {str(e)}", "ERROR")
-            return False
+        self.log(f"✅ Cycle detection complete - {len(cycles_results)} players analyzed")
+        return cycles_results
             
-    def run_prop_value_analysis(self):
+    def run_prop_value_analysis(self, props, gamelogs, volatility, cycles):
         """Run prop value analysis inline."""
         self.log("Running Prop Value Analyzer...")
         
-        try:
-            from core.prop_value_analyzer import PropValueAnalyzer
-            
-            # Initialize analyzer
-            analyzer = PropValueAnalyzer()
-            
-            # Load all required data
-            volatility_df = pd.read_csv('output/player_volatility_analysis.csv')
-            cycles_df = pd.read_csv('output/player_performance_cycles.csv')
-            
-            gamelogs_df = pd.read_csv('data/wnba_combined_gamelogs.csv')
-            gamelogs_df = gamelogs_df.rename(columns={'PLAYER_NAME': 'Player', 'GAME_DATE': 'Date'})
-            
-            props_df = pd.read_csv('data/wnba_prizepicks_props.csv')
-            
-            # Stat mapping
-            stat_mapping = {
-                'Points': 'PTS',
-                'Rebounds': 'REB', 
-                'Assists': 'AST',
-                'Steals': 'STL',
-                'Blocks': 'BLK',
-                '3-PT Made': 'FG3M',
-                'Pts+Rebs+Asts': 'PRA',
-                'Pts+Rebs': 'PR',
-                'Pts+Asts': 'PA'
-            }
-            
-            # Run analysis
-            value_results = analyzer.analyze_props(props_df, gamelogs_df, volatility_df, cycles_df, stat_mapping)
-            
-            if not value_results.empty:
-                value_results = value_results.sort_values('EV', ascending=False)
-                value_results.to_csv('output/prop_value_analysis.csv', index=False)
-                self.log(f"✅ Prop value analysis complete - {len(value_results)} valuable props found")
-            else:
-                self.log("⚠️  No valuable props found", "WARN")
-                
-            return True
+        from core.prop_value_analyzer import PropValueAnalyzer
+        
+        # Run analysis
+        analyzer = PropValueAnalyzer()
+        value_results = analyzer.analyze_props(props, gamelogs, volatility, cycles, STAT_MAPPING)
+        
+        if not value_results.empty:
+            value_results = value_results.sort_values('EV', ascending=False)
+            value_results.to_csv('output/prop_value_analysis.csv', index=False)
+            self.log(f"✅ Prop value analysis complete - {len(value_results)} valuable props found")
+        else:
+            self.log("⚠️  No valuable props found", "WARN")
             
-        except Exception as e:
-            self.log(f"❌ Prop value analysis failed: {str(e)}", "ERROR")
-            return False
+        return value_results.reset_index(drop=True)
+        
+    def build_stages(self):
+        """Stages of the daily run with the data and files each one uses."""
+        return [
+            Stage('gamelogs', self.load_gamelogs, outputs=('gamelogs',), files=(GAMELOGS_PATH,)),
+            Stage('props', self.load_props, outputs=('props',), files=(PROPS_PATH,)),
+            Stage('volatility', self.run_volatility_analysis,
+                  inputs=('gamelogs',), outputs=('volatility',),
+                  files=('core/volatility_analyzer.py',),
+                  writes=('output/player_volatility_analysis.csv', 'output/volatility_patterns.csv')),
+            Stage('cycles', self.run_cycle_detection,
+                  inputs=('gamelogs',), outputs=('cycles',),
+                  files=('core/performance_cycle_detector.py',),
+                  writes=('output/player_performance_cycles.csv', 'output/cycle_betting_opportunities.csv')),
+            Stage('prop_values', self.run_prop_value_analysis,
+                  inputs=('props', 'gamelogs', 'volatility', 'cycles'), outputs=('prop_values',),
+                  files=('core/prop_value_analyzer.py',),
+                  writes=('output/prop_value_analysis.csv',)),
+            # The slip is timestamped per run, so it is never served from the cache
+            Stage('betting_slip', self.create_betting_slip, inputs=('prop_values',), cacheable=False),
+        ]
+        
+    def stage_output(self, name, fallback_path):
+        """An artifact of this run, or the last saved CSV if its stage did not complete."""
+        if self.runner is not None and name in self.runner.results and self.runner.results[name].ok:
+            return self.runner.get(name)
+        return pd.read_csv(fallback_path)
             
     def check_data_freshness(self):
         """Check if data files are recent."""
@@ -181,7 +199,7 @@ class DailyAnalysisPipeline:
             
             try:
                 # Load prop value analysis
-                props_df = pd.read_csv('output/prop_value_analysis.csv')
+                props_df = self.stage_output('prop_values', 'output/prop_value_analysis.csv')
                 if not props_df.empty:
                     f.write(f"Found {len(props_df)} props with edge\n\n")
                     
@@ -202,7 +220,7 @@ class DailyAnalysisPipeline:
             f.write("-" * 40 + "\n")
             
             try:
-                volatility_df = pd.read_csv('output/player_volatility_analysis.csv')
+                volatility_df = self.stage_output('volatility', 'output/player_volatility_analysis.csv')
                 extreme_players = volatility_df[volatility_df['Risk_Level'] == 'EXTREME'].head(10)
                 
                 for _, player in extreme_players.iterrows():
@@ -216,7 +234,7 @@ class DailyAnalysisPipeline:
             f.write("-" * 40 + "\n")
             
             try:
-                cycles_df = pd.read_csv('output/player_performance_cycles.csv')
+                cycles_df = self.stage_output('cycles', 'output/player_performance_cycles.csv')
                 hot_players = []
                 
                 for _, player in cycles_df.iterrows():
@@ -234,6 +252,14 @@ class DailyAnalysisPipeline:
             except:
                 f.write("Could not load cycle analysis.\n\n")
                 
+            # Stage timings
+            if self.runner is not None:
+                f.write("STAGE TIMINGS:\n")
+                f.write("-" * 40 + "\n")
+                for line in self.runner.timing_report():
+                    f.write(line + "\n")
+                f.write("\n")
+                
             # Summary statistics
             f.write("SUMMARY STATISTICS:\n")
             f.write("-" * 40 + "\n")
@@ -243,12 +269,15 @@ class DailyAnalysisPipeline:
         self.log(f"✅ Report saved to {report_path}")
         return report_path
         
-    def create_betting_slip(self):
+    def create_betting_slip(self, prop_values=None):
         """Create a simple betting slip with top plays."""
         self.log("Creating betting slip...")
         
         try:
-            props_df = pd.read_csv('output/prop_value_analysis.csv')
+            props_df = prop_values if prop_values is not None else pd.read_csv('output/prop_value_analysis.csv')
+            if props_df.empty:
+                self.log("No high-confidence bets found today")
+                return
             
             # Filter for best bets
             strong_bets = props_df[
@@ -276,7 +305,7 @@ class DailyAnalysisPipeline:
         except Exception as e:
             self.log(f"Could not create betting slip: {e}", "ERROR")
             
-    def run_pipeline(self):
+    def run_pipeline(self, force=False):
         """Execute the full analysis pipeline."""
         print("\n" + "=" * 80)
         print("WNBA DAILY BETTING ANALYSIS PIPELINE")
@@ -285,18 +314,21 @@ class DailyAnalysisPipeline:
         # Check data freshness
         self.check_data_freshness()
         
-        # Run analyzers in sequence
-        success1 = self.run_volatility_analysis()
-        success2 = self.run_cycle_detection()
-        success3 = self.run_prop_value_analysis()
+        # Run analyzers as a stage DAG; independent stages run in parallel
+        self.runner = StageRunner(self.build_stages(), cache=self.cache,
+                                  max_workers=self.max_workers, log=self.log)
+        results = self.runner.run(force=force)
+        
+        print("\nStage timings:")
+        for line in self.runner.timing_report():
+            print(f"  {line}")
         
-        all_success = success1 and success2 and success3
+        all_success = all(result.ok for result in results.values())
         
         # Generate reports
         if all_success:
             self.log("\nAll analyzers completed. Generating reports...")
             report_path = self.generate_summary_report()
-            self.create_betting_slip()
             
             print("\n" + "=" * 80)
             print("PIPELINE COMPLETE")
@@ -311,8 +343,18 @@ class DailyAnalysisPipeline:
             
 def main():
     """Run the daily analysis pipeline."""
-    pipeline = DailyAnalysisPipeline()
-    pipeline.run_pipeline()
+    parser = argparse.ArgumentParser(description="Run the WNBA daily analysis pipeline")
+    parser.add_argument('--force', action='store_true', help="Re-run every stage, ignoring cached results")
+    parser.add_argument('--no-cache', action='store_true', help="Do not read or write the stage cache")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Stage artifact cache directory")
+    parser.add_argument('--workers', type=int, default=None, help="Maximum stages run at once")
+    parser.add_argument('--cache-keep', type=int, default=DEFAULT_CACHE_KEEP,
+                        help="Cached results kept per stage; older ones are pruned after the run")
+    args = parser.parse_args()
+    
+    pipeline = DailyAnalysisPipeline(cache_dir=None if args.no_cache else args.cache_dir,
+                                     max_workers=args.workers, cache_keep=args.cache_keep)
+    pipeline.run_pipeline(force=args.force)
     
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
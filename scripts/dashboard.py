@@ -2,6 +2,9 @@
 
 import os
 import sys
+import json
+import time
+from contextlib import contextmanager
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
@@ -10,19 +13,66 @@ import seaborn as sns
 from datetime import datetime, timedelta
 import argparse
 import logging
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.metrics_database import MetricsDatabase
 
 
+# Chart formats: 'png' is the full-resolution raster; 'svg' is vector and
+# inlined into the HTML page
+CHART_FORMATS = ('png', 'svg')
+
+
 class TradingDashboard:
     """Generate visual dashboard for paper trading metrics"""
     
     def __init__(self, db_path: str = "data/paper_metrics.db"):
         self.db = MetricsDatabase(db_path)
         self.style_config()
+        self.timings: Dict[str, float] = {}
+    
+    @contextmanager
+    def _timed(self, step: str):
+        """Record how long a render step takes (seconds) in self.timings"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[step] = time.perf_counter() - start
+    
+    def timing_report(self) -> str:
+        """Per-step timings of the last call, slowest first"""
+        total = sum(self.timings.values())
+        lines = [f"{'step':<20} {'ms':>9} {'share':>7}"]
+        for step, seconds in sorted(self.timings.items(), key=lambda item: item[1], reverse=True):
+            share = seconds / total if total > 0 else 0
+            lines.append(f"{step:<20} {seconds * 1000:>9.1f} {share:>7.1%}")
+        return "\n".join(lines)
+    
+    @staticmethod
+    def _render_cache_path(output_path: str) -> str:
+        return os.path.splitext(output_path)[0] + '.render.json'
+    
+    def _cached_render(self, output_path: str, key: Dict) -> bool:
+        """True when output_path was rendered for key and its files still exist"""
+        try:
+            with open(self._render_cache_path(output_path)) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return cached.get('key') == key and all(os.path.exists(path) for path in cached.get('outputs', []))
+    
+    def _save_render(self, output_path: str, key: Dict, outputs: List[str]):
+        with open(self._render_cache_path(output_path), 'w') as f:
+            json.dump({'key': key, 'outputs': outputs, 'timings': self.timings}, f, indent=2)
+    
+    def _render_key(self, start_date: str, end_date: str, **options) -> Dict:
+        """Render cache key: latest daily_metrics update plus the requested window"""
+        updated_at, days_stored = self.db.get_data_version()
+        return {'updated_at': updated_at, 'days_stored': days_stored,
+                'start_date': start_date, 'end_date': end_date, **options}
     
     def style_config(self):
         """Configure matplotlib style"""
@@ -33,61 +83,92 @@ class TradingDashboard:
         plt.rcParams['axes.titlesize'] = 14
         plt.rcParams['axes.labelsize'] = 12
     
-    def generate_dashboard(self, days: int = 30, output_path: str = "dashboard.html") -> str:
+    def generate_dashboard(self, days: int = 30, output_path: str = "dashboard.html",
+                           chart_format: str = 'png', dpi: int = 300, force: bool = False) -> str:
         """
         Generate comprehensive dashboard
         
+        Nothing is queried or drawn when the dashboard at output_path was
+        already rendered for the same window and options and no day has been
+        graded since (the latest daily_metrics.updated_at is unchanged).
+        
         Args:
             days: Number of days to include
             output_path: Path to save dashboard
+            chart_format: 'png' (raster at dpi, linked from the HTML) or 'svg'
+                (vector, inlined into the HTML)
+            dpi: Resolution of the PNG chart
+            force: Render even if the cached dashboard is current
             
         Returns:
             str: Path to generated dashboard
         """
+        if chart_format not in CHART_FORMATS:
+            raise ValueError(f"chart_format must be one of {CHART_FORMATS}")
+        self.timings = {}
+        
         # Calculate date range
         end_date = datetime.now().strftime('%Y-%m-%d')
         start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
         
+        with self._timed('cache_check'):
+            key = self._render_key(start_date, end_date, days=days, chart_format=chart_format, dpi=dpi)
+            cached = not force and self._cached_render(output_path, key)
+        if cached:
+            logging.info(f"Dashboard unchanged since last render: {output_path}")
+            return output_path
+        
         # Fetch data
-        metrics_df = self.db.get_metrics_range(start_date, end_date)
+        with self._timed('fetch'):
+            metrics_df = self.db.get_metrics_range(start_date, end_date)
         
         if metrics_df.empty:
             logging.warning("No data available for dashboard")
-            return self._generate_empty_dashboard(output_path)
+            self._generate_empty_dashboard(output_path)
+            self._save_render(output_path, key, [output_path])
+            return output_path
         
         # Create figure with subplots
-        fig = plt.figure(figsize=(20, 12))
-        
-        # Define grid layout
-        gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
+        with self._timed('figure'):
+            fig = plt.figure(figsize=(20, 12))
+            
+            # Define grid layout
+            gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
         
         # 1. Daily ROI Chart (top left, spans 2 columns)
-        ax1 = fig.add_subplot(gs[0, :2])
-        self._plot_daily_roi(ax1, metrics_df)
+        with self._timed('daily_roi'):
+            ax1 = fig.add_subplot(gs[0, :2])
+            self._plot_daily_roi(ax1, metrics_df)
         
         # 2. Win Rate Trend (top right)
-        ax2 = fig.add_subplot(gs[0, 2])
-        self._plot_win_rate_trend(ax2, metrics_df)
+        with self._timed('win_rate_trend'):
+            ax2 = fig.add_subplot(gs[0, 2])
+            self._plot_win_rate_trend(ax2, metrics_df)
         
         # 3. Cumulative Profit (middle left, spans 2 columns)
-        ax3 = fig.add_subplot(gs[1, :2])
-        self._plot_cumulative_profit(ax3, metrics_df)
+        with self._timed('cumulative_profit'):
+            ax3 = fig.add_subplot(gs[1, :2])
+            self._plot_cumulative_profit(ax3, metrics_df)
         
         # 4. Trade Volume (middle right)
-        ax4 = fig.add_subplot(gs[1, 2])
-        self._plot_trade_volume(ax4, metrics_df)
+        with self._timed('trade_volume'):
+            ax4 = fig.add_subplot(gs[1, 2])
+            self._plot_trade_volume(ax4, metrics_df)
         
         # 5. Rolling Metrics (bottom left)
-        ax5 = fig.add_subplot(gs[2, 0])
-        self._plot_rolling_metrics(ax5, metrics_df)
+        with self._timed('rolling_metrics'):
+            ax5 = fig.add_subplot(gs[2, 0])
+            self._plot_rolling_metrics(ax5, metrics_df)
         
         # 6. Best/Worst Days (bottom middle)
-        ax6 = fig.add_subplot(gs[2, 1])
-        self._plot_best_worst_days(ax6)
+        with self._timed('best_worst_days'):
+            ax6 = fig.add_subplot(gs[2, 1])
+            self._plot_best_worst_days(ax6)
         
         # 7. Summary Stats (bottom right)
-        ax7 = fig.add_subplot(gs[2, 2])
-        self._plot_summary_stats(ax7, metrics_df)
+        with self._timed('summary_stats'):
+            ax7 = fig.add_subplot(gs[2, 2])
+            self._plot_summary_stats(ax7, metrics_df)
         
         # Add title and timestamp
         fig.suptitle(f'PhaseGrid Paper Trading Dashboard - Last {days} Days', 
@@ -95,18 +176,29 @@ class TradingDashboard:
         fig.text(0.99, 0.01, f'Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}', 
                 ha='right', va='bottom', fontsize=8, alpha=0.5)
         
-        # Save as image
-        img_path = output_path.replace('.html', '.png')
-        plt.savefig(img_path, dpi=300, bbox_inches='tight')
+        # Save the chart
+        img_path = os.path.splitext(output_path)[0] + f'.{chart_format}'
+        with self._timed('save_chart'):
+            if chart_format == 'svg':
+                plt.savefig(img_path, format='svg', bbox_inches='tight')
+            else:
+                plt.savefig(img_path, dpi=dpi, bbox_inches='tight')
+        plt.close(fig)
         
         # Generate HTML report
-        html_content = self._generate_html_report(metrics_df, img_path, days)
-        
-        with open(output_path, 'w') as f:
-            f.write(html_content)
+        with self._timed('html'):
+            inline_svg = None
+            if chart_format == 'svg':
+                with open(img_path, encoding='utf-8') as f:
+                    inline_svg = f.read()
+            html_content = self._generate_html_report(metrics_df, img_path, days, inline_svg)
+            
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(html_content)
         
+        self._save_render(output_path, key, [output_path, img_path])
         logging.info(f"Dashboard generated: {output_path}")
-        plt.close()
+        logging.info("Render timings:\n" + self.timing_report())
         
         return output_path
     
@@ -317,12 +409,19 @@ Avg Win Rate: {avg_win_rate:.1f}%
                fontfamily='monospace',
                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
     
-    def _generate_html_report(self, df, img_path, days):
-        """Generate HTML report with embedded image and stats"""
+    def _generate_html_report(self, df, img_path, days, inline_svg: Optional[str] = None):
+        """Generate HTML report with embedded image and stats (inline SVG markup replaces the image link)"""
         total_profit = df['total_profit'].sum()
         avg_roi = df['roi'].mean()
         avg_win_rate = df['win_rate'].mean()
         
+        if inline_svg is not None:
+            # Drop the XML prolog/doctype so the markup can sit inside the page
+            chart = inline_svg[inline_svg.find('<svg'):]
+            chart_html = f'<div class="dashboard-image">{chart}</div>'
+        else:
+            chart_html = f'<img src="{os.path.basename(img_path)}" alt="Trading Dashboard" class="dashboard-image">'
+        
         html = f"""
 <!DOCTYPE html>
 <html>
@@ -362,7 +461,7 @@ Avg Win Rate: {avg_win_rate:.1f}%
         }}
         .positive {{ color: #27ae60; }}
         .negative {{ color: #e74c3c; }}
-        .dashboard-image {{
+        .dashboard-image, .dashboard-image svg {{
             width: 100%;
             max-width: 1400px;
             margin: 0 auto;
@@ -399,7 +498,7 @@ Avg Win Rate: {avg_win_rate:.1f}%
         </div>
     </div>
     
-    <img src="{os.path.basename(img_path)}" alt="Trading Dashboard" class="dashboard-image">
+    {chart_html}
     
     <div class="footer">
         <p>Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
@@ -444,12 +543,21 @@ Avg Win Rate: {avg_win_rate:.1f}%
             f.write(html)
         return output_path
     
-    def generate_ci_badge(self, output_path: str = "badge.svg") -> str:
-        """Generate CI badge with current metrics"""
+    def generate_ci_badge(self, output_path: str = "badge.svg", force: bool = False) -> str:
+        """Generate CI badge with current metrics (skipped when no day was graded since the last badge)"""
+        self.timings = {}
+        
         # Get latest metrics
         end_date = datetime.now().strftime('%Y-%m-%d')
         start_date = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-        df = self.db.get_metrics_range(start_date, end_date)
+        with self._timed('cache_check'):
+            key = self._render_key(start_date, end_date, badge=True)
+            cached = not force and self._cached_render(output_path, key)
+        if cached:
+            return output_path
+        
+        with self._timed('fetch'):
+            df = self.db.get_metrics_range(start_date, end_date)
         
         if df.empty:
             roi = 0
@@ -482,9 +590,11 @@ Avg Win Rate: {avg_win_rate:.1f}%
     </g>
 </svg>"""
         
-        with open(output_path, 'w') as f:
-            f.write(svg)
+        with self._timed('write'):
+            with open(output_path, 'w') as f:
+                f.write(svg)
         
+        self._save_render(output_path, key, [output_path])
         return output_path
 
 
@@ -494,6 +604,11 @@ def main():
     parser.add_argument('--days', type=int, default=30, help='Number of days to include')
     parser.add_argument('--output', default='dashboard.html', help='Output file path')
     parser.add_argument('--badge', action='store_true', help='Generate CI badge')
+    parser.add_argument('--format', choices=CHART_FORMATS, default='png',
+                        help='Chart format: png (raster) or svg (vector, inlined in the HTML)')
+    parser.add_argument('--dpi', type=int, default=300, help='PNG chart resolution')
+    parser.add_argument('--force', action='store_true', help='Render even if nothing changed')
+    parser.add_argument('--timings', action='store_true', help='Print per-panel render timings')
     
     args = parser.parse_args()
     
@@ -502,11 +617,15 @@ def main():
     dashboard = TradingDashboard()
     
     if args.badge:
-        badge_path = dashboard.generate_ci_badge()
+        badge_path = dashboard.generate_ci_badge(force=args.force)
         print(f"Badge generated: {badge_path}")
     else:
-        output_path = dashboard.generate_dashboard(args.days, args.output)
+        output_path = dashboard.generate_dashboard(args.days, args.output, chart_format=args.format,
+                                                   dpi=args.dpi, force=args.force)
         print(f"Dashboard generated: {output_path}")
+    
+    if args.timings:
+        print(dashboard.timing_report())
 
 
 if __name__ == "__main__":
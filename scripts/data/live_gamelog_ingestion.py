@@ -9,6 +9,8 @@ import requests
 import pandas as pd
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import os
 from pathlib import Path
@@ -25,8 +27,45 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Column order of wnba_2024_gamelogs.csv, shared by full and incremental writes
+GAMELOG_COLUMNS = [
+    'SEASON_YEAR', 'PLAYER_ID', 'PLAYER_NAME', 'NICKNAME', 'TEAM_ID', 
+    'TEAM_ABBREVIATION', 'TEAM_NAME', 'GAME_ID', 'GAME_DATE', 'MATCHUP', 
+    'WL', 'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 
+    'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'TOV', 
+    'STL', 'BLK', 'BLKA', 'PF', 'PFD', 'PTS', 'PLUS_MINUS', 
+    'NBA_FANTASY_PTS', 'DD2', 'TD3', 'WNBA_FANTASY_PTS', 'GP_RANK', 
+    'W_RANK', 'L_RANK', 'W_PCT_RANK', 'MIN_RANK', 'FGM_RANK', 
+    'FGA_RANK', 'FG_PCT_RANK', 'FG3M_RANK', 'FG3A_RANK', 'FG3_PCT_RANK', 
+    'FTM_RANK', 'FTA_RANK', 'FT_PCT_RANK', 'OREB_RANK', 'DREB_RANK', 
+    'REB_RANK', 'AST_RANK', 'TOV_RANK', 'STL_RANK', 'BLK_RANK', 
+    'BLKA_RANK', 'PF_RANK', 'PFD_RANK', 'PTS_RANK', 'PLUS_MINUS_RANK', 
+    'NBA_FANTASY_PTS_RANK', 'DD2_RANK', 'TD3_RANK', 'WNBA_FANTASY_PTS_RANK', 
+    'AVAILABLE_FLAG', 'MIN_SEC'
+]
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces requests at least `min_interval` seconds apart"""
+    
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self):
+        """Block until the caller may issue its request"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
 class WNBALiveIngestion:
-    def __init__(self):
+    def __init__(self, max_workers=8, request_delay=0.6, cache_dir=None):
         # ESPN API (Primary source - more reliable)
         self.espn_base_url = "https://site.api.espn.com/apis/site/v2/sports/basketball/wnba"
         
@@ -54,18 +93,37 @@ class WNBALiveIngestion:
         self.data_dir = Path("data")
         self.data_dir.mkdir(exist_ok=True)
         
-        # Rate limiting
-        self.request_delay = 0.6  # 600ms between requests
+        # Finalized boxscores never change, so their JSON is cached on disk
+        self.cache_dir = Path(cache_dir) if cache_dir else self.data_dir / "cache" / "espn_boxscores"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Rate limiting - shared by every worker, so the pool never issues more
+        # than one request per request_delay (600ms, as the sequential fetcher
+        # did); workers only overlap the time spent waiting on responses
+        self.request_delay = request_delay
+        self.rate_limiter = RateLimiter(request_delay)
+        self.max_workers = max_workers
+        
+        # One pooled session per worker thread
+        self._local = threading.local()
+        
+    def _get_session(self):
+        """Return this thread's pooled HTTP session"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
         
     def make_api_request(self, url, headers=None, params=None):
         """Make API request with proper rate limiting and error handling"""
         try:
-            time.sleep(self.request_delay)
+            self.rate_limiter.wait()
             
             if headers is None:
                 headers = self.espn_headers
                 
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = self._get_session().get(url, headers=headers, params=params, timeout=30)
             
             if response.status_code == 200:
                 return response.json()
@@ -145,68 +203,101 @@ class WNBALiveIngestion:
             logger.error(f"Error parsing ESPN roster for team {team_id}: {str(e)}")
             return []
     
+    def get_games_for_date(self, date_str):
+        """Get WNBA games scheduled on a single day (YYYYMMDD) from ESPN"""
+        url = f"{self.espn_base_url}/scoreboard"
+        params = {'dates': date_str}
+        
+        data = self.make_api_request(url, self.espn_headers, params)
+        
+        games = []
+        if data and 'events' in data:
+            for event in data['events']:
+                try:
+                    # Extract game data
+                    competition = event['competitions'][0]
+                    competitors = competition['competitors']
+                    
+                    home_team = next(c for c in competitors if c['homeAway'] == 'home')
+                    away_team = next(c for c in competitors if c['homeAway'] == 'away')
+                    
+                    game_info = {
+                        'game_id': event['id'],
+                        'date': event['date'][:10],  # Extract just the date part
+                        'home_team_id': home_team['team']['id'],
+                        'home_team_name': home_team['team']['displayName'],
+                        'home_team_abbr': home_team['team']['abbreviation'],
+                        'away_team_id': away_team['team']['id'], 
+                        'away_team_name': away_team['team']['displayName'],
+                        'away_team_abbr': away_team['team']['abbreviation'],
+                        'status': event['status']['type']['description']
+                    }
+                    
+                    games.append(game_info)
+                    
+                except (KeyError, IndexError, StopIteration) as e:
+                    logger.warning(f"Error parsing game data: {str(e)}")
+                    continue
+        
+        return games
+    
     def get_games_espn(self, start_date="2025-05-16", end_date="2025-09-11"):
         """Get all WNBA games from ESPN API for the 2025 season"""
         logger.info(f"Fetching WNBA games from {start_date} to {end_date}...")
         
-        all_games = []
         current_date = datetime.strptime(start_date, "%Y-%m-%d")
         end_datetime = datetime.strptime(end_date, "%Y-%m-%d")
         
+        date_strs = []
         while current_date <= end_datetime:
-            date_str = current_date.strftime("%Y%m%d")
-            url = f"{self.espn_base_url}/scoreboard"
-            params = {'dates': date_str}
-            
-            logger.info(f"Fetching games for {current_date.strftime('%Y-%m-%d')}")
-            data = self.make_api_request(url, self.espn_headers, params)
-            
-            if data and 'events' in data:
-                for event in data['events']:
-                    try:
-                        # Extract game data
-                        competition = event['competitions'][0]
-                        competitors = competition['competitors']
-                        
-                        home_team = next(c for c in competitors if c['homeAway'] == 'home')
-                        away_team = next(c for c in competitors if c['homeAway'] == 'away')
-                        
-                        game_info = {
-                            'game_id': event['id'],
-                            'date': event['date'][:10],  # Extract just the date part
-                            'home_team_id': home_team['team']['id'],
-                            'home_team_name': home_team['team']['displayName'],
-                            'home_team_abbr': home_team['team']['abbreviation'],
-                            'away_team_id': away_team['team']['id'], 
-                            'away_team_name': away_team['team']['displayName'],
-                            'away_team_abbr': away_team['team']['abbreviation'],
-                            'status': event['status']['type']['description']
-                        }
-                        
-                        all_games.append(game_info)
-                        
-                    except (KeyError, IndexError) as e:
-                        logger.warning(f"Error parsing game data: {str(e)}")
-                        continue
-            
-            # Move to next day
+            date_strs.append(current_date.strftime("%Y%m%d"))
             current_date += timedelta(days=1)
-            
-            # Add delay to be respectful to ESPN
-            time.sleep(0.1)
+        
+        # Scoreboard days are independent; the shared rate limiter keeps
+        # the pool respectful to ESPN
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            per_day = list(executor.map(self.get_games_for_date, date_strs))
+        
+        all_games = [game for games in per_day for game in games]
         
         logger.info(f"Found {len(all_games)} total games")
         return all_games
     
-    def get_player_stats_from_game(self, game_id):
-        """Get player statistics from a specific game using correct ESPN structure"""
-        logger.info(f"Fetching player stats for game {game_id}")
+    def _cache_path(self, game_id):
+        """Path of the cached summary JSON for a game"""
+        return self.cache_dir / f"{game_id}.json"
+    
+    def get_game_summary(self, game_id, final=False):
+        """Get a game's summary JSON, served from the disk cache for finalized games"""
+        cache_path = self._cache_path(game_id)
+        
+        if final and cache_path.exists():
+            try:
+                with open(cache_path, 'r') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable cache entry for game {game_id}: {str(e)}")
         
         url = f"{self.espn_base_url}/summary"
         params = {'event': game_id}
         
         data = self.make_api_request(url, self.espn_headers, params)
         
+        if data and final:
+            # Write to a temp file first so a crash never leaves a torn entry
+            tmp_path = cache_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, cache_path)
+        
+        return data
+    
+    def get_player_stats_from_game(self, game_id, final=False):
+        """Get player statistics from a specific game using correct ESPN structure"""
+        logger.info(f"Fetching player stats for game {game_id}")
+        
+        data = self.get_game_summary(game_id, final=final)
+        
         if not data:
             return []
         
@@ -356,35 +447,78 @@ class WNBALiveIngestion:
         except:
             return 0.0
     
-    def run_full_ingestion(self):
-        """Run complete ingestion process using ESPN API"""
+    def fetch_game_logs(self, games):
+        """Fetch player stats for many games concurrently, preserving game order"""
+        def fetch(game):
+            try:
+                return self.get_player_stats_from_game(game['game_id'], final=game['status'] == 'Final')
+            except Exception as e:
+                logger.error(f"Error processing game {game['game_id']}: {str(e)}")
+                return []
+        
+        all_game_logs = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for i, player_stats in enumerate(executor.map(fetch, games)):
+                all_game_logs.extend(player_stats)
+                
+                # Progress update every 10 games
+                if (i + 1) % 10 == 0:
+                    logger.info(f"Processed {i+1}/{len(games)} games, collected {len(all_game_logs)} player game logs")
+        
+        return all_game_logs
+    
+    def load_existing_game_ids(self, output_path):
+        """Return the GAME_IDs already present in the gamelog CSV"""
+        if not output_path.exists():
+            return set()
+        
+        existing = pd.read_csv(output_path, usecols=['GAME_ID'], dtype={'GAME_ID': str})
+        return set(existing['GAME_ID'].dropna())
+    
+    def get_last_game_date(self, output_path):
+        """Return the latest GAME_DATE in the gamelog CSV, or None"""
+        if not output_path.exists():
+            return None
+        
+        dates = pd.read_csv(output_path, usecols=['GAME_DATE'])['GAME_DATE']
+        last = pd.to_datetime(dates, errors='coerce').max()
+        return None if pd.isna(last) else last
+    
+    def run_full_ingestion(self, incremental=False, start_date="2025-05-16", end_date="2025-09-11"):
+        """Run complete ingestion process using ESPN API
+        
+        With incremental=True only games missing from wnba_2025_gamelogs.csv are
+        fetched, and their rows are appended to the existing file.
+        """
         logger.info("Starting WNBA live game log ingestion via ESPN API...")
         
+        output_path = self.data_dir / "wnba_2025_gamelogs.csv"
+        existing_ids = set()
+        
+        if incremental:
+            existing_ids = self.load_existing_game_ids(output_path)
+            last_date = self.get_last_game_date(output_path)
+            if last_date is not None:
+                # Re-scan the last stored day in case it was only partially final
+                start_date = max(start_date, last_date.strftime("%Y-%m-%d"))
+            # Days after today have no final games to fetch
+            end_date = min(end_date, datetime.now().strftime("%Y-%m-%d"))
+            logger.info(f"Incremental mode: {len(existing_ids)} games on file, scanning {start_date} to {end_date}")
+        
         # Get all games from the 2025 season
-        games = self.get_games_espn()
+        games = self.get_games_espn(start_date, end_date)
         if not games:
             logger.error("No games found. Aborting.")
             return False
         
-        all_game_logs = []
-        completed_games = [g for g in games if g['status'] == 'Final']
+        completed_games = [g for g in games if g['status'] == 'Final' and str(g['game_id']) not in existing_ids]
         logger.info(f"Found {len(completed_games)} completed games to process")
         
-        # Process each completed game
-        for i, game in enumerate(completed_games):  # Process all completed games
-            logger.info(f"Processing game {i+1}/{len(completed_games[:50])}: {game['away_team_abbr']} @ {game['home_team_abbr']}")
-            
-            try:
-                player_stats = self.get_player_stats_from_game(game['game_id'])
-                all_game_logs.extend(player_stats)
-                
-                # Progress update every 10 games
-                if (i + 1) % 10 == 0:
-                    logger.info(f"Processed {i+1} games, collected {len(all_game_logs)} player game logs")
-                
-            except Exception as e:
-                logger.error(f"Error processing game {game['game_id']}: {str(e)}")
-                continue
+        if incremental and not completed_games:
+            logger.info("Gamelog already up to date")
+            return True
+        
+        all_game_logs = self.fetch_game_logs(completed_games)
         
         # Convert to DataFrame and save
         if all_game_logs:
@@ -395,31 +529,18 @@ class WNBALiveIngestion:
             df = df.sort_values(['PLAYER_ID', 'GAME_DATE'])
             
             # Ensure column order matches wnba_2024_gamelogs.csv exactly
-            column_order = [
-                'SEASON_YEAR', 'PLAYER_ID', 'PLAYER_NAME', 'NICKNAME', 'TEAM_ID', 
-                'TEAM_ABBREVIATION', 'TEAM_NAME', 'GAME_ID', 'GAME_DATE', 'MATCHUP', 
-                'WL', 'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 
-                'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'TOV', 
-                'STL', 'BLK', 'BLKA', 'PF', 'PFD', 'PTS', 'PLUS_MINUS', 
-                'NBA_FANTASY_PTS', 'DD2', 'TD3', 'WNBA_FANTASY_PTS', 'GP_RANK', 
-                'W_RANK', 'L_RANK', 'W_PCT_RANK', 'MIN_RANK', 'FGM_RANK', 
-                'FGA_RANK', 'FG_PCT_RANK', 'FG3M_RANK', 'FG3A_RANK', 'FG3_PCT_RANK', 
-                'FTM_RANK', 'FTA_RANK', 'FT_PCT_RANK', 'OREB_RANK', 'DREB_RANK', 
-                'REB_RANK', 'AST_RANK', 'TOV_RANK', 'STL_RANK', 'BLK_RANK', 
-                'BLKA_RANK', 'PF_RANK', 'PFD_RANK', 'PTS_RANK', 'PLUS_MINUS_RANK', 
-                'NBA_FANTASY_PTS_RANK', 'DD2_RANK', 'TD3_RANK', 'WNBA_FANTASY_PTS_RANK', 
-                'AVAILABLE_FLAG', 'MIN_SEC'
-            ]
-            
-            df = df[column_order]
+            df = df[GAMELOG_COLUMNS]
             
             # Save to CSV following your naming convention
-            output_path = self.data_dir / "wnba_2025_gamelogs.csv"
-            df.to_csv(output_path, index=False)
+            if incremental and output_path.exists():
+                df.to_csv(output_path, mode='a', header=False, index=False)
+                logger.info(f"Appended {len(df)} game logs to {output_path}")
+            else:
+                df.to_csv(output_path, index=False)
+                logger.info(f"Successfully saved {len(df)} game logs to {output_path}")
             
-            logger.info(f"Successfully saved {len(df)} game logs to {output_path}")
             logger.info(f"Date range: {df['GAME_DATE'].min()} to {df['GAME_DATE'].max()}")
-            logger.info(f"Output format matches wnba_2024_gamelogs.csv with {len(column_order)} columns")
+            logger.info(f"Output format matches wnba_2024_gamelogs.csv with {len(GAMELOG_COLUMNS)} columns")
             logger.info(f"Players covered: {df['PLAYER_NAME'].nunique()}")
             
             return True
@@ -429,10 +550,18 @@ class WNBALiveIngestion:
 
 def main():
     """Main execution function"""
-    ingestion = WNBALiveIngestion()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Ingest 2025 WNBA game logs from ESPN')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Fetch only games missing from the existing gamelog and append them')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent request workers')
+    args = parser.parse_args()
+    
+    ingestion = WNBALiveIngestion(max_workers=args.workers)
     
     try:
-        success = ingestion.run_full_ingestion()
+        success = ingestion.run_full_ingestion(incremental=args.incremental)
         
         if success:
             logger.info("Live ingestion completed successfully!")
@@ -1,11 +1,15 @@
+import os
+import sys
+
 import pandas as pd
-import joblib
-import numpy as np
-from model_features import get_model_input_features
-from sklearn.linear_model import LogisticRegression
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from models.serving import build_player_feature_table, get_model
 
 MODEL_PATH = "models/prop_hit_predictor.joblib"
 DATA_PATH = "data/prizepicks_wnba_props.csv"
+GAMES_PATH = "data/wnba_2024_gamelogs.csv"
 OUTPUT_PATH = "data/profitable_props.csv"
 
 def implied_prob_from_odds(odds):
@@ -15,42 +19,23 @@ def implied_prob_from_odds(odds):
 def run_batch_prediction():
     print("📊 Running batch EV predictions...")
     df = pd.read_csv(DATA_PATH)
-    model = joblib.load(MODEL_PATH)
-
-    profitable_rows = []
-
-    for _, row in df.iterrows():
-        player_name = row.get("player")
-        line = row.get("line")
-        side = row.get("PICK_TYPE")
-        odds = row.get("ODDS")
-
-        try:
-            features = get_model_input_features(player_name)
-
-            # Skip if features are missing or contain NaNs
-            if features is None or np.isnan(features).any():
-                print(f"⚠️ Skipped: {player_name} (missing or invalid features)")
-                continue
-
-            proba = model.predict_proba([features])[0][1]  # probability of hitting the over
-            if side.upper() == "UNDER":
-                proba = 1 - proba
+    model = get_model(MODEL_PATH)
 
-            implied = implied_prob_from_odds(odds)
-            expected_value = 100 * (proba - implied)
+    # Latest game per player, built once for the whole board
+    model.set_player_features(build_player_feature_table(pd.read_csv(GAMES_PATH), how="latest"))
+    proba = model.score_board(df, player_col="player", date_col="game_date", side_col="PICK_TYPE")
 
-            if expected_value > 0:
-                row["MODEL_PROB"] = round(proba * 100, 2)
-                row["EXPECTED_VALUE"] = round(expected_value, 2)
-                profitable_rows.append(row)
+    for player_name in df.loc[proba.isna(), "player"]:
+        print(f"⚠️ Skipped: {player_name} (missing or invalid features)")
 
-        except Exception as e:
-            print(f"❌ Error with {player_name}: {str(e)}")
-            continue  # Skip broken rows
+    implied = df["ODDS"].astype(float).map(implied_prob_from_odds)
+    expected_value = 100 * (proba - implied)
+    profitable = expected_value > 0
 
-    if profitable_rows:
-        result_df = pd.DataFrame(profitable_rows)
+    if profitable.any():
+        result_df = df[profitable].copy()
+        result_df["MODEL_PROB"] = (proba[profitable] * 100).round(2)
+        result_df["EXPECTED_VALUE"] = expected_value[profitable].round(2)
         result_df.to_csv(OUTPUT_PATH, index=False)
         print(f"✅ Found {len(result_df)} +EV props. Saved to {OUTPUT_PATH}")
     else:
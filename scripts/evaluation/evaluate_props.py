@@ -1,8 +1,7 @@
 # scripts/evaluate_props.py
 
 import pandas as pd
-import joblib
-from scripts.model_features import FEATURE_COLUMNS
+from models.serving import build_player_feature_table, get_model
 from scripts.utils import calculate_implied_prob, calculate_ev
 
 MODEL_PATH = "models/prop_hit_predictor.joblib"
@@ -15,40 +14,30 @@ def evaluate_props():
     try:
         props = pd.read_csv(PROP_PATH)
         logs = pd.read_csv(LOG_PATH)
-        clf = joblib.load(MODEL_PATH)
+        clf = get_model(MODEL_PATH)
+        clf.set_player_features(build_player_feature_table(logs))
     except Exception as e:
         print(f"❌ Failed to load: {e}")
         return
 
     props = props[props["stat"] == "points"]  # Focus on PTS for now
-    output = []
-
-    for _, row in props.iterrows():
-        player_name = row["player"]
-        line = row["line"]
-        try:
-            # Use most recent game averages for prediction
-            recent = logs[logs["PLAYER_NAME"] == player_name]
-            if recent.empty:
-                continue
-
-            features = recent[FEATURE_COLUMNS].mean().values.reshape(1, -1)
-            prob = clf.predict_proba(features)[0][1] * 100
-            implied = calculate_implied_prob(-115)
-            ev = calculate_ev(prob, -115)
-
-            output.append({
-                "Player": player_name,
-                "Line": line,
-                "Hit Prob (%)": round(prob, 2),
-                "Implied Prob (%)": round(implied, 2),
-                "Expected Value": round(ev, 2),
-                "Model EV+": "✅" if ev > 0 else ""
-            })
-        except Exception as e:
-            print(f"⚠️ Failed to evaluate {player_name}: {e}")
-
-    df = pd.DataFrame(output)
+
+    # Score the whole board in one model call; players without logs drop out
+    probs = clf.score_board(props, player_col="player") * 100
+    scored = props[probs.notna()]
+    probs = probs[probs.notna()]
+
+    implied = calculate_implied_prob(-115)
+    ev = probs.map(lambda prob: calculate_ev(prob, -115))
+
+    df = pd.DataFrame({
+        "Player": scored["player"],
+        "Line": scored["line"],
+        "Hit Prob (%)": probs.round(2),
+        "Implied Prob (%)": round(implied, 2),
+        "Expected Value": ev.round(2),
+        "Model EV+": ev.gt(0).map({True: "✅", False: ""}),
+    })
     df.sort_values("Expected Value", ascending=False).to_csv(OUTPUT_PATH, index=False)
     print(f"✅ Saved predictions to {OUTPUT_PATH} — {len(df)} props evaluated.")
 
@@ -3,8 +3,12 @@
 import pandas as pd
 import numpy as np
 import argparse
-import joblib
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from models.serving import get_model
 
 MODEL_PATH = "models/prop_hit_predictor.joblib"
 DATA_PATH = "data/wnba_2024_gamelogs.csv"
@@ -30,7 +34,7 @@ def predict_prop(player_name, line, bet_type, odds):
         print(f"❌ Model not found at {MODEL_PATH}")
         return
     
-    model = joblib.load(MODEL_PATH)
+    model = get_model(MODEL_PATH)
     df = pd.read_csv(DATA_PATH)
 
     df["MIN"] = df["MIN_SEC"].apply(convert_min_sec)
@@ -47,10 +51,10 @@ def predict_prop(player_name, line, bet_type, odds):
         return
 
     # Average features
-    avg_features = player_df[FEATURES].mean().values.reshape(1, -1)
+    avg_features = player_df[FEATURES].mean().to_frame().T
 
     # Predict probability of hit
-    prob = model.predict_proba(avg_features)[0][1]  # Prob of hitting OVER
+    prob = model.predict_proba(avg_features)[0]  # Prob of hitting OVER
 
     if bet_type.upper() == "UNDER":
         prob = 1 - prob
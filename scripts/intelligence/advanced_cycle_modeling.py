@@ -154,6 +154,79 @@ class AdvancedCycleModeler:
             elif cycle_day <= cycle_length * 0.65:
                 return 'early'
         return 'mid'
+    
+    def calculate_advanced_cycle_phases(self, days_elapsed, start_day, cycle_length):
+        """
+        Array version of calculate_advanced_cycle_phase.
+        
+        Args:
+            days_elapsed: Days since each row's first game
+            start_day, cycle_length: Profile values per row
+        
+        Returns:
+            (phase, cycle_day, phase_confidence) arrays
+        """
+        cycle_day = ((days_elapsed + start_day - 1) % cycle_length) + 1
+        
+        conditions = [
+            cycle_day <= cycle_length * 0.18,
+            cycle_day <= cycle_length * 0.5,
+            cycle_day <= cycle_length * 0.57
+        ]
+        phase = np.select(conditions, ['menstrual', 'follicular', 'ovulation'], 'luteal')
+        confidence = np.select(conditions, [0.9, 0.85, 0.95], 0.85)
+        return phase, cycle_day, confidence
+    
+    def calculate_performance_modifiers(self, phase, cycle_type, games_played):
+        """
+        Array version of calculate_performance_modifier.
+        
+        Irregular-cycle rows draw their noise from the global RNG in row
+        order, so results match calling the scalar version row by row.
+        """
+        phase_modifiers = {
+            'menstrual': 0.95,
+            'follicular': 1.02,
+            'ovulation': 0.93,
+            'luteal': 1.05
+        }
+        modifier = pd.Series(phase).map(phase_modifiers).to_numpy(dtype=float)
+        
+        irregular = np.asarray(cycle_type) == 'irregular'
+        modifier[irregular] = modifier[irregular] + np.random.normal(0, 0.05, size=irregular.sum())
+        
+        experienced = np.asarray(games_played) > 20
+        modifier[experienced] = modifier[experienced] * 0.9 + 1.0 * 0.1
+        
+        return np.clip(modifier, 0.8, 1.2)
+    
+    def generate_risk_assessments(self, phase, cycle_day, cycle_length, modifier):
+        """Array version of generate_risk_assessment; returns (risk_tag, risk_confidence)."""
+        menstrual = phase == 'menstrual'
+        follicular = phase == 'follicular'
+        ovulation = phase == 'ovulation'
+        luteal = phase == 'luteal'
+        
+        # Phase position as in _get_phase_position
+        early = ((menstrual & (cycle_day <= 2))
+                 | (follicular & (cycle_day <= cycle_length * 0.3))
+                 | (luteal & ~(cycle_day >= cycle_length - 3) & (cycle_day <= cycle_length * 0.65)))
+        late = ((menstrual & ~(cycle_day <= 2) & (cycle_day >= 4))
+                | (follicular & ~(cycle_day <= cycle_length * 0.3) & (cycle_day >= cycle_length * 0.45))
+                | (luteal & (cycle_day >= cycle_length - 3)))
+        
+        conditions = [
+            luteal & (modifier > 1.03) & late,
+            luteal & (modifier > 1.03),
+            ovulation & (modifier < 0.95),
+            menstrual & early,
+            follicular & late
+        ]
+        tags = ['STRONG_TARGET_LUTEAL', 'TARGET_LUTEAL', 'STRONG_FADE_OVULATION',
+                'FADE_EARLY_MENSTRUAL', 'TARGET_LATE_FOLLICULAR']
+        risk_tag = np.select(conditions, tags, 'NEUTRAL')
+        risk_confidence = np.select(conditions, [0.75, 0.65, 0.70, 0.60, 0.65], 0.50)
+        return risk_tag, risk_confidence
 
 def apply_advanced_cycle_modeling(gamelogs_path, output_path):
     """
@@ -172,8 +245,8 @@ def apply_advanced_cycle_modeling(gamelogs_path, output_path):
     print("[TARS] Creating player-specific cycle profiles...")
     player_profiles = {}
     
-    for player_id in df['PLAYER_ID'].unique():
-        player_name = df[df['PLAYER_ID'] == player_id]['PLAYER_NAME'].iloc[0]
+    first_names = df.drop_duplicates('PLAYER_ID').set_index('PLAYER_ID')['PLAYER_NAME']
+    for player_id, player_name in first_names.items():
         profile = modeler.assign_player_cycle_profile(player_id, player_name)
         player_profiles[player_id] = profile
     
@@ -185,53 +258,7 @@ def apply_advanced_cycle_modeling(gamelogs_path, output_path):
     # Apply advanced cycle calculations
     print("[TARS] Calculating advanced cycle phases...")
     
-    new_columns = {
-        'adv_cycle_phase': [],
-        'adv_cycle_day': [],
-        'adv_cycle_confidence': [],
-        'adv_perf_modifier': [],
-        'adv_risk_tag': [],
-        'adv_risk_confidence': []
-    }
-    
-    for idx, row in df.iterrows():
-        player_id = row['PLAYER_ID']
-        game_date = row['GAME_DATE']
-        
-        # Get player's first game date
-        player_games = df[df['PLAYER_ID'] == player_id]
-        first_game = player_games['GAME_DATE'].min()
-        
-        # Get profile
-        profile = player_profiles[player_id]
-        
-        # Calculate phase
-        phase, cycle_day, confidence = modeler.calculate_advanced_cycle_phase(
-            game_date, first_game, profile
-        )
-        
-        # Calculate performance modifier
-        player_stats = {
-            'games_played': len(player_games[player_games['GAME_DATE'] <= game_date]),
-            'avg_fantasy': player_games['WNBA_FANTASY_PTS'].mean()
-        }
-        
-        modifier = modeler.calculate_performance_modifier(
-            phase, profile['cycle_type'], player_stats
-        )
-        
-        # Generate risk assessment
-        risk_tag, risk_conf = modeler.generate_risk_assessment(
-            phase, cycle_day, profile['cycle_length'], modifier
-        )
-        
-        # Store results
-        new_columns['adv_cycle_phase'].append(phase)
-        new_columns['adv_cycle_day'].append(cycle_day)
-        new_columns['adv_cycle_confidence'].append(confidence)
-        new_columns['adv_perf_modifier'].append(modifier)
-        new_columns['adv_risk_tag'].append(risk_tag)
-        new_columns['adv_risk_confidence'].append(risk_conf)
+    new_columns = compute_advanced_cycle_columns(df, modeler, profiles_df)
     
     # Add new columns to dataframe
     for col, values in new_columns.items():
@@ -246,6 +273,47 @@ def apply_advanced_cycle_modeling(gamelogs_path, output_path):
     
     return df
 
+def compute_advanced_cycle_columns(df, modeler, profiles_df):
+    """
+    Advanced cycle columns for every gamelog row in one pass.
+    
+    First game and games played to date come from per-player groupby
+    transforms, and each row's profile is joined by PLAYER_ID; phase,
+    modifier and risk then come from the modeler's array methods.
+    
+    Args:
+        df: Gamelogs with PLAYER_ID and datetime GAME_DATE
+        modeler: AdvancedCycleModeler (its RNG state drives irregular noise)
+        profiles_df: One profile per player (player_id, cycle_type, cycle_length, start_day)
+    
+    Returns:
+        Dict of column name -> array, aligned to df rows
+    """
+    by_player = df.groupby('PLAYER_ID')['GAME_DATE']
+    days_elapsed = (df['GAME_DATE'] - by_player.transform('min')).dt.days.to_numpy()
+    # Games on or before each date (ties count, as with <=)
+    games_played = by_player.rank(method='max').to_numpy()
+    
+    profiles = profiles_df.set_index('player_id').reindex(df['PLAYER_ID'])
+    cycle_length = profiles['cycle_length'].to_numpy()
+    
+    phase, cycle_day, confidence = modeler.calculate_advanced_cycle_phases(
+        days_elapsed, profiles['start_day'].to_numpy(), cycle_length
+    )
+    modifier = modeler.calculate_performance_modifiers(
+        phase, profiles['cycle_type'].to_numpy(), games_played
+    )
+    risk_tag, risk_conf = modeler.generate_risk_assessments(phase, cycle_day, cycle_length, modifier)
+    
+    return {
+        'adv_cycle_phase': phase,
+        'adv_cycle_day': cycle_day,
+        'adv_cycle_confidence': confidence,
+        'adv_perf_modifier': modifier,
+        'adv_risk_tag': risk_tag,
+        'adv_risk_confidence': risk_conf
+    }
+
 def generate_advanced_summary(df, profiles_df):
     """Generate summary statistics for advanced modeling."""
     
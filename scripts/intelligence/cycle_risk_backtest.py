@@ -6,10 +6,19 @@ Integration: Analyzes historical performance of risk tags vs actual outcomes
 """
 
 import pandas as pd
-import numpy as np
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 import json
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.metrics_cube import (VOLATILITY_BINS, VOLATILITY_LABELS, best_tags, build_metrics_cube,
+                               load_metrics_cube, phase_correlations, save_metrics_cube,
+                               tag_performance, volatility_accuracy)
 
 class CycleRiskBacktester:
     """
@@ -17,10 +26,32 @@ class CycleRiskBacktester:
     Validates FADE_LUTEAL, TARGET_OVULATION, and other risk signals.
     """
     
-    def __init__(self, hit_threshold: float = 0.5):
+    # Prop type -> (predicted column, actual column)
+    PROP_COLUMNS = {
+        'PTS': ('predicted_PTS', 'PTS'),
+        'REB': ('predicted_REB', 'REB'),
+        'AST': ('predicted_AST', 'AST'),
+        'fantasy_points': ('predicted_fantasy_points', 'WNBA_FANTASY_PTS')
+    }
+    
+    # Prop types whose misses are compared across volatility buckets
+    VARIANCE_PROPS = ['PTS', 'REB', 'AST']
+    
+    def __init__(self, hit_threshold: float = 0.5, signal_threshold: float = 0.55,
+                 correlation_threshold: float = 0.15, volatility_ratio: float = 1.5,
+                 volatility_bins: Sequence[float] = VOLATILITY_BINS,
+                 volatility_labels: Optional[Sequence[str]] = VOLATILITY_LABELS):
         self.hit_threshold = hit_threshold  # For over/under analysis
+        self.signal_threshold = signal_threshold  # Fade/target rate worth a recommendation
+        self.correlation_threshold = correlation_threshold  # Phase correlation worth a recommendation
+        self.volatility_ratio = volatility_ratio  # Very high vs low bucket variance ratio
+        self.volatility_bins = list(volatility_bins)
+        self.volatility_labels = volatility_labels
         self.results = {}
         self.tag_performance = {}
+        self.merged_df = None
+        self.metrics_cube = None
+        self.reported_props = None  # prop types with a predicted column in the merged props
         
     def backtest_props(self, props_df: pd.DataFrame, gamelogs_df: pd.DataFrame) -> Dict:
         """
@@ -36,26 +67,64 @@ class CycleRiskBacktester:
         print("[TARS] Initiating cycle risk tag backtest...")
         
         # Merge props with actuals
-        merged_df = self._merge_props_with_actuals(props_df, gamelogs_df)
+        self.merged_df = self._merge_props_with_actuals(props_df, gamelogs_df)
         
-        # Analyze each risk tag
-        risk_tags = merged_df['cycle_risk_tag'].unique()
+        # Aggregate every (tag, prop type, volatility bucket, phase) cell once
+        self.metrics_cube = self._build_cube()
+        
+        return self.analyze_cube()
+    
+    def rerun(self, volatility_bins: Optional[Sequence[float]] = None,
+              volatility_labels: Optional[Sequence[str]] = None, **thresholds) -> Dict:
+        """
+        Re-run the backtest with new thresholds without re-merging.
+        
+        Recommendation thresholds (signal_threshold, correlation_threshold,
+        volatility_ratio) only change how the results are read. New
+        volatility bins re-aggregate the merged props into a new cube.
+        """
+        for name, value in thresholds.items():
+            if not hasattr(self, name):
+                raise ValueError(f"Unknown threshold: {name}")
+            setattr(self, name, value)
+            
+        if volatility_bins is not None:
+            self.volatility_bins = list(volatility_bins)
+            self.volatility_labels = volatility_labels
+            if self.merged_df is None:
+                raise ValueError("New volatility bins need the merged props; run backtest_props first")
+            self.metrics_cube = self._build_cube()
+            
+        return self.analyze_cube()
+    
+    def load_cube(self, cube_path: str = 'output/cycle_risk_metrics_cube.csv') -> Dict:
+        """Analyze a metrics cube saved by an earlier backtest."""
+        self.metrics_cube = load_metrics_cube(cube_path)
+        self.reported_props = None
+        return self.analyze_cube()
+    
+    def analyze_cube(self) -> Dict:
+        """Tag, phase and volatility results from the metrics cube."""
+        self.tag_performance = tag_performance(self.metrics_cube, prop_types=self.reported_props)
         
-        for tag in risk_tags:
-            if pd.notna(tag):
-                self.tag_performance[tag] = self._analyze_risk_tag(merged_df, tag)
-                
         # Calculate overall statistics
         self.results = {
             'tag_performance': self.tag_performance,
             'best_fade_tags': self._identify_best_fade_tags(),
             'best_target_tags': self._identify_best_target_tags(),
-            'phase_correlations': self._calculate_phase_correlations(merged_df),
-            'volatility_accuracy': self._validate_volatility_scores(merged_df)
+            'phase_correlations': phase_correlations(self.metrics_cube, self.PROP_COLUMNS),
+            'volatility_accuracy': volatility_accuracy(self.metrics_cube, self.VARIANCE_PROPS)
         }
         
         return self.results
     
+    def _build_cube(self) -> pd.DataFrame:
+        # Props with a prediction are reported per tag even when their actual is missing
+        self.reported_props = [prop_type for prop_type, (pred_col, _) in self.PROP_COLUMNS.items()
+                               if pred_col in self.merged_df.columns]
+        return build_metrics_cube(self.merged_df, self.PROP_COLUMNS,
+                                  self.volatility_bins, self.volatility_labels)
+    
     def _merge_props_with_actuals(self, props_df: pd.DataFrame, 
                                   gamelogs_df: pd.DataFrame) -> pd.DataFrame:
         """Merge predicted props with actual game outcomes."""
@@ -79,179 +148,22 @@ class CycleRiskBacktester:
         
         return merged
     
-    def _analyze_risk_tag(self, df: pd.DataFrame, tag: str) -> Dict:
-        """Analyze performance of a specific risk tag."""
-        tag_data = df[df['cycle_risk_tag'] == tag].copy()
-        
-        if len(tag_data) == 0:
-            return {}
-            
-        results = {
-            'tag': tag,
-            'sample_size': len(tag_data),
-            'prop_types': {}
-        }
-        
-        # Analyze different prop types
-        for prop_type in ['PTS', 'REB', 'AST', 'fantasy_points']:
-            if f'predicted_{prop_type}' in tag_data.columns:
-                prop_results = self._analyze_prop_type(tag_data, prop_type)
-                results['prop_types'][prop_type] = prop_results
-                
-        # Calculate tag effectiveness metrics
-        results['fade_effectiveness'] = self._calculate_fade_effectiveness(tag, results)
-        results['target_effectiveness'] = self._calculate_target_effectiveness(tag, results)
-        
-        return results
-    
-    def _analyze_prop_type(self, df: pd.DataFrame, prop_type: str) -> Dict:
-        """Analyze specific prop type performance."""
-        pred_col = f'predicted_{prop_type}'
-        actual_col = prop_type if prop_type != 'fantasy_points' else 'WNBA_FANTASY_PTS'
-        
-        if pred_col not in df.columns or actual_col not in df.columns:
-            return {}
-            
-        # Remove rows with missing data
-        clean_df = df[[pred_col, actual_col]].dropna()
-        
-        if len(clean_df) == 0:
-            return {}
-            
-        # Calculate hit rates for over/under
-        clean_df['hit_over'] = clean_df[actual_col] > clean_df[pred_col]
-        clean_df['hit_under'] = clean_df[actual_col] < clean_df[pred_col]
-        clean_df['push'] = clean_df[actual_col] == clean_df[pred_col]
-        
-        # Calculate percentage differences
-        clean_df['pct_diff'] = (clean_df[actual_col] - clean_df[pred_col]) / clean_df[pred_col]
-        clean_df['pct_diff'] = clean_df['pct_diff'].replace([np.inf, -np.inf], np.nan)
-        
-        return {
-            'over_rate': clean_df['hit_over'].mean(),
-            'under_rate': clean_df['hit_under'].mean(),
-            'push_rate': clean_df['push'].mean(),
-            'avg_pct_diff': clean_df['pct_diff'].mean(),
-            'std_pct_diff': clean_df['pct_diff'].std(),
-            'sample_size': len(clean_df)
-        }
-    
-    def _calculate_fade_effectiveness(self, tag: str, results: Dict) -> float:
-        """Calculate how effective a FADE tag is."""
-        if 'FADE' not in tag:
-            return 0.0
-            
-        fade_scores = []
-        
-        for prop_type, prop_results in results['prop_types'].items():
-            if 'under_rate' in prop_results:
-                # FADE tags should have high under rates
-                fade_scores.append(prop_results['under_rate'])
-                
-        return np.mean(fade_scores) if fade_scores else 0.0
-    
-    def _calculate_target_effectiveness(self, tag: str, results: Dict) -> float:
-        """Calculate how effective a TARGET tag is."""
-        if 'TARGET' not in tag:
-            return 0.0
-            
-        target_scores = []
-        
-        for prop_type, prop_results in results['prop_types'].items():
-            if 'over_rate' in prop_results:
-                # TARGET tags should have high over rates
-                target_scores.append(prop_results['over_rate'])
-                
-        return np.mean(target_scores) if target_scores else 0.0
-    
     def _identify_best_fade_tags(self) -> List[Tuple[str, float]]:
         """Identify the most effective FADE tags."""
-        fade_tags = []
-        
-        for tag, performance in self.tag_performance.items():
-            if 'FADE' in tag and 'fade_effectiveness' in performance:
-                fade_tags.append((tag, performance['fade_effectiveness']))
-                
-        return sorted(fade_tags, key=lambda x: x[1], reverse=True)[:5]
+        return best_tags(self.tag_performance, 'FADE', 'fade_effectiveness')
     
     def _identify_best_target_tags(self) -> List[Tuple[str, float]]:
         """Identify the most effective TARGET tags."""
-        target_tags = []
-        
-        for tag, performance in self.tag_performance.items():
-            if 'TARGET' in tag and 'target_effectiveness' in performance:
-                target_tags.append((tag, performance['target_effectiveness']))
-                
-        return sorted(target_tags, key=lambda x: x[1], reverse=True)[:5]
+        return best_tags(self.tag_performance, 'TARGET', 'target_effectiveness')
     
-    def _calculate_phase_correlations(self, df: pd.DataFrame) -> Dict:
-        """Calculate correlations between cycle phases and performance."""
-        phase_correlations = {}
-        
-        # Map phases to numeric values for correlation
-        phase_map = {
-            'menstrual': 1,
-            'follicular': 2, 
-            'ovulation': 3,
-            'luteal': 4
-        }
-        
-        df['phase_numeric'] = df['cycle_phase'].map(phase_map)
-        
-        # Calculate correlations for each stat
-        for stat in ['PTS', 'REB', 'AST', 'WNBA_FANTASY_PTS']:
-            if stat in df.columns:
-                # Calculate actual vs predicted difference
-                pred_stat = f'predicted_{stat}' if stat != 'WNBA_FANTASY_PTS' else 'predicted_fantasy_points'
-                if pred_stat in df.columns:
-                    df[f'{stat}_diff'] = df[stat] - df[pred_stat]
-                    
-                    # Correlation between phase and performance difference
-                    corr = df[['phase_numeric', f'{stat}_diff']].corr().iloc[0, 1]
-                    phase_correlations[stat] = corr
-                    
-        return phase_correlations
-    
-    def _validate_volatility_scores(self, df: pd.DataFrame) -> Dict:
-        """Validate if volatility scores accurately predict variance."""
-        volatility_validation = {}
-        
-        # Group by volatility score ranges
-        df['volatility_bucket'] = pd.cut(
-            df['volatility_score'], 
-            bins=[0, 0.8, 0.9, 1.0, 1.1, 1.2, np.inf],
-            labels=['very_low', 'low', 'normal', 'high', 'very_high', 'extreme']
-        )
-        
-        for bucket in df['volatility_bucket'].unique():
-            if pd.notna(bucket):
-                bucket_data = df[df['volatility_bucket'] == bucket]
-                
-                # Calculate actual variance in outcomes
-                variances = []
-                for stat in ['PTS', 'REB', 'AST']:
-                    if f'predicted_{stat}' in bucket_data.columns:
-                        pred_col = f'predicted_{stat}'
-                        actual_col = stat
-                        
-                        # Calculate percentage variance from prediction
-                        pct_vars = np.abs(
-                            (bucket_data[actual_col] - bucket_data[pred_col]) / 
-                            bucket_data[pred_col]
-                        ).replace([np.inf, -np.inf], np.nan).dropna()
-                        
-                        if len(pct_vars) > 0:
-                            variances.append(pct_vars.mean())
-                            
-                volatility_validation[str(bucket)] = {
-                    'avg_variance': np.mean(variances) if variances else 0,
-                    'sample_size': len(bucket_data)
-                }
-                
-        return volatility_validation
-    
-    def generate_backtest_report(self, output_path: str = 'output/cycle_risk_backtest_report.json'):
-        """Generate comprehensive backtest report."""
+    def generate_backtest_report(self, output_path: str = 'output/cycle_risk_backtest_report.json',
+                                 cube_path: Optional[str] = 'output/cycle_risk_metrics_cube.csv'):
+        """Generate comprehensive backtest report (and save the metrics cube it reads from)."""
+        if cube_path and self.metrics_cube is not None:
+            save_metrics_cube(self.metrics_cube, cube_path)
+            print(f"[TARS] Metrics cube saved to {cube_path}")
+            
+        recommendations = self._generate_recommendations()
         report = {
             'generated_at': datetime.now().isoformat(),
             'summary': {
@@ -260,7 +172,7 @@ class CycleRiskBacktester:
                 'best_target_tags': self.results['best_target_tags']
             },
             'detailed_results': self.results,
-            'recommendations': self._generate_recommendations()
+            'recommendations': recommendations
         }
         
         with open(output_path, 'w') as f:
@@ -269,7 +181,7 @@ class CycleRiskBacktester:
         print(f"[TARS] Backtest report saved to {output_path}")
         
         # Print summary
-        self._print_summary()
+        self._print_summary(recommendations)
         
     def _generate_recommendations(self) -> List[str]:
         """Generate actionable recommendations from backtest."""
@@ -278,7 +190,7 @@ class CycleRiskBacktester:
         # Check FADE effectiveness
         if self.results['best_fade_tags']:
             top_fade = self.results['best_fade_tags'][0]
-            if top_fade[1] > 0.55:  # 55% under rate
+            if top_fade[1] > self.signal_threshold:  # e.g. 55% under rate
                 recommendations.append(
                     f"STRONG SIGNAL: {top_fade[0]} shows {top_fade[1]:.1%} under rate. "
                     "Consider increasing fade confidence for this tag."
@@ -287,7 +199,7 @@ class CycleRiskBacktester:
         # Check TARGET effectiveness  
         if self.results['best_target_tags']:
             top_target = self.results['best_target_tags'][0]
-            if top_target[1] > 0.55:  # 55% over rate
+            if top_target[1] > self.signal_threshold:  # e.g. 55% over rate
                 recommendations.append(
                     f"STRONG SIGNAL: {top_target[0]} shows {top_target[1]:.1%} over rate. "
                     "Consider increasing target confidence for this tag."
@@ -296,7 +208,7 @@ class CycleRiskBacktester:
         # Check phase correlations
         phase_corrs = self.results['phase_correlations']
         for stat, corr in phase_corrs.items():
-            if abs(corr) > 0.15:  # Significant correlation
+            if abs(corr) > self.correlation_threshold:  # Significant correlation
                 direction = "higher" if corr > 0 else "lower"
                 recommendations.append(
                     f"PHASE PATTERN: {stat} shows {direction} performance in later cycle phases "
@@ -308,7 +220,7 @@ class CycleRiskBacktester:
         high_vol_variance = vol_accuracy.get('very_high', {}).get('avg_variance', 0)
         low_vol_variance = vol_accuracy.get('low', {}).get('avg_variance', 0)
         
-        if high_vol_variance > low_vol_variance * 1.5:
+        if high_vol_variance > low_vol_variance * self.volatility_ratio:
             recommendations.append(
                 "VOLATILITY VALIDATED: High volatility scores correctly predict "
                 f"{(high_vol_variance/low_vol_variance - 1)*100:.0f}% more variance"
@@ -316,7 +228,7 @@ class CycleRiskBacktester:
             
         return recommendations
     
-    def _print_summary(self):
+    def _print_summary(self, recommendations: List[str]):
         """Print backtest summary to console."""
         print("\n" + "="*60)
         print("[TARS] CYCLE RISK TAG BACKTEST SUMMARY")
@@ -337,7 +249,7 @@ class CycleRiskBacktester:
                       f"(n={stats['sample_size']})")
                       
         print("\nKEY RECOMMENDATIONS:")
-        for i, rec in enumerate(self.results['recommendations'][:3], 1):
+        for i, rec in enumerate(recommendations[:3], 1):
             print(f"  {i}. {rec}")
             
         print("="*60)
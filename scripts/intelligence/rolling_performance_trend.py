@@ -8,18 +8,32 @@ Integration: Drop-in replacement for placeholder trend calculation
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, Tuple, Optional
+from typing import Tuple, Optional
+
+# Columns kept for each player's most recent games between append_games calls
+WINDOW_COLUMNS = ['player_id', 'cycle_phase', 'actual_fantasy_points', 'position']
 
 class RollingPerformanceTrend:
     """
     Calculates rolling performance trends relative to cycle phases.
     Replaces static 1.0 placeholder with actual performance deltas.
+    
+    Trends come from running per-phase sums over each player's games, so
+    every player is handled in one grouped pass. Per-phase totals and the
+    last lookback_games games of each player are kept after
+    process_all_players so later games can be added with append_games.
     """
     
     def __init__(self, lookback_games: int = 10, min_games: int = 3):
         self.lookback_games = lookback_games
         self.min_games = min_games
-        self.phase_baselines = {}
+        self.reset()
+        
+    def reset(self):
+        """Forget the games seen by process_all_players/append_games."""
+        self.phase_totals = None
+        self.games_seen = pd.Series(dtype=int)
+        self.recent_games = pd.DataFrame(columns=WINDOW_COLUMNS)
         
     def calculate_player_trends(self, player_df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -34,90 +48,186 @@ class RollingPerformanceTrend:
         # Sort by date
         player_df = player_df.sort_values('game_date').copy()
         
-        # Initialize trend column
-        player_df['rolling_perf_trend'] = 1.0
+        totals = self._phase_totals(player_df.assign(player_id=0))
+        players = np.zeros(len(player_df), dtype=int)
+        phases = player_df['cycle_phase'].to_numpy()
         
-        # Calculate phase-specific baselines
-        phase_stats = self._calculate_phase_baselines(player_df)
-        
-        # Calculate rolling trends
-        for idx in range(len(player_df)):
-            if idx < self.min_games:
-                continue
-                
-            # Get lookback window
-            start_idx = max(0, idx - self.lookback_games)
-            window = player_df.iloc[start_idx:idx]
-            
-            # Current phase
-            current_phase = player_df.iloc[idx]['cycle_phase']
-            
-            # Calculate trend
-            trend = self._calculate_trend(
-                window, 
-                current_phase, 
-                phase_stats
-            )
-            
-            player_df.loc[player_df.index[idx], 'rolling_perf_trend'] = trend
+        player_df['rolling_perf_trend'] = self._rolling_trend(
+            players,
+            phases,
+            player_df['actual_fantasy_points'].to_numpy(dtype=float),
+            np.arange(len(player_df)),
+            self._baselines(totals, players, phases)
+        )
             
         return player_df
     
-    def _calculate_phase_baselines(self, df: pd.DataFrame) -> Dict[str, Dict[str, float]]:
-        """Calculate baseline performance for each phase."""
-        phase_stats = {}
+    def _phase_totals(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Game counts and significant-minute (>10) fantasy totals per player and phase."""
+        significant = df['minutes'] > 10
+        points = df['actual_fantasy_points'].where(significant)
+        
+        totals = pd.DataFrame({
+            'player_id': df['player_id'].to_numpy(),
+            'cycle_phase': df['cycle_phase'].to_numpy(),
+            'games': 1,
+            'significant_games': significant.to_numpy(dtype=int),
+            'significant_points': points.fillna(0).to_numpy(dtype=float),
+            'scored_games': points.notna().to_numpy(dtype=int)
+        })
+        
+        return totals.groupby(['player_id', 'cycle_phase']).sum()
+    
+    def _baselines(self, totals: pd.DataFrame, players, phases) -> np.ndarray:
+        """
+        Baseline fantasy points for each row's player and phase.
         
-        for phase in df['cycle_phase'].unique():
-            phase_data = df[df['cycle_phase'] == phase]
+        A phase needs at least 2 games, one of them with significant
+        minutes; otherwise the baseline is NaN.
+        """
+        if totals is None or len(totals) == 0:
+            return np.full(len(players), np.nan)
+            
+        has_baseline = (totals['games'] >= 2) & (totals['significant_games'] > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_fantasy = (totals['significant_points'] / totals['scored_games']).where(has_baseline)
             
-            if len(phase_data) >= 2:
-                # Filter for games with significant minutes (>10)
-                significant_games = phase_data[phase_data['minutes'] > 10]
-                
-                if len(significant_games) > 0:
-                    phase_stats[phase] = {
-                        'mean_fantasy': significant_games['actual_fantasy_points'].mean(),
-                        'std_fantasy': significant_games['actual_fantasy_points'].std(),
-                        'mean_minutes': significant_games['minutes'].mean(),
-                        'game_count': len(significant_games)
-                    }
-                    
-        return phase_stats
-    
-    def _calculate_trend(self, window: pd.DataFrame, current_phase: str, 
-                        phase_stats: Dict) -> float:
+        keys = pd.MultiIndex.from_arrays([players, phases])
+        return mean_fantasy.reindex(keys).to_numpy(dtype=float)
+    
+    def _rolling_trend(self, players, phases, points, positions, baselines) -> np.ndarray:
         """
-        Calculate performance trend for current game.
+        Performance multiplier for every row (1.0 = baseline).
+        
+        The window of a game is the player's previous lookback_games games;
+        only those in the game's own phase count, weighted linearly from 0.5
+        (oldest) to 1.0 (newest). Each player/phase run is walked once with
+        running sums of points and rank-weighted points, so the window sums
+        are differences of those running totals.
         
+        Args:
+            players, phases: Player and cycle phase of each row
+            points: Fantasy points (NaN in a window makes its trend NaN)
+            positions: Game number within the player's history
+            baselines: Phase baseline of each row (see _baselines)
+            
         Returns:
-            Float representing performance multiplier (1.0 = baseline)
+            Trends bounded between 0.7 and 1.3 for stability
         """
-        if current_phase not in phase_stats:
-            return 1.0
+        n_rows = len(points)
+        trend = np.ones(n_rows)
+        if n_rows == 0:
+            return trend
             
-        # Get recent performance in same phase
-        same_phase_games = window[window['cycle_phase'] == current_phase]
+        player_codes = pd.factorize(players)[0]
+        phase_codes = pd.factorize(phases)[0]
+        run = player_codes * (phase_codes.max() + 2) + phase_codes + 1
         
-        if len(same_phase_games) < 2:
-            return 1.0
-            
-        # Calculate recent average (weighted by recency)
-        weights = np.linspace(0.5, 1.0, len(same_phase_games))
-        weighted_avg = np.average(
-            same_phase_games['actual_fantasy_points'], 
-            weights=weights
+        # Rows of each player/phase run, oldest first
+        order = np.lexsort((positions, run))
+        run = run[order]
+        position = np.asarray(positions, dtype=np.int64)[order]
+        rank = np.arange(n_rows) - np.searchsorted(run, run, side='left')
+        
+        values = points[order]
+        missing = np.isnan(values)
+        values = np.where(missing, 0.0, values)
+        
+        # Running totals over the run's earlier games
+        totals = pd.DataFrame({
+            'points': values,
+            'ranked': values * rank,
+            'missing': missing.astype(int)
+        }).groupby(run).cumsum()
+        running = totals.groupby(run).shift(fill_value=0).to_numpy(dtype=float)
+        
+        # First game of the run inside the lookback window
+        span = position.max() + self.lookback_games + 1
+        first = np.searchsorted(
+            run * span + position,
+            run * span + np.maximum(position - self.lookback_games, 0),
+            side='left'
         )
+        last = np.arange(n_rows)
         
-        # Compare to phase baseline
-        baseline = phase_stats[current_phase]['mean_fantasy']
+        window = running[last] - running[first]
+        count = last - first
+        first_rank = rank[first]
         
-        if baseline > 0:
-            trend = weighted_avg / baseline
+        baseline = np.asarray(baselines, dtype=float)[order]
+        eligible = (position >= self.min_games) & (count >= 2) & (baseline > 0)
+        
+        total = window[:, 0]
+        # Weights run 0.5 + 0.5 * k / (count - 1) over the window's games
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ranked = window[:, 1] - first_rank * total
+            weighted_avg = (0.5 * total + 0.5 * ranked / (count - 1)) / (0.75 * count)
+            ratio = np.where(window[:, 2] > 0, np.nan, weighted_avg / baseline)
+            
+        trend[order[eligible]] = np.clip(ratio[eligible], 0.7, 1.3)
+        return trend
+    
+    def _advance(self, games: pd.DataFrame) -> np.ndarray:
+        """
+        Trends for games following those already seen, updating the state.
+        
+        games must be in chronological order within each player.
+        """
+        totals = self._phase_totals(games)
+        if self.phase_totals is None:
+            self.phase_totals = totals
         else:
-            trend = 1.0
+            self.phase_totals = self.phase_totals.add(totals, fill_value=0)
             
-        # Bound between 0.7 and 1.3 for stability
-        return np.clip(trend, 0.7, 1.3)
+        players = games['player_id']
+        prior = players.map(self.games_seen).fillna(0).to_numpy(dtype=int)
+        current = pd.DataFrame({
+            'player_id': players.to_numpy(),
+            'cycle_phase': games['cycle_phase'].to_numpy(),
+            'actual_fantasy_points': games['actual_fantasy_points'].to_numpy(dtype=float),
+            'position': prior + players.groupby(players).cumcount().to_numpy()
+        })
+        
+        # Earlier games that can still fall inside a new game's window
+        history = self.recent_games[self.recent_games['player_id'].isin(current['player_id'])]
+        window = pd.concat([history, current], ignore_index=True) if len(history) else current
+        
+        trend = self._rolling_trend(
+            window['player_id'].to_numpy(),
+            window['cycle_phase'].to_numpy(),
+            window['actual_fantasy_points'].to_numpy(dtype=float),
+            window['position'].to_numpy(dtype=np.int64),
+            self._baselines(self.phase_totals, window['player_id'].to_numpy(), window['cycle_phase'].to_numpy())
+        )[len(history):]
+        
+        recent = window.sort_values(['player_id', 'position'], kind='stable')
+        recent = recent.groupby('player_id').tail(self.lookback_games)
+        others = self.recent_games[~self.recent_games['player_id'].isin(current['player_id'])]
+        self.recent_games = pd.concat([others, recent], ignore_index=True) if len(others) else recent.reset_index(drop=True)
+        self.games_seen = self.games_seen.add(players.value_counts(), fill_value=0).astype(int)
+        
+        return trend
+    
+    def append_games(self, new_games: pd.DataFrame) -> pd.DataFrame:
+        """
+        Rolling trends for games played after those already processed.
+        
+        Only the new games are scanned: their windows are filled from each
+        player's stored recent games, and the phase baselines from running
+        totals that now include the new games. The trends match what
+        process_all_players would give these rows on the combined gamelogs;
+        rows returned earlier are not revised.
+        
+        Args:
+            new_games: Gamelogs dated after every game seen so far
+            
+        Returns:
+            new_games in player/date order with added rolling_perf_trend column
+        """
+        games = new_games[new_games['player_id'].notna()]
+        games = games.sort_values(['player_id', 'game_date'], kind='stable').copy()
+        games['rolling_perf_trend'] = self._advance(games)
+        return games
     
     def process_all_players(self, gamelogs_df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -131,20 +241,16 @@ class RollingPerformanceTrend:
         """
         print(f"[TARS] Processing rolling trends for {gamelogs_df['player_id'].nunique()} players...")
         
-        # Group by player
-        processed_dfs = []
-        
-        for player_id, player_data in gamelogs_df.groupby('player_id'):
-            # Skip players with too few games
-            if len(player_data) < self.min_games:
-                player_data['rolling_perf_trend'] = 1.0
-            else:
-                player_data = self.calculate_player_trends(player_data)
-                
-            processed_dfs.append(player_data)
-            
-        # Combine all players
-        result_df = pd.concat(processed_dfs, ignore_index=True)
+        self.reset()
+        
+        # Group by player; players with too few games keep their row order
+        games = gamelogs_df[gamelogs_df['player_id'].notna()]
+        game_counts = games.groupby('player_id')['player_id'].transform('size')
+        order_key = games['game_date'].where(game_counts >= self.min_games)
+        
+        result_df = games.assign(_order=order_key).sort_values(['player_id', '_order'], kind='stable')
+        result_df = result_df.drop(columns='_order').reset_index(drop=True)
+        result_df['rolling_perf_trend'] = self._advance(result_df)
         
         # Log summary statistics
         trend_stats = result_df.groupby('cycle_phase')['rolling_perf_trend'].agg(['mean', 'std', 'count'])
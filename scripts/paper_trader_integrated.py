@@ -10,6 +10,7 @@ import json
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 
@@ -23,6 +24,7 @@ from src.result_ingester import ResultIngester
 from src.slip_optimizer import SlipOptimizer
 from src.metrics_database import MetricsDatabase
 from src.alert_system import AlertSystem, AlertType
+from core.simulation import outcome_returns
 
 # Load environment variables
 load_dotenv()
@@ -48,6 +50,7 @@ class PaperTrader:
         self.slip_optimizer = SlipOptimizer()
         self.metrics_db = MetricsDatabase()
         self.alert_system = AlertSystem()
+        self.rng = np.random.default_rng()
         
         # Configuration from environment
         self.high_roi_threshold = float(os.getenv('HIGH_ROI_THRESHOLD', '0.20'))  # 20%
@@ -225,34 +228,7 @@ class PaperTrader:
             results = self.result_ingester.ingest_results(date)
             
             # Calculate P&L (using simulation if no real results)
-            total_pnl = 0
-            winners = 0
-            
-            for trade in trades:
-                # Try to match with real result
-                result = self._match_result(trade, results)
-                
-                if result:
-                    # Use actual result
-                    if result['hit']:
-                        trade['result'] = 'won'
-                        trade['profit'] = trade['stake'] * 0.909  # -110 odds
-                        winners += 1
-                    else:
-                        trade['result'] = 'lost'
-                        trade['profit'] = -trade['stake']
-                else:
-                    # Simulate result based on confidence
-                    import random
-                    if random.random() < trade['confidence']:
-                        trade['result'] = 'won'
-                        trade['profit'] = trade['stake'] * 0.909
-                        winners += 1
-                    else:
-                        trade['result'] = 'lost'
-                        trade['profit'] = -trade['stake']
-                
-                total_pnl += trade['profit']
+            total_pnl, winners = self._settle_trades(trades, results)
             
             # Update bankroll
             self.current_bankroll += total_pnl
@@ -298,13 +274,39 @@ class PaperTrader:
             )
             raise
     
+    def _settle_trades(self, trades: List[Dict], results: List[Dict]) -> Tuple[float, int]:
+        """Settle a day's trades at -110 in one pass; returns (total P&L, winners)."""
+        if not trades:
+            return 0, 0
+        
+        index = self._index_results(results)
+        matched = [index.get((trade['player'], trade['stat_type'])) for trade in trades]
+        
+        # Use actual results where matched, otherwise simulate from confidence
+        confidence = np.array([trade['confidence'] for trade in trades], dtype=float)
+        simulated = self.rng.random(len(trades)) < confidence
+        wins = np.array([bool(result['hit']) if result else sim for result, sim in zip(matched, simulated)])
+        
+        stakes = np.array([trade['stake'] for trade in trades], dtype=float)
+        profits = stakes * outcome_returns(wins, 0.909)
+        
+        for trade, won, profit in zip(trades, wins, profits):
+            trade['result'] = 'won' if won else 'lost'
+            trade['profit'] = float(profit)
+        
+        return float(profits.sum()), int(wins.sum())
+    
+    @staticmethod
+    def _index_results(results: List[Dict]) -> Dict[Tuple, Dict]:
+        """(player_name, prop_type) -> first matching result."""
+        index = {}
+        for result in results:
+            index.setdefault((result.get('player_name'), result.get('prop_type')), result)
+        return index
+    
     def _match_result(self, trade: Dict, results: List[Dict]) -> Optional[Dict]:
         """Match a trade with its result."""
-        for result in results:
-            if (result.get('player_name') == trade['player'] and 
-                result.get('prop_type') == trade['stat_type']):
-                return result
-        return None
+        return self._index_results(results).get((trade['player'], trade['stat_type']))
     
     def _check_alerts(self, metrics: Dict):
         """Check if alerts should be triggered based on metrics."""
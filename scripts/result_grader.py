@@ -8,9 +8,13 @@ import os
 import json
 import logging
 import time
+import sys
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from functools import wraps
+import numpy as np
+import pandas as pd
 import requests
 from dotenv import load_dotenv
 from twilio.rest import Client
@@ -18,6 +22,13 @@ from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.grading import grade_legs, pick_sides
+
 # Load environment variables
 load_dotenv()
 
@@ -360,6 +371,57 @@ class EnhancedResultGrader:
             logger.error(f"Error grading slip {slip.get('slip_id', 'unknown')}: {e}")
             return 'ERROR', str(e), {}
     
+    def grade_slips(self, slips: List[Dict], results: Dict) -> List[Tuple[str, str, Dict]]:
+        """Grade many slips at once; same output as grade_slip for each slip"""
+        if not slips:
+            return []
+        
+        frame = pd.DataFrame({
+            'player': [slip.get('player', '') for slip in slips],
+            'prop_type': [slip.get('prop_type', '') for slip in slips],
+            'pick': [slip.get('pick', '') for slip in slips],
+            'line': pd.to_numeric(pd.Series([slip.get('line', 0) for slip in slips], dtype=object),
+                                  errors='coerce'),
+        })
+        # Results are keyed "{player}_{prop_type}"; match on that exact key
+        frame['key'] = frame['player'].astype(str) + '_' + frame['prop_type'].astype(str)
+        actual_values = [value.get('actual_value', 0) if isinstance(value, dict) else None
+                         for value in results.values()]
+        actuals = pd.DataFrame({
+            'key': list(results.keys()),
+            # Only plain numbers are compared here; anything else takes the scalar path
+            'actual': [v if isinstance(v, (int, float)) else np.nan for v in actual_values],
+        })
+        graded = grade_legs(frame, actuals, ['key'], sides=pick_sides(frame['pick'], over='OVER', under='UNDER'))
+        
+        has_prop = (frame['player'].astype(bool) & frame['prop_type'].astype(bool)).to_numpy()
+        found = has_prop & frame['key'].isin(actuals['key']).to_numpy()
+        is_win = (graded['result'] == 'won').to_numpy()
+        
+        grades = []
+        for i, slip in enumerate(slips):
+            if not found[i] or np.isnan(frame['line'].iat[i]):
+                # No prop result (game result / error path) or an unparseable line
+                grades.append(self.grade_slip(slip, results))
+                continue
+            
+            pick = frame['pick'].iat[i]
+            if pick not in ('OVER', 'UNDER'):
+                grades.append(('PASS', 'No pick made', {}))
+                continue
+            if graded['result'].iat[i] is None:
+                # Non-numeric actual value; keep the scalar path's error handling
+                grades.append(self.grade_slip(slip, results))
+                continue
+            
+            actual = results[frame['key'].iat[i]].get('actual_value', 0)
+            line = float(frame['line'].iat[i])
+            grade = 'WIN' if is_win[i] else 'LOSS'
+            details = f"{slip.get('player', '')} {slip.get('prop_type', '')}: {actual} vs {line} ({pick})"
+            grades.append((grade, details, {'actual_value': actual, 'line': line, 'pick': pick}))
+        
+        return grades
+    
     @exponential_backoff_retry(max_retries=3)
     def update_slip_by_id(self, slip: Dict, grade: str, details: str, metadata: Dict):
         """Update a specific slip row by slip_id"""
@@ -513,12 +575,10 @@ class EnhancedResultGrader:
             
             # Grade each slip
             logger.info(f"ðŸ“ Grading {len(slips)} slips...")
-            grades = []
+            grades = self.grade_slips(slips, results)
             
-            for slip in slips:
+            for slip, (grade, details, metadata) in zip(slips, grades):
                 slip_id = slip.get('slip_id', slip.get('id', 'unknown'))
-                grade, details, metadata = self.grade_slip(slip, results)
-                grades.append((grade, details, metadata))
                 
                 # Update slip in sheet
                 self.update_slip_by_id(slip, grade, details, metadata)
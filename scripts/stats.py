@@ -10,12 +10,16 @@ import logging
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 import click
 import plotly.graph_objects as go
 from plotly.io import to_html
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from core.bets_log_store import BetsLogStore, daily_aggregates, normalize_bets_log
+
 # Load environment variables
 load_dotenv()
 
@@ -39,6 +43,7 @@ class StatsGenerator:
         self.data_path = Path('data')
         self.metrics_path = self.data_path / 'metrics'
         self.bets_log_path = Path('bets_log.csv')
+        self.bets_log_store = BetsLogStore(self.data_path / 'bets_log_store')
         
     def validate_date(self, date_str: str) -> datetime:
         """Validate and parse date string"""
@@ -47,6 +52,33 @@ class StatsGenerator:
         except ValueError:
             raise ValueError(f"Invalid date format: {date_str}. Use YYYY-MM-DD")
     
+    def date_bounds(self, days: int = 7, start_date: Optional[str] = None,
+                    end_date: Optional[str] = None) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        """Inclusive (start, end) timestamps of a days or start/end query"""
+        if start_date and end_date:
+            start = pd.to_datetime(start_date).tz_localize(None)
+            # Make the end date inclusive
+            end = pd.to_datetime(end_date).tz_localize(None) + timedelta(days=1, microseconds=-1)
+        else:
+            # Default: the last `days` days from now, including all of today
+            now = pd.Timestamp.now().tz_localize(None)
+            start = now - timedelta(days=days)
+            end = now + timedelta(days=1) - pd.Timedelta(1, 'ns')
+        return start, end
+
+    def _store_ready(self) -> bool:
+        """Sync the Parquet store with the bets log; False when the CSV has to be read instead"""
+        if not self.bets_log_store.available():
+            return False
+        try:
+            self.bets_log_store.sync(self.bets_log_path)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Bets log store unavailable, reading CSV: {e}")
+            return False
+        return bool(self.bets_log_store.manifest().get('date_column'))
+
     def load_data(self, days: int = 7, start_date: Optional[str] = None, 
                   end_date: Optional[str] = None) -> Optional[pd.DataFrame]:
         """Load betting data for the specified period"""
@@ -57,44 +89,20 @@ class StatsGenerator:
             return pd.DataFrame()
             
         try:
-            # Load all data from CSV
-            df = pd.read_csv(self.bets_log_path)
-            
-            # If dataframe is empty, return it as is
-            if df.empty:
-                return df
-            
-            # Ensure we have a date column
-            if 'date' in df.columns:
-                # Convert to datetime and ensure timezone naive
-                df['date'] = pd.to_datetime(df['date'])
-                # If dates have timezone info, convert to UTC then remove timezone
-                if hasattr(df['date'].iloc[0], 'tz') and df['date'].iloc[0].tz is not None:
-                    df['date'] = df['date'].dt.tz_convert('UTC').dt.tz_localize(None)
-                else:
-                    # Ensure timezone naive
-                    df['date'] = df['date'].dt.tz_localize(None)
-            else:
-                # If no date column, return all data
-                return df
-            
-            # Apply date filtering
-            if start_date and end_date:
-                start = pd.to_datetime(start_date).tz_localize(None)
-                end = pd.to_datetime(end_date).tz_localize(None)
-                # Make the end date inclusive
-                end = end + timedelta(days=1, microseconds=-1)
-                mask = (df['date'] >= start) & (df['date'] <= end)
-                df = df[mask]
+            start, end = self.date_bounds(days, start_date, end_date)
+
+            if self._store_ready():
+                # Only the partitions overlapping the range are read
+                df = self.bets_log_store.read(start, end)
             else:
-                # Default: filter by days from today
-                # Get the current time without timezone
-                now = pd.Timestamp.now().tz_localize(None)
-                start_date = now - timedelta(days=days)
-                # Include all of today
-                end_date = now + timedelta(days=1)
-                mask = (df['date'] >= start_date) & (df['date'] < end_date)
-                df = df[mask]
+                df = pd.read_csv(self.bets_log_path)
+
+                # If dataframe is empty or has no dates, return all of it
+                if df.empty or 'date' not in df.columns:
+                    return df
+
+                df = normalize_bets_log(df)
+                df = df[(df['date'] >= start) & (df['date'] <= end)]
             
             logger.info(f"Loaded {len(df)} records after date filtering")
             return df
@@ -102,6 +110,26 @@ class StatsGenerator:
         except Exception as e:
             logger.error(f"Error loading data: {e}")
             return pd.DataFrame()
+
+    def load_daily_stats(self, days: int = 7, start_date: Optional[str] = None,
+                         end_date: Optional[str] = None) -> pd.DataFrame:
+        """
+        Daily statistics for the bets load_data returns, from the store's cached
+        daily aggregates when available
+        """
+        start, end = self.date_bounds(days, start_date, end_date)
+        if self.bets_log_path.exists() and self._store_ready():
+            # A --days window starts mid-day: that day's rows in the window are
+            # aggregated here, the whole days after it come from the cache
+            whole_days_from = start.ceil('D')
+            daily = self.bets_log_store.daily_range(whole_days_from, end)
+            if whole_days_from > start:
+                first_day_end = min(end, whole_days_from - pd.Timedelta(1, 'ns'))
+                first_day = daily_aggregates(self.bets_log_store.read(start, first_day_end))
+                frames = [frame for frame in (first_day, daily) if not frame.empty]
+                daily = pd.concat(frames, ignore_index=True) if frames else daily
+            return self._daily_stats_frame(daily)
+        return self.calculate_daily_stats(self.load_data(days, start_date, end_date))
     
     def calculate_roi(self, df: pd.DataFrame) -> float:
         """Calculate ROI from betting data"""
@@ -187,29 +215,24 @@ class StatsGenerator:
                 'roi_percent': stats['roi_percent']
             }])
         
-        # Convert date to date only (no time)
-        df = df.copy()
-        df['date'] = pd.to_datetime(df['date']).dt.date
-        
-        # Handle column name variations
-        stake_col = 'stake' if 'stake' in df.columns else 'bet_amount'
-        payout_col = 'payout' if 'payout' in df.columns else 'win_amount'
-        
-        # Group by date and calculate stats
-        daily_stats = df.groupby('date').agg({
-            stake_col: ['count', 'sum'],
-            payout_col: 'sum'
-        }).reset_index()
-        
-        # Flatten column names
-        daily_stats.columns = ['date', 'bet_count', 'total_stake', 'total_payout']
+        return self._daily_stats_frame(daily_aggregates(df))
+
+    @staticmethod
+    def _daily_stats_frame(daily: pd.DataFrame) -> pd.DataFrame:
+        """Daily statistics columns from additive daily aggregates"""
+        daily_stats = pd.DataFrame({
+            'date': daily['date'].dt.date,
+            'bet_count': daily['bet_count'],
+            'total_stake': daily['total_stake'],
+            'total_payout': daily['total_payout']
+        })
         
         # Calculate derived metrics
         daily_stats['net_profit'] = daily_stats['total_payout'] - daily_stats['total_stake']
-        daily_stats['roi_percent'] = daily_stats.apply(
-            lambda row: ((row['total_payout'] - row['total_stake']) / row['total_stake'] * 100) 
-            if row['total_stake'] > 0 else 0.0, axis=1
-        )
+        stake = daily_stats['total_stake'].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roi = daily_stats['net_profit'].to_numpy(dtype=float) / stake * 100
+        daily_stats['roi_percent'] = np.where(stake > 0, roi, 0.0)
         
         return daily_stats
 
@@ -310,8 +333,9 @@ class StatsGenerator:
 @click.option('--output', '-o', type=click.Path(), help='Output file path')
 @click.option('--date', type=str, help='Analyze specific date (YYYY-MM-DD)')
 @click.option('--range', 'date_range', type=int, help='Analyze last N days')
+@click.option('--daily', is_flag=True, help='Show per-day totals in the table output')
 @click.option('--help', '-h', is_flag=True, help='Show help message')
-def cli(days, format, output, date, date_range, help):
+def cli(days, format, output, date, date_range, daily, help):
     """PhaseGrid Stats CLI - Generate betting statistics reports"""
     
     if help:
@@ -326,15 +350,14 @@ def cli(days, format, output, date, date_range, help):
         # Determine date range
         if date:
             # Single date analysis
-            start_date = date
-            end_date = date
-            df = generator.load_data(start_date=start_date, end_date=end_date)
+            period = {'start_date': date, 'end_date': date}
         elif date_range:
             # Range-based analysis
-            df = generator.load_data(days=date_range)
+            period = {'days': date_range}
         else:
             # Default days-based analysis
-            df = generator.load_data(days=days)
+            period = {'days': days}
+        df = generator.load_data(**period)
         
         if df is None:
             click.echo("No betting data found.", err=True)
@@ -387,6 +410,15 @@ def cli(days, format, output, date, date_range, help):
                 else:
                     click.echo(f"{key:.<20} {value:>10}")
             click.echo("=" * 40)
+
+            if daily:
+                # Served from the cached daily aggregates when the store is built
+                daily_stats = generator.load_daily_stats(**period)
+                click.echo("\nDaily Breakdown")
+                if daily_stats.empty:
+                    click.echo("No bets in this period")
+                else:
+                    click.echo(daily_stats.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
             
             if output:
                 # Also save as HTML if output specified
@@ -8,12 +8,25 @@ import pandas as pd
 import numpy as np
 import json
 import os
+import sys
+from pathlib import Path
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.simulation import (annualized_sharpe, grouped_metrics, max_drawdown, outcome_returns,
+                             replay_seasons, simulate_bankroll)
+
+# Win pays 90% of the stake
+PAYOUT_RATIO = 0.9
+
 class BacktestEngine:
     def __init__(self, starting_bankroll=1000):
         """Initialize backtest engine with starting bankroll"""
@@ -89,12 +102,75 @@ class BacktestEngine:
         """Run backtest on all bets"""
         print("\n🎲 Running Backtest...")
         
-        for idx, row in betting_card_df.iterrows():
-            if pd.notna(row.get('bet_percentage', None)) and row['bet_percentage'] > 0:
-                self.calculate_bet_outcome(row)
+        bets = self._active_bets(betting_card_df)
+        if not bets.empty:
+            is_win = (bets['actual_result'] > bets['line']).to_numpy()
+            path = simulate_bankroll(bets['bet_percentage'].to_numpy(dtype=float),
+                                     outcome_returns(is_win, PAYOUT_RATIO), self.bankroll)
+            
+            results = pd.DataFrame({
+                'player_name': bets['player_name'].to_numpy(),
+                'stat_type': bets['stat_type'].to_numpy(),
+                'line': bets['line'].to_numpy(),
+                'prediction': self._column(bets, 'adjusted_prediction', np.nan),
+                'actual': bets['actual_result'].to_numpy(),
+                'is_win': is_win,
+                'bet_percentage': bets['bet_percentage'].to_numpy(),
+                'bet_size': path['bet_size'],
+                'profit': path['profit'],
+                'bankroll_after': path['bankroll'],
+                'phase': self._column(bets, 'adv_phase', 'unknown'),
+                'risk_tag': self._column(bets, 'adv_risk_tag', 'unknown'),
+                'kelly_fraction': self._column(bets, 'kelly_fraction', 0),
+                'kelly_used': self._column(bets, 'kelly_used', 0)
+            })
+            
+            self.bankroll = float(path['bankroll'][-1])
+            self.bankroll_history.extend(path['bankroll'].tolist())
+            self.daily_returns.extend(path['bet_return'].tolist())
+            self.results.extend(results.to_dict('records'))
         
         print(f"✅ Processed {len(self.results)} bets")
         print(f"💰 Final bankroll: ${self.bankroll:.2f}")
+    
+    @staticmethod
+    def _active_bets(betting_card_df):
+        """Rows with a positive bet percentage, in card order"""
+        if 'bet_percentage' not in betting_card_df.columns:
+            return betting_card_df.iloc[:0]
+        bet_pct = pd.to_numeric(betting_card_df['bet_percentage'], errors='coerce')
+        return betting_card_df[bet_pct.notna() & (bet_pct > 0)]
+    
+    @staticmethod
+    def _column(df, column, default):
+        """Column values, or the default for every row when the column is absent"""
+        if column in df.columns:
+            return df[column].to_numpy()
+        return np.full(len(df), default, dtype=object if isinstance(default, str) else float)
+    
+    def monte_carlo(self, betting_card_df, n_replays=1000, hit_probability=None, seed=None):
+        """
+        Replay the card's staking plan over many random seasons.
+        
+        Args:
+            betting_card_df: Card with bet_percentage (and actual results for the default hit rate)
+            n_replays: Number of simulated seasons
+            hit_probability: Win probability per bet (scalar or column); defaults to the
+                card's observed win rate
+            seed: RNG seed for reproducible replays
+        
+        Returns:
+            DataFrame with one row per replay: final_bankroll, total_profit, max_drawdown, wins
+        """
+        bets = self._active_bets(betting_card_df)
+        if hit_probability is None:
+            hit_probability = float((bets['actual_result'] > bets['line']).mean()) if len(bets) else 0.0
+        elif isinstance(hit_probability, str):
+            hit_probability = bets[hit_probability].to_numpy(dtype=float)
+        
+        return replay_seasons(bets['bet_percentage'].to_numpy(dtype=float), hit_probability,
+                              n_replays=n_replays, payout_ratio=PAYOUT_RATIO,
+                              starting_bankroll=self.starting_bankroll, seed=seed)
         
     def calculate_metrics(self):
         """Calculate overall performance metrics"""
@@ -113,29 +189,20 @@ class BacktestEngine:
         roi = total_profit / self.starting_bankroll
         
         # Drawdown calculation
-        bankroll_series = pd.Series(self.bankroll_history)
-        rolling_max = bankroll_series.expanding().max()
-        drawdown = (bankroll_series - rolling_max) / rolling_max
-        max_drawdown = abs(drawdown.min())
+        max_dd = max_drawdown(self.bankroll_history[1:], self.bankroll_history[0])
         
         # Average bet percentage
         avg_bet_pct = df['bet_percentage'].mean()
         
         # Sharpe ratio (using 0% risk-free rate)
-        if len(self.daily_returns) > 1:
-            returns_array = np.array(self.daily_returns)
-            avg_return = np.mean(returns_array)
-            std_return = np.std(returns_array)
-            sharpe_ratio = avg_return / std_return * np.sqrt(252) if std_return > 0 else np.nan
-        else:
-            sharpe_ratio = np.nan
+        sharpe_ratio = annualized_sharpe(self.daily_returns)
         
         metrics = {
             'total_bets': total_bets,
             'total_profit': round(total_profit, 2),
             'final_bankroll': round(self.bankroll, 2),
             'win_rate': round(win_rate, 3),
-            'max_drawdown': round(max_drawdown, 3),
+            'max_drawdown': round(max_dd, 3),
             'avg_bet_pct': round(avg_bet_pct, 3),
             'sharpe_ratio': round(sharpe_ratio, 2) if not np.isnan(sharpe_ratio) else 'NaN',
             'roi': round(roi, 3)
@@ -148,68 +215,14 @@ class BacktestEngine:
         if not self.results:
             return None
         
-        df = pd.DataFrame(self.results)
-        phase_metrics = []
-        
-        for phase in df['phase'].unique():
-            if phase and phase != 'unknown':
-                phase_df = df[df['phase'] == phase]
-                
-                total_bets = len(phase_df)
-                if total_bets > 0:
-                    wins = phase_df['is_win'].sum()
-                    win_rate = wins / total_bets
-                    profit = phase_df['profit'].sum()
-                    avg_bet = phase_df['bet_percentage'].mean()
-                    
-                    # Phase-specific Sharpe
-                    phase_returns = phase_df['profit'] / phase_df['bet_size']
-                    phase_returns = phase_returns[phase_returns.notna()]
-                    
-                    if len(phase_returns) > 1:
-                        sharpe = phase_returns.mean() / phase_returns.std() * np.sqrt(252)
-                    else:
-                        sharpe = np.nan
-                    
-                    phase_metrics.append({
-                        'phase': phase,
-                        'total_bets': total_bets,
-                        'win_rate': round(win_rate, 3),
-                        'profit': round(profit, 2),
-                        'avg_bet': round(avg_bet, 3),
-                        'sharpe_ratio': round(sharpe, 2) if not np.isnan(sharpe) else 'NaN'
-                    })
-        
-        return pd.DataFrame(phase_metrics)
+        return grouped_metrics(pd.DataFrame(self.results), 'phase')
     
     def calculate_metrics_by_risk_tag(self):
         """Calculate metrics grouped by risk tag"""
         if not self.results:
             return None
         
-        df = pd.DataFrame(self.results)
-        risk_metrics = []
-        
-        for risk_tag in df['risk_tag'].unique():
-            if risk_tag and risk_tag != 'unknown':
-                risk_df = df[df['risk_tag'] == risk_tag]
-                
-                total_bets = len(risk_df)
-                if total_bets > 0:
-                    wins = risk_df['is_win'].sum()
-                    win_rate = wins / total_bets
-                    profit = risk_df['profit'].sum()
-                    avg_bet = risk_df['bet_percentage'].mean()
-                    
-                    risk_metrics.append({
-                        'risk_tag': risk_tag,
-                        'total_bets': total_bets,
-                        'win_rate': round(win_rate, 3),
-                        'profit': round(profit, 2),
-                        'avg_bet': round(avg_bet, 3)
-                    })
-        
-        return pd.DataFrame(risk_metrics)
+        return grouped_metrics(pd.DataFrame(self.results), 'risk_tag', sharpe=False)
     
     def plot_bankroll_curve(self, save_path='output/bankroll_curve.png'):
         """Plot bankroll progression over time"""
@@ -11,13 +11,22 @@ This module calculates optimal bet sizes for WNBA prop bets using:
 
 import pandas as pd
 import numpy as np
+import sys
 from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.risk_engine import card_risk
+
 class BankrollOptimizer:
     def __init__(self, min_bet_pct=0.005, max_bet_pct=0.025, payout=0.9, kelly_fraction=0.25,
-                 max_bets_per_combo=5, max_bets_per_player=2):
+                 max_bets_per_combo=5, max_bets_per_player=2, max_bets_per_game=None,
+                 game_col='game_id'):
         """
         Initialize bankroll optimizer with betting constraints
         
@@ -28,6 +37,8 @@ class BankrollOptimizer:
             kelly_fraction: Fraction of Kelly to use (default 0.25 for 1/4 Kelly)
             max_bets_per_combo: Maximum bets per phase/risk combination (default 5)
             max_bets_per_player: Maximum bets per player (default 2)
+            max_bets_per_game: Maximum bets per game (default None, no cap)
+            game_col: Column identifying the game for max_bets_per_game
         """
         self.min_bet_pct = min_bet_pct
         self.max_bet_pct = max_bet_pct
@@ -35,6 +46,8 @@ class BankrollOptimizer:
         self.kelly_fraction = kelly_fraction  # Use fractional Kelly for safety
         self.max_bets_per_combo = max_bets_per_combo
         self.max_bets_per_player = max_bets_per_player
+        self.max_bets_per_game = max_bets_per_game
+        self.game_col = game_col
         
     def load_data(self):
         """Load props data and cycle validation summary"""
@@ -162,10 +175,160 @@ class BankrollOptimizer:
             # Return safe defaults
             return 0.0, self.min_bet_pct, 0.25
     
+    def _validation_columns(self):
+        """Phase and risk tag columns of the validation summary (None when absent)"""
+        columns = self.validation_summary.columns
+        phase_col = next((c for c in ('adv_phase', 'phase', 'cycle_phase') if c in columns), None)
+        risk_col = next((c for c in ('adv_risk_tag', 'risk_tag', 'cycle_risk_tag') if c in columns), None)
+        return phase_col, risk_col
+    
+    @staticmethod
+    def _first_column(df, columns, default):
+        """Values of the first column present, or the default for every row"""
+        for column in columns:
+            if column in df.columns:
+                return df[column]
+        return pd.Series(default, index=df.index)
+    
+    @staticmethod
+    def _coalesce(df, primary, fallback):
+        """primary where it is set, else fallback"""
+        if primary not in df.columns:
+            return df[fallback]
+        if fallback not in df.columns:
+            return df[primary]
+        return df[primary].where(df[primary].notna(), df[fallback])
+    
+    def score_props(self, props_df):
+        """
+        Size every prop in one pass
+        
+        Validation stats are looked up once per prop by (phase, risk tag);
+        the first matching summary row wins and unmatched combos use a 50%
+        win rate with a 4.0 std dev. Kelly, volatility, confidence and
+        dynamic Kelly adjustments then run as arrays, matching
+        calculate_bet_percentage.
+        
+        Returns:
+            DataFrame of card rows in props order
+        """
+        phase = self._coalesce(props_df, 'adv_phase', 'cycle_phase')
+        risk_tag = self._coalesce(props_df, 'adv_risk_tag', 'cycle_risk_tag')
+        
+        # Join validation stats on (phase, risk tag)
+        win_rate = np.full(len(props_df), 0.5)
+        sizing_std = np.full(len(props_df), 4.0)
+        card_std = np.full(len(props_df), 4.0)
+        matched = np.zeros(len(props_df), dtype=bool)
+        
+        phase_col_val, risk_col_val = self._validation_columns()
+        if phase_col_val and risk_col_val:
+            summary = self.validation_summary.dropna(subset=[phase_col_val, risk_col_val])
+            summary = summary.drop_duplicates([phase_col_val, risk_col_val])
+            keys = pd.MultiIndex.from_frame(summary[[phase_col_val, risk_col_val]])
+            position = keys.get_indexer(pd.MultiIndex.from_arrays([phase, risk_tag]))
+            matched = position >= 0
+            rows = position[matched]
+            
+            win_rate[matched] = summary['win_rate'].to_numpy(dtype=float)[rows]
+            sizing_std[matched] = self._first_column(summary, ['std_dev', 'actual_std'], 3.0).to_numpy(dtype=float)[rows]
+            card_std[matched] = self._first_column(summary, ['actual_std', 'std_dev'], 4.0).to_numpy(dtype=float)[rows]
+        else:
+            print(f"Warning: Could not find phase/risk columns in validation summary")
+            print(f"Looking for phase in {self.validation_summary.columns.tolist()}")
+        
+        unmatched = pd.DataFrame({'phase': phase, 'risk': risk_tag})[~matched].drop_duplicates()
+        for combo_phase, combo_risk in unmatched.itertuples(index=False):
+            print(f"Warning: No validation data for {combo_phase}/{combo_risk}")
+        
+        confidence_series = self._first_column(props_df, ['confidence', 'adv_confidence', 'confidence_score'], 0.7)
+        confidence = confidence_series.to_numpy(dtype=float)
+        
+        with np.errstate(invalid='ignore'):
+            # Kelly: f = (p*b - q) / b, zero without an edge
+            edge = (win_rate * self.payout) - (1 - win_rate)
+            kelly = edge / self.payout
+            kelly = np.where((win_rate <= 0) | (win_rate >= 1) | ~(kelly > 0), 0.0, kelly)
+            
+            # Volatility: up to 50% smaller for high std dev
+            volatility = (sizing_std - 2) / 8
+            kelly_adjusted = kelly * (1 - np.where(volatility < 0.5, volatility, 0.5))
+            
+            # Confidence: 0.5 -> 0, 1.0 -> 1, floored at 30%
+            confidence_factor = (confidence - 0.5) * 2
+            kelly_adjusted = kelly_adjusted * np.where(confidence_factor > 0.3, confidence_factor, 0.3)
+            
+            # Dynamic fractional Kelly (1/3, 1/4 or 1/5)
+            kelly_used = np.select([confidence > 0.8, confidence > 0.7], [0.33, 0.25], 0.20)
+            kelly_adjusted = kelly_adjusted * kelly_used
+            
+            bet_percentage = np.clip(kelly_adjusted, self.min_bet_pct, self.max_bet_pct)
+            recommendation = np.where((kelly > 0.05) & (confidence > 0.65), 'BET', 'NO BET')
+        
+        if len(props_df):
+            print(f"\nDEBUG - First prop calculation:")
+            print(f"  Kelly fraction: {kelly[0]:.3f}")
+            print(f"  Bet percentage: {bet_percentage[0]:.3f}")
+            print(f"  Kelly used: {kelly_used[0]:.0%}")
+            print(f"  Confidence: {confidence[0]:.1%}")
+        
+        kelly_fraction = np.round(kelly, 3)
+        if len(kelly) and (kelly == 0).all():
+            kelly_fraction = kelly_fraction.astype(int)
+        
+        return pd.DataFrame({
+            'player_name': props_df['player_name'].to_numpy(),
+            'stat_type': props_df['stat_type'].to_numpy(),
+            'line': props_df['line'].to_numpy(),
+            'adjusted_prediction': self._first_column(
+                props_df, ['adjusted_prediction', 'predicted_value'], 0).to_numpy(),
+            'adv_phase': phase.to_numpy(),
+            'adv_risk_tag': risk_tag.to_numpy(),
+            'win_rate': win_rate,
+            'std_dev': card_std,
+            'kelly_fraction': kelly_fraction,
+            'kelly_used': np.round(kelly_used, 2),
+            'bet_percentage': np.round(bet_percentage, 3),
+            'confidence': confidence_series.to_numpy(),
+            'recommendation': recommendation
+        })
+    
+    @staticmethod
+    def _within_caps(caps):
+        """
+        Greedy selection under per-group caps
+        
+        Rows are taken in order and skipped once any of their groups is
+        full. Each pass counts earlier selected rows per group with a
+        grouped cumulative sum; passes repeat until the selection is stable
+        (each pass fixes at least one more leading row).
+        
+        Args:
+            caps: (group codes, cap) pairs aligned to the rows
+        
+        Returns:
+            (selected mask, mask of rows passing the first cap)
+        """
+        n_rows = len(caps[0][0])
+        selected = np.ones(n_rows, dtype=bool)
+        while True:
+            passes = []
+            for codes, cap in caps:
+                taken = pd.Series(selected.astype(int)).groupby(codes).cumsum().to_numpy() - selected
+                passes.append(taken < cap)
+            allowed = np.logical_and.reduce(passes)
+            if (allowed == selected).all():
+                return selected, passes[0]
+            selected = allowed
+    
     def apply_diversification(self, betting_card):
         """
         Apply diversification rules to limit concentration risk
         
+        Bets are taken by descending bet_percentage while their phase/risk
+        combination, player (and game, when max_bets_per_game is set) are
+        under their caps.
+        
         Returns:
             DataFrame with diversification rules applied
         """
@@ -179,45 +342,25 @@ class BankrollOptimizer:
         # Sort by bet_percentage to prioritize highest value bets
         bet_rows = bet_rows.sort_values('bet_percentage', ascending=False)
         
-        # Track counts for diversification
-        phase_risk_counts = {}
-        player_counts = {}
-        selected_bets = []
-        
         print("\nApplying diversification rules...")
         
-        for idx, row in bet_rows.iterrows():
-            # Create phase/risk key
-            phase_risk_key = f"{row['adv_phase']}_{row['adv_risk_tag']}"
-            
-            # Check phase/risk limit
-            if phase_risk_key not in phase_risk_counts:
-                phase_risk_counts[phase_risk_key] = 0
-            
-            if phase_risk_counts[phase_risk_key] >= self.max_bets_per_combo:
-                continue
-            
-            # Check player limit
-            player = row['player_name']
-            if player not in player_counts:
-                player_counts[player] = 0
-                
-            if player_counts[player] >= self.max_bets_per_player:
-                continue
-            
-            # This bet passes diversification rules
-            selected_bets.append(row)
-            phase_risk_counts[phase_risk_key] += 1
-            player_counts[player] += 1
+        combos = bet_rows.groupby(['adv_phase', 'adv_risk_tag'], sort=False, dropna=False).ngroup().to_numpy()
+        players = bet_rows.groupby('player_name', sort=False, dropna=False).ngroup().to_numpy()
+        caps = [(combos, self.max_bets_per_combo), (players, self.max_bets_per_player)]
+        if self.max_bets_per_game is not None and self.game_col in bet_rows.columns:
+            games = bet_rows.groupby(self.game_col, sort=False, dropna=False).ngroup().to_numpy()
+            caps.append((games, self.max_bets_per_game))
+        
+        selected, combo_open = self._within_caps(caps)
         
         # Convert back to DataFrame
-        if selected_bets:
-            diversified_bets = pd.DataFrame(selected_bets)
+        if selected.any():
+            diversified_bets = bet_rows[selected]
             result = pd.concat([diversified_bets, no_bet_rows])
             
             print(f"Diversification applied: {len(bet_rows)} -> {len(diversified_bets)} bets")
-            print(f"Phase/Risk combinations: {len(phase_risk_counts)}")
-            print(f"Unique players: {len(player_counts)}")
+            print(f"Phase/Risk combinations: {combos.max() + 1}")
+            print(f"Unique players: {len(np.unique(players[combo_open]))}")
             
             return result
         else:
@@ -261,8 +404,6 @@ class BankrollOptimizer:
             max_bets: Maximum number of bets to include (default 20)
             hours_ahead: Hours ahead to look for games (default 48)
         """
-        results = []
-        
         # Process all validated props (no date filtering)
         props_to_analyze = self.props_df.copy()
         
@@ -272,131 +413,10 @@ class BankrollOptimizer:
         print(f"\nGenerating betting card...")
         print(f"Analyzing {len(props_to_analyze)} validated props...\n")
         
-        # Debug: show unique phase/risk combinations in validation summary
-        if 'phase' in self.validation_summary.columns and 'risk_tag' in self.validation_summary.columns:
-            print("Available phase/risk combinations in validation summary:")
-            unique_combos = self.validation_summary[['phase', 'risk_tag']].drop_duplicates()
-            print(unique_combos.to_string(index=False))
-            print()
-        
-        # Debug: Show first few rows of validation summary
-        print("\nFirst few rows of validation summary:")
-        print(self.validation_summary.head(3))
+        # Size every prop against the validation summary in one pass
+        betting_card = self.score_props(props_to_analyze)
         
-        # Track warnings to avoid spam
-        warnings_shown = set()
-        
-        for idx, prop in props_to_analyze.iterrows():
-            # Determine which phase and risk columns to use in props
-            if 'adv_phase' in prop and pd.notna(prop['adv_phase']):
-                phase_col_props = 'adv_phase'
-            else:
-                phase_col_props = 'cycle_phase'
-                
-            if 'adv_risk_tag' in prop and pd.notna(prop['adv_risk_tag']):
-                risk_col_props = 'adv_risk_tag'
-            else:
-                risk_col_props = 'cycle_risk_tag'
-            
-            # Determine which columns exist in validation summary
-            phase_col_val = None
-            risk_col_val = None
-            
-            # Check for phase column in validation summary
-            if 'adv_phase' in self.validation_summary.columns:
-                phase_col_val = 'adv_phase'
-            elif 'phase' in self.validation_summary.columns:
-                phase_col_val = 'phase'
-            elif 'cycle_phase' in self.validation_summary.columns:
-                phase_col_val = 'cycle_phase'
-                
-            # Check for risk tag column in validation summary
-            if 'adv_risk_tag' in self.validation_summary.columns:
-                risk_col_val = 'adv_risk_tag'
-            elif 'risk_tag' in self.validation_summary.columns:
-                risk_col_val = 'risk_tag'
-            elif 'cycle_risk_tag' in self.validation_summary.columns:
-                risk_col_val = 'cycle_risk_tag'
-            
-            # Lookup validation stats for this phase/risk combo
-            if phase_col_val and risk_col_val:
-                # Debug first few lookups
-                if idx < props_to_analyze.index[0] + 1:  # Only debug first prop
-                    print(f"Looking up: phase={prop[phase_col_props]}, risk={prop[risk_col_props]}")
-                
-                validation_match = self.validation_summary[
-                    (self.validation_summary[phase_col_val] == prop[phase_col_props]) &
-                    (self.validation_summary[risk_col_val] == prop[risk_col_props])
-                ]
-                
-                if idx < props_to_analyze.index[0] + 1:  # Only debug first prop
-                    print(f"  Found {len(validation_match)} matches")
-            else:
-                print(f"Warning: Could not find phase/risk columns in validation summary")
-                print(f"Looking for phase in {self.validation_summary.columns.tolist()}")
-                validation_match = pd.DataFrame()
-            
-            if validation_match.empty:
-                # Use default values if no match found
-                warning_key = f"{prop[phase_col_props]}/{prop[risk_col_props]}"
-                if warning_key not in warnings_shown:
-                    print(f"Warning: No validation data for {warning_key}")
-                    warnings_shown.add(warning_key)
-                
-                validation_match = pd.DataFrame({
-                    'win_rate': [0.5],
-                    'actual_std': [4.0]
-                })
-            
-            # Calculate bet sizing
-            result = self.calculate_bet_percentage(prop, validation_match)
-            kelly_fraction, bet_percentage, kelly_fraction_used = result
-            
-            # Get confidence for recommendation logic
-            confidence = prop.get('confidence', prop.get('adv_confidence', prop.get('confidence_score', 0.7)))
-            
-            # Debug first prop
-            if idx == props_to_analyze.index[0]:
-                print(f"\nDEBUG - First prop calculation:")
-                print(f"  Kelly fraction: {kelly_fraction:.3f}")
-                print(f"  Bet percentage: {bet_percentage:.3f}")
-                print(f"  Kelly used: {kelly_fraction_used:.0%}")
-                print(f"  Confidence: {confidence:.1%}")
-            
-            # Determine recommendation
-            # Only bet if we have positive Kelly and reasonable confidence
-            # Increased threshold from 0.02 to 0.05 for more selectivity
-            recommendation = "BET" if kelly_fraction > 0.05 and confidence > 0.65 else "NO BET"
-            
-            # Get std_dev value from validation match
-            if not validation_match.empty:
-                if 'actual_std' in validation_match.columns:
-                    std_dev_value = validation_match['actual_std'].iloc[0]
-                elif 'std_dev' in validation_match.columns:
-                    std_dev_value = validation_match['std_dev'].iloc[0]
-                else:
-                    std_dev_value = 4.0
-            else:
-                std_dev_value = 4.0
-            
-            results.append({
-                'player_name': prop['player_name'],
-                'stat_type': prop['stat_type'],
-                'line': prop['line'],
-                'adjusted_prediction': prop.get('adjusted_prediction', prop.get('predicted_value', 0)),
-                'adv_phase': prop[phase_col_props],
-                'adv_risk_tag': prop[risk_col_props],
-                'win_rate': validation_match['win_rate'].iloc[0] if not validation_match.empty else 0.5,
-                'std_dev': std_dev_value,
-                'kelly_fraction': round(kelly_fraction, 3),
-                'kelly_used': round(kelly_fraction_used, 2),
-                'bet_percentage': round(bet_percentage, 3),
-                'confidence': confidence,
-                'recommendation': recommendation
-            })
-        
-        # Convert to DataFrame and sort by bet percentage
-        betting_card = pd.DataFrame(results)
+        # Sort by bet percentage
         betting_card = betting_card.sort_values('bet_percentage', ascending=False)
         
         # Apply diversification rules BEFORE bankroll constraints
@@ -456,6 +476,40 @@ class BankrollOptimizer:
         
         return betting_card
     
+    def stress_test(self, betting_card, n_paths=100_000, seed=None, **kwargs):
+        """
+        Monte-Carlo risk of the recommended bets as one card
+        
+        Legs on the same player share a latent factor, so stacked player
+        props are not treated as independent.
+        
+        Args:
+            betting_card: Card from generate_betting_card
+            n_paths: Simulated paths
+            seed: RNG seed for a reproducible report
+            **kwargs: Passed to core.risk_engine.simulate_card (e.g. n_slates,
+                player_correlation, ruin_fraction)
+        
+        Returns:
+            RiskReport with ruin probability, drawdown and final bankroll quantiles
+        """
+        bets = betting_card[betting_card['recommendation'] == 'BET']
+        return card_risk(bets, fraction_col='bet_percentage', probability_col='win_rate',
+                         player_col='player_name', n_paths=n_paths, payout_ratio=self.payout,
+                         starting_bankroll=1.0, seed=seed, **kwargs)
+    
+    def print_risk_summary(self, report):
+        """Print a stress test report (bankroll shown as a multiple of today's)"""
+        print("\nCARD STRESS TEST:")
+        print("-"*40)
+        print(f"Paths simulated: {report.n_paths:,}")
+        print(f"Probability of a losing card: {report.loss_probability:.1%}")
+        print(f"Ruin probability: {report.ruin_probability:.2%}")
+        print(f"Median final bankroll: {report.final_quantiles.get(0.5, 1.0):.3f}x")
+        print(f"5th-95th percentile: {report.final_quantiles.get(0.05, 1.0):.3f}x - "
+              f"{report.final_quantiles.get(0.95, 1.0):.3f}x")
+        print(f"95th percentile drawdown: {report.drawdown_quantiles.get(0.95, 0.0):.1%}")
+    
     def print_summary(self, betting_card):
         """Print summary statistics of betting recommendations"""
         print("\n" + "="*60)
@@ -586,6 +640,9 @@ def main():
     # Print summary
     optimizer.print_summary(betting_card)
     
+    # Stress-test the card before placing it
+    optimizer.print_risk_summary(optimizer.stress_test(betting_card))
+    
     print("\nOptimization complete! Check output/daily_betting_card.csv for full results.")
 
 
@@ -7,11 +7,18 @@ Run with: streamlit run streamlit_dashboard.py
 """
 
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-import os
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.dashboard_data import DashboardData
 
 # Page config
 st.set_page_config(
@@ -44,29 +51,16 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
+@st.cache_resource
 def load_data():
-    """Load all relevant data files."""
-    data = {}
-    
-    files = {
-        'phase_results': 'phase_results_tracker.csv',
-        'confidence': 'output/phase_confidence_levels.csv',
-        'kelly_divisors': 'output/dynamic_kelly_divisors.csv',
-        'risk_adjustments': 'output/phase_risk_adjustments.csv',
-        'betting_card': 'input/daily_betting_card.csv'
-    }
-    
-    for key, filepath in files.items():
-        if os.path.exists(filepath):
-            try:
-                data[key] = pd.read_csv(filepath)
-            except:
-                data[key] = pd.DataFrame()
-        else:
-            data[key] = pd.DataFrame()
-    
-    return data
+    """
+    Shared data layer for all sessions.
+    
+    Files are read lazily when a panel first needs them and re-read only
+    when their mtime or size changes; panel aggregates are computed once
+    per data version.
+    """
+    return DashboardData()
 
 def create_phase_summary(data):
     """Create phase performance summary."""
@@ -78,15 +72,14 @@ def create_phase_summary(data):
     
     phases = ['luteal', 'menstrual', 'follicular', 'ovulatory']
     cols = st.columns(4)
+    summary = data.phase_summary().set_index('phase')
     
     for idx, phase in enumerate(phases):
         with cols[idx]:
-            phase_data = data['phase_results'][data['phase_results']['phase'] == phase]
-            
-            if len(phase_data) > 0:
-                wins = len(phase_data[phase_data['actual_result'] == 'win'])
-                total = len(phase_data)
-                win_rate = wins / total if total > 0 else 0
+            if phase in summary.index:
+                wins = int(summary.at[phase, 'wins'])
+                total = int(summary.at[phase, 'bets'])
+                win_rate = summary.at[phase, 'win_rate']
                 
                 # Color based on performance
                 if win_rate >= 0.65:
@@ -173,12 +166,8 @@ def create_bet_timeline(data):
         st.info("No betting history available")
         return
     
-    # Convert date column
-    df = data['phase_results'].copy()
-    df['date'] = pd.to_datetime(df['date'])
-    
-    # Group by date and phase
-    timeline = df.groupby(['date', 'phase']).size().reset_index(name='bet_count')
+    # Bet count per date and phase (cached per tracker version)
+    timeline = data.bet_timeline()
     
     # Create line chart
     fig = px.line(
@@ -201,13 +190,15 @@ def create_risk_matrix(data):
         st.info("No risk adjustment data available")
         return
     
+    matrix = data.risk_matrix()
     col1, col2 = st.columns(2)
     
     with col1:
         # Risk level distribution
         fig = px.pie(
-            data['risk_adjustments'],
+            matrix['levels'],
             names='risk_level',
+            values='count',
             title="Risk Level Distribution",
             color_discrete_map={
                 'HIGH': '#28a745',
@@ -221,7 +212,7 @@ def create_risk_matrix(data):
     with col2:
         # Kelly multiplier comparison
         fig = px.bar(
-            data['risk_adjustments'],
+            matrix['multipliers'],
             x='phase',
             y='kelly_multiplier',
             color='risk_level',
@@ -327,10 +318,11 @@ def create_today_card(data):
 
 def main():
     """Main dashboard application."""
+    render_start = time.perf_counter()
     st.title("🏀 WNBA Phase Intelligence Dashboard")
     st.caption(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Load data
+    # Data layer (nothing is read until a panel asks for it)
     data = load_data()
     
     # Sidebar
@@ -349,10 +341,9 @@ def main():
         # Quick stats
         st.subheader("📊 Quick Stats")
         if not data['phase_results'].empty:
-            total_bets = len(data['phase_results'])
-            total_wins = len(data['phase_results'][
-                data['phase_results']['actual_result'] == 'win'
-            ])
+            totals = data.result_totals()
+            total_bets = totals['total_bets']
+            total_wins = totals['total_wins']
             overall_wr = total_wins / total_bets if total_bets > 0 else 0
             
             st.metric("Total Bets", total_bets)
@@ -392,6 +383,13 @@ def main():
     with tab4:
         create_today_card(data)
     
+    # Load/compute timings (cached steps keep the time of their last run)
+    with st.sidebar:
+        st.divider()
+        with st.expander("⏱️ Data Timings"):
+            st.dataframe(data.timing_table(), use_container_width=True, hide_index=True)
+            st.caption(f"Page rendered in {(time.perf_counter() - render_start) * 1000:.0f} ms")
+    
     # Footer
     st.divider()
     st.caption("Built with Streamlit • WNBA Phase Intelligence System")
@@ -69,6 +69,26 @@ class SlipOptimizer:
         # Beam search parameters
         self.default_beam_width = 20
         
+    @staticmethod
+    def _fill_model_confidence(available_bets: List[Dict], scorer) -> List[Dict]:
+        """Fill missing confidences from a batch scorer (one model call per board)."""
+        unscored = [b for b in available_bets if b.get('confidence') is None]
+        if not unscored:
+            return available_bets
+
+        import pandas as pd
+
+        board = pd.DataFrame({
+            'player': [b['player'] for b in unscored],
+            'game_date': [b.get('game_date', '') for b in unscored],
+            'side': [b.get('over_under', 'over' if b.get('projection', b['line']) > b['line'] else 'under')
+                     for b in unscored],
+        })
+        probs = scorer.score_board(board, side_col='side').fillna(0.0).tolist()
+
+        filled = {id(b): {**b, 'confidence': p} for b, p in zip(unscored, probs)}
+        return [filled.get(id(b), b) for b in available_bets]
+
     def _load_payouts(self) -> Dict:
         """Load payout tables from configuration."""
         config_path = Path(self.config_path)
@@ -121,7 +141,8 @@ class SlipOptimizer:
                       slip_types: List[str] = ['Power', 'Flex'],
                       beam_width: Optional[int] = None,
                       *,
-                      phase_modifier: float = 1.0) -> List[Slip]:
+                      phase_modifier: float = 1.0,
+                      scorer=None) -> List[Slip]:
         """
         Optimize slip selection using beam search.
         
@@ -131,10 +152,15 @@ class SlipOptimizer:
             slip_types: Types of slips to generate
             beam_width: Beam width for search (None = use default)
             phase_modifier: Multiplier for expected values based on phase (default: 1.0)
+            scorer: Optional models.serving.PropHitModel; bets without a
+                'confidence' are scored in one batch with the model's hit probability
             
         Returns:
             List of optimized slips
         """
+        if scorer is not None:
+            available_bets = self._fill_model_confidence(available_bets, scorer)
+
         # Convert to Bet objects
         bets = [
             Bet(
@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from tenacity import retry, stop_after_attempt, wait_exponential
 import uuid
+import numpy as np
+import pandas as pd
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -98,6 +100,45 @@ class WNBADataEnricher:
         
         return projection
     
+    def enrich_board(self, board: pd.DataFrame) -> pd.DataFrame:
+        """
+        Columnar enrich_projection for a whole projections frame.
+        
+        Phase data is joined once by player name (falling back to the mapped
+        name) and confidence is computed as a column.
+        """
+        if type(self).enrich_projection is not WNBADataEnricher.enrich_projection:
+            # Subclasses that customize per-projection enrichment keep their semantics
+            return pd.DataFrame([self.enrich_projection(row) for row in _records(board)],
+                                index=board.index)
+        
+        board = board.copy()
+        names = board['player_name'] if 'player_name' in board.columns else pd.Series('', index=board.index)
+        
+        phase_info = names.map(self.phase_data)
+        if self.player_mappings:
+            mapped = names.map(self.player_mappings).map(self.phase_data)
+            phase_info = phase_info.where(phase_info.notna(), mapped)
+        if 'phase_info' in board.columns:
+            phase_info = phase_info.where(phase_info.notna(), board['phase_info'])
+        board['phase_info'] = phase_info
+        
+        board['confidence'] = self._calculate_confidence_column(board)
+        return board
+    
+    def _calculate_confidence_column(self, board: pd.DataFrame) -> np.ndarray:
+        """_calculate_confidence for every row of an enriched board."""
+        confidence = np.full(len(board), 0.5)
+        
+        if 'stat_type' in board.columns:
+            confidence = confidence + np.where(
+                board['stat_type'].isin(['points', 'rebounds', 'assists']), 0.1, 0.0)
+        
+        phase = _phase_column(board)
+        confidence = confidence + np.select([phase == 'peak', phase == 'low'], [0.15, -0.1], 0.0)
+        
+        return np.minimum(np.maximum(confidence, 0.0), 1.0)
+    
     def _calculate_confidence(self, projection: Dict[str, Any]) -> float:
         """Calculate confidence score for a projection."""
         # Base confidence
@@ -123,77 +164,194 @@ class WNBADataEnricher:
 
 def generate_slips(start_date: str, end_date: str, 
                   max_slips: int = 10,
-                  min_confidence: float = 0.65) -> List[Dict[str, Any]]:
+                  min_confidence: float = 0.65,
+                  scorer=None,
+                  projections: Optional[List[Dict[str, Any]]] = None,
+                  enricher=None) -> List[Dict[str, Any]]:
     """
     Generate betting slips for the given date range.
     
     Args:
         start_date: Start date in ISO format (YYYY-MM-DD)
         end_date: End date in ISO format (YYYY-MM-DD)
-        max_slips: Maximum number of slips to generate
+        max_slips: Maximum number of slips to generate (the highest-confidence ones)
         min_confidence: Minimum confidence threshold
+        scorer: Optional models.serving.PropHitModel; when given, every
+            projection is scored in one batch and slips carry 'model_probability'
+        projections: Already-fetched PrizePicks projections; fetched when omitted
+        enricher: Enricher to use; a WNBADataEnricher is created when omitted
         
     Returns:
         List of betting slip dictionaries
     """
     logger.info(f"Generating slips from {start_date} to {end_date}")
     
-    # Initialize clients
-    prizepicks = PrizePicksClient()
-    enricher = WNBADataEnricher()
-    
     # Fetch current projections
-    projections = prizepicks.get_projections("WNBA")
-    logger.info(f"Fetched {len(projections)} projections from PrizePicks")
+    if projections is None:
+        projections = PrizePicksClient().get_projections("WNBA")
+        logger.info(f"Fetched {len(projections)} projections from PrizePicks")
     
-    # Filter and enrich projections
-    slips = []
+    board = build_projection_board(projections, start_date, end_date,
+                                   enricher=enricher or WNBADataEnricher())
+    slips = select_slips(board, max_slips=max_slips, min_confidence=min_confidence, scorer=scorer)
     
-    for proj in projections:
-        # Skip if not in date range
-        game_date = proj.get('game_date', start_date)
-        if game_date < start_date or game_date > end_date:
-            continue
-            
-        # Enrich with additional data
-        enriched = enricher.enrich_projection(proj)
+    logger.info(f"Generated {len(slips)} slips with confidence >= {min_confidence}")
+    return slips
+
+def build_projection_board(projections: List[Dict[str, Any]], start_date: str, end_date: str,
+                           enricher=None) -> pd.DataFrame:
+    """
+    Load projections into one enriched frame with pick and amount columns.
+    
+    Args:
+        projections: PrizePicks projection dicts
+        start_date/end_date: Inclusive ISO date range (projections without a
+            game_date count as start_date)
+        enricher: Enricher providing enrich_board (vectorized) or only
+            enrich_projection (called per projection)
         
-        # Skip if confidence too low
-        if enriched.get('confidence', 0) < min_confidence:
-            continue
-            
-        # Create slip
+    Returns:
+        DataFrame with one row per in-range projection
+    """
+    board = pd.DataFrame(projections)
+    if board.empty:
+        return board
+    
+    # Skip if not in date range
+    game_date = board['game_date'] if 'game_date' in board.columns else pd.Series(start_date, index=board.index)
+    game_date = game_date.fillna(start_date)
+    in_range = (game_date >= start_date) & (game_date <= end_date)
+    board = board[in_range].assign(game_date=game_date[in_range]).reset_index(drop=True)
+    if board.empty:
+        return board
+    
+    # Enrich with additional data
+    if enricher is not None:
+        enrich_board = getattr(type(enricher), 'enrich_board', None)
+        if enrich_board is not None:
+            board = enricher.enrich_board(board)
+        else:
+            board = pd.DataFrame([enricher.enrich_projection(row) for row in _records(board)])
+    
+    board['pick'] = determine_picks(board)
+    board['amount'] = calculate_bet_amounts(board)
+    return board
+
+def select_slips(board: pd.DataFrame, max_slips: Optional[int] = 10,
+                 min_confidence: float = 0.65, scorer=None) -> List[Dict[str, Any]]:
+    """
+    Build slips for the top-K projections of a board by confidence.
+    
+    Candidates are chosen with a partial sort; reasoning strings and slip
+    ids are only built for the selected rows.
+    """
+    if board.empty:
+        return []
+    
+    confidence = _column(board, 'confidence', 0.5).to_numpy(dtype=float)
+    eligible = np.flatnonzero(_column(board, 'confidence', 0).to_numpy(dtype=float) >= min_confidence)
+    chosen = _top_k(confidence, eligible, max_slips)
+    
+    model_probs = None
+    if scorer is not None:
+        model_probs = scorer.score_board(board, player_col='player_name', date_col='game_date')
+    
+    today = datetime.now().strftime('%Y%m%d')
+    slips = []
+    for position, enriched in zip(chosen, _records(board.iloc[chosen])):
         slip = {
-            'slip_id': f"PG-{uuid.uuid4().hex[:8]}-{datetime.now().strftime('%Y%m%d')}",
-            'date': game_date,
+            'slip_id': f"PG-{uuid.uuid4().hex[:8]}-{today}",
+            'date': enriched['game_date'],
             'player': enriched.get('player_name', 'Unknown'),
             'team': enriched.get('team', 'Unknown'),
             'opponent': enriched.get('opponent', 'Unknown'),
             'prop_type': enriched.get('stat_type', 'unknown'),
             'line': enriched.get('line_score', 0),
-            'pick': determine_pick(enriched),
+            'pick': enriched['pick'],
             'odds': enriched.get('odds', -110),
             'confidence': enriched.get('confidence', 0.5),
-            'amount': calculate_bet_amount(enriched),
+            'amount': round(enriched['amount'], 2),
             'reasoning': generate_reasoning(enriched),
             'phase_data': enriched.get('phase_info', {}),
             'prizepicks_id': enriched.get('id', ''),
             'game_time': enriched.get('game_time', ''),
             'status': 'pending'
         }
+        if model_probs is not None:
+            probability = model_probs.iloc[position]
+            slip['model_probability'] = None if pd.isna(probability) else float(probability)
         
         slips.append(slip)
-        
-        # Stop if we have enough slips
-        if len(slips) >= max_slips:
-            break
-    
-    # Sort by confidence
-    slips.sort(key=lambda x: x['confidence'], reverse=True)
     
-    logger.info(f"Generated {len(slips)} slips with confidence >= {min_confidence}")
     return slips
 
+def _top_k(values: np.ndarray, candidates: np.ndarray, k: Optional[int]) -> np.ndarray:
+    """Positions of the k largest values among candidates, highest first (ties keep board order)."""
+    if k is not None and len(candidates) > k:
+        if k <= 0:
+            return candidates[:0]
+        scores = values[candidates]
+        threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = candidates[scores > threshold]
+        ties = candidates[scores == threshold][:k - len(above)]
+        candidates = np.sort(np.concatenate([above, ties]))
+    order = np.lexsort((candidates, -values[candidates]))
+    return candidates[order]
+
+def _records(board: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Board rows as projection dicts (keys absent from a projection are dropped)."""
+    return [
+        {key: value for key, value in row.items() if not (isinstance(value, float) and np.isnan(value))}
+        for row in board.to_dict('records')
+    ]
+
+def _column(board: pd.DataFrame, name: str, default) -> pd.Series:
+    """Board column with missing values (and a missing column) filled by default."""
+    if name not in board.columns:
+        return pd.Series(default, index=board.index)
+    return board[name].fillna(default)
+
+def _phase_column(board: pd.DataFrame) -> np.ndarray:
+    """current_phase from each row's phase_info (None when absent)."""
+    if 'phase_info' not in board.columns:
+        return np.full(len(board), None, dtype=object)
+    return board['phase_info'].map(
+        lambda info: info.get('current_phase') if isinstance(info, dict) else None
+    ).to_numpy(dtype=object)
+
+def determine_picks(board: pd.DataFrame) -> np.ndarray:
+    """determine_pick for every row of an enriched board."""
+    trend = _column(board, 'historical_trend', 'neutral').to_numpy(dtype=object)
+    line = _column(board, 'line_score', 0).to_numpy(dtype=float)
+    average = board['season_average'].fillna(pd.Series(line, index=board.index)).to_numpy(dtype=float) \
+        if 'season_average' in board.columns else line
+    phase = _phase_column(board)
+    confidence = _column(board, 'confidence', 0.5).to_numpy(dtype=float)
+    
+    return np.select(
+        [trend == 'over', trend == 'under',
+         average > line * 1.1, average < line * 0.9,
+         phase == 'peak', phase == 'low',
+         confidence > 0.7],
+        ['over', 'under', 'over', 'under', 'over', 'under', 'over'],
+        'under'
+    )
+
+def calculate_bet_amounts(board: pd.DataFrame) -> np.ndarray:
+    """Unrounded calculate_bet_amount for every row of an enriched board."""
+    base_bankroll = float(os.getenv('BANKROLL', '1000'))
+    
+    confidence = _column(board, 'confidence', 0.5).to_numpy(dtype=float)
+    odds = _column(board, 'odds', -110).to_numpy(dtype=float)
+    
+    # Convert American odds to decimal
+    decimal_odds = np.where(odds < 0, 1 + (100 / np.abs(odds)), 1 + (odds / 100))
+    
+    # Quarter Kelly, clamped to 1%-5% of bankroll
+    kelly_fraction = (confidence * decimal_odds - 1) / (decimal_odds - 1)
+    amount = base_bankroll * (kelly_fraction * 0.25)
+    return np.maximum(base_bankroll * 0.01, np.minimum(amount, base_bankroll * 0.05))
+
 def determine_pick(projection: Dict[str, Any]) -> str:
     """Determine whether to pick over or under."""
     # This is where you'd integrate your backtesting logic
@@ -1,16 +1,19 @@
 ﻿"""
 AlertSystem - Enhanced with exponential backoff retry logic and error handling
+Alerts are delivered in the background by the shared AlertDispatcher.
 """
 
 import os
 import json
 import time
 import logging
-import requests
 from enum import Enum
+from concurrent.futures import Future
 from typing import Dict, Any, Optional
 from datetime import datetime
-from functools import wraps
+from functools import partial, wraps
+
+from alerts.dispatcher import AlertDispatcher, get_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -67,7 +70,10 @@ def exponential_backoff_retry(retry_config: RetryConfig):
 class AlertSystem:
     """System for sending alerts via Discord, Slack, and other channels."""
     
-    def __init__(self):
+    def __init__(self, dispatcher: Optional[AlertDispatcher] = None):
+        # Background delivery (pooled connections, coalescing, rate limiting)
+        self.dispatcher = dispatcher or get_dispatcher()
+        
         # Load webhook URLs from environment
         self.discord_webhook = os.getenv('DISCORD_WEBHOOK_URL')
         self.slack_webhook = os.getenv('SLACK_WEBHOOK_URL')
@@ -98,8 +104,15 @@ class AlertSystem:
             if self.slack_webhook:
                 logger.info("Slack webhook configured")
     
-    def send_alert(self, alert_type: AlertType, message: str, data: Optional[Dict[str, Any]] = None):
-        """Send an alert through configured channels."""
+    def send_alert(self, alert_type: AlertType, message: str,
+                   data: Optional[Dict[str, Any]] = None) -> Optional[Future]:
+        """
+        Send an alert through configured channels without blocking.
+        
+        The alert is logged immediately and queued for concurrent Discord/Slack
+        delivery. Returns a Future of {channel: delivered}, or None when nothing
+        was queued (no webhooks, or a rate-limited duplicate).
+        """
         alert_data = {
             'type': alert_type.value,
             'message': message,
@@ -110,23 +123,22 @@ class AlertSystem:
         # Log the alert
         self._log_alert(alert_data)
         
-        # Send to Discord
+        deliveries = {}
         if self.discord_webhook:
-            try:
-                self._send_to_discord(alert_data)
-            except Exception as e:
-                logger.error(f"Failed to send Discord alert: {e}")
-        
-        # Send to Slack
+            deliveries['discord'] = partial(self._send_to_discord, alert_data)
         if self.slack_webhook:
-            try:
-                self._send_to_slack(alert_data)
-            except Exception as e:
-                logger.error(f"Failed to send Slack alert: {e}")
+            deliveries['slack'] = partial(self._send_to_slack, alert_data)
         
         # If no webhooks configured, ensure it's logged
-        if not self.discord_webhook and not self.slack_webhook:
+        if not deliveries:
             logger.warning(f"Alert not sent to external channels: {message}")
+            return None
+        
+        return self.dispatcher.submit((alert_data['type'], message), deliveries)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait (up to timeout seconds) for queued alerts to be delivered."""
+        return self.dispatcher.flush(timeout)
     
     def _log_alert(self, alert_data: Dict[str, Any]):
         """Log alert locally."""
@@ -140,7 +152,7 @@ class AlertSystem:
     @exponential_backoff_retry(RetryConfig())
     def _send_to_webhook(self, url: str, payload: Dict[str, Any], timeout: int = 10):
         """Generic webhook sender with retry logic."""
-        response = requests.post(url, json=payload, timeout=timeout)
+        response = self.dispatcher.session.post(url, json=payload, timeout=timeout)
         response.raise_for_status()
         return response
     
@@ -291,6 +303,8 @@ class AlertSystem:
         
         if not self.discord_webhook and not self.slack_webhook:
             logger.warning("No webhooks configured to test")
+        else:
+            self.flush(timeout=30)
 
 
 # Example usage and testing
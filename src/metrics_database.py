@@ -5,7 +5,7 @@ import pandas as pd
 from datetime import datetime
 import logging
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import json
 
 
@@ -194,6 +194,20 @@ class MetricsDatabase:
         with sqlite3.connect(self.db_path) as conn:
             return pd.read_sql_query(query, conn, params=(start_date, end_date))
     
+    def get_data_version(self) -> Tuple[Optional[str], int]:
+        """
+        Latest daily_metrics update time and row count
+        
+        Changes whenever a day is graded or re-graded, so it can key
+        caches of anything rendered from daily_metrics.
+        
+        Returns:
+            Tuple: (MAX(updated_at) or None, number of days)
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT MAX(updated_at), COUNT(*) FROM daily_metrics").fetchone()
+        return row[0], row[1]
+    
     def get_player_stats(self, player: str) -> pd.DataFrame:
         """Get all trades for a specific player"""
         query = """
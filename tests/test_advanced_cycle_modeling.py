@@ -0,0 +1,83 @@
+"""Tests for array-based advanced cycle modeling."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts' / 'intelligence'))
+
+from advanced_cycle_modeling import AdvancedCycleModeler, apply_advanced_cycle_modeling
+
+
+def _gamelogs(n_players=12, n_games=30, seed=3):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for p in range(n_players):
+        dates = pd.Timestamp('2024-05-15') + pd.to_timedelta(np.sort(rng.integers(0, 120, n_games)), unit='D')
+        for date in dates:
+            rows.append({'PLAYER_ID': 1000 + p, 'PLAYER_NAME': f"Player {p}",
+                         'GAME_DATE': date.strftime('%Y-%m-%d'), 'WNBA_FANTASY_PTS': rng.uniform(5, 50)})
+    return pd.DataFrame(rows).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def _row_by_row(df):
+    """The per-row reference: refilter each player's games for every row."""
+    df = df.copy()
+    df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
+    modeler = AdvancedCycleModeler(seed=42)
+    profiles = {}
+    for player_id in df['PLAYER_ID'].unique():
+        name = df[df['PLAYER_ID'] == player_id]['PLAYER_NAME'].iloc[0]
+        profiles[player_id] = modeler.assign_player_cycle_profile(player_id, name)
+
+    rows = []
+    for _, row in df.iterrows():
+        player_games = df[df['PLAYER_ID'] == row['PLAYER_ID']]
+        profile = profiles[row['PLAYER_ID']]
+        phase, day, confidence = modeler.calculate_advanced_cycle_phase(
+            row['GAME_DATE'], player_games['GAME_DATE'].min(), profile)
+        stats = {'games_played': len(player_games[player_games['GAME_DATE'] <= row['GAME_DATE']])}
+        modifier = modeler.calculate_performance_modifier(phase, profile['cycle_type'], stats)
+        tag, risk = modeler.generate_risk_assessment(phase, day, profile['cycle_length'], modifier)
+        rows.append((phase, day, confidence, modifier, tag, risk))
+    return pd.DataFrame(rows, columns=['adv_cycle_phase', 'adv_cycle_day', 'adv_cycle_confidence',
+                                       'adv_perf_modifier', 'adv_risk_tag', 'adv_risk_confidence'])
+
+
+class TestAdvancedCycleModeling:
+    """Test the one-pass gamelog modeling."""
+
+    def test_matches_row_by_row(self, tmp_path, monkeypatch):
+        """The CSV is byte-identical to the per-row computation."""
+        df = _gamelogs()
+        source = tmp_path / "gamelogs.csv"
+        df.to_csv(source, index=False)
+        (tmp_path / "output").mkdir()
+        monkeypatch.chdir(tmp_path)
+
+        apply_advanced_cycle_modeling(str(source), str(tmp_path / "vectorized.csv"))
+
+        expected = pd.read_csv(source)
+        expected['GAME_DATE'] = pd.to_datetime(expected['GAME_DATE'])
+        for column, values in _row_by_row(df).items():
+            expected[column] = values.tolist()
+        expected.to_csv(tmp_path / "reference.csv", index=False)
+
+        assert (tmp_path / "vectorized.csv").read_bytes() == (tmp_path / "reference.csv").read_bytes()
+        assert (tmp_path / "output" / "player_cycle_profiles.csv").exists()
+
+    @pytest.mark.parametrize("phase,day,length,modifier", [
+        ('luteal', 27, 28, 1.05), ('luteal', 18, 28, 1.05), ('luteal', 18, 28, 1.0),
+        ('ovulation', 15, 28, 0.93), ('menstrual', 1, 28, 0.95), ('menstrual', 3, 28, 0.95),
+        ('follicular', 13, 28, 1.02), ('follicular', 6, 28, 1.02),
+    ])
+    def test_risk_arrays_match_scalar(self, phase, day, length, modifier):
+        """Each risk branch matches generate_risk_assessment."""
+        modeler = AdvancedCycleModeler()
+
+        tags, confidence = modeler.generate_risk_assessments(
+            np.array([phase]), np.array([day]), np.array([length]), np.array([modifier]))
+
+        assert (tags[0], confidence[0]) == modeler.generate_risk_assessment(phase, day, length, modifier)
@@ -0,0 +1,157 @@
+"""Tests for background alert dispatch."""
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from alerts.dispatcher import AlertDispatcher
+from src.alert_system import AlertSystem, AlertType
+
+
+@pytest.fixture
+def dispatcher():
+    """Dispatcher with a long rate-limit window."""
+    dispatcher = AlertDispatcher(max_workers=4, min_interval=60.0, flush_timeout=1.0)
+    yield dispatcher
+    dispatcher.close(timeout=1.0)
+
+
+class TestAlertDispatcher:
+    """Test queueing, fan-out, coalescing and flushing."""
+
+    def test_submit_does_not_wait_for_delivery(self, dispatcher):
+        """A blocked webhook does not hold up the caller."""
+        release = threading.Event()
+        start = time.monotonic()
+        future = dispatcher.submit('slow', {'discord': release.wait})
+
+        assert time.monotonic() - start < 0.5
+        assert not future.done()
+        release.set()
+        assert future.result(timeout=2) == {'discord': True}
+
+    def test_channels_delivered_concurrently(self, dispatcher):
+        """Every channel of an alert is in flight at the same time."""
+        barrier = threading.Barrier(3, timeout=2)
+        future = dispatcher.submit('fan-out', {name: barrier.wait for name in ('discord', 'slack', 'sms')})
+
+        assert future.result(timeout=3) == {'discord': True, 'slack': True, 'sms': True}
+
+    def test_duplicates_coalesced_and_rate_limited(self, dispatcher):
+        """Repeated identical alerts reach the channel once."""
+        send = MagicMock(return_value=True)
+        futures = [dispatcher.submit(('warning', 'guard rail'), {'slack': send}) for _ in range(5)]
+        dispatcher.flush(timeout=2)
+
+        assert send.call_count == 1
+        assert futures[0] is not None
+        assert all(f is None or f is futures[0] for f in futures[1:])
+        assert dispatcher.submit(('warning', 'other'), {'slack': send}) is not None
+
+    def test_failures_reported_per_channel(self, dispatcher):
+        """Raising or returning False marks only that channel as failed."""
+        def broken():
+            raise ConnectionError("down")
+
+        results = dispatcher.deliver({'discord': broken, 'slack': lambda: False, 'sms': lambda: None})
+
+        assert results == {'discord': False, 'slack': False, 'sms': True}
+
+    def test_flush_is_bounded(self, dispatcher):
+        """Flushing gives up after the timeout instead of hanging."""
+        release = threading.Event()
+        dispatcher.submit('stuck', {'discord': release.wait})
+
+        start = time.monotonic()
+        assert dispatcher.flush(timeout=0.2) is False
+        assert time.monotonic() - start < 1.0
+        release.set()
+        assert dispatcher.flush(timeout=2) is True
+
+
+class TestAlertSystemDispatch:
+    """Test that AlertSystem hands alerts to the dispatcher."""
+
+    @patch.dict(os.environ, {'DISCORD_WEBHOOK_URL': 'https://discord.test/hook', 'SLACK_WEBHOOK_URL': ''})
+    def test_send_alert_posts_through_pooled_session(self, dispatcher):
+        """Webhooks are posted on the dispatcher's session in the background."""
+        dispatcher.session.post = MagicMock()
+        alerts = AlertSystem(dispatcher=dispatcher)
+
+        future = alerts.send_alert(AlertType.WARNING, "Guard rail failed", {'slips': 2})
+
+        assert future.result(timeout=2) == {'discord': True}
+        url = dispatcher.session.post.call_args.args[0]
+        assert url == 'https://discord.test/hook'
+        assert alerts.send_alert(AlertType.WARNING, "Guard rail failed") is None
+
+    @patch.dict(os.environ, {'DISCORD_WEBHOOK_URL': '', 'SLACK_WEBHOOK_URL': ''})
+    def test_no_webhooks_only_logs(self, dispatcher):
+        """Without webhooks nothing is queued."""
+        assert AlertSystem(dispatcher=dispatcher).send_alert(AlertType.INFO, "hello") is None
+
+
+# Queues one Discord alert and exits straight away
+SEND_AND_EXIT = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from src.alert_system import AlertSystem, AlertType
+AlertSystem().send_alert(AlertType.WARNING, "sent at exit")
+"""
+
+
+def _send_and_exit(webhook_url, flush_timeout):
+    env = dict(os.environ, DISCORD_WEBHOOK_URL=webhook_url, SLACK_WEBHOOK_URL='',
+               ALERT_FLUSH_TIMEOUT=str(flush_timeout))
+    start = time.monotonic()
+    result = subprocess.run([sys.executable, '-c', SEND_AND_EXIT, PROJECT_ROOT],
+                            env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return time.monotonic() - start
+
+
+class TestExitFlush:
+    """Test that alerts queued just before the process exits are delivered."""
+
+    def test_alert_delivered_at_exit(self):
+        """A slow webhook still receives an alert sent right before exit."""
+        received = []
+
+        class SlowWebhook(BaseHTTPRequestHandler):
+            def do_POST(self):
+                time.sleep(0.5)
+                received.append(self.rfile.read(int(self.headers['Content-Length'])))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), SlowWebhook)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            _send_and_exit(f"http://127.0.0.1:{server.server_port}/hook", flush_timeout=10)
+        finally:
+            server.shutdown()
+
+        assert len(received) == 1
+        assert b'sent at exit' in received[0]
+
+    def test_exit_wait_bounded_by_flush_timeout(self):
+        """A webhook that never answers cannot hold the process past flush_timeout."""
+        with socket.socket() as hung:
+            hung.bind(('127.0.0.1', 0))
+            hung.listen()  # accepts connections but never responds
+
+            elapsed = _send_and_exit(f"http://127.0.0.1:{hung.getsockname()[1]}/hook", flush_timeout=1)
+
+        assert elapsed < 8
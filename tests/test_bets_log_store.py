@@ -0,0 +1,164 @@
+"""Tests for the date-partitioned bets log store."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.bets_log_store import BetsLogStore, daily_aggregates, normalize_bets_log, parse_bet_dates
+
+pytestmark = pytest.mark.skipif(not BetsLogStore.available(), reason="pyarrow not installed")
+
+
+def _bets(n=300, seed=2, end='2025-06-30'):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp(end) - pd.to_timedelta(rng.integers(0, 120 * 86400, n), unit='s')
+    return pd.DataFrame({
+        'date': dates.sort_values().strftime('%Y-%m-%d %H:%M:%S'),
+        'bet_id': [f'bet{i}' for i in range(n)],
+        'stake': rng.integers(5, 50, n),
+        'payout': np.round(rng.uniform(0, 90, n), 2),
+        'result': rng.choice(['win', 'loss'], n),
+    })
+
+
+@pytest.fixture
+def bets_log(tmp_path):
+    path = tmp_path / 'bets_log.csv'
+    _bets().to_csv(path, index=False)
+    return path
+
+
+def _filtered(path, start, end):
+    df = normalize_bets_log(pd.read_csv(path))
+    return df[(df['date'] >= start) & (df['date'] <= end)].reset_index(drop=True)
+
+
+class TestSync:
+    """Test keeping the store current with the CSV."""
+
+    def test_sync_states(self, bets_log, tmp_path):
+        """Unchanged logs are not re-read, appends are parsed alone, edits rebuild."""
+        store = BetsLogStore(tmp_path / 'store')
+
+        assert store.sync(bets_log) == 'rebuilt'
+        assert store.sync(bets_log) == 'current'
+
+        _bets(5, seed=9, end='2025-07-02').to_csv(bets_log, mode='a', header=False, index=False)
+        assert store.sync(bets_log) == 'appended'
+        assert store.manifest()['rows'] == 305
+
+        pd.read_csv(bets_log).iloc[1:].to_csv(bets_log, index=False)
+        assert store.sync(bets_log) == 'rebuilt'
+        assert store.manifest()['rows'] == 304
+
+    def test_append_with_new_types_rebuilds(self, bets_log, tmp_path):
+        """Appended rows whose types differ from the stored ones force a rebuild."""
+        store = BetsLogStore(tmp_path / 'store')
+        store.sync(bets_log)
+
+        with open(bets_log, 'a') as f:
+            f.write('2025-07-01 10:00:00,bet900,10,5.0,\n')
+
+        assert store.sync(bets_log) == 'rebuilt'
+        assert len(store.read()) == 301
+
+
+class TestReads:
+    """Test date-range reads and the cached daily aggregates."""
+
+    def test_range_read_matches_filtering(self, bets_log, tmp_path):
+        """Pruned reads return exactly the rows a full parse and filter would."""
+        store = BetsLogStore(tmp_path / 'store')
+        store.sync(bets_log)
+        start, end = pd.Timestamp('2025-04-15 12:00'), pd.Timestamp('2025-05-20 23:59:59')
+
+        result = store.read(start, end)
+
+        pd.testing.assert_frame_equal(result, _filtered(bets_log, start, end))
+
+    def test_appends_read_in_log_order(self, bets_log, tmp_path):
+        """Rows from later appends come back after older rows of the same month."""
+        store = BetsLogStore(tmp_path / 'store')
+        store.sync(bets_log)
+        for seed in range(6):
+            appended = _bets(4, seed=10 + seed, end='2025-06-30')
+            appended['bet_id'] = [f'append{seed}_{i}' for i in range(4)]
+            appended.to_csv(bets_log, mode='a', header=False, index=False)
+            assert store.sync(bets_log) == 'appended'
+
+        june = pd.Timestamp('2025-06-01'), pd.Timestamp('2025-06-30 23:59:59')
+        expected = _filtered(bets_log, *june)
+
+        assert store.read(*june)['bet_id'].tolist() == expected['bet_id'].tolist()
+
+    def test_daily_aggregates_survive_appends(self, bets_log, tmp_path):
+        """Daily totals after an append equal aggregating the whole log."""
+        store = BetsLogStore(tmp_path / 'store')
+        store.sync(bets_log)
+        _bets(20, seed=5, end='2025-07-01').to_csv(bets_log, mode='a', header=False, index=False)
+        store.sync(bets_log)
+
+        expected = daily_aggregates(normalize_bets_log(pd.read_csv(bets_log)))
+
+        pd.testing.assert_frame_equal(store.daily(), expected)
+        assert store.daily_range('2025-06-01', '2025-06-30')['date'].dt.month.unique().tolist() == [6]
+
+    def test_mixed_timezones(self):
+        """Aware dates are converted to UTC per value before dropping the zone."""
+        dates = parse_bet_dates(['2025-06-01T23:30:00-04:00', '2025-06-02 01:00:00+00:00', 'bad'])
+
+        assert dates.tolist()[:2] == [pd.Timestamp('2025-06-02 03:30'), pd.Timestamp('2025-06-02 01:00')]
+        assert pd.isna(dates.iloc[2])
+
+
+class TestStatsGenerator:
+    """Test the stats CLI reading through the store."""
+
+    @pytest.fixture
+    def generator(self, bets_log, monkeypatch):
+        pytest.importorskip('plotly')
+        pytest.importorskip('click')
+        monkeypatch.chdir(bets_log.parent)
+        from scripts.stats import StatsGenerator
+        return StatsGenerator()
+
+    def test_store_and_csv_paths_agree(self, generator, bets_log, monkeypatch):
+        """Loading through the store gives the same rows and stats as the CSV path."""
+        stored = generator.load_data(start_date='2025-05-01', end_date='2025-05-31')
+        assert (bets_log.parent / 'data' / 'bets_log_store' / 'manifest.json').exists()
+
+        monkeypatch.setattr(generator.bets_log_store, 'available', lambda: False)
+        direct = generator.load_data(start_date='2025-05-01', end_date='2025-05-31')
+
+        pd.testing.assert_frame_equal(stored, direct.reset_index(drop=True))
+        assert generator.generate_summary_stats(stored) == generator.generate_summary_stats(direct)
+
+    def test_daily_stats_from_cache(self, generator):
+        """Cached daily stats equal aggregating the loaded rows."""
+        period = {'start_date': '2025-05-01', 'end_date': '2025-05-31'}
+
+        cached = generator.load_daily_stats(**period)
+        computed = generator.calculate_daily_stats(generator.load_data(**period))
+
+        pd.testing.assert_frame_equal(cached, computed)
+        zero_stake = generator._daily_stats_frame(pd.DataFrame({
+            'date': pd.to_datetime(['2025-05-01']), 'bet_count': [1], 'total_stake': [0.0], 'total_payout': [5.0]}))
+        assert zero_stake['roi_percent'].tolist() == [0.0]
+
+    def test_daily_stats_share_the_days_window(self, generator, monkeypatch):
+        """A --days window starting mid-day covers the same bets as the summary, with or without the store."""
+        window = (pd.Timestamp('2025-05-10 13:00'), pd.Timestamp('2025-05-31 23:59:59.999999999'))
+        monkeypatch.setattr(generator, 'date_bounds', lambda *args: window)
+
+        bets = generator.load_data(days=21)
+        daily = generator.load_daily_stats(days=21)
+        assert bets['date'].min() >= window[0]
+        assert daily['bet_count'].sum() == len(bets)
+        pd.testing.assert_frame_equal(daily, generator.calculate_daily_stats(bets))
+
+        monkeypatch.setattr(generator.bets_log_store, 'available', lambda: False)
+        pd.testing.assert_frame_equal(generator.load_daily_stats(days=21), daily)
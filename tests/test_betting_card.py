@@ -0,0 +1,125 @@
+"""Tests for columnar betting card generation in the strategy BankrollOptimizer."""
+import importlib.util
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Loaded by path: the repo root also has a bankroll_optimizer module
+_spec = importlib.util.spec_from_file_location(
+    'strategy_bankroll_optimizer',
+    Path(__file__).parent.parent / 'scripts' / 'strategy' / 'bankroll_optimizer.py')
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+BankrollOptimizer = _module.BankrollOptimizer
+
+
+@pytest.fixture
+def optimizer():
+    """Optimizer with a small validation summary."""
+    optimizer = BankrollOptimizer(max_bets_per_combo=2, max_bets_per_player=1)
+    optimizer.validation_summary = pd.DataFrame({
+        'phase': ['luteal', 'luteal', 'follicular', None],
+        'risk_tag': ['HIGH', 'HIGH', 'LOW', 'LOW'],
+        'win_rate': [0.7, 0.99, 0.6, 0.9],
+        'actual_std': [3.0, 1.0, 8.0, 1.0],
+    })
+    return optimizer
+
+
+def _props():
+    return pd.DataFrame({
+        'player_name': ['A', 'B', 'C', 'D', 'E'],
+        'stat_type': ['PTS'] * 5,
+        'line': [10.5, 12.5, 8.5, 20.5, 5.5],
+        'adv_phase': ['luteal', None, 'follicular', 'ovulatory', 'luteal'],
+        'cycle_phase': ['menstrual', 'luteal', 'luteal', 'luteal', 'luteal'],
+        'adv_risk_tag': ['HIGH', 'HIGH', 'LOW', 'LOW', None],
+        'cycle_risk_tag': ['LOW', 'LOW', 'LOW', 'LOW', 'LOW'],
+        'confidence': [0.9, 0.75, 0.68, 0.6, 0.85],
+    })
+
+
+class TestScoreProps:
+    """Test one-pass prop sizing."""
+
+    def test_matches_per_prop_sizing(self, optimizer):
+        """Array sizing equals calculate_bet_percentage row by row."""
+        props = _props()
+
+        card = optimizer.score_props(props)
+
+        assert list(card['adv_phase']) == ['luteal', 'luteal', 'follicular', 'ovulatory', 'luteal']
+        assert list(card['adv_risk_tag']) == ['HIGH', 'HIGH', 'LOW', 'LOW', 'LOW']
+        for i, prop in props.iterrows():
+            summary = optimizer.validation_summary
+            match = summary[(summary['phase'] == card.loc[i, 'adv_phase'])
+                            & (summary['risk_tag'] == card.loc[i, 'adv_risk_tag'])].head(1)
+            if match.empty:
+                match = pd.DataFrame({'win_rate': [0.5], 'actual_std': [4.0]})
+            kelly, bet_pct, used = optimizer.calculate_bet_percentage(prop, match)
+            assert card.loc[i, 'win_rate'] == match['win_rate'].iloc[0]
+            assert card.loc[i, 'kelly_fraction'] == round(kelly, 3)
+            assert card.loc[i, 'bet_percentage'] == round(bet_pct, 3)
+            assert card.loc[i, 'kelly_used'] == round(used, 2)
+
+    def test_recommendation_thresholds(self, optimizer):
+        """Only props with edge and confidence above 65% are bets."""
+        card = optimizer.score_props(_props())
+
+        assert list(card['recommendation']) == ['BET', 'BET', 'BET', 'NO BET', 'NO BET']
+
+
+class TestDiversification:
+    """Test exposure caps."""
+
+    @staticmethod
+    def _reference(card, combo_cap, player_cap):
+        """Row-by-row greedy selection."""
+        combos, players, kept = {}, {}, []
+        for idx, row in card.sort_values('bet_percentage', ascending=False).iterrows():
+            combo = (row['adv_phase'], row['adv_risk_tag'])
+            if combos.get(combo, 0) >= combo_cap or players.get(row['player_name'], 0) >= player_cap:
+                continue
+            combos[combo] = combos.get(combo, 0) + 1
+            players[row['player_name']] = players.get(row['player_name'], 0) + 1
+            kept.append(idx)
+        return kept
+
+    def test_matches_greedy_loop(self):
+        """Grouped cumulative caps select the same bets as the sequential loop."""
+        rng = np.random.default_rng(4)
+        n = 400
+        card = pd.DataFrame({
+            'player_name': rng.choice([f"P{i}" for i in range(60)], n),
+            'adv_phase': rng.choice(['luteal', 'follicular', 'menstrual'], n),
+            'adv_risk_tag': rng.choice(['HIGH', 'LOW'], n),
+            'bet_percentage': rng.permutation(n) / 1000,
+            'recommendation': 'BET',
+        })
+        optimizer = BankrollOptimizer(max_bets_per_combo=7, max_bets_per_player=2)
+
+        result = optimizer.apply_diversification(card)
+
+        assert list(result.index) == self._reference(card, 7, 2)
+
+    def test_game_cap(self):
+        """An optional per-game cap limits stacked bets on one game."""
+        card = pd.DataFrame({
+            'player_name': ['A', 'B', 'C', 'D'],
+            'adv_phase': ['luteal'] * 4,
+            'adv_risk_tag': ['HIGH'] * 4,
+            'game_id': ['G1', 'G1', 'G1', 'G2'],
+            'bet_percentage': [0.04, 0.03, 0.02, 0.01],
+            'recommendation': ['BET'] * 4,
+        })
+
+        uncapped = BankrollOptimizer().apply_diversification(card)
+        capped = BankrollOptimizer(max_bets_per_game=2).apply_diversification(card)
+
+        assert list(uncapped['player_name']) == ['A', 'B', 'C', 'D']
+        assert list(capped['player_name']) == ['A', 'B', 'D']
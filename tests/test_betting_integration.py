@@ -0,0 +1,68 @@
+"""Tests for the join-based UNDER opportunity matching."""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.betting_integration import BettingIntelligenceSystem
+
+
+@pytest.fixture
+def system():
+    """System with in-memory dips and props."""
+    system = BettingIntelligenceSystem()
+    system.dips_data = pd.DataFrame({
+        'player': ['A Wilson', 'A Wilson', 'Kelsey Plum', 'Li Yueru', 'Napheesa Collier'],
+        'date': pd.to_datetime(['2024-09-01', '2024-09-10', '2024-09-10', '2024-09-10', '2024-09-10']),
+        'trend_phase': ['Descending', 'Trough', 'Descending', 'Trough', 'Peak'],
+        'games_in_trend': [1, 4, 2, 1, 3],
+        'dip_type': ['fatigue', 'cycle', 'unknown', 'none', 'cycle'],
+        'fantasy_points_roll_3': [30.0, 22.0, 18.0, 9.0, 40.0],
+        'percent_drop_from_avg': [-10.0, -30.0, 16.0, 5.0, 0.0],
+    })
+    system.props_data = pd.DataFrame({
+        'player_name': ['a  wilson', 'A Wilson', 'Kelsey M. Plum', 'Aliyah Boston', 'Napheesa Collier'],
+        'stat_type': ['Points', 'Blocks', 'Assists', 'Points', 'Points'],
+        'line': [22.5, 1.5, 4.5, 14.5, 20.5],
+    })
+    return system
+
+
+class TestUnderOpportunities:
+    """Test matching, scoring and reasoning."""
+
+    def test_latest_concern_joined_on_normalized_name(self, system):
+        """Each player's latest concerning record matches props regardless of case/spacing."""
+        opps = system.identify_under_opportunities()
+        wilson = opps[opps['player'] == 'A Wilson']
+
+        assert sorted(wilson['line_score']) == [1.5, 22.5]
+        assert (wilson['trend_phase'] == 'Trough').all()
+
+    def test_fuzzy_pass_only_matches_first_name_token(self, system):
+        """Unresolved names fall back to a whole-word first-name match."""
+        opps = system.identify_under_opportunities()
+
+        assert opps.loc[opps['player'] == 'Kelsey Plum', 'stat_type'].tolist() == ['Assists']
+        assert 'Li Yueru' not in set(opps['player'])
+        assert 'Napheesa Collier' not in set(opps['player'])
+
+    def test_confidence_and_reasoning(self, system):
+        """Scores and reasons follow the phase, duration, dip, drop and stat rules."""
+        opps = system.identify_under_opportunities().set_index(['player', 'stat_type'])
+
+        assert opps.loc[('A Wilson', 'Points'), 'confidence_score'] == 95
+        assert opps.loc[('A Wilson', 'Blocks'), 'confidence_score'] == 95
+        assert opps.loc[('Kelsey Plum', 'Assists'), 'confidence_score'] == 50 + 20 + 10 + 10 + 3
+        assert opps.loc[('Kelsey Plum', 'Assists'), 'reasoning'] == (
+            'Descending trend for 2 games; unclear dip cause; 16.0% below season average')
+
+    def test_sorted_by_confidence(self, system):
+        """Opportunities come back highest confidence first."""
+        opps = system.identify_under_opportunities()
+
+        assert opps['confidence_score'].is_monotonic_decreasing
+        assert 'Recent 3-game avg' in system.generate_daily_report(min_confidence=60)
@@ -0,0 +1,199 @@
+"""Tests for the cycle risk backtest metrics cube."""
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts' / 'intelligence'))
+
+from core.metrics_cube import build_metrics_cube, load_metrics_cube, save_metrics_cube
+from cycle_risk_backtest import CycleRiskBacktester
+from menstrual_phase_estimator import CycleRiskBacktester as LowercaseBacktester
+
+TAGS = ['FADE_LUTEAL', 'TARGET_OVULATION', 'NEUTRAL', 'FADE_MENSTRUAL', None]
+PHASES = ['menstrual', 'follicular', 'ovulation', 'luteal', None]
+
+
+def _data(n=400, seed=4):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2024-05-15', periods=40).strftime('%Y-%m-%d')
+    gamelogs = pd.DataFrame({
+        'PLAYER_ID': rng.integers(1, 30, n),
+        'GAME_DATE': rng.choice(dates, n),
+        'PTS': rng.integers(0, 30, n).astype(float),
+        'REB': rng.integers(0, 12, n).astype(float),
+        'AST': rng.integers(0, 9, n).astype(float),
+        'MIN': rng.uniform(5, 35, n),
+    }).drop_duplicates(['PLAYER_ID', 'GAME_DATE'])
+    gamelogs['WNBA_FANTASY_PTS'] = gamelogs['PTS'] + 1.2 * gamelogs['REB'] + 1.5 * gamelogs['AST']
+
+    props = gamelogs[['PLAYER_ID', 'GAME_DATE']].copy()
+    props['cycle_risk_tag'] = rng.choice(np.array(TAGS, dtype=object), len(props))
+    props['cycle_phase'] = rng.choice(np.array(PHASES, dtype=object), len(props))
+    props['volatility_score'] = rng.uniform(0.7, 1.3, len(props))
+    for stat in ['PTS', 'REB', 'AST']:
+        props[f'predicted_{stat}'] = np.round(gamelogs[stat] + rng.normal(0, 3, len(props)))
+    props['predicted_fantasy_points'] = gamelogs['WNBA_FANTASY_PTS'] * rng.uniform(0.8, 1.2, len(props))
+    props.loc[props.sample(frac=0.05, random_state=seed).index, 'predicted_REB'] = np.nan
+    return props, gamelogs
+
+
+def _tag_reference(merged, tag, prop_type):
+    """Refilter the merged props for one tag and prop type."""
+    actual_col = 'WNBA_FANTASY_PTS' if prop_type == 'fantasy_points' else prop_type
+    clean = merged.loc[merged['cycle_risk_tag'] == tag, [f'predicted_{prop_type}', actual_col]].dropna()
+    predicted, actual = clean.iloc[:, 0], clean.iloc[:, 1]
+    pct = ((actual - predicted) / predicted).replace([np.inf, -np.inf], np.nan)
+    return {'over_rate': (actual > predicted).mean(), 'under_rate': (actual < predicted).mean(),
+            'push_rate': (actual == predicted).mean(), 'avg_pct_diff': pct.mean(),
+            'std_pct_diff': pct.std(), 'sample_size': len(clean)}
+
+
+class TestMetricsCube:
+    """Test cube aggregation against refiltering the merged props."""
+
+    def test_tag_metrics_match_refiltering(self):
+        """Every tag/prop cell agrees with filtering the merged frame."""
+        props, gamelogs = _data()
+        backtester = CycleRiskBacktester()
+
+        results = backtester.backtest_props(props, gamelogs)
+
+        merged = backtester.merged_df
+        assert list(results['tag_performance']) == [tag for tag in merged['cycle_risk_tag'].unique()
+                                                    if pd.notna(tag)]
+        for tag, performance in results['tag_performance'].items():
+            assert performance['sample_size'] == (merged['cycle_risk_tag'] == tag).sum()
+            for prop_type, metrics in performance['prop_types'].items():
+                expected = _tag_reference(merged, tag, prop_type)
+                assert metrics['sample_size'] == expected['sample_size']
+                for key in ['over_rate', 'under_rate', 'push_rate', 'avg_pct_diff', 'std_pct_diff']:
+                    assert metrics[key] == pytest.approx(expected[key], rel=1e-9)
+
+        fade = results['tag_performance']['FADE_LUTEAL']
+        assert fade['fade_effectiveness'] == pytest.approx(
+            np.mean([metrics['under_rate'] for metrics in fade['prop_types'].values()]))
+        assert fade['target_effectiveness'] == 0.0
+
+    def test_prediction_without_actual_reported_empty(self):
+        """A predicted prop type whose actual column is missing is still reported, as {}."""
+        props, gamelogs = _data()
+        backtester = CycleRiskBacktester()
+        backtester.backtest_props(props, gamelogs)
+        backtester.merged_df = backtester.merged_df.drop(columns='WNBA_FANTASY_PTS')
+
+        results = backtester.rerun(volatility_bins=backtester.volatility_bins)
+
+        for performance in results['tag_performance'].values():
+            assert list(performance['prop_types']) == ['PTS', 'REB', 'AST', 'fantasy_points']
+            assert performance['prop_types']['fantasy_points'] == {}
+
+    def test_phase_correlation_from_cell_sums(self):
+        """Correlations from cell co-moments equal pandas' row-level corr."""
+        props, gamelogs = _data()
+        backtester = CycleRiskBacktester()
+
+        correlations = backtester.backtest_props(props, gamelogs)['phase_correlations']
+
+        merged = backtester.merged_df
+        phase = merged['cycle_phase'].map({'menstrual': 1, 'follicular': 2, 'ovulation': 3, 'luteal': 4})
+        expected = phase.corr(merged['PTS'] - merged['predicted_PTS'])
+        assert list(correlations) == ['PTS', 'REB', 'AST', 'WNBA_FANTASY_PTS']
+        assert correlations['PTS'] == pytest.approx(expected, rel=1e-9)
+
+    def test_volatility_buckets(self):
+        """Bucket sample sizes count every prop in the bucket."""
+        props, gamelogs = _data()
+        props.loc[props.index[:5], 'volatility_score'] = np.nan
+        backtester = CycleRiskBacktester()
+
+        accuracy = backtester.backtest_props(props, gamelogs)['volatility_accuracy']
+
+        assert set(accuracy) <= {'very_low', 'low', 'normal', 'high', 'very_high', 'extreme'}
+        assert sum(stats['sample_size'] for stats in accuracy.values()) == \
+            backtester.merged_df['volatility_score'].notna().sum()
+
+    def test_lowercase_schema(self):
+        """The phase estimator's backtester builds the same cube on lowercase columns."""
+        props, gamelogs = _data()
+        rename = {'PLAYER_ID': 'player_id', 'GAME_DATE': 'game_date', 'PTS': 'points', 'REB': 'rebounds',
+                  'AST': 'assists', 'MIN': 'minutes', 'WNBA_FANTASY_PTS': 'actual_fantasy_points',
+                  'predicted_PTS': 'predicted_points', 'predicted_REB': 'predicted_rebounds',
+                  'predicted_AST': 'predicted_assists'}
+
+        upper = CycleRiskBacktester().backtest_props(props.copy(), gamelogs.copy())
+        lower = LowercaseBacktester().backtest_props(props.rename(columns=rename), gamelogs.rename(columns=rename))
+
+        assert upper['best_fade_tags'] == lower['best_fade_tags']
+        assert list(lower['phase_correlations']) == ['points', 'rebounds', 'assists', 'actual_fantasy_points']
+        assert lower['volatility_accuracy'] == upper['volatility_accuracy']
+
+
+class TestRerun:
+    """Test re-aggregating for new thresholds."""
+
+    def test_thresholds_do_not_remerge(self, monkeypatch):
+        """New recommendation thresholds reuse the cube."""
+        props, gamelogs = _data()
+        backtester = CycleRiskBacktester()
+        first = backtester.backtest_props(props, gamelogs)
+        cube = backtester.metrics_cube
+
+        def fail(*args):
+            raise AssertionError("merged again")
+        monkeypatch.setattr(backtester, '_merge_props_with_actuals', fail)
+        rerun = backtester.rerun(signal_threshold=0.0, correlation_threshold=0.0)
+
+        assert backtester.metrics_cube is cube
+        assert rerun['best_fade_tags'] == first['best_fade_tags']
+        assert any(rec.startswith('STRONG SIGNAL') for rec in backtester._generate_recommendations())
+        with pytest.raises(ValueError):
+            backtester.rerun(unknown_threshold=1)
+
+    def test_new_bins_reaggregate_merged_props(self):
+        """New volatility bins rebuild the cube from the cached merge."""
+        props, gamelogs = _data()
+        backtester = CycleRiskBacktester()
+        backtester.backtest_props(props, gamelogs)
+
+        accuracy = backtester.rerun(volatility_bins=[0, 1.0, np.inf], volatility_labels=['calm', 'wild'])
+
+        assert set(accuracy['volatility_accuracy']) == {'calm', 'wild'}
+        with pytest.raises(ValueError):
+            CycleRiskBacktester().rerun(volatility_bins=[0, 1.0, np.inf])
+
+
+class TestPersistence:
+    """Test saving the cube and reporting from it."""
+
+    def test_report_reads_saved_cube(self, tmp_path):
+        """A saved cube reproduces the results without the props."""
+        props, gamelogs = _data()
+        backtester = CycleRiskBacktester()
+        results = backtester.backtest_props(props, gamelogs)
+        cube_path = str(tmp_path / 'cube.csv')
+
+        backtester.generate_backtest_report(str(tmp_path / 'report.json'), cube_path)
+
+        reloaded = CycleRiskBacktester()
+        assert json.dumps(reloaded.load_cube(cube_path), default=str) == json.dumps(results, default=str)
+        report = json.loads((tmp_path / 'report.json').read_text())
+        assert report['summary']['total_tags_analyzed'] == 4
+        assert isinstance(report['recommendations'], list)
+
+    def test_roundtrip_keeps_missing_labels(self, tmp_path):
+        """Cells with no tag or phase survive the CSV round trip."""
+        merged = pd.DataFrame({'cycle_risk_tag': ['FADE_LUTEAL', None], 'cycle_phase': [None, 'luteal'],
+                               'volatility_score': [0.85, 5.0], 'predicted_PTS': [10.0, 12.0],
+                               'PTS': [8.0, 12.0]})
+        cube = build_metrics_cube(merged, {'PTS': ('predicted_PTS', 'PTS')})
+
+        loaded = load_metrics_cube(save_metrics_cube(cube, str(tmp_path / 'nested' / 'cube.csv')))
+
+        assert loaded['risk_tag'].isna().tolist() == [False, True]
+        assert loaded['volatility_bucket'].tolist() == ['low', 'extreme']
+        assert loaded[['unders', 'pushes']].to_numpy().tolist() == [[1, 0], [0, 1]]
@@ -0,0 +1,141 @@
+"""Tests for the cached TradingDashboard render."""
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.metrics_database import MetricsDatabase
+
+
+def _grade_days(db, n_days=10, start_offset=12):
+    for i in range(n_days):
+        date = (datetime.now() - timedelta(days=start_offset - i)).strftime('%Y-%m-%d')
+        db.insert_daily_metrics({
+            'date': date, 'total_trades': 5 + i % 3, 'winners': 3, 'losers': 2 + i % 3,
+            'win_rate': 60.0 - i, 'total_stake': 50.0, 'total_profit': (-1) ** i * 4.5 + i,
+            'roi': (-1) ** i * 9.0 + i, 'average_odds': 1.91,
+        })
+
+
+def _touch_updated_at(db_path):
+    """Move every updated_at forward, as a re-grade in a later second would."""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE daily_metrics SET updated_at = datetime(updated_at, '+1 minute')")
+
+
+class TestDataVersion:
+    """Test the daily_metrics version used as the render cache key."""
+
+    def test_version_tracks_grading(self, tmp_path):
+        """Grading a new day or re-grading an old one changes the version."""
+        db_path = str(tmp_path / 'data' / 'metrics.db')
+        db = MetricsDatabase(db_path)
+        assert db.get_data_version() == (None, 0)
+
+        _grade_days(db, 3)
+        first = db.get_data_version()
+        assert first[1] == 3
+
+        _touch_updated_at(db_path)
+        assert db.get_data_version() != first
+
+
+@pytest.fixture
+def dashboard_module():
+    pytest.importorskip('seaborn')
+    matplotlib = pytest.importorskip('matplotlib')
+    matplotlib.use('Agg')
+    sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+    import dashboard
+    return dashboard
+
+
+@pytest.fixture
+def trading_dashboard(dashboard_module, tmp_path):
+    db_path = str(tmp_path / 'data' / 'metrics.db')
+    _grade_days(MetricsDatabase(db_path))
+    return dashboard_module.TradingDashboard(db_path)
+
+
+class TestRenderCache:
+    """Test skipping renders when nothing was graded."""
+
+    def test_unchanged_dashboard_is_not_redrawn(self, trading_dashboard, tmp_path, monkeypatch):
+        """A second call with the same data and window returns without querying."""
+        output = str(tmp_path / 'dashboard.html')
+        trading_dashboard.generate_dashboard(14, output, dpi=40)
+        assert os.path.exists(tmp_path / 'dashboard.png')
+        assert 'daily_roi' in trading_dashboard.timings
+
+        monkeypatch.setattr(trading_dashboard.db, 'get_metrics_range',
+                            lambda *args: pytest.fail("queried again"))
+        assert trading_dashboard.generate_dashboard(14, output, dpi=40) == output
+        assert list(trading_dashboard.timings) == ['cache_check']
+
+    def test_new_grading_or_window_rerenders(self, trading_dashboard, tmp_path):
+        """A new updated_at, another window or force render again."""
+        output = str(tmp_path / 'dashboard.html')
+        trading_dashboard.generate_dashboard(14, output, dpi=40)
+
+        _touch_updated_at(trading_dashboard.db.db_path)
+        trading_dashboard.generate_dashboard(14, output, dpi=40)
+        assert 'fetch' in trading_dashboard.timings
+
+        trading_dashboard.generate_dashboard(7, output, dpi=40)
+        assert 'fetch' in trading_dashboard.timings
+
+        trading_dashboard.generate_dashboard(7, output, dpi=40, force=True)
+        assert 'fetch' in trading_dashboard.timings
+
+    def test_deleted_output_is_rerendered(self, trading_dashboard, tmp_path):
+        """The cache only counts while its files exist."""
+        output = str(tmp_path / 'dashboard.html')
+        trading_dashboard.generate_dashboard(14, output, dpi=40)
+        os.remove(tmp_path / 'dashboard.png')
+
+        trading_dashboard.generate_dashboard(14, output, dpi=40)
+
+        assert os.path.exists(tmp_path / 'dashboard.png')
+
+    def test_badge_is_cached(self, trading_dashboard, tmp_path):
+        """The CI badge is only rewritten when the data changes."""
+        badge = str(tmp_path / 'badge.svg')
+        trading_dashboard.generate_ci_badge(badge)
+        assert 'write' in trading_dashboard.timings
+
+        trading_dashboard.generate_ci_badge(badge)
+        assert list(trading_dashboard.timings) == ['cache_check']
+
+
+class TestVectorOutput:
+    """Test the SVG chart format and timing breakdown."""
+
+    def test_svg_is_inlined(self, trading_dashboard, tmp_path):
+        """SVG output is written and embedded in the page instead of linked."""
+        output = str(tmp_path / 'dashboard.html')
+
+        trading_dashboard.generate_dashboard(14, output, chart_format='svg')
+
+        html = (tmp_path / 'dashboard.html').read_text(encoding='utf-8')
+        assert os.path.exists(tmp_path / 'dashboard.svg')
+        assert '<svg' in html and '<?xml' not in html
+        assert 'dashboard.png' not in html
+
+    def test_timing_breakdown(self, trading_dashboard, tmp_path):
+        """Every panel and output step is timed."""
+        trading_dashboard.generate_dashboard(14, str(tmp_path / 'dashboard.html'), dpi=40)
+
+        panels = ['daily_roi', 'win_rate_trend', 'cumulative_profit', 'trade_volume',
+                  'rolling_metrics', 'best_worst_days', 'summary_stats']
+        assert set(panels + ['fetch', 'save_chart', 'html']) <= set(trading_dashboard.timings)
+        report = trading_dashboard.timing_report()
+        assert all(panel in report for panel in panels)
+
+    def test_unknown_format(self, trading_dashboard, tmp_path):
+        with pytest.raises(ValueError):
+            trading_dashboard.generate_dashboard(14, str(tmp_path / 'dashboard.html'), chart_format='gif')
@@ -0,0 +1,120 @@
+"""Tests for the cached dashboard data layer."""
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.dashboard_data import DashboardData, bet_timeline, phase_summary, risk_matrix
+
+
+def _write(path, frame, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    frame.to_csv(path, index=False)
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    results = pd.DataFrame({
+        'date': ['2024-06-01', '2024-06-01', '2024-06-02', '2024-06-02', '2024-06-03'],
+        'phase': ['luteal', 'luteal', 'menstrual', 'luteal', None],
+        'actual_result': ['win', 'loss', 'win', 'win', 'loss'],
+    })
+    _write(tmp_path / 'phase_results_tracker.csv', results, mtime=1_000_000_000)
+    return tmp_path
+
+
+class TestLazyLoading:
+    """Test per-file caching keyed on mtime and size."""
+
+    def test_files_are_read_on_first_access(self, tracker):
+        """Nothing is read until a panel asks for a source."""
+        data = DashboardData(base_dir=str(tracker))
+
+        assert data.timings == {}
+        assert len(data['phase_results']) == 5
+        assert list(data.timings) == ['load phase_results']
+
+    def test_unchanged_file_is_not_reread(self, tracker, monkeypatch):
+        """A second access with the same signature returns the cached frame."""
+        data = DashboardData(base_dir=str(tracker))
+        first = data.frame('phase_results')
+
+        monkeypatch.setattr(pd, 'read_csv', lambda *args, **kwargs: pytest.fail("re-read"))
+
+        assert data.frame('phase_results') is first
+
+    def test_changed_file_is_reloaded(self, tracker):
+        """A new mtime or size invalidates the frame and its aggregates."""
+        data = DashboardData(base_dir=str(tracker))
+        assert data.phase_summary()['bets'].sum() == 4
+
+        grown = pd.concat([data['phase_results'], pd.DataFrame(
+            {'date': ['2024-06-04'], 'phase': ['follicular'], 'actual_result': ['win']})])
+        _write(tracker / 'phase_results_tracker.csv', grown, mtime=2_000_000_000)
+
+        assert len(data['phase_results']) == 6
+        assert 'follicular' in set(data.phase_summary()['phase'])
+
+    def test_missing_and_unreadable_files(self, tracker):
+        """Missing or unreadable sources give empty frames."""
+        (tracker / 'output').mkdir()
+        (tracker / 'output' / 'phase_confidence_levels.csv').write_bytes(b'')
+        data = DashboardData(base_dir=str(tracker))
+
+        assert data['confidence'].empty
+        assert data['betting_card'].empty
+        assert data.risk_matrix()['levels'].empty
+
+
+class TestAggregates:
+    """Test the precomputed panel aggregates."""
+
+    def test_aggregates_are_computed_once_per_version(self, tracker):
+        """Repeated panel renders reuse the cached aggregate."""
+        data = DashboardData(base_dir=str(tracker))
+        calls = []
+
+        def count(frame):
+            calls.append(len(frame))
+            return phase_summary(frame)
+
+        data.derived('summary', ['phase_results'], count)
+        data.derived('summary', ['phase_results'], count)
+
+        assert calls == [5]
+        assert 'compute summary' in set(data.timing_table()['step'])
+
+    def test_phase_summary_matches_filtering(self, tracker):
+        """Per-phase counts equal filtering the tracker phase by phase."""
+        data = DashboardData(base_dir=str(tracker))
+        results = data['phase_results']
+
+        summary = data.phase_summary().set_index('phase')
+
+        for phase in ['luteal', 'menstrual']:
+            phase_data = results[results['phase'] == phase]
+            assert summary.at[phase, 'bets'] == len(phase_data)
+            assert summary.at[phase, 'wins'] == (phase_data['actual_result'] == 'win').sum()
+        assert summary.at['luteal', 'win_rate'] == pytest.approx(2 / 3)
+        assert data.result_totals() == {'total_bets': 5, 'total_wins': 3}
+
+    def test_timeline_and_risk_matrix(self):
+        """Timeline counts bets per day and phase; the matrix counts risk levels."""
+        results = pd.DataFrame({'date': ['2024-06-02', '2024-06-01', '2024-06-01'],
+                                'phase': ['luteal', 'luteal', 'luteal']})
+        adjustments = pd.DataFrame({'phase': ['luteal', 'menstrual', 'follicular'],
+                                    'kelly_multiplier': [0.5, 1.0, 1.2],
+                                    'risk_level': ['LOW', 'HIGH', 'LOW']})
+
+        timeline = bet_timeline(results)
+        matrix = risk_matrix(adjustments)
+
+        assert timeline['bet_count'].tolist() == [2, 1]
+        assert dict(zip(matrix['levels']['risk_level'], matrix['levels']['count'])) == {'LOW': 2, 'HIGH': 1}
+        assert list(matrix['multipliers'].columns) == ['phase', 'kelly_multiplier', 'risk_level']
@@ -0,0 +1,111 @@
+"""Tests for the SQLite-backed EdgeTracker ledger."""
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.edge_tracker import EdgeTracker
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    """Tracker writing to a temporary ledger."""
+    return EdgeTracker(tracking_file=str(tmp_path / "betting_history.json"))
+
+
+def _add(tracker, stat='PTS', recommendation='OVER', confidence=75, line=20.5):
+    return tracker.add_bet(player='A Wilson', stat=stat, line=line, recommendation=recommendation,
+                           predicted_ev=0.1, hit_probability=0.6, confidence=confidence)
+
+
+class TestLedger:
+    """Test bet storage and settlement."""
+
+    def test_ids_and_settlement(self, tracker):
+        """Bets get sequential ids and settle by id."""
+        first, second = _add(tracker), _add(tracker, recommendation='UNDER')
+
+        assert (first, second) == (1, 2)
+        assert tracker.update_bet_result(first, 25)
+        assert tracker.update_bet_result(second, 25)
+        assert not tracker.update_bet_result(99, 10)
+
+        bets = {bet['id']: bet for bet in tracker.history['bets']}
+        assert bets[1]['result'] == 'win'
+        assert bets[1]['payout'] == pytest.approx(1 + 100 / 110)
+        assert bets[2]['result'] == 'loss'
+        assert bets[2]['payout'] == 0
+
+    def test_bulk_settlement(self, tracker):
+        """Many results settle in one call, honouring explicit hits."""
+        ids = [_add(tracker) for _ in range(5)]
+
+        updated = tracker.update_bet_results([(ids[0], 30), (ids[1], 10), (ids[2], 10, True)])
+
+        assert updated == 3
+        results = [bet['result'] for bet in tracker.history['bets']]
+        assert results == ['win', 'loss', 'win', 'pending', 'pending']
+
+    def test_legacy_json_imported(self, tmp_path):
+        """An existing JSON history is loaded into a fresh ledger."""
+        legacy = tmp_path / "history.json"
+        legacy.write_text(json.dumps({'bets': [{
+            'id': 7, 'date': '2025-06-01T12:00:00', 'player': 'C Clark', 'stat': 'AST', 'line': 8.5,
+            'recommendation': 'OVER', 'predicted_ev': 0.1, 'hit_probability': 0.6, 'confidence': 80,
+            'stake': 1.0, 'odds': -110, 'result': 'pending', 'actual_value': None, 'payout': None,
+        }], 'sessions': []}))
+
+        tracker = EdgeTracker(tracking_file=str(legacy))
+
+        assert tracker.update_bet_result(7, 10)
+        assert _add(tracker) == 8
+
+
+class TestAggregations:
+    """Test grouped performance queries."""
+
+    def test_analyze_performance_buckets_and_stats(self, tracker):
+        """Overall, confidence and stat breakdowns come from one grouped query."""
+        results = []
+        for stat, confidence, actual in [('PTS', 80, 25), ('PTS', 60, 10), ('REB', 40, 25), ('REB', 80, 25)]:
+            results.append((_add(tracker, stat=stat, confidence=confidence), actual))
+        _add(tracker)  # pending bets are excluded
+        tracker.update_bet_results(results)
+
+        perf = tracker.analyze_performance(days=7)
+
+        assert perf['total_bets'] == 4
+        assert perf['wins'] == 3
+        assert list(perf['confidence_performance']) == ['high', 'medium', 'low']
+        assert perf['confidence_performance']['high']['count'] == 2
+        assert perf['stat_performance']['REB']['win_rate'] == 1.0
+        assert perf['stat_performance']['PTS']['win_rate'] == 0.5
+
+    def test_session_summary_upserts(self, tracker):
+        """Session summaries include pending bets and replace earlier summaries."""
+        bet_id = _add(tracker)
+        _add(tracker)
+        tracker.add_session_summary()
+        tracker.update_bet_result(bet_id, 30)
+        session = tracker.add_session_summary()
+
+        assert session['total_bets'] == 2
+        assert session['completed_bets'] == 1
+        assert session['wins'] == 1
+        assert len(tracker.history['sessions']) == 1
+
+    def test_window_excludes_old_bets(self, tracker):
+        """Bets placed before the window are not analysed."""
+        old = (datetime.now() - timedelta(days=40)).isoformat()
+        tracker.ledger.add_many([{
+            'date': old, 'player': 'X', 'stat': 'PTS', 'line': 10, 'recommendation': 'OVER',
+            'predicted_ev': 0.1, 'hit_probability': 0.5, 'confidence': 60, 'stake': 1.0,
+            'odds': -110, 'result': 'loss', 'actual_value': 5, 'payout': 0,
+        }])
+
+        assert tracker.analyze_performance(days=30) is None
+        assert tracker.add_session_summary(date=old[:10])['total_bets'] == 1
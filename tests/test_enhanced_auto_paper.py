@@ -106,6 +106,11 @@ class TestEnhancedAutoPaper(unittest.TestCase):
         slip_data = {'confidence': 0.7}
         score = self.auto_paper.calculate_confidence_score(slip_data)
         self.assertEqual(score, 0.7)
+        
+        # Missing factor values are left out, as in the batch scores
+        for edge in (None, float('nan')):
+            score = self.auto_paper.calculate_confidence_score({'confidence': 0.7, 'edge': edge})
+            self.assertEqual(score, 0.7)
     
     def test_closing_line_format(self):
         """Test closing line formatting"""
@@ -163,7 +168,7 @@ class TestEnhancedAutoPaper(unittest.TestCase):
         
         self.assertTrue(result)
     
-    @patch('auto_paper.csv.DictWriter')
+    @patch('core.paper_slip_store.csv.DictWriter')
     @patch('builtins.open', create=True)
     def test_save_slips_to_csv(self, mock_open, mock_csv_writer):
         """Test saving slips to CSV with new fields"""
@@ -187,28 +192,39 @@ class TestEnhancedAutoPaper(unittest.TestCase):
         self.assertIn('confidence_score', fieldnames)
         self.assertIn('closing_line', fieldnames)
     
-    @patch('auto_paper.sqlite3.connect')
-    def test_database_migration(self, mock_connect):
+    def test_database_migration(self):
         """Test database schema migration"""
-        mock_conn = MagicMock()
-        mock_cursor = MagicMock()
-        mock_conn.cursor.return_value = mock_cursor
-        mock_connect.return_value = mock_conn
-        
-        # Mock existing columns without new fields
-        mock_cursor.fetchall.return_value = [
-            (0, 'id', 'INTEGER', 0, None, 1),
-            (1, 'slip_id', 'TEXT', 0, None, 0),
-            (2, 'date', 'TEXT', 0, None, 0),
-            (3, 'confidence', 'REAL', 0, None, 0)
-        ]
+        import sqlite3
+        db_path = os.path.join(tempfile.mkdtemp(), "paper_metrics.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE paper_slips (id INTEGER PRIMARY KEY, slip_id TEXT UNIQUE, "
+                     "date TEXT, confidence REAL)")
+        conn.close()
         
+        self.auto_paper.db_path = db_path
         self.auto_paper._init_database()
         
-        # Should have attempted to add both new columns
-        alter_calls = [call[0][0] for call in mock_cursor.execute.call_args_list 
-                      if 'ALTER TABLE' in str(call)]
-        self.assertEqual(len(alter_calls), 2)
+        # Attaching the store leaves the database alone until it migrates (on the first save)
+        conn = sqlite3.connect(db_path)
+        self.assertNotIn('confidence_score', [row[1] for row in conn.execute("PRAGMA table_info(paper_slips)")])
+        conn.close()
+        self.auto_paper.slip_store.migrate()
+        
+        # Both new columns are added, and the migration is recorded
+        conn = sqlite3.connect(db_path)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(paper_slips)")]
+        version = conn.execute("SELECT version FROM schema_version").fetchone()[0]
+        conn.close()
+        self.assertIn('confidence_score', columns)
+        self.assertIn('closing_line', columns)
+        self.assertEqual(version, 2)
+        
+        # Later instances reuse the migrated store
+        with patch('auto_paper.build'):
+            other = EnhancedAutoPaper("test-sheet-id")
+        other.db_path = db_path
+        other._init_database()
+        self.assertIs(other.slip_store, self.auto_paper.slip_store)
     
     def test_emit_daily_metrics(self):
         """Test daily metrics emission"""
@@ -231,6 +247,61 @@ class TestEnhancedAutoPaper(unittest.TestCase):
             self.assertEqual(metrics['low_confidence_count'], 1)
 
 
+class TestMergeWithProjections(unittest.TestCase):
+    """Test the shared-board merge stage"""
+
+    def setUp(self):
+        with patch('auto_paper.build'):
+            self.auto_paper = EnhancedAutoPaper("test-sheet-id", dry_run=True)
+        self.board = [
+            {'player_name': "A'ja Wilson", 'stat_type': 'points', 'line_score': 22.5,
+             'over_odds': -110, 'under_odds': -120, 'game_id': 'G1', 'id': 'P1'},
+            {'player_name': 'Caitlin Clark', 'stat_type': 'assists', 'line_score': 8.5,
+             'over_odds': -115, 'under_odds': -105, 'game_id': 'G2', 'id': 'P2'},
+        ]
+        self.auto_paper.prizepicks_client = Mock()
+        self.auto_paper.prizepicks_client.fetch_projections.return_value = self.board
+
+    @patch('auto_paper.generate_slips')
+    def test_one_fetch_shared_across_dates(self, mock_generate):
+        """Every date reuses the board fetched once for the league"""
+        mock_generate.return_value = []
+        with patch.object(self.auto_paper, 'save_slips_to_csv'), \
+             patch.object(self.auto_paper, 'save_to_database'), \
+             patch.object(self.auto_paper.state_manager, 'save_state'), \
+             patch('auto_paper.time.sleep'):
+            self.auto_paper.run_multi_day("2025-06-26", "2025-06-28", resume=False)
+
+        self.assertEqual(self.auto_paper.prizepicks_client.fetch_projections.call_count, 1)
+        self.assertEqual(mock_generate.call_count, 3)
+        projections = mock_generate.call_args.kwargs['projections']
+        self.assertEqual([p['player_name'] for p in projections], ["A'ja Wilson", 'Caitlin Clark'])
+
+    @patch('auto_paper.generate_slips')
+    def test_normalized_join_and_batch_fields(self, mock_generate):
+        """Slips join live lines on normalized keys and get batch-computed fields"""
+        mock_generate.return_value = [
+            {'player': "a'ja  wilson", 'prop_type': 'Points ', 'line': 20.5, 'confidence': 0.7,
+             'projection': 25.0},
+            {'player': 'Unknown Player', 'prop_type': 'points', 'line': 10.5, 'confidence': 0.6},
+        ]
+        live_lines = self.auto_paper.fetch_live_lines()
+        slips = self.auto_paper.merge_with_projections(live_lines, "2025-06-26")
+
+        self.assertEqual(self.auto_paper.last_merge_stats, {'hits': 1, 'misses': 1})
+        self.assertEqual(slips[0]['source'], 'prizepicks_live')
+        self.assertEqual(slips[0]['line'], 22.5)
+        self.assertEqual(slips[0]['game_id'], 'G1')
+        self.assertAlmostEqual(slips[0]['edge'], (25.0 - 22.5) / 22.5)
+        self.assertEqual(slips[0]['pick'], 'over')
+        self.assertNotIn('edge', slips[1])
+
+        self.assertEqual([slip['confidence_score'] for slip in slips], [0.7, 0.6])
+        for slip in slips:
+            self.assertEqual(slip['slip_id'], self.auto_paper.generate_slip_id(slip))
+            self.assertEqual(slip['closing_line'], f"{slip['prop_type']} {slip['line']}")
+
+
 class TestMultiDayRun(unittest.TestCase):
     """Test multi-day run functionality"""
     
@@ -0,0 +1,151 @@
+"""Tests for the incremental EnhancedCycleDetector state."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from enhanced_cycle_detector import Z_TOLERANCE, EnhancedCycleDetector, RollingWelford
+
+
+def _gamelogs(n_players=5, n_games=45, seed=1):
+    """Integer box scores every other day with a dip roughly every 27 days."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for p in range(n_players):
+        start = pd.Timestamp('2024-05-01') + pd.Timedelta(days=p)
+        for g in range(n_games):
+            day = g * 2 + int(rng.integers(0, 2))
+            rows.append({'PLAYER_NAME': f"Player {p}", 'GAME_DATE': start + pd.Timedelta(days=day),
+                         'PTS': int(rng.integers(4, 8) if day % 27 < 3 else rng.integers(12, 25)),
+                         'REB': int(rng.integers(2, 10)),
+                         'AST': np.nan if g == 3 else int(rng.integers(0, 3))})
+    return pd.DataFrame(rows)
+
+
+def _full_results(games, tmp_path, **kwargs):
+    path = tmp_path / 'games.csv'
+    games.to_csv(path, index=False)
+    detector = EnhancedCycleDetector(**kwargs)
+    detector.load_data(path)
+    return detector.analyze_all_players(verbose=False, processes=1)
+
+
+def _export(detector, results, tmp_path, name):
+    return detector.export_detailed_results(results, str(tmp_path / f"{name}.csv"))
+
+
+class TestRollingWelford:
+    """Test the sliding-window mean and std."""
+
+    def test_matches_pandas_rolling(self):
+        """Window stats equal pandas rolling(7, min_periods=3), NaNs included."""
+        values = pd.Series(np.random.default_rng(0).normal(10, 3, 60))
+        values.iloc[[4, 5, 20]] = np.nan
+        window = RollingWelford()
+
+        stats = []
+        for value in values:
+            window.push(value)
+            stats.append(window.stats())
+
+        mean, std = np.array(stats).T
+        np.testing.assert_allclose(mean, values.rolling(7, min_periods=3).mean(), rtol=1e-12)
+        np.testing.assert_allclose(std, values.rolling(7, min_periods=3).std(), rtol=1e-9)
+
+    def test_constant_window_has_zero_std(self):
+        """Identical values give their exact mean and a std of exactly 0."""
+        window = RollingWelford()
+        for value in [3.1, 7.7, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1]:
+            window.push(value)
+
+        assert window.stats() == (0.1, 0.0)
+
+
+class TestIncrementalUpdate:
+    """Test that incremental updates reproduce a full analysis."""
+
+    def test_batches_match_full_analysis(self, tmp_path, capsys):
+        """Feeding games in date batches gives the same export as one full pass."""
+        games = _gamelogs()
+        full = _full_results(games, tmp_path, z_tolerance=Z_TOLERANCE)
+        detector = EnhancedCycleDetector(z_tolerance=Z_TOLERANCE)
+
+        for _, batch in games.groupby(games['GAME_DATE'].dt.to_period('W')):
+            detector.update(batch)
+
+        pd.testing.assert_frame_equal(_export(detector, detector.current_results(), tmp_path, 'inc'),
+                                      _export(detector, full, tmp_path, 'full'))
+
+    def test_early_games_are_replayed(self, tmp_path, capsys):
+        """Dips in a player's first games use the final early-season average."""
+        games = _gamelogs(n_players=1)
+        detector = EnhancedCycleDetector(z_tolerance=Z_TOLERANCE)
+
+        detector.update(games.iloc[:2])
+        detector.update(games.iloc[2:4])
+        assert len(detector.players['Player 0'].head) == 4
+        detector.update(games.iloc[4:])
+
+        state = detector.players['Player 0']
+        full = _full_results(games, tmp_path, z_tolerance=Z_TOLERANCE)[0]
+        assert state.head == []
+        assert state.result['metrics']['PTS']['recent_dips'] == full['metrics']['PTS']['recent_dips']
+        assert state.result['metrics']['AST']['dip_count'] == full['metrics']['AST']['dip_count']
+
+    def test_refeeding_skips_processed_games(self):
+        """Games on or before a player's last processed game are ignored."""
+        games = _gamelogs()
+        detector = EnhancedCycleDetector()
+        detector.update(games)
+        before = {name: state.result for name, state in detector.players.items()}
+
+        assert detector.update(games) == []
+        assert {name: state.result for name, state in detector.players.items()} == before
+
+    def test_too_few_games_have_no_result(self):
+        """Players below min_games are tracked but not reported."""
+        detector = EnhancedCycleDetector(min_games=30)
+
+        detector.update(_gamelogs(n_games=25))
+
+        assert detector.current_results() == []
+        assert all(state.games == 25 for state in detector.players.values())
+
+
+class TestState:
+    """Test persisting the incremental state."""
+
+    def test_save_and_resume(self, tmp_path):
+        """A resumed detector continues exactly where the saved one stopped."""
+        games = _gamelogs()
+        cut = games['GAME_DATE'] < pd.Timestamp('2024-06-15')
+        detector = EnhancedCycleDetector()
+        detector.update(games[cut])
+        detector.save_state(tmp_path / 'state' / 'cycles.pkl')
+
+        resumed = EnhancedCycleDetector()
+        resumed.load_state(tmp_path / 'state' / 'cycles.pkl')
+        resumed.update(games[~cut])
+
+        uninterrupted = EnhancedCycleDetector()
+        uninterrupted.update(games)
+        assert resumed.current_results() == uninterrupted.current_results()
+
+    def test_rescored_with_new_cycle_settings(self, tmp_path):
+        """Loading re-scores with the loading detector's settings; other metrics are rejected."""
+        detector = EnhancedCycleDetector()
+        detector.update(_gamelogs())
+        detector.save_state(tmp_path / 'cycles.pkl')
+
+        narrow = EnhancedCycleDetector(cycle_range=(26, 28), min_games=50)
+        narrow.load_state(tmp_path / 'cycles.pkl')
+        assert narrow.current_results() == []
+
+        other = EnhancedCycleDetector()
+        other.target_metrics = ['PTS']
+        with pytest.raises(ValueError):
+            other.load_state(tmp_path / 'cycles.pkl')
@@ -0,0 +1,80 @@
+"""Tests for the vectorized rolling feature engine."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.features import add_rolling_features, update_rolling_features
+
+
+def _reference_features(df, windows, stats):
+    """Per-group lambda implementation the engine replaces."""
+    df = df.copy()
+    df.sort_values(["PLAYER_NAME", "GAME_DATE"], inplace=True)
+    for stat in stats:
+        for window in windows:
+            avg = f"{stat}_{window}G_AVG"
+            df[avg] = df.groupby("PLAYER_NAME")[stat].transform(
+                lambda x: x.shift(1).rolling(window, min_periods=1).mean())
+            df[f"{stat}_{window}G_STD"] = df.groupby("PLAYER_NAME")[stat].transform(
+                lambda x: x.shift(1).rolling(window, min_periods=1).std())
+            df[f"{stat}_{window}G_Z"] = (df[stat] - df[avg]) / df[f"{stat}_{window}G_STD"]
+    return df
+
+
+@pytest.fixture
+def gamelogs():
+    """Three players with uneven game counts, a missing value and a flat streak."""
+    rng = np.random.default_rng(7)
+    rows = []
+    for player, games in [("A Wilson", 14), ("B Stewart", 4), ("C Clark", 9)]:
+        dates = pd.date_range("2024-05-14", periods=games, freq="3D")
+        for date in dates:
+            rows.append({
+                "PLAYER_NAME": player,
+                "GAME_DATE": date,
+                "PTS": float(rng.integers(5, 35)),
+                "MIN": round(float(rng.uniform(20, 38)), 2),
+            })
+    df = pd.DataFrame(rows).sample(frac=1, random_state=3)
+    df.loc[df.index[2], "PTS"] = np.nan
+    df.loc[df["PLAYER_NAME"] == "B Stewart", "MIN"] = 31.7
+    return df
+
+
+class TestRollingFeatures:
+    """Test the one-pass feature computation."""
+
+    def test_matches_grouped_rolling(self, gamelogs):
+        """Output equals the per-group shift/rolling implementation."""
+        expected = _reference_features(gamelogs, [3, 5], ["PTS", "MIN"])
+        result = add_rolling_features(gamelogs, windows=[3, 5], stats=["PTS", "MIN"])
+
+        assert list(result.columns) == list(expected.columns)
+        pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-9)
+
+    def test_no_leakage_of_current_game(self, gamelogs):
+        """A player's first game has no rolling history."""
+        result = add_rolling_features(gamelogs, windows=[3], stats=["PTS"])
+        first_games = result.groupby("PLAYER_NAME").head(1)
+
+        assert first_games["PTS_3G_AVG"].isna().all()
+
+    def test_incremental_update_matches_full_build(self, gamelogs):
+        """Appending new games gives the same features as a full rebuild."""
+        cutoff = pd.Timestamp("2024-05-30")
+        base = add_rolling_features(gamelogs[gamelogs["GAME_DATE"] <= cutoff], windows=[3, 5], stats=["PTS"])
+        updated = update_rolling_features(base, gamelogs[gamelogs["GAME_DATE"] > cutoff],
+                                          windows=[3, 5], stats=["PTS"])
+        full = add_rolling_features(gamelogs, windows=[3, 5], stats=["PTS"])
+
+        key = ["PLAYER_NAME", "GAME_DATE"]
+        pd.testing.assert_frame_equal(
+            updated.sort_values(key).reset_index(drop=True),
+            full.sort_values(key).reset_index(drop=True),
+            check_exact=False, rtol=1e-9,
+        )
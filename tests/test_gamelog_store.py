@@ -0,0 +1,141 @@
+"""Tests for the shared columnar gamelog store."""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.gamelog_store import GamelogStore, load_gamelogs, normalize_gamelogs, read_gamelog_csv
+
+
+@pytest.fixture
+def combined_csv(tmp_path):
+    """Gamelog CSV in the combined (Player/Date) layout with a BOM."""
+    path = tmp_path / "combined.csv"
+    df = pd.DataFrame({
+        'Player': ['A Wilson', 'A Wilson', 'C Clark', 'C Clark'],
+        'Date': ['2024-05-14', '2025-05-20', '2024-05-14', '2025-05-21'],
+        'PTS': [22, 30, 20, 18],
+        'AST': [2, 3, 8, 9],
+        'REB': [10, 12, 4, 5],
+    })
+    path.write_text('\ufeff' + df.to_csv(index=False), encoding='utf-8')
+    return path
+
+
+class TestNormalization:
+    """Test canonical column aliasing and dtype coercion."""
+
+    def test_aliases_and_dtypes(self):
+        """Lower-case and alternate spellings map onto canonical names."""
+        df = pd.DataFrame({
+            'player': ['X'], 'date': ['2024-06-01'], 'points': ['12'], 'minutes': ['31:30'],
+        })
+        out = normalize_gamelogs(df)
+
+        assert list(out.columns) == ['PLAYER_NAME', 'GAME_DATE', 'PTS', 'MIN']
+        assert pd.api.types.is_datetime64_any_dtype(out['GAME_DATE'])
+        assert out['PTS'].iloc[0] == 12
+        assert out['MIN'].iloc[0] == pytest.approx(31.5)
+
+    def test_canonical_column_wins_over_alias(self):
+        """An existing canonical column is kept over its alias."""
+        df = pd.DataFrame({'PLAYER_NAME': ['Full Name'], 'Player': ['Alias']})
+        out = normalize_gamelogs(df)
+
+        assert list(out.columns) == ['PLAYER_NAME']
+        assert out['PLAYER_NAME'].iloc[0] == 'Full Name'
+
+
+class TestCsvReads:
+    """Test projected/filtered CSV reads."""
+
+    def test_projection_and_predicates(self, combined_csv):
+        """Only requested columns and matching rows come back."""
+        df = read_gamelog_csv(combined_csv, columns=['PLAYER_NAME', 'PTS'],
+                              players=['C Clark'], start_date='2025-01-01')
+
+        assert list(df.columns) == ['PLAYER_NAME', 'PTS']
+        assert df['PTS'].tolist() == [18]
+
+    def test_load_gamelogs_rename(self, combined_csv):
+        """Callers get their own column names back."""
+        df = load_gamelogs(combined_csv, columns=['PLAYER_NAME', 'GAME_DATE', 'REB'],
+                           rename={'PLAYER_NAME': 'Player', 'GAME_DATE': 'Date'})
+
+        assert list(df.columns) == ['Player', 'Date', 'REB']
+
+
+class TestParquetStore:
+    """Test the season-partitioned Parquet store."""
+
+    @pytest.fixture
+    def store(self, tmp_path, combined_csv):
+        """Store built from the combined CSV."""
+        pytest.importorskip('pyarrow')
+        store = GamelogStore(tmp_path / "store")
+        store.ingest_csv([combined_csv])
+        return store
+
+    def test_partitions_by_season(self, store):
+        """Each game year lands in its own partition."""
+        assert store.seasons() == [2024, 2025]
+
+    def test_pushdown_read(self, store):
+        """Projection, player and date predicates apply to the read."""
+        df = store.read(columns=['PLAYER_NAME', 'GAME_DATE', 'PTS'],
+                        players=['A Wilson'], end_date='2024-12-31')
+
+        assert list(df.columns) == ['PLAYER_NAME', 'GAME_DATE', 'PTS']
+        assert df['PTS'].tolist() == [22]
+
+    def test_append_keeps_existing_rows(self, store):
+        """Appending adds rows without rewriting the season."""
+        store.append(pd.DataFrame({
+            'PLAYER_NAME': ['C Clark'], 'GAME_DATE': ['2025-05-25'], 'PTS': [25], 'STL': [3],
+        }))
+        df = store.read(seasons=[2025])
+
+        assert len(df) == 3
+        assert 'STL' in df.columns
+
+    def test_load_gamelogs_prefers_store(self, store):
+        """With no explicit source the store is read."""
+        df = load_gamelogs(columns=['PLAYER_NAME', 'PTS'], players=['C Clark'], store_dir=store.root)
+
+        assert sorted(df['PTS'].tolist()) == [18, 20]
+
+    def test_slim_duplicate_source_keeps_columns(self, tmp_path):
+        """A later source with fewer columns can't null out what an earlier one has."""
+        pytest.importorskip('pyarrow')
+        full, slim = tmp_path / "full.csv", tmp_path / "slim.csv"
+        pd.DataFrame({'PLAYER_NAME': ['C Clark', 'A Wilson'], 'GAME_DATE': ['2024-05-14', '2024-05-14'],
+                      'GAME_ID': ['101', '102'], 'PTS': [20, 22], 'FGM': [7, 9],
+                      'FG3M': [3, 0]}).to_csv(full, index=False)
+        pd.DataFrame({'PLAYER_NAME': ['C Clark', 'C Clark'], 'GAME_DATE': ['2024-05-14', '2024-05-18'],
+                      'PTS': [21, 15], 'FGM': [None, 5]}).to_csv(slim, index=False)
+        store = GamelogStore(tmp_path / "store")
+
+        assert store.ingest_csv([full, slim]) == 3
+
+        df = store.read().sort_values(['PLAYER_NAME', 'GAME_DATE']).reset_index(drop=True)
+        assert df['PLAYER_NAME'].tolist() == ['A Wilson', 'C Clark', 'C Clark']
+        assert df['PTS'].tolist() == [22, 21, 15]
+        assert df['FGM'].tolist() == [9, 7, 5]
+        assert df['FG3M'].tolist()[:2] == [0, 3] and pd.isna(df['FG3M'].iloc[2])
+        assert df['GAME_ID'].tolist()[:2] == [102, 101]
+
+    def test_mixed_type_passthrough_column(self, tmp_path):
+        """A pass-through column that is text in one source and numbers in another still reads back."""
+        pytest.importorskip('pyarrow')
+        old, new = tmp_path / "2024.csv", tmp_path / "2025.csv"
+        pd.DataFrame({'PLAYER_NAME': ['C Clark'], 'GAME_DATE': ['2024-05-14'], 'MIN_SEC': ['32:36']}).to_csv(old, index=False)
+        pd.DataFrame({'PLAYER_NAME': ['C Clark'], 'GAME_DATE': ['2025-05-20'], 'MIN_SEC': [13]}).to_csv(new, index=False)
+        store = GamelogStore(tmp_path / "store")
+        store.ingest_csv([old, new])
+
+        df = store.read().sort_values('GAME_DATE')
+
+        assert df['MIN_SEC'].tolist() == ['32:36', '13']
@@ -0,0 +1,131 @@
+"""Tests for the columnar grading engine."""
+import sys
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.grading import american_to_decimal, grade_legs, load_flex_payouts, pick_sides, settle_slips
+
+
+@pytest.fixture
+def bets():
+    """Legs across three slips covering win, loss, push and missing actuals."""
+    return pd.DataFrame({
+        'slip_id': ['S1', 'S1', 'S2', 'S2', 'S2', 'S3'],
+        'player': ['A', 'B', 'A', 'C', 'D', 'E'],
+        'prop_type': ['points', 'points', 'rebounds', 'assists', 'points', 'points'],
+        'line': [20.5, 10.5, 7.0, 4.5, 12.5, 9.5],
+        'over_under': ['over', 'under', 'over', 'over', 'under', 'over'],
+        'odds': [-110, 150, -120, 100, -105, -110],
+        'stake': [10.0, 10.0, 5.0, 5.0, 5.0, 2.0],
+        'result': ['pending'] * 6,
+        'date': ['2025-06-18'] * 6,
+    })
+
+
+ACTUALS = pd.DataFrame({
+    'player': ['A', 'B', 'A', 'C', 'D'],
+    'prop_type': ['points', 'points', 'rebounds', 'assists', 'points'],
+    'actual': [24.0, 8.0, 7.0, 3.0, 12.0],
+})
+
+
+class TestGradeLegs:
+    """Test vectorized leg grading."""
+
+    def test_outcomes_and_payouts(self, bets):
+        """Masks follow the over/under/push rules and payouts use decimal odds."""
+        graded = grade_legs(bets, ACTUALS, ['player', 'prop_type'],
+                            sides=pick_sides(bets['over_under'], under=None),
+                            stake_col='stake', odds_col='odds')
+
+        assert graded['result'].tolist() == ['won', 'won', 'push', 'lost', 'won', None]
+        assert graded['payout'].iloc[0] == round(10.0 * (100 / 110 + 1), 2)
+        assert graded['payout'].iloc[1] == 25.0
+        assert graded['payout'].iloc[2] == 5.0
+        assert graded['payout'].iloc[3] == 0.0
+        assert np.isnan(graded['payout'].iloc[5])
+
+    def test_odds_conversion(self):
+        """American odds convert in bulk."""
+        np.testing.assert_allclose(american_to_decimal([-200, 100, 150]), [1.5, 2.0, 2.5])
+
+    def test_no_pick_is_ungraded(self, bets):
+        """Legs without an over/under pick get no result."""
+        sides = pick_sides(['over', 'UNDER', 'x', 'under', 'over', 'over'])
+        graded = grade_legs(bets, ACTUALS, ['player', 'prop_type'], sides=sides)
+
+        assert graded['result'].tolist()[:3] == ['won', None, None]
+
+
+class TestSettleSlips:
+    """Test slip settlement against the payout tables."""
+
+    def test_power_and_flex(self, bets):
+        """Power needs every leg; Flex pays from the (legs, wins) table."""
+        bets['result'] = ['won', 'won', 'won', 'lost', 'won', 'push']
+        slips = pd.DataFrame({'slip_id': ['S1', 'S2', 'S3', 'S4'], 'type': ['Power', 'Flex', 'Power', 'Power'],
+                              'total_stake': [10.0, 5.0, 2.0, 1.0]})
+
+        settled = settle_slips(bets, slips).set_index('slip_id')
+
+        assert list(settled.index) == ['S1', 'S2', 'S3']
+        assert settled.loc['S1', 'actual_payout'] == round(10.0 * (100 / 110 + 1) * 2.5, 2)
+        assert settled.loc['S1', 'result'] == 'won'
+        assert settled.loc['S2', 'actual_payout'] == round(5.0 * 1.2, 2)
+        assert settled.loc['S2', 'result'] == 'won'
+        assert settled.loc['S3', 'result'] == 'push'
+        assert settled.loc['S3', 'actual_payout'] == 2.0
+
+    def test_flex_tables_loaded(self):
+        """Flex multipliers are keyed by (total_legs, wins)."""
+        assert load_flex_payouts().loc[(4, 3)] == 2.0
+
+
+class TestCallers:
+    """Test that both graders use the engine."""
+
+    @patch('update_results.SheetConnector')
+    def test_results_updater(self, mock_connector, bets):
+        """ResultsUpdater grades bets and settles slips in bulk."""
+        from update_results import ResultsUpdater
+
+        updater = ResultsUpdater()
+        updater.player_stats = {'A': {'points': 24.0, 'rebounds': 7.0}, 'B': {'points': 8.0}}
+        updater.game_results = {'G': {'player_stats': {'A': {'points': 30.0}}}}
+        slips = pd.DataFrame({'slip_id': ['S1', 'S2'], 'type': ['Power', 'Flex'], 'total_stake': [10.0, 5.0],
+                              'result': ['pending', 'pending'], 'date': ['2025-06-18'] * 2})
+
+        assert updater._update_bet_results(bets, bets[bets['result'] == 'pending']) == 3
+        assert bets['actual'].iloc[0] == 30.0  # fetched results win over simulated
+        assert updater._update_slip_results(slips, bets, datetime(2025, 6, 18)) == 2
+        assert slips['result'].tolist() == ['won', 'lost']
+        assert slips['winning_legs'].tolist() == [2, 0]
+
+    def test_result_grader_matches_scalar(self):
+        """grade_slips returns exactly what grade_slip gives per slip."""
+        from scripts.result_grader import EnhancedResultGrader
+
+        grader = EnhancedResultGrader()
+        results = {
+            'A_Points': {'actual_value': 28.0}, 'B_Points': {'actual_value': 10},
+            'C_Points': {'actual_value': None}, 'D_Points': {'actual_value': '12'}, 'G1': {'winner': 'X'},
+        }
+        slips = [
+            {'slip_id': '1', 'player': 'A', 'prop_type': 'Points', 'line': 25.5, 'pick': 'OVER'},
+            {'slip_id': '2', 'player': 'B', 'prop_type': 'Points', 'line': '10', 'pick': 'UNDER'},
+            {'slip_id': '3', 'player': 'A', 'prop_type': 'Points', 'line': 25.5, 'pick': 'over'},
+            {'slip_id': '4', 'player': 'C', 'prop_type': 'Points', 'line': 5, 'pick': 'OVER'},
+            {'slip_id': '5', 'player': 'D', 'prop_type': 'Points', 'line': 5, 'pick': 'OVER'},
+            {'slip_id': '6', 'player': 'E', 'prop_type': 'Points', 'line': 5, 'pick': 'OVER', 'game_id': 'G1'},
+            {'slip_id': '7', 'player': 'A', 'prop_type': 'Points', 'line': 'abc', 'pick': 'OVER'},
+            {'slip_id': '8', 'player': '', 'prop_type': 'Points', 'pick': 'OVER'},
+        ]
+
+        assert grader.grade_slips(slips, results) == [grader.grade_slip(slip, results) for slip in slips]
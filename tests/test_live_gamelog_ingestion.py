@@ -0,0 +1,126 @@
+"""Tests for concurrent, cached ESPN gamelog ingestion."""
+import importlib
+import json
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _summary(game_id, player_id="1", pts="12"):
+    """Minimal ESPN summary payload with one player line."""
+    return {
+        'header': {'competitions': [{'date': '2025-06-01T23:00Z'}]},
+        'boxscore': {'players': [{
+            'team': {'id': '5', 'displayName': 'Las Vegas Aces', 'abbreviation': 'LV'},
+            'statistics': [{
+                'names': ['MIN', 'FG', '3PT', 'FT', 'REB', 'AST', 'PTS'],
+                'athletes': [{
+                    'athlete': {'id': player_id, 'displayName': f'Player {player_id}'},
+                    'stats': ['30', '5-10', '1-3', '1-2', '7', '3', pts],
+                }],
+            }],
+        }]},
+    }
+
+
+@pytest.fixture
+def ingestion_module(tmp_path, monkeypatch):
+    """Import the module from a scratch cwd so its log file lands there."""
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module('scripts.data.live_gamelog_ingestion')
+
+
+@pytest.fixture
+def ingestion(ingestion_module, tmp_path):
+    """Ingestion instance writing into a temporary data directory."""
+    ing = ingestion_module.WNBALiveIngestion(max_workers=4, request_delay=0)
+    ing.data_dir = tmp_path / "data"
+    ing.data_dir.mkdir(exist_ok=True)
+    return ing
+
+
+class TestRateLimiter:
+    """Test the shared request spacing."""
+
+    def test_spaces_calls(self, ingestion_module):
+        """Consecutive waits are spaced by the minimum interval."""
+        limiter = ingestion_module.RateLimiter(0.05)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.wait()
+        assert time.monotonic() - start >= 0.1
+
+
+class TestBoxscoreCache:
+    """Test on-disk caching of finalized game summaries."""
+
+    def test_final_game_served_from_cache(self, ingestion):
+        """A finalized game is fetched once, then read from disk."""
+        with patch.object(ingestion, 'make_api_request', return_value=_summary('401')) as mock_req:
+            first = ingestion.get_player_stats_from_game('401', final=True)
+            second = ingestion.get_player_stats_from_game('401', final=True)
+
+        assert mock_req.call_count == 1
+        assert first == second
+        assert json.loads(ingestion._cache_path('401').read_text())['boxscore']
+
+    def test_live_game_not_cached(self, ingestion):
+        """In-progress games always hit the network."""
+        with patch.object(ingestion, 'make_api_request', return_value=_summary('402')) as mock_req:
+            ingestion.get_player_stats_from_game('402')
+            ingestion.get_player_stats_from_game('402')
+
+        assert mock_req.call_count == 2
+        assert not ingestion._cache_path('402').exists()
+
+
+class TestIncrementalIngestion:
+    """Test incremental append mode."""
+
+    def test_only_new_games_fetched_and_appended(self, ingestion):
+        """Games already on file are skipped and new rows are appended."""
+        games = [
+            {'game_id': '401', 'date': '2025-06-01', 'status': 'Final',
+             'home_team_abbr': 'LV', 'away_team_abbr': 'NY'},
+            {'game_id': '402', 'date': '2025-06-02', 'status': 'Final',
+             'home_team_abbr': 'LV', 'away_team_abbr': 'SEA'},
+        ]
+        summaries = {'401': _summary('401', '1'), '402': _summary('402', '2')}
+
+        with patch.object(ingestion, 'get_games_espn', return_value=games[:1]), \
+             patch.object(ingestion, 'get_game_summary', side_effect=lambda gid, final=False: summaries[gid]):
+            assert ingestion.run_full_ingestion()
+
+        with patch.object(ingestion, 'get_games_espn', return_value=games), \
+             patch.object(ingestion, 'get_game_summary',
+                          side_effect=lambda gid, final=False: summaries[gid]) as mock_summary:
+            assert ingestion.run_full_ingestion(incremental=True)
+
+        assert [c.args[0] for c in mock_summary.call_args_list] == ['402']
+        df = pd.read_csv(ingestion.data_dir / "wnba_2025_gamelogs.csv", dtype={'GAME_ID': str})
+        assert list(df['GAME_ID']) == ['401', '402']
+
+    def test_scan_stops_at_today(self, ingestion, ingestion_module, monkeypatch):
+        """A mid-season incremental run scans from the last stored day to today only."""
+        games = [{'game_id': '401', 'date': '2025-06-01', 'status': 'Final',
+                  'home_team_abbr': 'LV', 'away_team_abbr': 'NY'}]
+        with patch.object(ingestion, 'get_games_espn', return_value=games), \
+             patch.object(ingestion, 'get_game_summary', return_value=_summary('401')):
+            assert ingestion.run_full_ingestion()
+
+        class Today(ingestion_module.datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return cls(2025, 6, 10, 22, 30)
+
+        monkeypatch.setattr(ingestion_module, 'datetime', Today)
+        with patch.object(ingestion, 'get_games_espn', return_value=games) as mock_games:
+            assert ingestion.run_full_ingestion(incremental=True)
+
+        mock_games.assert_called_once_with('2025-06-01', '2025-06-10')
@@ -0,0 +1,84 @@
+"""Tests for batched paper slip persistence."""
+import sqlite3
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.paper_slip_store import SCHEMA_VERSION, PaperSlipStore, get_slip_store, write_slips
+
+FIELDNAMES = ['slip_id', 'player', 'line', 'legs', 'confidence_score']
+
+
+def _slips(n):
+    return [{'slip_id': f'PG_{i:08X}', 'date': '2025-06-26', 'player': f'Player {i}', 'line': 10.5 + i,
+             'pick': 'over', 'confidence': 0.6, 'confidence_score': 0.7, 'closing_line': 'points 10.5',
+             'created_at': '2025-06-26T12:00:00'} for i in range(n)]
+
+
+class TestPaperSlipStore:
+    """Test migrations and batched writes."""
+
+    def test_fresh_database_migrated_once(self, tmp_path):
+        """Opening writes nothing; the first save migrates and later stores skip it."""
+        db_path = str(tmp_path / "metrics.db")
+        store = PaperSlipStore(db_path)
+        assert store.schema_version() == 0
+        assert store.conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone() == (0,)
+
+        store.save_slips(_slips(1))
+        assert store.schema_version() == SCHEMA_VERSION
+
+        with patch('core.paper_slip_store._add_missing_columns') as step:
+            PaperSlipStore(db_path).save_slips(_slips(1))
+        step.assert_not_called()
+
+    def test_registry_shares_connection(self, tmp_path):
+        """One store (and connection) per database file per process."""
+        db_path = str(tmp_path / "metrics.db")
+        assert get_slip_store(db_path) is get_slip_store(str(tmp_path / "." / "metrics.db"))
+
+    def test_save_slips_is_one_transaction(self, tmp_path):
+        """Slips upsert by slip_id, and a failing batch leaves nothing behind."""
+        store = PaperSlipStore(str(tmp_path / "metrics.db"))
+        assert store.save_slips(_slips(500)) == 500
+
+        updated = _slips(2)
+        updated[0]['pick'] = 'under'
+        store.save_slips(updated)
+
+        rows = store.conn.execute("SELECT COUNT(*), SUM(pick = 'under') FROM paper_slips").fetchone()
+        assert rows == (500, 1)
+
+        bad = _slips(3)
+        bad[2]['date'] = None  # violates NOT NULL
+        bad[0]['slip_id'] = 'PG_NEW'
+        with pytest.raises(sqlite3.IntegrityError):
+            store.save_slips(bad)
+        assert store.conn.execute("SELECT COUNT(*) FROM paper_slips WHERE slip_id = 'PG_NEW'").fetchone() == (0,)
+
+
+class TestWriteSlips:
+    """Test the combined CSV/Parquet writer."""
+
+    def test_csv_blanks_missing_and_drops_extra_fields(self, tmp_path):
+        """Missing fields are blank and unknown fields are ignored."""
+        path = write_slips([{'slip_id': 'PG_1', 'player': 'A', 'extra': 1}], str(tmp_path / "s.csv"), FIELDNAMES)
+
+        assert Path(path).read_text(encoding='utf-8').splitlines() == [','.join(FIELDNAMES), 'PG_1,A,,,']
+
+    def test_parquet_round_trip(self, tmp_path):
+        """Parquet keeps numeric columns and encodes nested legs as JSON."""
+        pytest.importorskip("pyarrow")
+        slips = [{'slip_id': 'PG_1', 'player': 'A', 'line': 20.5, 'legs': [{'player': 'A'}]},
+                 {'slip_id': 'PG_2', 'player': 'B', 'line': 8.5, 'confidence_score': 0.8}]
+        frame = pd.read_parquet(write_slips(slips, str(tmp_path / "s.parquet"), FIELDNAMES))
+
+        assert list(frame.columns) == FIELDNAMES
+        assert frame['line'].tolist() == [20.5, 8.5]
+        assert frame['legs'].iloc[0] == '[{"player": "A"}]'
+        assert frame['legs'].isna().iloc[1]
@@ -0,0 +1,112 @@
+"""Tests for the spectral cycle-length search and parallel player scans."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.periodicity import (GamelogBuffer, best_period, candidate_periods, dip_periodogram,
+                              scan_players)
+from cycle_detector import CycleAwarePatternDetector
+from enhanced_cycle_detector import EnhancedCycleDetector
+
+
+def _gamelogs(n_players=6, n_games=60, period=27, seed=0):
+    """Every-other-day games with a scoring dip every `period` days for even players."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for p in range(n_players):
+        start = pd.Timestamp('2024-05-01') + pd.Timedelta(days=p)
+        for g in range(n_games):
+            day = g * 2
+            dip = p % 2 == 0 and day % period < 2
+            rows.append({'PLAYER_NAME': f"Player {p}", 'GAME_DATE': start + pd.Timedelta(days=day),
+                         'PTS': (6 if dip else 20) + rng.normal(0, 1),
+                         'REB': 8 + rng.normal(0, 1), 'AST': 5 + rng.normal(0, 1)})
+    return pd.DataFrame(rows).sort_values(['PLAYER_NAME', 'GAME_DATE']).reset_index(drop=True)
+
+
+class TestPeriodogram:
+    """Test scoring candidate cycle lengths."""
+
+    def test_finds_true_period(self):
+        """Dips every 28 days peak at 28."""
+        periods = candidate_periods((21, 35))
+
+        period, score = best_period([3, 31, 59, 87, 115], periods)
+
+        assert period == 28
+        assert score == pytest.approx(1.0)
+        assert dip_periodogram([3, 31, 59], periods).shape == periods.shape
+
+    def test_too_few_dips(self):
+        """Fewer than three dips give no period."""
+        assert best_period([1, 29], candidate_periods((21, 35))) is None
+        assert not dip_periodogram([], [28]).any()
+
+
+class TestGamelogBuffer:
+    """Test the columnar per-player buffer."""
+
+    def test_frames_match_filtering(self):
+        """Each player's slice equals filtering the source frame."""
+        df = _gamelogs(n_players=3, n_games=5).sample(frac=1, random_state=1)
+        buffer = GamelogBuffer.from_frame(df, ['GAME_DATE', 'PTS', 'MISSING'])
+
+        assert list(buffer.players) == list(df['PLAYER_NAME'].unique())
+        assert buffer.columns == ['GAME_DATE', 'PTS']
+        for i, player in enumerate(buffer.players):
+            expected = df.loc[df['PLAYER_NAME'] == player, ['PLAYER_NAME', 'GAME_DATE', 'PTS']]
+            pd.testing.assert_frame_equal(buffer.frame(i), expected.reset_index(drop=True))
+
+
+class TestDetectors:
+    """Test the detectors on the shared engine."""
+
+    def test_optimal_length_from_dips(self):
+        """The cycle-length search recovers the injected period."""
+        detector = CycleAwarePatternDetector(cycle_range=(21, 35), min_games=30)
+        detector.df = _gamelogs(period=27)
+
+        result = detector.analyze_player('Player 0')
+
+        assert result['metrics']['PTS']['optimal_cycle_length'] in (26, 27, 28)
+
+    def test_pool_matches_in_process(self):
+        """A process-pool scan returns the same results as an in-process scan."""
+        detector = CycleAwarePatternDetector(min_games=30)
+        detector.df = _gamelogs()
+
+        serial = detector.analyze_all_players(processes=1)
+        pooled = detector.analyze_all_players(processes=2)
+
+        assert repr(pooled) == repr(serial)
+        assert repr(serial[0]) == repr(detector.analyze_player(serial[0]['player_name']))
+
+    def test_enhanced_scan(self):
+        """EnhancedCycleDetector scans through the pool and reports a spectral period."""
+        detector = EnhancedCycleDetector(min_games=20)
+        detector.df = _gamelogs()
+        detector.df['DAYS_SINCE_START'] = (
+            detector.df['GAME_DATE'] - detector.df.groupby('PLAYER_NAME')['GAME_DATE'].transform('min')
+        ).dt.days.astype(float)
+
+        results = detector.analyze_all_players(verbose=False, processes=2)
+
+        assert len(results) == 6
+        assert repr(results) == repr(detector.analyze_all_players(verbose=False, processes=1))
+        pts = next(r for r in results if r['player_name'] == 'Player 0')['metrics']['PTS']
+        assert 21 <= pts['spectral_period'] <= 35
+
+    def test_scan_reports_progress(self):
+        """Progress is reported once per span, ending at the total."""
+        detector = CycleAwarePatternDetector(min_games=30)
+        buffer = GamelogBuffer.from_frame(_gamelogs(n_players=3), ['GAME_DATE', 'PTS'])
+        calls = []
+
+        scan_players(detector, buffer, processes=1, progress=lambda done, total: calls.append((done, total)))
+
+        assert calls[-1] == (3, 3)
@@ -0,0 +1,136 @@
+"""Tests for the columnar phase confidence tracker."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from phase_confidence_tracker import LOG_COLUMNS, PhaseConfidenceTracker, confidence_statuses
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    (tmp_path / 'output').mkdir()
+    pd.DataFrame({
+        'phase': ['Follicular', 'luteal', 'menstrual', 'ovulatory'],
+        'total_bets': [25, 30, 22, 13],
+        'total_wins': [16, 22, 10, 9],
+        'win_rate': [0.64, 73.3, 0.4545, 0.69],
+    }).to_csv(tmp_path / 'output' / 'backtest_by_phase.csv', index=False)
+    pd.DataFrame([
+        ['2025-07-01', 'follicular', 18, 11, 0.61, 'LOW'],
+        ['2025-07-01', 'luteal', 25, 17, 0.68, 'MEDIUM'],
+        ['2025-07-01', 'menstrual', 20, 14, 0.70, 'HIGH'],
+        ['2025-07-02', 'follicular', 20, 12, 0.60, 'MEDIUM'],
+    ], columns=LOG_COLUMNS).to_csv(tmp_path / 'output' / 'phase_confidence_log.csv', index=False)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _tracker(today='2025-07-03'):
+    tracker = PhaseConfidenceTracker()
+    tracker.today = today
+    tracker.load_phase_data()
+    tracker.load_confidence_log()
+    return tracker
+
+
+class TestStatus:
+    """Test vectorized status rules."""
+
+    def test_status_thresholds(self):
+        """20 bets are needed; 60% and 70% win rates (as decimals or percentages) are the cut-offs."""
+        rates = [0.0, 0.59, 0.6, 0.69, 0.7, 0.95, 65.0, 72.0, np.nan]
+
+        assert confidence_statuses([19] * len(rates), rates).tolist() == ['LOW'] * len(rates)
+        assert confidence_statuses([20] * len(rates), rates).tolist() == [
+            'LOW', 'LOW', 'MEDIUM', 'MEDIUM', 'HIGH', 'HIGH', 'MEDIUM', 'HIGH', 'LOW']
+
+    def test_scalar_helpers_use_batch_rules(self, workdir, capsys):
+        """The per-phase helpers give the same status and change as the batch path."""
+        tracker = _tracker()
+
+        assert tracker.determine_confidence_status(30, 73.3) == 'HIGH'
+        tracker.check_confidence_change('luteal', 'HIGH')
+        tracker.check_confidence_change('follicular', 'MEDIUM')
+
+        assert [(change['phase'], change['change']) for change in tracker.confidence_changes] == [
+            ('luteal', 'MEDIUM → HIGH')]
+
+
+class TestUpdate:
+    """Test change detection and the append-only log."""
+
+    def test_changes_against_latest_entry(self, workdir, capsys):
+        """Each phase is compared with its most recent log entry only."""
+        tracker = _tracker()
+
+        tracker.update_confidence_log()
+
+        changes = {change['phase']: (change['change'], change['type']) for change in tracker.confidence_changes}
+        # follicular was LOW on 07-01 but MEDIUM on 07-02, so staying MEDIUM is no change
+        assert changes == {
+            'luteal': ('MEDIUM → HIGH', '⬆️ UPGRADE'),
+            'menstrual': ('HIGH → LOW', '⬇️ DOWNGRADE'),
+        }
+        assert tracker.new_entries['phase'].tolist() == ['follicular', 'luteal', 'menstrual', 'ovulatory']
+        assert tracker.new_entries['win_rate'].iloc[1] == pytest.approx(0.733)
+
+    def test_save_appends_without_rewriting(self, workdir, capsys):
+        """Existing history is left byte-for-byte and a same-day rerun adds nothing."""
+        log_path = workdir / 'output' / 'phase_confidence_log.csv'
+        history = log_path.read_text()
+
+        tracker = _tracker()
+        tracker.update_confidence_log()
+        tracker.save_confidence_log()
+
+        content = log_path.read_text()
+        assert content.startswith(history)
+        assert content.count('date,phase') == 1
+        assert len(pd.read_csv(log_path)) == 8
+
+        rerun = _tracker()
+        rerun.update_confidence_log()
+        rerun.save_confidence_log()
+        assert rerun.confidence_changes == []
+        assert log_path.read_text() == content
+        assert 'Entry already exists for luteal on 2025-07-03' in capsys.readouterr().out
+
+    def test_new_log_gets_header(self, workdir, capsys):
+        """Without a log the first save writes the header and today's rows."""
+        log_path = workdir / 'output' / 'phase_confidence_log.csv'
+        log_path.unlink()
+
+        tracker = _tracker()
+        tracker.update_confidence_log()
+        tracker.save_confidence_log()
+
+        log = pd.read_csv(log_path)
+        assert list(log.columns) == LOG_COLUMNS
+        assert log['confidence_status'].tolist() == ['MEDIUM', 'HIGH', 'LOW', 'LOW']
+        assert tracker.confidence_changes == []
+
+
+class TestReport:
+    """Test the summary report built from grouped history."""
+
+    def test_recent_history_per_phase(self, workdir, capsys):
+        """Each phase lists its own last five entries and the status distribution."""
+        for day in range(3, 10):
+            tracker = _tracker(f'2025-07-{day:02d}')
+            tracker.update_confidence_log()
+            tracker.save_confidence_log()
+        capsys.readouterr()
+
+        tracker.print_summary_report()
+
+        out = capsys.readouterr().out
+        history = out.split('RECENT CONFIDENCE HISTORY')[1].split('STATISTICAL SUMMARY')[0]
+        assert history.count('2025-07-09') == 4
+        assert '2025-07-04' not in history
+        assert 'MEDIUM: 1 phases (25%)' in out
+        assert 'HIGH: 1 phases (25%)' in out
@@ -0,0 +1,80 @@
+"""Tests for the columnar PropValueAnalyzer scoring path."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.prop_value_analyzer import PropValueAnalyzer
+
+STAT_MAPPING = {'Points': 'PTS', 'Rebounds': 'REB', 'Assists': 'AST', 'Pts+Rebs': 'PR'}
+
+
+@pytest.fixture
+def inputs():
+    """Gamelogs, analysis tables and a board covering each scoring branch."""
+    rng = np.random.default_rng(3)
+    players = [f'Player {i}' for i in range(8)]
+    gamelogs = pd.DataFrame({
+        'Player': np.repeat(players, 12),
+        'PTS': rng.integers(0, 30, 96),
+        'REB': rng.integers(0, 12, 96),
+        'AST': rng.integers(0, 9, 96),
+    })
+    volatility = pd.DataFrame({
+        'Player': players[:7],
+        'PTS_CV': [0.2, 0.35, 0.6, 0.9, np.nan, 0.4125, 0.25],
+        'REB_CV': rng.uniform(0.1, 1.0, 7),
+        'Overall_Volatility': rng.uniform(0.1, 1.0, 7),
+        'Risk_Level': ['LOW', 'MODERATE', 'HIGH', 'EXTREME', 'LOW', 'HIGH', 'LOW'],
+    })
+    cycles = pd.DataFrame({
+        'Player': players[1:],
+        'PTS_Current_Streak': ['hot', 'cold', 'neutral', 'hot', 'cold', np.nan, 'hot'],
+        'PTS_Streak_Length': [6, 2, 0, 3, 5, 1, 7],
+        'PTS_Recent_Avg': [25.0, 8.0, 15.0, 30.0, 4.0, 12.0, np.nan],
+        'PTS_Bounce_Rate': [0.5, 0.7, 0.5, 0.5, 0.4, 0.5, 0.5],
+    })
+    lines = rng.uniform(0.5, 30, 60).round(1)
+    lines[:3] = [0, np.nan, 60.0]
+    props = pd.DataFrame({
+        'player_name': rng.choice(players + ['Unknown', ''], 60),
+        'stat_type': rng.choice(['Points', 'Rebounds', 'Assists', 'Pts+Rebs', 'Steals'], 60),
+        'line_score': lines,
+    })
+    return props, gamelogs, volatility, cycles
+
+
+class TestScoreProps:
+    """Test that the vectorized path reproduces the row-by-row analysis."""
+
+    def test_matches_rowwise(self, inputs):
+        """Every column and row equals the scalar implementation."""
+        analyzer = PropValueAnalyzer()
+        expected = analyzer.analyze_props_rowwise(*inputs, STAT_MAPPING)
+        result = analyzer.analyze_props(*inputs, STAT_MAPPING)
+
+        assert not expected.empty
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+    def test_precomputed_tables_reused(self, inputs):
+        """Scoring against prebuilt tables gives the same board."""
+        props, gamelogs, volatility, cycles = inputs
+        analyzer = PropValueAnalyzer()
+        stats = analyzer.build_player_stat_table(gamelogs)
+        analysis = analyzer.build_analysis_table(volatility, cycles)
+
+        pd.testing.assert_frame_equal(
+            analyzer.score_props(props, stats, analysis, STAT_MAPPING),
+            analyzer.analyze_props(props, gamelogs, volatility, cycles, STAT_MAPPING),
+        )
+
+    def test_no_value_returns_empty_frame(self, inputs):
+        """A board with nothing playable yields an empty DataFrame."""
+        props, gamelogs, volatility, cycles = inputs
+        result = PropValueAnalyzer().analyze_props(props.iloc[:0], gamelogs, volatility, cycles, STAT_MAPPING)
+
+        assert result.empty
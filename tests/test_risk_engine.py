@@ -0,0 +1,125 @@
+"""Tests for the Monte-Carlo card risk engine."""
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.risk_engine import card_risk, simulate_card
+from modules.bankroll_optimizer import BankrollOptimizer
+
+
+class TestSimulateCard:
+    """Test sampled card outcomes and the risk summary."""
+
+    def test_seeded_reports_repeat(self):
+        """The same seed and chunk size reproduce the report."""
+        kwargs = dict(players=['A', 'A', 'B'], n_paths=5_000, seed=3, chunk_size=1_000)
+
+        first = simulate_card([0.02, 0.02, 0.03], 0.55, **kwargs)
+        second = simulate_card([0.02, 0.02, 0.03], 0.55, **kwargs)
+
+        assert first.to_dict() == second.to_dict()
+        assert len(first.final_bankroll) == 5_000
+        assert list(first.final_quantiles) == sorted(first.final_quantiles)
+
+    def test_hit_rates_match_probabilities(self):
+        """Each leg wins at its own marginal rate despite shared factors."""
+        report = simulate_card([0.1], [0.7], players=['A'], n_paths=40_000, seed=1,
+                               payout_ratio=1.0, starting_bankroll=100)
+
+        assert (report.final_bankroll > 100).mean() == pytest.approx(0.7, abs=0.01)
+
+    def test_certain_legs(self):
+        """Legs with hit probability 1 always win and 0 always lose."""
+        report = simulate_card([0.1, 0.1], [1.0, 0.0], n_paths=1_000, seed=2,
+                               payout_ratio=1.0, starting_bankroll=100)
+
+        assert np.allclose(report.final_bankroll, 100)
+
+    def test_imports_without_scipy(self):
+        """The risk engine and the optimizer using it need only numpy and pandas."""
+        code = "import sys; sys.modules['scipy'] = None; import modules.bankroll_optimizer"
+        subprocess.run([sys.executable, '-c', code], cwd=Path(__file__).parent.parent, check=True)
+
+    def test_player_correlation_widens_outcomes(self):
+        """Stacked legs on one player swing together."""
+        kwargs = dict(n_paths=20_000, seed=5, payout_ratio=1.0)
+        fractions = np.full(6, 0.05)
+
+        independent = simulate_card(fractions, 0.5, players=None, **kwargs)
+        stacked = simulate_card(fractions, 0.5, players=['A'] * 6, player_correlation=0.6, **kwargs)
+
+        assert stacked.final_bankroll.std() > 1.3 * independent.final_bankroll.std()
+        assert stacked.drawdown_quantiles[0.95] > independent.drawdown_quantiles[0.95]
+
+    def test_opposite_sides_hedge(self):
+        """An over and under on the same player offset each other."""
+        kwargs = dict(players=['A', 'A'], player_correlation=0.9, game_correlation=0.0,
+                      n_paths=20_000, seed=2, payout_ratio=1.0)
+
+        same = simulate_card([0.1, 0.1], 0.5, sides=[1, 1], **kwargs)
+        hedged = simulate_card([0.1, 0.1], 0.5, sides=[1, -1], **kwargs)
+
+        assert hedged.final_bankroll.std() < same.final_bankroll.std()
+
+    def test_ruin_stops_betting(self):
+        """Paths that hit the ruin level are counted and stop staking."""
+        report = simulate_card([0.5], 0.0, n_paths=100, n_slates=4, ruin_fraction=0.5,
+                               starting_bankroll=100, seed=0)
+
+        assert report.ruin_probability == 1.0
+        assert np.allclose(report.final_bankroll, 50)
+        assert report.drawdown_quantiles[0.5] == pytest.approx(0.5)
+
+    def test_invalid_correlation(self):
+        """Factor correlations must leave room for independent noise."""
+        with pytest.raises(ValueError):
+            simulate_card([0.01], 0.5, player_correlation=0.7, game_correlation=0.3)
+
+    def test_hundred_thousand_paths_in_seconds(self):
+        """A 20-leg card over 100k paths runs quickly in chunks."""
+        players = [f"P{i // 2}" for i in range(20)]
+        games = [f"G{i // 6}" for i in range(20)]
+
+        started = time.perf_counter()
+        report = simulate_card(np.full(20, 0.0125), 0.56, players=players, games=games,
+                               n_paths=100_000, seed=9, chunk_size=20_000)
+
+        assert time.perf_counter() - started < 10
+        assert report.n_paths == 100_000
+
+
+class TestCardRisk:
+    """Test the DataFrame and optimizer entry points."""
+
+    def test_card_risk_skips_unstaked_legs(self):
+        """Only legs with a positive stake are simulated."""
+        card = pd.DataFrame({'player_name': ['A', 'B', 'C'], 'bet_percentage': [0.5, 0.0, None],
+                             'win_rate': [1.0, 0.0, 0.0]})
+
+        report = card_risk(card, n_paths=100, payout_ratio=1.0, starting_bankroll=10, seed=0)
+
+        assert np.allclose(report.final_bankroll, 15)
+        assert report.ruin_probability == 0.0
+
+    def test_optimizer_stress_test(self, tmp_path):
+        """The phase-aware optimizer sizes each bet and simulates the card."""
+        config = tmp_path / "divisors.json"
+        config.write_text('{"follicular": 4.0, "unknown": 5.0}')
+        optimizer = BankrollOptimizer(config)
+        optimizer.set_constraints(min_bet=1.0, max_bet_pct=0.05)
+        bets = [{'ev': 0.08, 'phase': 'follicular', 'player': 'A'},
+                {'ev': 0.05, 'phase': 'unknown', 'player': 'A'},
+                {'stake': 10.0, 'hit_probability': 0.6, 'player': 'B'}]
+
+        report = optimizer.stress_test(1000, bets, n_paths=2_000, seed=4)
+
+        assert report.starting_bankroll == 1000
+        assert report.final_bankroll.max() <= 1000 + (20 + 10 + 10) * 100 / 110 + 1e-9
+        assert 0 <= report.loss_probability <= 1
@@ -0,0 +1,133 @@
+"""Tests for sliding-window rolling performance trends."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts' / 'intelligence'))
+
+from rolling_performance_trend import RollingPerformanceTrend
+
+
+def _gamelogs(n_players=8, n_games=25, seed=5):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for p in range(n_players):
+        dates = pd.Timestamp('2024-05-15') + pd.to_timedelta(np.sort(rng.choice(150, n_games, replace=False)), unit='D')
+        for date in dates:
+            rows.append({'player_id': 100 + p, 'game_date': date,
+                         'cycle_phase': rng.choice(['follicular', 'ovulation', 'luteal', 'menstrual']),
+                         'actual_fantasy_points': rng.uniform(5, 45), 'minutes': rng.uniform(4, 36)})
+    # A player below min_games keeps a trend of 1.0
+    rows.append({'player_id': 999, 'game_date': pd.Timestamp('2024-06-01'), 'cycle_phase': 'luteal',
+                 'actual_fantasy_points': 20.0, 'minutes': 30.0})
+    return pd.DataFrame(rows).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def _window_trend(player_df, lookback_games=10, min_games=3):
+    """The per-game reference: slice each window and weight it directly."""
+    player_df = player_df.sort_values('game_date')
+    baselines = {}
+    for phase, phase_data in player_df.groupby('cycle_phase'):
+        significant = phase_data[phase_data['minutes'] > 10]
+        if len(phase_data) >= 2 and len(significant) > 0:
+            baselines[phase] = significant['actual_fantasy_points'].mean()
+
+    trends = []
+    for idx in range(len(player_df)):
+        phase = player_df['cycle_phase'].iloc[idx]
+        window = player_df.iloc[max(0, idx - lookback_games):idx]
+        same_phase = window[window['cycle_phase'] == phase]['actual_fantasy_points']
+        if idx < min_games or phase not in baselines or len(same_phase) < 2 or not baselines[phase] > 0:
+            trends.append(1.0)
+            continue
+        weighted = np.average(same_phase, weights=np.linspace(0.5, 1.0, len(same_phase)))
+        trends.append(np.clip(weighted / baselines[phase], 0.7, 1.3))
+    return np.array(trends)
+
+
+class TestRollingTrend:
+    """Test the grouped sliding-window trend."""
+
+    @pytest.mark.parametrize('lookback_games', [10, 4])
+    def test_matches_per_game_windows(self, lookback_games):
+        """Running per-phase sums give the same trend as slicing every window."""
+        df = _gamelogs()
+        engine = RollingPerformanceTrend(lookback_games=lookback_games, min_games=3)
+
+        result = engine.process_all_players(df)
+
+        assert len(result) == len(df)
+        assert (result.loc[result['player_id'] == 999, 'rolling_perf_trend'] == 1.0).all()
+        for player_id, player_df in result.groupby('player_id'):
+            expected = _window_trend(player_df, lookback_games)
+            assert np.allclose(player_df['rolling_perf_trend'], expected, rtol=0, atol=1e-12)
+        assert (result['rolling_perf_trend'] != 1.0).any()
+
+    def test_single_player(self):
+        """calculate_player_trends sorts by date and keeps the frame's index."""
+        df = _gamelogs(n_players=1)
+        player_df = df[df['player_id'] == 100]
+
+        result = RollingPerformanceTrend().calculate_player_trends(player_df)
+
+        assert result['game_date'].is_monotonic_increasing
+        assert set(result.index) == set(player_df.index)
+        assert np.allclose(result['rolling_perf_trend'], _window_trend(player_df), rtol=0, atol=1e-12)
+
+    def test_missing_points_in_window(self):
+        """A NaN score in a same-phase window propagates, as np.average does."""
+        df = pd.DataFrame({
+            'player_id': 1,
+            'game_date': pd.date_range('2024-06-01', periods=6),
+            'cycle_phase': ['luteal'] * 6,
+            'actual_fantasy_points': [20.0, np.nan, 22.0, 18.0, 25.0, 30.0],
+            'minutes': 30.0,
+        })
+
+        trend = RollingPerformanceTrend(lookback_games=2).process_all_players(df)['rolling_perf_trend']
+
+        assert np.isnan(trend.iloc[3])
+        assert not np.isnan(trend.iloc[4])
+
+
+class TestAppendGames:
+    """Test the incremental append mode."""
+
+    def test_append_matches_full_recompute(self):
+        """Appended games get the trend a full pass over the games so far gives them."""
+        df = _gamelogs(seed=9)
+        first_cut, second_cut = pd.Timestamp('2024-08-01'), pd.Timestamp('2024-09-01')
+        engine = RollingPerformanceTrend()
+        engine.process_all_players(df[df['game_date'] <= first_cut])
+
+        for new_games, seen in [(df[(df['game_date'] > first_cut) & (df['game_date'] <= second_cut)],
+                                 df[df['game_date'] <= second_cut]),
+                                (df[df['game_date'] > second_cut], df)]:
+            appended = engine.append_games(new_games).set_index(['player_id', 'game_date'])['rolling_perf_trend']
+            full = RollingPerformanceTrend().process_all_players(seen)
+            full = full.set_index(['player_id', 'game_date'])['rolling_perf_trend']
+
+            assert len(appended) == len(new_games)
+            assert np.allclose(appended, full.reindex(appended.index), rtol=0, atol=1e-12)
+
+    def test_state_is_bounded(self):
+        """Only each player's last lookback_games games are kept."""
+        engine = RollingPerformanceTrend(lookback_games=5)
+        df = _gamelogs(n_players=3)
+
+        engine.process_all_players(df)
+
+        assert engine.recent_games.groupby('player_id').size().max() == 5
+        assert engine.games_seen.sum() == len(df)
+
+    def test_append_without_history(self):
+        """Appending to a fresh engine is the same as a full pass."""
+        df = _gamelogs(n_players=3, seed=2)
+
+        appended = RollingPerformanceTrend().append_games(df)
+        full = RollingPerformanceTrend().process_all_players(df)
+
+        assert np.allclose(appended['rolling_perf_trend'], full['rolling_perf_trend'])
@@ -0,0 +1,84 @@
+"""Tests for batch prop_hit_predictor scoring."""
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.serving import FEATURES, PropHitModel, build_player_feature_table
+
+
+@pytest.fixture
+def gamelogs():
+    """Two players with a few games each."""
+    rng = np.random.default_rng(11)
+    rows = []
+    for player in ["A'ja Wilson", "Caitlin Clark"]:
+        for day in range(3):
+            row = {"PLAYER_NAME": player, "GAME_DATE": f"2024-06-0{day + 1}"}
+            row.update({col: float(rng.uniform(0, 30)) for col in FEATURES})
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def model(tmp_path, gamelogs):
+    """PropHitModel backed by a small fitted LogisticRegression."""
+    joblib = pytest.importorskip("joblib")
+    from sklearn.linear_model import LogisticRegression
+
+    rng = np.random.default_rng(5)
+    X = pd.DataFrame(rng.uniform(0, 30, size=(40, len(FEATURES))), columns=FEATURES)
+    y = (X["MIN"] > 15).astype(int)
+    path = tmp_path / "prop_hit_predictor.joblib"
+    joblib.dump(LogisticRegression(max_iter=500).fit(X, y), path)
+
+    scorer = PropHitModel(str(path))
+    scorer.set_player_features(build_player_feature_table(gamelogs))
+    return scorer
+
+
+class TestPropHitModel:
+    """Test lazy loading, batch scoring and memoization."""
+
+    def test_model_loaded_lazily(self, tmp_path):
+        """Constructing the scorer does not touch the model file."""
+        scorer = PropHitModel(str(tmp_path / "missing.joblib"))
+        assert scorer._model is None
+
+    def test_board_matches_direct_predictions(self, model, gamelogs):
+        """Board scores equal predict_proba on the averaged features."""
+        board = pd.DataFrame({"player": ["caitlin  clark", "A'ja Wilson", "Unknown"],
+                              "game_date": ["2024-06-10"] * 3})
+        probs = model.score_board(board)
+
+        expected = model.model.predict_proba(
+            gamelogs.groupby("PLAYER_NAME")[FEATURES].mean().loc[["Caitlin Clark", "A'ja Wilson"]])[:, 1]
+        np.testing.assert_allclose(probs.iloc[:2], expected)
+        assert np.isnan(probs.iloc[2])
+
+    def test_only_misses_reach_the_model(self, model):
+        """Memoized (player, date) pairs are not rescored."""
+        board = pd.DataFrame({"player": ["A'ja Wilson", "Caitlin Clark"], "game_date": ["2024-06-10"] * 2})
+        model.score_board(board)
+
+        with patch.object(model, "predict_proba", wraps=model.predict_proba) as spy:
+            model.score_board(board)
+            assert spy.call_count == 0
+
+            board.loc[2] = ["A'ja Wilson", "2024-06-12"]
+            model.score_board(board)
+            assert spy.call_count == 1
+            assert len(spy.call_args.args[0]) == 1
+
+    def test_under_side_inverted(self, model):
+        """Unders score 1 - P(hit)."""
+        board = pd.DataFrame({"player": ["A'ja Wilson"] * 2, "game_date": ["2024-06-10"] * 2,
+                              "side": ["over", "UNDER"]})
+        probs = model.score_board(board, side_col="side")
+
+        assert probs.iloc[0] + probs.iloc[1] == pytest.approx(1.0)
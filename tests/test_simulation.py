@@ -0,0 +1,165 @@
+"""Tests for the shared bankroll simulation core."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.simulation import (STANDARD_PAYOUT, annualized_sharpe, grouped_metrics, max_drawdown,
+                             outcome_returns, replay_seasons, simulate_bankroll)
+
+
+def _sequential(fractions, returns, bankroll, max_stake=None):
+    """Reference bet-by-bet loop."""
+    sizes, path = [], []
+    for fraction, ret in zip(fractions, returns):
+        stake = bankroll * fraction
+        if max_stake is not None:
+            stake = min(stake, max_stake)
+        bankroll += stake * ret
+        sizes.append(stake)
+        path.append(bankroll)
+    return np.array(sizes), np.array(path)
+
+
+class TestSimulateBankroll:
+    """Test cumulative and capped bankroll paths."""
+
+    def test_cumulative_matches_sequential(self):
+        """Uncapped staking equals the bet-by-bet loop."""
+        rng = np.random.default_rng(1)
+        fractions = rng.uniform(0, 0.05, 200)
+        returns = outcome_returns(rng.random(200) < 0.55)
+
+        path = simulate_bankroll(fractions, returns, 1000)
+        sizes, bankroll = _sequential(fractions, returns, 1000)
+
+        assert np.allclose(path['bet_size'], sizes)
+        assert np.allclose(path['bankroll'], bankroll)
+        assert np.allclose(path['bet_return'], fractions * returns)
+
+    def test_capped_matches_sequential(self):
+        """A stake cap is applied to each bet in order."""
+        fractions = np.full(50, 0.1)
+        returns = outcome_returns(np.arange(50) % 3 != 0)
+
+        path = simulate_bankroll(fractions, returns, 1000, max_stake=120)
+        sizes, bankroll = _sequential(fractions, returns, 1000, max_stake=120)
+
+        assert path['bet_size'].max() == pytest.approx(120)
+        assert np.allclose(path['bankroll'], bankroll)
+
+    def test_replays_are_simulated_together(self):
+        """2-D returns give one path per replay."""
+        returns = np.array([outcome_returns([True, False, True]), outcome_returns([False, False, False])])
+
+        path = simulate_bankroll([0.1, 0.1, 0.1], returns, 100)
+
+        assert path['bankroll'].shape == (2, 3)
+        assert path['bankroll'][1, -1] == pytest.approx(100 * 0.9 ** 3)
+        assert outcome_returns([True])[0] == pytest.approx(STANDARD_PAYOUT)
+
+
+class TestMetrics:
+    """Test drawdown, Sharpe and grouped breakdowns."""
+
+    def test_max_drawdown_includes_start(self):
+        """Drawdown is measured from the starting bankroll too."""
+        assert max_drawdown([90, 120, 60, 100], 100) == pytest.approx(0.5)
+        assert max_drawdown([110, 120], 100) == pytest.approx(0.0)
+
+    def test_sharpe_needs_two_returns(self):
+        """A single return has no Sharpe ratio."""
+        assert np.isnan(annualized_sharpe([0.1]))
+        assert annualized_sharpe([0.1, -0.1, 0.2]) > 0
+
+    def test_grouped_metrics_matches_category_loop(self):
+        """One groupby gives the same rows as filtering each category."""
+        results = pd.DataFrame({
+            'phase': ['peak', 'low', 'peak', 'unknown', 'low', 'peak', None],
+            'is_win': [True, False, False, True, True, True, False],
+            'profit': [9.0, -10.0, -8.0, 5.0, 4.5, 7.2, -1.0],
+            'bet_size': [10.0, 10.0, 8.0, 5.0, 5.0, 8.0, 1.0],
+            'bet_percentage': [0.01, 0.01, 0.008, 0.005, 0.005, 0.008, 0.001],
+        })
+
+        metrics = grouped_metrics(results, 'phase')
+
+        assert list(metrics['phase']) == ['peak', 'low']
+        for _, row in metrics.iterrows():
+            subset = results[results['phase'] == row['phase']]
+            returns = subset['profit'] / subset['bet_size']
+            assert row['total_bets'] == len(subset)
+            assert row['win_rate'] == round(subset['is_win'].mean(), 3)
+            assert row['profit'] == round(subset['profit'].sum(), 2)
+            assert row['sharpe_ratio'] == round(returns.mean() / returns.std() * np.sqrt(252), 2)
+
+    def test_single_bet_category_has_no_sharpe(self):
+        """Categories with one bet report 'NaN' for Sharpe."""
+        results = pd.DataFrame({'risk_tag': ['solo'], 'is_win': [True], 'profit': [9.0],
+                                'bet_size': [10.0], 'bet_percentage': [0.01]})
+
+        assert grouped_metrics(results, 'risk_tag')['sharpe_ratio'].tolist() == ['NaN']
+        assert 'sharpe_ratio' not in grouped_metrics(results, 'risk_tag', sharpe=False)
+
+
+class TestReplaySeasons:
+    """Test Monte-Carlo season replays."""
+
+    def test_shape_and_reproducibility(self):
+        """Seeded replays are repeatable and chunking does not change them."""
+        fractions = np.full(40, 0.02)
+
+        first = replay_seasons(fractions, 0.55, n_replays=300, seed=7, chunk_size=64)
+        second = replay_seasons(fractions, 0.55, n_replays=300, seed=7, chunk_size=64)
+
+        assert list(first.columns) == ['final_bankroll', 'total_profit', 'max_drawdown', 'wins']
+        assert len(first) == 300
+        pd.testing.assert_frame_equal(first, second)
+        assert first['wins'].between(0, 40).all()
+        assert (first['max_drawdown'] >= 0).all()
+
+    def test_certain_outcomes(self):
+        """Always-winning seasons grow deterministically."""
+        replays = replay_seasons([0.1, 0.1], 1.0, n_replays=5, payout_ratio=1.0, starting_bankroll=100)
+
+        assert np.allclose(replays['final_bankroll'], 121.0)
+        assert (replays['max_drawdown'] == 0).all()
+
+
+class TestBacktestEngine:
+    """Test BacktestEngine on the shared core."""
+
+    @pytest.fixture
+    def engine_module(self):
+        pytest.importorskip('matplotlib')
+        pytest.importorskip('seaborn')
+        sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts' / 'strategy'))
+        import backtest_engine
+        return backtest_engine
+
+    def test_matches_per_bet_outcomes(self, engine_module):
+        """The vectorized run matches settling each bet in turn."""
+        card = pd.DataFrame({
+            'player_name': ['A', 'B', 'C', 'D', 'E'],
+            'stat_type': ['PTS'] * 5,
+            'line': [10.5, 12.5, 8.5, 20.5, 5.5],
+            'adjusted_prediction': [11.0, 13.0, 9.0, 21.0, 6.0],
+            'actual_result': [12, 10, 9, 18, 7],
+            'bet_percentage': [0.02, 0.0, 0.03, 0.01, np.nan],
+            'adv_phase': ['peak', 'low', 'peak', 'low', 'peak'],
+        })
+
+        vectorized = engine_module.BacktestEngine(1000)
+        vectorized.run_backtest(card)
+        scalar = engine_module.BacktestEngine(1000)
+        for _, row in card.iloc[[0, 2, 3]].iterrows():
+            scalar.calculate_bet_outcome(row)
+
+        assert len(vectorized.results) == 3
+        assert vectorized.bankroll == pytest.approx(scalar.bankroll)
+        assert np.allclose(vectorized.bankroll_history, scalar.bankroll_history)
+        assert vectorized.calculate_metrics() == scalar.calculate_metrics()
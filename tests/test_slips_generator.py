@@ -11,7 +11,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from slips_generator import (
     PrizePicksClient, WNBADataEnricher, generate_slips,
-    determine_pick, calculate_bet_amount, generate_reasoning
+    determine_pick, calculate_bet_amount, generate_reasoning,
+    build_projection_board, determine_picks, calculate_bet_amounts
 )
 
 
@@ -228,6 +229,73 @@ class TestIntegration:
         assert slip['pick'] in ['over', 'under']
 
 
+class TestBoardPipeline:
+    """Test the columnar board pipeline against the per-projection helpers."""
+
+    @pytest.fixture
+    def board_projections(self):
+        """Projections covering trends, averages, phases, odds and a missing date."""
+        projections = []
+        for i in range(40):
+            proj = {
+                'id': str(i),
+                'player_name': f"Player {i % 7}",
+                'stat_type': ['points', 'rebounds', 'steals', 'blocks'][i % 4],
+                'line_score': 5.0 + i,
+                'odds': [-110, -150, 120, 200][i % 4],
+                'game_date': '2024-06-21',
+            }
+            if i % 3 == 0:
+                proj['season_average'] = (5.0 + i) * [1.2, 0.8, 1.0][i % 9 // 3]
+            if i % 5 == 0:
+                proj['historical_trend'] = ['over', 'under', 'neutral'][i % 3]
+            if i == 39:
+                del proj['game_date']
+            projections.append(proj)
+        return projections
+
+    @pytest.fixture
+    def enricher(self):
+        """Enricher with phase data for some players."""
+        phase_data = {
+            'Player 1': {'current_phase': 'peak'},
+            'Player 2': {'current_phase': 'low'},
+            'Player 3': {'current_phase': 'mid'},
+        }
+        with patch.object(WNBADataEnricher, '_load_phase_data', return_value=phase_data), \
+             patch.object(WNBADataEnricher, '_load_player_mappings', return_value={}):
+            return WNBADataEnricher()
+
+    @patch.dict(os.environ, {'BANKROLL': '1000'})
+    def test_board_matches_per_projection_helpers(self, board_projections, enricher):
+        """Confidence, pick and amount columns equal the scalar functions."""
+        board = build_projection_board(board_projections, '2024-06-21', '2024-06-21', enricher=enricher)
+        expected = [enricher.enrich_projection(dict(p)) for p in board_projections]
+
+        assert len(board) == len(expected)
+        assert board['confidence'].tolist() == [e['confidence'] for e in expected]
+        assert list(determine_picks(board)) == [determine_pick(e) for e in expected]
+        assert [round(a, 2) for a in calculate_bet_amounts(board)] == \
+            [calculate_bet_amount(e) for e in expected]
+
+    def test_true_top_k_by_confidence(self, board_projections, enricher):
+        """The highest-confidence slips are returned even if they come late in the board."""
+        slips = generate_slips('2024-06-21', '2024-06-21', max_slips=3, min_confidence=0.5,
+                               projections=board_projections, enricher=enricher)
+        board = build_projection_board(board_projections, '2024-06-21', '2024-06-21', enricher=enricher)
+        best = board.sort_values('confidence', ascending=False, kind='mergesort').head(3)
+
+        assert [s['prizepicks_id'] for s in slips] == best['id'].tolist()
+        assert [s['confidence'] for s in slips] == sorted((s['confidence'] for s in slips), reverse=True)
+
+    def test_date_filter_and_missing_date(self, board_projections, enricher):
+        """Out-of-range dates are dropped; a missing date counts as start_date."""
+        board = build_projection_board(board_projections, '2024-06-22', '2024-06-30', enricher=enricher)
+
+        assert board['id'].tolist() == ['39']
+        assert board['game_date'].tolist() == ['2024-06-22']
+
+
 @pytest.mark.parametrize("days_offset,expected_slips", [
     (0, 1),  # Today
     (1, 2),  # Tomorrow (more games)
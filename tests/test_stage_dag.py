@@ -0,0 +1,213 @@
+"""Tests for the stage DAG runner and the daily analysis pipeline built on it."""
+import contextlib
+import io
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.stage_dag import ArtifactCache, Stage, StageRunner, content_hash
+
+
+def _runner(stages, tmp_path, **kwargs):
+    return StageRunner(stages, cache=ArtifactCache(tmp_path / 'cache'), log=lambda *args: None, **kwargs)
+
+
+class TestScheduling:
+    """Test ordering, parallelism and failure handling."""
+
+    def test_independent_stages_run_concurrently(self, tmp_path):
+        """Two stages on the same input only pass the barrier if they overlap."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def branch(base):
+            barrier.wait()
+            return base + 1
+
+        runner = _runner([
+            Stage('base', lambda: 1, outputs=('base',)),
+            Stage('left', branch, inputs=('base',), outputs=('left',)),
+            Stage('right', branch, inputs=('base',), outputs=('right',)),
+            Stage('join', lambda left, right: left + right, inputs=('left', 'right'), outputs=('total',)),
+        ], tmp_path, max_workers=2)
+
+        results = runner.run()
+
+        assert all(result.status == 'ran' for result in results.values())
+        assert runner.get('total') == 4
+        path, seconds = runner.critical_path()
+        assert path[0] == 'base' and path[-1] == 'join'
+        assert seconds <= sum(result.seconds for result in results.values())
+
+    def test_failure_skips_dependents_only(self, tmp_path):
+        """Stages downstream of a failure are skipped, other branches still run."""
+        def broken():
+            time.sleep(0.05)
+            raise RuntimeError("no data")
+
+        logged = []
+        results = StageRunner([
+            Stage('broken', broken, outputs=('a',)),
+            Stage('after', lambda a: a, inputs=('a',), outputs=('b',)),
+            Stage('other', lambda: 2, outputs=('c',)),
+        ], cache=ArtifactCache(tmp_path / 'cache'), log=lambda *args: logged.append(args)).run()
+
+        assert results['broken'].status == 'failed' and results['broken'].error == "no data"
+        assert results['broken'].seconds >= 0.05
+        assert 'in broken' in results['broken'].traceback
+        assert any(level == "ERROR" and results['broken'].traceback in message for message, level in logged)
+        assert results['after'].status == 'skipped'
+        assert results['other'].status == 'ran'
+
+    def test_file_dependencies_and_validation(self, tmp_path):
+        """A stage reading a file runs after its writer; bad graphs are rejected."""
+        path = str(tmp_path / 'step.csv')
+        runner = _runner([
+            Stage('read', lambda: Path(path).read_text(), outputs=('text',), files=(path,)),
+            Stage('write', lambda: Path(path).write_text('ok'), writes=(path,)),
+        ], tmp_path)
+        assert runner.order == ['write', 'read']
+        runner.run()
+        assert runner.get('text') == 'ok'
+
+        with pytest.raises(ValueError):
+            StageRunner([Stage('a', lambda x: x, inputs=('x',), outputs=('y',))])
+        with pytest.raises(ValueError):
+            StageRunner([Stage('a', lambda y: y, inputs=('y',), outputs=('x',)),
+                         Stage('b', lambda x: x, inputs=('x',), outputs=('y',))])
+
+
+class TestCache:
+    """Test skipping stages whose inputs are unchanged."""
+
+    def test_unchanged_inputs_are_served_from_cache(self, tmp_path):
+        """Only stages downstream of a changed file re-run; outputs are restored."""
+        source, output = tmp_path / 'source.txt', tmp_path / 'out.txt'
+        source.write_text('1,2,3')
+        calls = []
+
+        def parse():
+            calls.append('parse')
+            return [int(value) for value in source.read_text().split(',')]
+
+        def total(values):
+            calls.append('total')
+            output.write_text(str(sum(values)))
+            return sum(values)
+
+        stages = [
+            Stage('parse', parse, outputs=('values',), files=(str(source),)),
+            Stage('total', total, inputs=('values',), outputs=('total',), writes=(str(output),)),
+        ]
+        _runner(stages, tmp_path).run()
+
+        output.unlink()
+        runner = _runner(stages, tmp_path)
+        assert {r.status for r in runner.run().values()} == {'cached'}
+        assert runner.get('total') == 6
+        assert output.read_text() == '6'
+
+        source.write_text('1,2,4')
+        runner.run()
+        assert runner.get('total') == 7
+        assert calls == ['parse', 'total', 'parse', 'total']
+
+        # Reformatted source, same parsed values: only the parse re-runs
+        source.write_text('1, 2, 4')
+        runner.run()
+        assert runner.results['parse'].status == 'ran'
+        assert runner.results['total'].status == 'cached'
+        assert _runner(stages, tmp_path).run(force=True)['total'].status == 'ran'
+
+    def test_prune_keeps_newest_entries_per_stage(self, tmp_path):
+        """Only the newest `keep` results of a stage and the objects they use survive."""
+        source, output = tmp_path / 'source.txt', tmp_path / 'out.txt'
+        stages = [
+            Stage('read', lambda: source.read_text(), outputs=('text',), files=(str(source),)),
+            Stage('copy', lambda text: output.write_text(text), inputs=('text',), writes=(str(output),)),
+        ]
+        cache = ArtifactCache(tmp_path / 'cache', keep=2)
+        for text in ['a', 'b', 'c', 'b']:
+            source.write_text(text)
+            StageRunner(stages, cache=cache, log=lambda *args: None).run()
+
+        assert len(list((tmp_path / 'cache' / 'stages').glob('*.json'))) == 4
+        # 'text' of b and c, and the copies of b and c written to out.txt
+        assert len(list((tmp_path / 'cache' / 'objects').glob('*/*'))) == 4
+        source.write_text('c')
+        runner = StageRunner(stages, cache=cache, log=lambda *args: None)
+        assert {result.status for result in runner.run().values()} == {'cached'}
+        source.write_text('a')
+        assert {result.status for result in runner.run().values()} == {'ran'}
+        assert ArtifactCache(tmp_path / 'cache', keep=None).prune() == (0, 0)
+
+    def test_frame_hash_is_by_content(self):
+        """Equal frames hash equal; other values, labels or dtypes do not."""
+        frame = pd.DataFrame({'Player': ['A', 'B'], 'PTS': [10, 12]})
+
+        assert content_hash(frame) == content_hash(frame.copy())
+        assert content_hash(frame) != content_hash(frame.assign(PTS=[10, 13]))
+        assert content_hash(frame) != content_hash(frame.astype({'PTS': float}))
+        assert content_hash(frame) != content_hash(frame.rename(columns={'PTS': 'REB'}))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    rng = np.random.default_rng(4)
+    (tmp_path / 'data').mkdir()
+    (tmp_path / 'output').mkdir()
+    rows = [{'PLAYER_NAME': f"Player {p}",
+             'GAME_DATE': (pd.Timestamp('2024-05-01') + pd.Timedelta(days=2 * g)).strftime('%Y-%m-%d'),
+             'PTS': int(rng.poisson(12)), 'REB': int(rng.poisson(5)), 'AST': int(rng.poisson(3))}
+            for p in range(8) for g in range(25)]
+    pd.DataFrame(rows).to_csv(tmp_path / 'data' / 'wnba_combined_gamelogs.csv', index=False)
+    pd.DataFrame({'player_name': [f"Player {p}" for p in range(8)], 'team_name': 'IND',
+                  'stat_type': 'Points', 'line': 9.5, 'timestamp': ''}).to_csv(
+        tmp_path / 'data' / 'wnba_prizepicks_props.csv', index=False)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _run_pipeline(cache_dir, force=False):
+    sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+    from daily_analysis_pipeline import DailyAnalysisPipeline
+
+    pipeline = DailyAnalysisPipeline(cache_dir=cache_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline.run_pipeline(force=force)
+    return pipeline
+
+
+class TestDailyPipeline:
+    """Test the daily analysis pipeline run as stages."""
+
+    def test_outputs_match_saved_csvs(self, workdir):
+        """Stages pass the same frames in memory that they save for later runs."""
+        pipeline = _run_pipeline(str(workdir / 'cache'))
+
+        assert all(result.ok for result in pipeline.runner.results.values())
+        for name, path in [('volatility', 'player_volatility_analysis.csv'),
+                           ('cycles', 'player_performance_cycles.csv'),
+                           ('prop_values', 'prop_value_analysis.csv')]:
+            saved = pd.read_csv(workdir / 'output' / path)
+            pd.testing.assert_frame_equal(pipeline.runner.get(name), saved, check_dtype=False)
+        report = next((workdir / 'output').glob('daily_report_*.txt')).read_text(encoding='utf-8')
+        assert 'STAGE TIMINGS' in report and 'Critical path' in report
+
+    def test_rerun_reuses_cached_stages(self, workdir):
+        """An unchanged morning re-run only rebuilds the timestamped slip."""
+        _run_pipeline(str(workdir / 'cache'))
+        (workdir / 'output' / 'player_volatility_analysis.csv').unlink()
+
+        pipeline = _run_pipeline(str(workdir / 'cache'))
+
+        statuses = {name: result.status for name, result in pipeline.runner.results.items()}
+        assert statuses.pop('betting_slip') == 'ran'
+        assert set(statuses.values()) == {'cached'}
+        assert (workdir / 'output' / 'player_volatility_analysis.csv').exists()
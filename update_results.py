@@ -4,12 +4,11 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import requests
-import json
 
 from sheet_connector import SheetConnector
+from core.grading import actuals_frame, grade_legs, load_flex_payouts, pick_sides, settle_slips
 
 
 class ResultsUpdater:
@@ -147,54 +146,35 @@ class ResultsUpdater:
                 self.player_stats[player][prop_type] = max(0, round(actual, 1))
                 
     def _update_bet_results(self, bets_df: pd.DataFrame, pending_bets: pd.DataFrame) -> int:
-        """Update individual bet results."""
-        updated_count = 0
+        """Update individual bet results (all pending bets graded in one pass)."""
+        actuals = actuals_frame(self._actuals_index(), ['player', 'prop_type'])
+        graded = grade_legs(
+            pending_bets, actuals, ['player', 'prop_type'],
+            sides=pick_sides(pending_bets['over_under'], under=None),
+            stake_col='stake', odds_col='odds'
+        )
+        graded = graded[graded['result'].notna()]
         
-        for idx, bet in pending_bets.iterrows():
-            player = bet['player']
-            prop_type = bet['prop_type']
-            line = bet['line']
-            over_under = bet['over_under']
-            odds = bet['odds']
-            stake = bet['stake']
-            
-            # Get actual result
-            actual = self._get_player_stat(player, prop_type)
-            
-            if actual is not None:
-                # Determine win/loss
-                if over_under == 'over':
-                    won = actual > line
-                else:
-                    won = actual < line
-                    
-                # Calculate payout
-                if won:
-                    # Convert odds to decimal
-                    if odds < 0:
-                        decimal_odds = (-100 / odds) + 1
-                    else:
-                        decimal_odds = (odds / 100) + 1
-                        
-                    payout = round(stake * decimal_odds, 2)
-                    result = 'won'
-                else:
-                    payout = 0
-                    result = 'lost'
-                    
-                # Handle push (exact line)
-                if actual == line:
-                    payout = stake  # Return stake
-                    result = 'push'
+        # Update DataFrame
+        bets_df.loc[graded.index, 'result'] = graded['result']
+        bets_df.loc[graded.index, 'payout'] = graded['payout']
+        bets_df.loc[graded.index, 'actual'] = graded['actual']
+        
+        return len(graded)
+        
+    def _actuals_index(self) -> Dict[Tuple[str, str], float]:
+        """(player, prop_type) -> actual, with fetched game results taking priority."""
+        index = {}
+        for data in self.game_results.values():
+            for player, stats in data.get('player_stats', {}).items():
+                for prop_type, value in stats.items():
+                    index.setdefault((player, prop_type), value)
                     
-                # Update DataFrame
-                bets_df.loc[idx, 'result'] = result
-                bets_df.loc[idx, 'payout'] = payout
-                bets_df.loc[idx, 'actual'] = actual
-                
-                updated_count += 1
+        for player, stats in self.player_stats.items():
+            for prop_type, value in stats.items():
+                index.setdefault((player, prop_type), value)
                 
-        return updated_count
+        return index
         
     def _get_player_stat(self, player: str, prop_type: str) -> Optional[float]:
         """Get actual player statistic."""
@@ -213,108 +193,28 @@ class ResultsUpdater:
         
     def _update_slip_results(self, slips_df: pd.DataFrame, bets_df: pd.DataFrame, date: datetime) -> int:
         """Update slip results based on individual bet outcomes."""
-        updated_count = 0
-        
         # Get pending slips for date
         pending_slips = slips_df[
             (slips_df['result'] == 'pending') &
             (pd.to_datetime(slips_df['date']).dt.date == date.date())
         ]
         
-        for idx, slip in pending_slips.iterrows():
-            slip_id = slip['slip_id']
-            slip_type = slip['type']
-            total_stake = slip['total_stake']
-            
-            # Get all bets for this slip
-            slip_bets = bets_df[bets_df['slip_id'] == slip_id]
-            
-            if slip_bets.empty:
-                continue
-                
-            # Count wins
-            wins = len(slip_bets[slip_bets['result'] == 'won'])
-            losses = len(slip_bets[slip_bets['result'] == 'lost'])
-            pushes = len(slip_bets[slip_bets['result'] == 'push'])
-            total_legs = len(slip_bets)
-            
-            # Calculate payout based on slip type
-            if slip_type == 'Power':
-                # Power play: all must win (pushes reduce legs)
-                effective_legs = wins + pushes
-                
-                if losses == 0 and effective_legs == total_legs:
-                    # All won or pushed - calculate payout
-                    if wins == 0:
-                        # All pushes
-                        actual_payout = total_stake
-                        result = 'push'
-                    else:
-                        # Calculate combined odds from winning bets
-                        combined_odds = 1.0
-                        for _, bet in slip_bets[slip_bets['result'] == 'won'].iterrows():
-                            odds = bet['odds']
-                            if odds < 0:
-                                decimal_odds = (-100 / odds) + 1
-                            else:
-                                decimal_odds = (odds / 100) + 1
-                            combined_odds *= decimal_odds
-                            
-                        actual_payout = round(total_stake * combined_odds, 2)
-                        result = 'won'
-                else:
-                    actual_payout = 0
-                    result = 'lost'
-                    
-            else:  # Flex
-                # Get payout table
-                payout_table = self._get_flex_payouts(total_legs)
-                
-                # Adjust for pushes (reduce total legs)
-                effective_legs = total_legs - pushes
-                effective_wins = wins
-                
-                if str(effective_wins) in payout_table:
-                    multiplier = payout_table[str(effective_wins)]
-                    actual_payout = round(total_stake * multiplier, 2)
-                    
-                    if actual_payout > total_stake:
-                        result = 'won'
-                    elif actual_payout == total_stake:
-                        result = 'push'
-                    else:
-                        result = 'partial'
-                else:
-                    actual_payout = 0
-                    result = 'lost'
-                    
-            # Update slip
-            slips_df.loc[idx, 'actual_payout'] = actual_payout
-            slips_df.loc[idx, 'result'] = result
-            slips_df.loc[idx, 'winning_legs'] = wins
-            slips_df.loc[idx, 'updated_at'] = datetime.now().isoformat()
-            
-            updated_count += 1
-            
-        return updated_count
+        settled = settle_slips(bets_df, pending_slips, flex_payouts=load_flex_payouts())
+        
+        # Update slips
+        slips_df.loc[settled.index, 'actual_payout'] = settled['actual_payout']
+        slips_df.loc[settled.index, 'result'] = settled['result']
+        slips_df.loc[settled.index, 'winning_legs'] = settled['wins']
+        slips_df.loc[settled.index, 'updated_at'] = datetime.now().isoformat()
+        
+        return len(settled)
         
     def _get_flex_payouts(self, num_legs: int) -> Dict[str, float]:
         """Get Flex payout table."""
-        try:
-            config_path = Path(__file__).parent / "config" / "payout_tables.json"
-            with open(config_path, 'r') as f:
-                payouts = json.load(f)
-                return payouts['flex'].get(str(num_legs), {})
-        except:
-            # Fallback payouts
-            default = {
-                2: {2: 2.3},
-                3: {2: 1.2, 3: 5.0},
-                4: {2: 0.4, 3: 2.0, 4: 10.0},
-                5: {3: 1.5, 4: 5.0, 5: 20.0},
-                6: {4: 4.0, 5: 12.0, 6: 35.0}
-            }
-            return default.get(num_legs, {})
+        flex = load_flex_payouts()
+        if num_legs not in flex.index.get_level_values('total_legs'):
+            return {}
+        return {str(wins): multiplier for wins, multiplier in flex.loc[num_legs].items()}
             
     def _update_phase_tracker(self, bets_df: pd.DataFrame, slips_df: pd.DataFrame):
         """Update phase confidence tracking metrics."""